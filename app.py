@@ -3,13 +3,31 @@ Flask API for Xepelin Blog Scraper
 Provides endpoint to scrape blog posts and send results to webhook
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 import requests
 import threading
+import asyncio
+import contextlib
+import functools
+import hmac
+import json
 import os
+import time
+import uuid
+from urllib.parse import quote
 from dotenv import load_dotenv
 from scraper_playwright import XepelinPlaywrightScraper
-from sheets_manager import GoogleSheetsManager
+from scraper_async import AsyncXepelinScraper
+from sheets_manager import GoogleSheetsManager, SheetsSink
+from post_sinks import FILE_SINKS, StreamingWriter, available_formats, open_file_sink
+from post_cache import PostCache
+from checkpoint import CheckpointStore
+from browser_pool import BrowserPool
+from sharding import ShardOptions, iter_sharded_posts
+from job_queue import JobQueue, QueueFullError
+from memory_governor import MemoryGovernor
+from progress import JobCancelled
+from metrics import REGISTRY, Gauge
 
 # Load environment variables
 load_dotenv()
@@ -77,68 +95,226 @@ if is_render or is_railway:
 app = Flask(__name__)
 app.config['JSON_AS_ASCII'] = False  # Support Spanish characters
 
+# Persistent post cache shared by all jobs (set POST_CACHE_PATH to empty to disable)
+post_cache_path = os.getenv('POST_CACHE_PATH', '.cache/posts.sqlite3')
+post_cache = PostCache(
+    post_cache_path,
+    ttl_seconds=float(os.getenv('POST_CACHE_TTL_HOURS', '168')) * 3600,
+    max_entries=int(os.getenv('POST_CACHE_MAX_ENTRIES', '5000'))
+) if post_cache_path else None
+
+# Job checkpoints, so retried or restarted jobs resume (set CHECKPOINT_PATH to empty to disable)
+checkpoint_path = os.getenv('CHECKPOINT_PATH', '.cache/checkpoints.sqlite3')
+checkpoint_store = CheckpointStore(checkpoint_path) if checkpoint_path else None
+
+# Scraping engine: "pool" (shared warm browser), "async", "sync" (one browser per job)
+# or "sharded" (categories and large-category URL shards spread over worker processes)
+scraper_engine = os.getenv('SCRAPER_ENGINE', 'pool').lower()
+
+# Chromium is launched once per process and shared by every job and /test-playwright
+browser_pool = BrowserPool() if scraper_engine == 'pool' else None
+
+
+# One memory governor shared by every job: it raises or lowers how many pages navigate at once
+# from the RSS of this process and its Chromium children. The sharded engine budgets memory
+# per worker process instead (set MEMORY_GOVERNOR=false to keep a fixed concurrency)
+memory_governor = None
+if scraper_engine != 'sharded':
+    memory_governor = MemoryGovernor.from_env(
+        int(os.getenv('SCRAPER_CONCURRENCY', '1')) if scraper_engine == 'sync'
+        else int(os.getenv('SCRAPER_MAX_NAVIGATIONS', '4')))
+    if memory_governor:
+        memory_governor.start()
+
+
+def warm_browser_pool():
+    """Launch the pooled browser in the background so the first job does not pay for it"""
+    try:
+        browser_pool.start()
+    except Exception as e:
+        # The pool retries the launch on the next job
+        print(f"⚠️ Could not warm up the browser pool: {e}")
+
+
+# Every job writes to a sheet; concurrent writes to the same spreadsheet would interleave
+sheet_write_lock = threading.Lock()
+
+# "stream" upserts posts into the sheet in micro-batches while the scrape runs; "sync" sends only the
+# rows that changed in one batch_update at the end; "rewrite" clears and rewrites every sheet at the end
+sheets_write_mode = os.getenv('SHEETS_WRITE_MODE', 'stream').lower()
+sink_batch_size = int(os.getenv('SINK_BATCH_SIZE', '50'))
+
+# Outputs a job can write to: the Google Sheet, or a local file in OUTPUT_DIR (Parquet needs pyarrow)
+OUTPUTS = ('sheets',) + tuple(available_formats())
+output_dir = os.getenv('OUTPUT_DIR', 'output')
+# Base URL clients reach this API at, for the download links of local outputs sent to webhooks;
+# it only comes from configuration (request Host headers are client-controlled). Without PUBLIC_URL
+# or Render's RENDER_EXTERNAL_URL the links are paths relative to the API
+public_url = (os.getenv('PUBLIC_URL') or os.getenv('RENDER_EXTERNAL_URL') or '').rstrip('/')
+# Bearer token required by /scrape, /jobs and /outputs (unset leaves them open)
+api_token = os.getenv('API_TOKEN', '')
+
+# Streaming jobs take the lock of their spreadsheet (or output file) for each batch they write
+_output_locks = {}
+_output_locks_guard = threading.Lock()
+
+
+def output_lock(target: str = None):
+    """Lock serializing the jobs that write to one spreadsheet or file (a new spreadsheet needs none)"""
+    if not target:
+        return contextlib.nullcontext()
+    with _output_locks_guard:
+        return _output_locks.setdefault(target, threading.Lock())
+
+
+def output_path(output: str, category: str, scrape_all: bool) -> str:
+    """
+    File a job writes its posts to
+    
+    SQLite (upsert by URL) accumulates every run in OUTPUT_DIR/posts.sqlite; JSONL, CSV and Parquet
+    get a new file per job (a resumed job writes the posts of its earlier attempts again, so a
+    shared append-only JSONL would repeat them).
+    """
+    extension = FILE_SINKS[output].EXTENSION
+    if output == 'sqlite':
+        return os.path.join(output_dir, f"posts{extension}")
+    name = "all" if scrape_all else XepelinPlaywrightScraper.CATEGORIES[category]
+    return os.path.join(output_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}{extension}")
+
+
+def output_download_url(path: str) -> str:
+    """Download link of a local output file (served by GET /outputs/<name>, relative without PUBLIC_URL)"""
+    relative = os.path.relpath(path, output_dir).replace(os.sep, '/')
+    return f"{public_url}/outputs/{quote(relative)}"
+
 
 def process_scraping_job(category: str, webhook_url: str, email: str, 
-                         scrape_all: bool = False, sheet_url: str = None):
+                         scrape_all: bool = False, sheet_url: str = None,
+                         incremental: bool = False, progress=None, detail_level: str = "full",
+                         output: str = "sheets"):
     """
-    Background job to scrape blog and send results to webhook
+    Scrape the blog and write the results to Google Sheets or a local file
     
     Args:
         category: Category to scrape
-        webhook_url: URL to send results
+        webhook_url: URL of the webhook that requested the job (kept in the checkpoint)
         email: Email for webhook response
         scrape_all: Whether to scrape all categories
         sheet_url: Optional Google Sheet URL to use (instead of creating new one)
+        incremental: Only load posts published since the previous run and merge them
+        progress: JobProgress updated while the job runs (and checked for cancellation)
+        detail_level: "full" visits every post, "listing" builds records from the listing cards
+        output: "sheets", or a local format ("jsonl", "csv", "parquet", "sqlite") written to OUTPUT_DIR
+    
+    Returns:
+        (sheet URL or file path, error message) - exactly one of them is None
+    
+    Raises:
+        JobCancelled: If the job was cancelled through the API
     """
+    checkpoint = None
     try:
         print(f"\n{'='*60}")
         print(f"Starting scraping job")
         print(f"Category: {category if not scrape_all else 'ALL CATEGORIES'}")
         print(f"Webhook: {webhook_url}")
         print(f"Email: {email}")
+        print(f"Incremental: {incremental}")
+        print(f"Output: {output}")
         print(f"{'='*60}\n")
         
-        # Initialize sheets manager
-        print("📊 Initializing Google Sheets manager...")
-        sheets_manager = GoogleSheetsManager()
-        print("✅ Google Sheets manager initialized")
+        # Open (or resume) the job checkpoint; the key depends on what is scraped and where it is written
+        if checkpoint_store:
+            checkpoint = checkpoint_store.open(
+                {
+                    "category": category,
+                    "webhook_url": webhook_url,
+                    "email": email,
+                    "scrape_all": scrape_all,
+                    "sheet_url": sheet_url,
+                    "incremental": incremental,
+                    "detail_level": detail_level,
+                    "output": output
+                },
+                key=CheckpointStore.job_key(checkpoint_key_params(category, scrape_all, sheet_url, incremental,
+                                                                  detail_level, output))
+            )
+        
+        if output == 'sheets':
+            # Initialize sheets manager
+            print("📊 Initializing Google Sheets manager...")
+            sheets_manager = GoogleSheetsManager()
+            print("✅ Google Sheets manager initialized")
         
-        # Scrape blog posts with Playwright
-        print("🎭 Initializing Playwright scraper...")
-        with XepelinPlaywrightScraper() as scraper:
-            print("✅ Playwright scraper initialized")
+        if output != 'sheets' or sheets_write_mode == 'stream':
+            # Posts reach the sheet (or file) in micro-batches while the scrape runs
+            if output == 'sheets':
+                sink = SheetsSink(sheets_manager, sheet_url,
+                                  categories=list(XepelinPlaywrightScraper.CATEGORIES) if scrape_all else [category])
+                target = sheet_url
+                on_batch = (lambda category_name, count: progress.add_written(count, sink.url)) if progress else None
+            else:
+                target = output_path(output, category, scrape_all)
+                sink = open_file_sink(output, target)
+                on_batch = (lambda category_name, count: progress.add_written(count)) if progress else None
+            writer = StreamingWriter(sink, batch_size=sink_batch_size, on_batch=on_batch,
+                                     lock=output_lock(target))
+            with writer:
+                _stream_blog(category, scrape_all, incremental, checkpoint, progress, detail_level, writer)
+                if progress:
+                    progress.set_phase("writing")
+            result_sheet_url = writer.result
+            if result_sheet_url and output != 'sheets':
+                # Webhook clients cannot read the server's disk: send them a download link
+                result_sheet_url = output_download_url(result_sheet_url)
+            
+            if not result_sheet_url:
+                print("No data scraped!")
+                if checkpoint:
+                    checkpoint.complete()
+                if scrape_all:
+                    return None, "No se pudieron extraer datos del blog"
+                return None, f"No se encontraron posts en la categoría '{category}'"
+        else:
+            categories_data = _scrape_blog(category, scrape_all, incremental, checkpoint, progress, detail_level)
+            
             if scrape_all:
-                print("Scraping all categories...")
-                categories_data = scraper.scrape_all_categories()
-                
                 if not categories_data:
                     print("No data scraped!")
-                    send_webhook_response(webhook_url, email, None, 
-                                        error="No se pudieron extraer datos del blog")
-                    return
-                
-                # Write to Google Sheets
-                result_sheet_url = sheets_manager.write_multiple_categories(categories_data, sheet_url)
-            else:
-                print(f"Scraping category: {category}")
-                posts = scraper.scrape_category(category)
-                
-                if not posts:
-                    print(f"No posts found for category: {category}")
-                    send_webhook_response(webhook_url, email, None, 
-                                        error=f"No se encontraron posts en la categoría '{category}'")
-                    return
-                
-                # Write to Google Sheets - single category as dict
-                result_sheet_url = sheets_manager.write_multiple_categories({category: posts}, sheet_url)
+                    if checkpoint:
+                        checkpoint.complete()
+                    return None, "No se pudieron extraer datos del blog"
+            elif not categories_data[category]:
+                print(f"No posts found for category: {category}")
+                if checkpoint:
+                    checkpoint.complete()
+                return None, f"No se encontraron posts en la categoría '{category}'"
+            
+            # Write to Google Sheets
+            if progress:
+                progress.set_phase("writing")
+            with sheet_write_lock:
+                if sheets_write_mode == 'sync':
+                    result_sheet_url = sheets_manager.sync_multiple_categories(categories_data, sheet_url)
+                else:
+                    result_sheet_url = sheets_manager.write_multiple_categories(categories_data, sheet_url)
+        
+        # Results are stored: a retry from here on should start from scratch
+        if checkpoint:
+            checkpoint.complete()
         
-        # Send success response to webhook
         print(f"\n{'='*60}")
         print(f"✅ SCRAPING COMPLETED SUCCESSFULLY!")
-        print(f"📊 Google Sheet URL: {result_sheet_url}")
-        print(f"📧 Sending webhook response...")
+        print(f"📊 Results: {result_sheet_url}")
         print(f"{'='*60}\n")
-        send_webhook_response(webhook_url, email, result_sheet_url)
+        return result_sheet_url, None
+    
+    except JobCancelled:
+        print(f"🛑 Scraping job cancelled")
+        # A cancelled job must not be resumed on the next startup
+        if checkpoint:
+            checkpoint.complete()
+        raise
     
     except Exception as e:
         print(f"\n{'='*60}")
@@ -148,7 +324,273 @@ def process_scraping_job(category: str, webhook_url: str, email: str,
         print(f"{'='*60}\n")
         import traceback
         traceback.print_exc()
-        send_webhook_response(webhook_url, email, None, error=str(e))
+        if checkpoint:
+            checkpoint.fail(str(e))
+            print(f"💾 Progress kept in checkpoint {checkpoint.key}; a retry will resume from it")
+        return None, str(e)
+
+
+def _scrape_blog(category: str, scrape_all: bool, incremental: bool, checkpoint, progress, detail_level: str):
+    """Run the configured engine and return the posts of every scraped category"""
+    if scraper_engine == 'sharded':
+        categories = list(XepelinPlaywrightScraper.CATEGORIES) if scrape_all else [category]
+        results = {name: [] for name in categories}
+        for post in _sharded_posts(categories, progress, detail_level):
+            results[post["Categoría"]].append(post)
+        return results
+    
+    if browser_pool:
+        print("🎭 Running async Playwright scraper on the pooled browser...")
+        if scrape_all:
+            return browser_pool.run(
+                lambda browser: _scrape_all_async(incremental, checkpoint, browser=browser,
+                                                  progress=progress, detail_level=detail_level))
+        return {category: browser_pool.run(
+            lambda browser: _scrape_category_async(category, incremental, checkpoint,
+                                                   browser=browser, progress=progress,
+                                                   detail_level=detail_level))}
+    
+    if scraper_engine == 'async':
+        print("🎭 Running async Playwright scraper...")
+        if scrape_all:
+            return asyncio.run(_scrape_all_async(incremental, checkpoint, progress=progress,
+                                                 detail_level=detail_level))
+        return {category: asyncio.run(_scrape_category_async(category, incremental, checkpoint,
+                                                             progress=progress,
+                                                             detail_level=detail_level))}
+    
+    print("🎭 Initializing Playwright scraper...")
+    with _sync_scraper(progress) as scraper:
+        print("✅ Playwright scraper initialized")
+        if scrape_all:
+            print("Scraping all categories...")
+            return scraper.scrape_all_categories(incremental=incremental, checkpoint=checkpoint,
+                                                 detail_level=detail_level)
+        print(f"Scraping category: {category}")
+        return {category: scraper.scrape_category(category, incremental=incremental,
+                                                  checkpoint=checkpoint, detail_level=detail_level)}
+
+
+def _stream_blog(category: str, scrape_all: bool, incremental: bool, checkpoint, progress,
+                 detail_level: str, writer: StreamingWriter):
+    """Run the configured engine and hand every post to `writer` as soon as it is extracted"""
+    if scraper_engine == 'sharded':
+        categories = list(XepelinPlaywrightScraper.CATEGORIES) if scrape_all else [category]
+        for post in _sharded_posts(categories, progress, detail_level):
+            writer.put(post)
+    elif browser_pool:
+        print("🎭 Streaming with the async Playwright scraper on the pooled browser...")
+        browser_pool.run(lambda browser: _stream_async(category, scrape_all, incremental, checkpoint, writer,
+                                                       browser=browser, progress=progress,
+                                                       detail_level=detail_level))
+    elif scraper_engine == 'async':
+        print("🎭 Streaming with the async Playwright scraper...")
+        asyncio.run(_stream_async(category, scrape_all, incremental, checkpoint, writer,
+                                  progress=progress, detail_level=detail_level))
+    else:
+        print("🎭 Streaming with the Playwright scraper...")
+        with _sync_scraper(progress) as scraper:
+            if scrape_all:
+                posts = scraper.iter_all_posts(incremental=incremental, checkpoint=checkpoint,
+                                               detail_level=detail_level, batch_size=sink_batch_size)
+            else:
+                posts = scraper.iter_posts(category, incremental=incremental, checkpoint=checkpoint,
+                                           detail_level=detail_level, batch_size=sink_batch_size)
+            for post in posts:
+                writer.put(post)
+
+
+def _sharded_posts(categories, progress, detail_level: str):
+    """
+    Posts of `categories` scraped by worker processes, in category and listing order
+    
+    Workers run without the post cache and the job checkpoint; a failed job starts over.
+    A post listed in several categories is extracted once and copied to the others, and
+    cancelling the job stops the running workers.
+    """
+    print("🧩 Running sharded scraper across worker processes...")
+    options = ShardOptions(backend=os.getenv('SCRAPER_BACKEND', 'browser'),
+                           discovery=os.getenv('SCRAPER_DISCOVERY', 'listing'), detail_level=detail_level,
+                           shard_size=int(os.getenv('SHARD_SIZE', '200')), batch_size=sink_batch_size)
+    
+    def on_report(shard, report):
+        if progress and "discovered" in report:
+            progress.add_discovered(shard.category, report["discovered"])
+    
+    if progress:
+        progress.set_phase("extracting")
+    workers = os.getenv('SHARD_WORKERS')
+    for post in iter_sharded_posts(categories, options, workers=int(workers) if workers else None,
+                                   worker_memory_mb=int(os.getenv('SHARD_WORKER_MEMORY_MB', '700')),
+                                   on_report=on_report,
+                                   is_cancelled=(lambda: progress.cancelled) if progress else None):
+        if progress:
+            progress.check_cancelled()
+        yield post
+
+
+def run_queued_job(job):
+    """Job queue entry point: run the scrape described by the job parameters"""
+    return process_scraping_job(**job.params, progress=job.progress)
+
+
+def notify_job_subscribers(job):
+    """Send the result of a finished job to every webhook that asked for it"""
+    print(f"📧 Sending webhook responses for job {job.id} ({len(job.subscribers)} subscriber(s))...")
+    for webhook_url, email in job.subscribers:
+        send_webhook_response(webhook_url, email, job.result, error=job.error)
+
+
+def checkpoint_key_params(category: str, scrape_all: bool = False, sheet_url: str = None,
+                          incremental: bool = False, detail_level: str = "full", output: str = "sheets") -> dict:
+    """
+    Parameters that identify a job's checkpoint: the same ones as `job_key`, so posts saved for one
+    destination are never resumed into another (defaults are left out, so older keys stay valid)
+    """
+    params = {"category": category, "scrape_all": scrape_all, "incremental": incremental}
+    if detail_level != "full":
+        params["detail_level"] = detail_level
+    if sheet_url:
+        params["sheet_url"] = sheet_url
+    if output != "sheets":
+        params["output"] = output
+    return params
+
+
+def job_key(category: str, scrape_all: bool = False, sheet_url: str = None,
+            incremental: bool = False, detail_level: str = "full", output: str = "sheets") -> str:
+    """Coalescing key: requests for the same category set and options share one execution"""
+    categories = sorted(XepelinPlaywrightScraper.CATEGORIES) if scrape_all else [category]
+    return "|".join([",".join(categories), sheet_url or "", "incremental" if incremental else "full",
+                     detail_level, output])
+
+
+def submit_scraping_job(category: str, webhook_url: str, email: str,
+                        scrape_all: bool = False, sheet_url: str = None,
+                        incremental: bool = False, detail_level: str = "full", output: str = "sheets"):
+    """
+    Queue a scraping job, or attach the webhook to an identical job already in flight
+    
+    Returns:
+        (job, coalesced)
+    
+    Raises:
+        QueueFullError: If the queue has no room left
+    """
+    params = {
+        "category": category,
+        "webhook_url": webhook_url,
+        "email": email,
+        "scrape_all": scrape_all,
+        "sheet_url": sheet_url,
+        "incremental": incremental,
+        "detail_level": detail_level,
+        "output": output
+    }
+    return job_queue.submit(job_key(category, scrape_all, sheet_url, incremental, detail_level, output),
+                            params, (webhook_url, email))
+
+
+# Bounded job queue: at most SCRAPER_WORKERS jobs run at once, JOB_QUEUE_SIZE more may wait
+job_queue = JobQueue(
+    run=run_queued_job,
+    notify=notify_job_subscribers,
+    workers=int(os.getenv('SCRAPER_WORKERS', '1')),
+    max_pending=int(os.getenv('JOB_QUEUE_SIZE', '10'))
+)
+
+
+REGISTRY.register(Gauge("scrape_jobs_running", "Scraping jobs currently running",
+                        callback=lambda: job_queue.stats()["running"]))
+REGISTRY.register(Gauge("scrape_jobs_queued", "Scraping jobs waiting in the queue",
+                        callback=lambda: job_queue.stats()["queued"]))
+
+
+def resume_pending_jobs():
+    """
+    Re-queue jobs whose checkpoints were left behind by a crashed or killed worker, or by a
+    failed attempt. Jobs past RESUME_MAX_ATTEMPTS attempts or older than RESUME_MAX_AGE_HOURS
+    are marked abandoned instead, so a job that always fails is not retried on every start.
+    """
+    if not checkpoint_store:
+        return
+    
+    max_age_hours = os.getenv('RESUME_MAX_AGE_HOURS', '24')
+    pending = checkpoint_store.pending(
+        max_attempts=int(os.getenv('RESUME_MAX_ATTEMPTS', '3')),
+        max_age_seconds=float(max_age_hours) * 3600 if max_age_hours else None
+    )
+    for key, params in pending:
+        print(f"♻️ Resuming interrupted scraping job {key} ({params.get('category')})")
+        try:
+            submit_scraping_job(**params)
+        except QueueFullError:
+            print(f"⚠️ Job queue full, job {key} stays in the checkpoint store")
+
+
+def _sync_scraper(progress=None) -> XepelinPlaywrightScraper:
+    """Sync engine scraper configured from the environment"""
+    # With the governor this is only the cap: worker browsers start as its limit allows and retire when it drops
+    concurrency = (memory_governor.max_concurrency if memory_governor
+                   else int(os.getenv('SCRAPER_CONCURRENCY', '1')))
+    return XepelinPlaywrightScraper(concurrency=concurrency,
+                                    backend=os.getenv('SCRAPER_BACKEND', 'browser'), cache=post_cache,
+                                    progress=progress, discovery=os.getenv('SCRAPER_DISCOVERY', 'listing'),
+                                    governor=memory_governor)
+
+
+def _async_scraper(browser=None, progress=None) -> AsyncXepelinScraper:
+    """Async engine scraper configured from the environment (on `browser` if given)"""
+    max_navigations = (memory_governor.max_concurrency if memory_governor
+                       else int(os.getenv('SCRAPER_MAX_NAVIGATIONS', '4')))
+    return AsyncXepelinScraper(max_navigations=max_navigations,
+                               backend=os.getenv('SCRAPER_BACKEND', 'browser'),
+                               cache=post_cache, browser=browser, progress=progress,
+                               discovery=os.getenv('SCRAPER_DISCOVERY', 'listing'),
+                               governor=memory_governor)
+
+
+async def _scrape_category_async(category: str, incremental: bool = False, checkpoint=None,
+                                 browser=None, progress=None, detail_level: str = "full"):
+    """Scrape a single category with the async engine (on `browser` if given)"""
+    async with _async_scraper(browser, progress) as scraper:
+        return await scraper.scrape_category(category, incremental=incremental, checkpoint=checkpoint,
+                                             detail_level=detail_level)
+
+
+async def _scrape_all_async(incremental: bool = False, checkpoint=None, browser=None, progress=None,
+                            detail_level: str = "full"):
+    """Scrape all categories concurrently with the async engine (on `browser` if given)"""
+    async with _async_scraper(browser, progress) as scraper:
+        return await scraper.scrape_all_categories(incremental=incremental, checkpoint=checkpoint,
+                                                   detail_level=detail_level)
+
+
+async def _stream_async(category: str, scrape_all: bool, incremental: bool, checkpoint, writer: StreamingWriter,
+                        browser=None, progress=None, detail_level: str = "full"):
+    """Hand posts to `writer` as the async engine extracts them (on `browser` if given)"""
+    async with _async_scraper(browser, progress) as scraper:
+        if scrape_all:
+            posts = scraper.iter_all_posts(incremental=incremental, checkpoint=checkpoint,
+                                           detail_level=detail_level, batch_size=sink_batch_size)
+        else:
+            posts = scraper.iter_posts(category, incremental=incremental, checkpoint=checkpoint,
+                                       detail_level=detail_level, batch_size=sink_batch_size)
+        async with contextlib.aclosing(posts):
+            async for post in posts:
+                # put() waits while the sink is behind: keep the event loop free meanwhile
+                await asyncio.to_thread(writer.put, post)
+
+
+async def _test_page_title(browser) -> str:
+    """Open example.com in an isolated context of the pooled browser"""
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
+        await page.goto("https://example.com", timeout=30000)
+        return await page.title()
+    finally:
+        await context.close()
 
 
 def send_webhook_response(webhook_url: str, email: str, sheet_url: str = None, 
@@ -159,7 +601,7 @@ def send_webhook_response(webhook_url: str, email: str, sheet_url: str = None,
     Args:
         webhook_url: Webhook URL to send response
         email: Email address
-        sheet_url: Google Sheets URL with results
+        sheet_url: Google Sheets URL (or local output download link) with results
         error: Error message if any
     """
     try:
@@ -191,12 +633,27 @@ def send_webhook_response(webhook_url: str, email: str, sheet_url: str = None,
         print(f"Error sending webhook response: {e}")
 
 
+def require_api_token(view):
+    """Answer 401 unless the request carries `Authorization: Bearer <API_TOKEN>` (when API_TOKEN is set)"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if api_token:
+            scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+            if scheme.lower() != 'bearer' or not hmac.compare_digest(token.encode(), api_token.encode()):
+                response = jsonify({"error": "Missing or invalid API token"})
+                response.headers['WWW-Authenticate'] = 'Bearer'
+                return response, 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
 @app.route('/', methods=['GET'])
 def home():
     """Home endpoint with API information"""
     return jsonify({
         "message": "Xepelin Blog Scraper API",
         "version": "1.0",
+        "authentication": "Bearer API_TOKEN on /scrape, /jobs and /outputs" if api_token else None,
         "endpoints": {
             "/scrape": {
                 "method": "POST",
@@ -204,8 +661,32 @@ def home():
                 "required_parameters": {
                     "categoria": "Category name (e.g., 'Pymes', 'Noticias', 'Corporativos')",
                     "webhook": "Webhook URL to receive results"
+                },
+                "optional_parameters": {
+                    "scrape_all": "Scrape every category instead of 'categoria'",
+                    "incremental": "Only load posts published since the previous run and merge them",
+                    "detail_level": "'full' (default) visits every post; 'listing' returns title, "
+                                    "category and URL from the listing cards in seconds",
+                    "output": "'sheets' (default), or 'jsonl', 'csv', 'parquet', 'sqlite' to write a "
+                              "local file in OUTPUT_DIR; the webhook receives its /outputs download link"
                 }
             },
+            "/outputs/<name>": {
+                "method": "GET",
+                "description": "Download a local output file written by a job"
+            },
+            "/jobs/<job_id>": {
+                "method": "GET",
+                "description": "Job status: phase, posts discovered/extracted, throughput and ETA"
+            },
+            "/jobs/<job_id>/events": {
+                "method": "GET",
+                "description": "Server-Sent Events stream with live job progress"
+            },
+            "/jobs/<job_id>/cancel": {
+                "method": "POST",
+                "description": "Cancel a queued or running job"
+            },
             "/categories": {
                 "method": "GET",
                 "description": "Get list of available categories"
@@ -217,6 +698,10 @@ def home():
             "/health": {
                 "method": "GET",
                 "description": "Health check endpoint"
+            },
+            "/metrics": {
+                "method": "GET",
+                "description": "Prometheus metrics (stage timings, failures, jobs, Chromium memory)"
             }
         },
         "example": {
@@ -230,32 +715,50 @@ def home():
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({
+    response = {
         "status": "healthy",
         "message": "API is running"
-    }), 200
+    }
+    response["job_queue"] = job_queue.stats()
+    if browser_pool:
+        response["browser_pool"] = browser_pool.status()
+    if memory_governor:
+        response["memory_governor"] = memory_governor.status()
+    return jsonify(response), 200
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics: stage timings, failures, posts, jobs and Chromium memory"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 
 @app.route('/test-playwright', methods=['GET'])
 def test_playwright():
     """Test if Playwright is working"""
     try:
-        from playwright.sync_api import sync_playwright
-        
         print("Testing Playwright installation...")
         
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            page.goto("https://example.com", timeout=30000)
-            title = page.title()
-            browser.close()
+        if browser_pool:
+            title = browser_pool.run(_test_page_title, timeout=60)
+        else:
+            from playwright.sync_api import sync_playwright
+            
+            with sync_playwright() as p:
+                browser = p.chromium.launch(headless=True)
+                page = browser.new_page()
+                page.goto("https://example.com", timeout=30000)
+                title = page.title()
+                browser.close()
         
-        return jsonify({
+        response = {
             "status": "success",
             "message": "Playwright is working correctly",
             "test_page_title": title
-        }), 200
+        }
+        if browser_pool:
+            response["browser_pool"] = browser_pool.status()
+        return jsonify(response), 200
     
     except Exception as e:
         import traceback
@@ -267,6 +770,79 @@ def test_playwright():
         }), 500
 
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+@require_api_token
+def get_job(job_id):
+    """Current status and progress of a scraping job"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": f"Job not found: '{job_id}'"}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+@require_api_token
+def stream_job_events(job_id):
+    """
+    Server-Sent Events stream of a job's progress
+    
+    Sends a "progress" event on every change and an "end" event once the job
+    finishes; idle periods are filled with keep-alive comments.
+    """
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": f"Job not found: '{job_id}'"}), 404
+    
+    keepalive = float(os.getenv('SSE_KEEPALIVE_SECONDS', '15'))
+    
+    def events():
+        version = -1
+        while True:
+            current = job.progress.wait_for_update(version, timeout=keepalive)
+            if current == version and not job.finished_at:
+                yield ": keep-alive\n\n"
+                continue
+            version = current
+            state = job.to_dict()
+            if job.finished_at:
+                yield f"event: end\ndata: {json.dumps(state, ensure_ascii=False)}\n\n"
+                return
+            yield f"event: progress\ndata: {json.dumps(state, ensure_ascii=False)}\n\n"
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+@require_api_token
+def cancel_job(job_id):
+    """Cancel a queued or running scraping job (its webhooks are notified of the cancellation)"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": f"Job not found: '{job_id}'"}), 404
+    if job.finished_at:
+        return jsonify({"error": "Job already finished", "job": job.to_dict()}), 409
+    job_queue.cancel(job_id)
+    if job.status == "cancelled":
+        # It was still queued: it left the queue without running
+        return jsonify({"status": "cancelled", "message": "Job cancelled before it started",
+                        "job": job.to_dict()}), 200
+    return jsonify({
+        "status": "cancelling",
+        "message": "Cancellation requested; the job stops at its next checkpoint",
+        "job": job.to_dict()
+    }), 202
+
+
+@app.route('/outputs/<path:filename>', methods=['GET'])
+@require_api_token
+def download_output(filename):
+    """Download a local output file written by a job (files still being written are not served)"""
+    if filename.endswith('.part'):
+        return jsonify({"error": f"Output not found: '{filename}'"}), 404
+    return send_from_directory(os.path.abspath(output_dir), filename, as_attachment=True)
+
+
 @app.route('/categories', methods=['GET'])
 def get_categories():
     """Get available blog categories"""
@@ -279,6 +855,7 @@ def get_categories():
 
 
 @app.route('/scrape', methods=['POST'])
+@require_api_token
 def scrape_blog():
     """
     Main endpoint to scrape blog posts
@@ -287,8 +864,13 @@ def scrape_blog():
     {
         "categoria": "Category name" (required if not scrape_all),
         "webhook": "Webhook URL" (required),
-        "scrape_all": true/false (optional, default: false)
+        "scrape_all": true/false (optional, default: false),
+        "incremental": true/false (optional, default: false),
+        "detail_level": "full" | "listing" (optional, default: "full"),
+        "output": "sheets" | "jsonl" | "csv" | "parquet" | "sqlite" (optional, default: "sheets")
     }
+    
+    Answers 503 with a Retry-After header when the job queue is full.
     """
     try:
         # Parse request data
@@ -302,12 +884,37 @@ def scrape_blog():
         # Check for required parameters
         webhook_url = data.get('webhook')
         scrape_all = data.get('scrape_all', False)
+        incremental = bool(data.get('incremental', False))
+        detail_level = data.get('detail_level', 'full')
+        output = data.get('output', 'sheets')
         
         if not webhook_url:
             return jsonify({
                 "error": "Missing required parameter: 'webhook'"
             }), 400
         
+        if detail_level not in XepelinPlaywrightScraper.DETAIL_LEVELS:
+            return jsonify({
+                "error": f"Invalid detail_level: '{detail_level}'",
+                "available_detail_levels": list(XepelinPlaywrightScraper.DETAIL_LEVELS)
+            }), 400
+        
+        if output not in OUTPUTS:
+            return jsonify({
+                "error": f"Invalid output: '{output}'",
+                "available_outputs": list(OUTPUTS)
+            }), 400
+        
+        if incremental and scraper_engine == 'sharded':
+            return jsonify({
+                "error": "Incremental mode is not available with the sharded engine"
+            }), 400
+        
+        if incremental and post_cache is None:
+            return jsonify({
+                "error": "Incremental mode requires the post cache (set POST_CACHE_PATH)"
+            }), 400
+        
         # Category is required unless scrape_all is true
         if scrape_all:
             categoria = "all"
@@ -333,21 +940,43 @@ def scrape_blog():
         # Use default sheet URL (will be overwritten each time)
         sheet_url = "https://docs.google.com/spreadsheets/d/17JhWF2_3DMt_jRllzKQp7DuKNcHGfYDJ6u5DeBsYHR8/"
         
-        # Start background job
-        thread = threading.Thread(
-            target=process_scraping_job,
-            args=(categoria, webhook_url, email, scrape_all, sheet_url)
-        )
-        thread.daemon = True
-        thread.start()
+        # Queue the job (identical in-flight requests share one execution)
+        try:
+            job, coalesced = submit_scraping_job(categoria, webhook_url, email, scrape_all,
+                                                 sheet_url, incremental, detail_level, output)
+        except QueueFullError as e:
+            response = jsonify({
+                "error": "Too many scraping jobs in progress, try again later",
+                "retry_after": e.retry_after
+            })
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 503
         
         # Return immediate response
         response = {
             "status": "accepted",
-            "message": "Scraping job started. Results will be sent to webhook when complete.",
-            "webhook": webhook_url
+            "message": "Scraping job queued. Results will be sent to webhook when complete.",
+            "webhook": webhook_url,
+            "job_id": job.id,
+            "job_status": job.status,
+            "status_url": f"/jobs/{job.id}",
+            "events_url": f"/jobs/{job.id}/events"
         }
         
+        if coalesced:
+            response["coalesced"] = True
+            response["message"] = ("An identical scraping job is already in progress. "
+                                   "Results will be sent to this webhook too.")
+        
+        if incremental:
+            response["incremental"] = True
+        
+        if detail_level != "full":
+            response["detail_level"] = detail_level
+        
+        if output != "sheets":
+            response["output"] = output
+        
         if scrape_all:
             response["mode"] = "all_categories"
             response["info"] = "Scraping all 6 categories (654 posts total, ~25 min)"
@@ -380,6 +1009,18 @@ def internal_error(error):
     }), 500
 
 
+def start_background_jobs():
+    """
+    Warm the browser pool and resume interrupted jobs. Called by the server entrypoint
+    (gunicorn's post_worker_init hook in gunicorn.conf.py, or `python app.py`), not on import.
+    """
+    if browser_pool:
+        threading.Thread(target=warm_browser_pool, daemon=True).start()
+    
+    if os.getenv('RESUME_JOBS_ON_STARTUP', 'true').lower() == 'true':
+        resume_pending_jobs()
+
+
 if __name__ == '__main__':
     # Get configuration from environment
     host = os.getenv('HOST', '0.0.0.0')
@@ -393,4 +1034,5 @@ if __name__ == '__main__':
     print(f"Debug mode: {debug}")
     print("="*60 + "\n")
     
+    start_background_jobs()
     app.run(host=host, port=port, debug=debug)
@@ -0,0 +1,4 @@
+"""
+Benchmarks offline del scraper contra una copia local del blog.
+Uso: python -m benchmarks.run_benchmarks --help
+"""
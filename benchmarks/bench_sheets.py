@@ -0,0 +1,121 @@
+"""
+Mide la escritura en Google Sheets contra la API falsa de benchmarks.fake_sheets.
+Escribe los posts del sitio de prueba en todas las categorías con cada modo de
+GoogleSheetsManager (reescritura y sync), cuenta las llamadas a la API, los 429 y el
+tiempo, y verifica que la planilla quede exactamente con los registros esperados;
+termina con código 1 si alguna hoja difiere.
+
+Uso:
+    python -m benchmarks.bench_sheets
+    python -m benchmarks.bench_sheets --latency-ms 150 --rate-limit 5 --window 2
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.fake_sheets import FakeSheetsClient
+from benchmarks.fixture_site import FixtureSite
+from scraper_playwright import XepelinPlaywrightScraper
+from sheets_manager import GoogleSheetsManager
+
+
+def build_categories(site: FixtureSite) -> Dict[str, List[Dict[str, str]]]:
+    """Posts de cada categoría del sitio de prueba, como los entrega el scraper."""
+    categories = {}
+    for name in XepelinPlaywrightScraper.CATEGORIES:
+        categories[name] = [dict(site.expected_post(url), **{"Categoría": name})
+                            for url in site.expected_urls(name)]
+    return categories
+
+
+def mutate(categories: Dict[str, List[Dict[str, str]]], rng: random.Random) -> Dict[str, List[Dict[str, str]]]:
+    """
+    Simula una nueva ejecución: posts nuevos al inicio, algunos títulos editados, posts
+    eliminados y una categoría que ya no se pide.
+    """
+    changed = {}
+    for index, (name, posts) in enumerate(categories.items()):
+        if index == len(categories) - 1:
+            break
+        posts = [dict(post) for post in posts if rng.random() > 0.03]
+        for post in rng.sample(posts, max(1, len(posts) // 20)):
+            post["Titular"] += " (actualizado)"
+        new_posts = [{"Titular": f"Post nuevo {index}-{i}", "Categoría": name, "Autor": "N/A",
+                      "Tiempo de lectura": "N/A", "Fecha": "N/A",
+                      "URL": f"https://example.test/blog/{name.lower()}/nuevo-{index}-{i}"} for i in range(3)]
+        changed[name] = new_posts + posts
+    return changed
+
+
+def validate(client: FakeSheetsClient, url: str, categories: Dict[str, List[Dict[str, str]]],
+             manager: GoogleSheetsManager) -> List[str]:
+    """Diferencias entre la planilla y `categories` (vacío si coinciden)."""
+    spreadsheet = client.spreadsheet(url)
+    errors = []
+    titles = {sheet.title for sheet in spreadsheet.sheets}
+    expected_titles = {name[:30] for name in categories}
+    if titles != expected_titles:
+        errors.append(f"hojas {sorted(titles)} != {sorted(expected_titles)}")
+    for name, posts in categories.items():
+        sheet = spreadsheet.sheet(name[:30])
+        if sheet is None:
+            continue
+        expected = [manager.HEADERS] + [manager._post_to_row(post) for post in posts]
+        got = [(row + [""] * len(manager.HEADERS))[:len(manager.HEADERS)] for row in sheet.values()]
+        if got != expected:
+            errors.append(f"{name}: {len(got) - 1} filas escritas, {len(expected) - 1} esperadas"
+                          if len(got) != len(expected) else f"{name}: contenido distinto")
+        if not sheet.header_formatted:
+            errors.append(f"{name}: encabezado sin formato")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escritura en Google Sheets (API falsa)")
+    parser.add_argument("--posts", type=int, default=650)
+    parser.add_argument("--latency-ms", type=float, default=100, help="Latencia de cada llamada a la API")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Llamadas por ventana antes de responder 429")
+    parser.add_argument("--window", type=float, default=60, help="Duración de la ventana de la cuota (s)")
+    parser.add_argument("--retry-base", type=float, default=0.2, help="Primer backoff tras un 429 (s)")
+    args = parser.parse_args()
+    
+    site = FixtureSite(XepelinPlaywrightScraper.CATEGORIES, posts=args.posts)
+    first = build_categories(site)
+    second = mutate(first, random.Random(7))
+    
+    client = FakeSheetsClient(latency_ms=args.latency_ms, rate_limit=args.rate_limit, window_seconds=args.window)
+    manager = GoogleSheetsManager(client=client, retry_base_seconds=args.retry_base)
+    
+    # (caso, método, datos, planilla existente)
+    steps = [
+        ("reescritura, planilla nueva", manager.write_multiple_categories, first, False),
+        ("reescritura, sin cambios", manager.write_multiple_categories, first, True),
+        ("sync, sin cambios", manager.sync_multiple_categories, first, True),
+        ("sync, con cambios", manager.sync_multiple_categories, second, True),
+        ("reescritura, con cambios", manager.write_multiple_categories, first, True),
+    ]
+    
+    url = None
+    failed = False
+    print(f"{'caso':<28}{'llamadas':>9}{'requests':>10}{'429':>6}{'segundos':>10}  resultado")
+    for name, method, categories, existing in steps:
+        calls_before, rejected_before = client.total_calls, client.rejected
+        requests_before = client.applied_requests
+        started = time.perf_counter()
+        url = method(categories, url if existing else None)
+        elapsed = time.perf_counter() - started
+        calls, rejected = client.total_calls - calls_before, client.rejected - rejected_before
+        errors = validate(client, url, categories, manager)
+        failed = failed or bool(errors)
+        print(f"{name:<28}{calls:>9}{client.applied_requests - requests_before:>10}{rejected:>6}"
+              f"{elapsed:>10.2f}  {'ok' if not errors else '; '.join(errors)}")
+    
+    print(f"\nLlamadas por método: {dict(client.calls)}")
+    print(f"{'✅' if not failed else '❌'} {sum(len(posts) for posts in first.values())} filas por escritura completa")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Verifica que los parsers de html_extractor den resultados idénticos y compara su costo.
+Recorre todas las páginas de posts y listados del sitio de prueba (o de un snapshot grabado)
+sin levantar el servidor; termina con código 1 si algún registro difiere.
+
+Uso:
+    python -m benchmarks.compare_parsers
+    python -m benchmarks.compare_parsers --snapshot benchmarks/snapshot
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.fixture_site import FixtureSite
+from html_extractor import EXTRACTORS, get_extractor
+from scraper_playwright import XepelinPlaywrightScraper
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara los parsers de HTML del scraper")
+    parser.add_argument("--posts", type=int, default=650)
+    parser.add_argument("--body-kb", type=int, default=20)
+    parser.add_argument("--snapshot", help="Directorio grabado con benchmarks.record_snapshot")
+    args = parser.parse_args()
+    
+    site = FixtureSite(XepelinPlaywrightScraper.CATEGORIES, posts=args.posts, body_kb=args.body_kb,
+                       snapshot_dir=args.snapshot)
+    posts = [(site.url(path), site.render_post(path)) for path in site.posts]
+    listings = [site.render_listing(slug) for slug in site.listings]
+    extractors = [get_extractor(name) for name in EXTRACTORS]
+    reference = extractors[0]
+    
+    timings = {}
+    for extractor in extractors:
+        started = time.perf_counter()
+        for url, page in posts:
+            extractor.extract_post(page, url)
+        post_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        for page in listings:
+            extractor.post_links(page)
+        timings[extractor.name] = (post_seconds, time.perf_counter() - started)
+    
+    differences = 0
+    for url, page in posts:
+        expected = reference.extract_post(page, url)
+        for extractor in extractors[1:]:
+            got = extractor.extract_post(page, url)
+            if got != expected:
+                differences += 1
+                print(f"❌ {extractor.name} difiere de {reference.name} en {url}:\n"
+                      f"   {got}\n   {expected}")
+    for page in listings:
+        expected = reference.post_links(page)
+        for extractor in extractors[1:]:
+            if extractor.post_links(page) != expected:
+                differences += 1
+                print(f"❌ {extractor.name} difiere de {reference.name} en un listado")
+    
+    print(f"\n{'parser':<8}{'ms/post':>10}{'ms/listado':>12}")
+    for name, (post_seconds, listing_seconds) in timings.items():
+        print(f"{name:<8}{post_seconds / len(posts) * 1000:>10.2f}"
+              f"{listing_seconds / max(len(listings), 1) * 1000:>12.2f}")
+    print(f"\n{'✅' if not differences else '❌'} {len(posts)} posts y {len(listings)} listados, "
+          f"{differences} diferencias")
+    sys.exit(1 if differences else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+API de Google Sheets falsa y en memoria para probar y medir sheets_manager sin red.
+Imita la superficie de gspread que usa GoogleSheetsManager (create, open_by_url,
+worksheets, values_batch_get, batch_update, share), aplica los requests de batchUpdate
+sobre grillas en memoria con las mismas validaciones que la API real (límites de la
+grilla, no borrar todas las hojas, batchUpdate atómico) y responde 429 cuando se supera
+la cuota configurada, como la cuota por minuto de Google. `inject_error` hace fallar
+llamadas puntuales, incluso después de aplicarlas (un 5xx de una escritura ya confirmada).
+
+Ejemplo:
+    client = FakeSheetsClient(rate_limit=60, window_seconds=60)
+    manager = GoogleSheetsManager(client=client)
+"""
+import copy
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from typing import Dict, List, Optional
+
+import gspread
+
+
+class FakeResponse:
+    """Respuesta mínima para construir un gspread.exceptions.APIError."""
+    
+    def __init__(self, code: int, message: str):
+        self.status_code = code
+        self.text = message
+        self._error = {"code": code, "message": message,
+                       "status": "RESOURCE_EXHAUSTED" if code == 429 else "INVALID_ARGUMENT"}
+    
+    def json(self) -> Dict:
+        return {"error": self._error}
+
+
+def api_error(code: int, message: str) -> gspread.exceptions.APIError:
+    """Error con el mismo tipo y código HTTP que lanza gspread."""
+    return gspread.exceptions.APIError(FakeResponse(code, message))
+
+
+class FakeSheet:
+    """Hoja en memoria: grilla de row_count x col_count celdas de texto."""
+    
+    def __init__(self, sheet_id: int, title: str, rows: int = 1000, cols: int = 26):
+        self.id = sheet_id
+        self.title = title
+        self.cells: List[List[str]] = [[""] * cols for _ in range(rows)]
+        self.header_formatted = False
+    
+    @property
+    def row_count(self) -> int:
+        return len(self.cells)
+    
+    @property
+    def col_count(self) -> int:
+        return len(self.cells[0]) if self.cells else 0
+    
+    def values(self) -> List[List[str]]:
+        """Valores como los devuelve la API: sin celdas ni filas vacías al final."""
+        rows = [list(row) for row in self.cells]
+        for row in rows:
+            while row and row[-1] == "":
+                row.pop()
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+
+class FakeWorksheet:
+    """Propiedades de una hoja al momento de listarla (como gspread.Worksheet)."""
+    
+    def __init__(self, sheet: FakeSheet):
+        self.id = sheet.id
+        self.title = sheet.title
+        self.row_count = sheet.row_count
+        self.col_count = sheet.col_count
+
+
+class FakeSpreadsheet:
+    """Planilla en memoria; cada método público cuenta como una llamada a la API."""
+    
+    def __init__(self, client: "FakeSheetsClient", key: str, title: str):
+        self.client = client
+        self.id = key
+        self.title = title
+        self.sheets: List[FakeSheet] = [FakeSheet(0, "Sheet1")]
+    
+    @property
+    def url(self) -> str:
+        return f"https://docs.google.com/spreadsheets/d/{self.id}/edit#gid=0"
+    
+    def sheet(self, title: str) -> Optional[FakeSheet]:
+        return next((sheet for sheet in self.sheets if sheet.title == title), None)
+    
+    # ------------------------------------------------------------------ API
+    
+    def worksheets(self) -> List[FakeWorksheet]:
+        self.client._request("worksheets")
+        return [FakeWorksheet(sheet) for sheet in self.sheets]
+    
+    def share(self, value, perm_type: str, role: str) -> None:
+        self.client._request("share")
+    
+    def values_batch_get(self, ranges: List[str]) -> Dict:
+        self.client._request("values_batch_get")
+        value_ranges = []
+        for range_name in ranges:
+            match = re.match(r"^'((?:[^']|'')*)'!|^([^!]+)!", range_name)
+            title = (match.group(1).replace("''", "'") if match.group(1) is not None else match.group(2)) \
+                if match else range_name
+            sheet = self.sheet(title)
+            if sheet is None:
+                raise api_error(400, f"Unable to parse range: {range_name}")
+            value_ranges.append({"range": range_name, "majorDimension": "ROWS", "values": sheet.values()})
+        return {"spreadsheetId": self.id, "valueRanges": value_ranges}
+    
+    def batch_update(self, body: Dict) -> Dict:
+        late_error = self.client._request("batch_update")
+        # Atómico como la API real: si un request falla no se aplica ninguno
+        sheets = copy.deepcopy(self.sheets)
+        for index, request in enumerate(body.get("requests", [])):
+            (kind, params), = request.items()
+            handler = getattr(self, f"_apply_{kind}", None)
+            if handler is None:
+                raise api_error(400, f"requests[{index}]: unsupported request {kind}")
+            try:
+                handler(sheets, params)
+            except ValueError as e:
+                raise api_error(400, f"requests[{index}].{kind}: {e}")
+        self.sheets = sheets
+        self.client.applied_requests += len(body.get("requests", []))
+        if late_error:
+            raise late_error
+        return {"spreadsheetId": self.id, "replies": [{} for _ in body.get("requests", [])]}
+    
+    # ------------------------------------------------------------------ requests de batchUpdate
+    
+    @staticmethod
+    def _find(sheets: List[FakeSheet], sheet_id: int) -> FakeSheet:
+        for sheet in sheets:
+            if sheet.id == sheet_id:
+                return sheet
+        raise ValueError(f"No grid with id: {sheet_id}")
+    
+    @staticmethod
+    def _check_range(sheet: FakeSheet, grid_range: Dict) -> None:
+        if grid_range.get("endRowIndex", 0) > sheet.row_count or \
+                grid_range.get("endColumnIndex", 0) > sheet.col_count:
+            raise ValueError(f"Range exceeds grid limits of sheet {sheet.title}")
+    
+    def _apply_addSheet(self, sheets: List[FakeSheet], params: Dict) -> None:
+        properties = params.get("properties", {})
+        sheet_id = properties.get("sheetId", max((sheet.id for sheet in sheets), default=0) + 1)
+        title = properties.get("title", f"Sheet{len(sheets) + 1}")
+        if any(sheet.id == sheet_id or sheet.title == title for sheet in sheets):
+            raise ValueError(f"A sheet with the name \"{title}\" or id {sheet_id} already exists")
+        grid = properties.get("gridProperties", {})
+        sheets.append(FakeSheet(sheet_id, title, grid.get("rowCount", 1000), grid.get("columnCount", 26)))
+    
+    def _apply_deleteSheet(self, sheets: List[FakeSheet], params: Dict) -> None:
+        sheet = self._find(sheets, params["sheetId"])
+        if len(sheets) == 1:
+            raise ValueError("You can't remove all the sheets in a document.")
+        sheets.remove(sheet)
+    
+    def _apply_updateCells(self, sheets: List[FakeSheet], params: Dict) -> None:
+        if "start" in params:
+            start = params["start"]
+            sheet = self._find(sheets, start["sheetId"])
+            row_index, column_index = start.get("rowIndex", 0), start.get("columnIndex", 0)
+            rows = params.get("rows", [])
+            width = max((len(row.get("values", [])) for row in rows), default=0)
+            self._check_range(sheet, {"endRowIndex": row_index + len(rows), "endColumnIndex": column_index + width})
+            for offset, row in enumerate(rows):
+                for column, cell in enumerate(row.get("values", [])):
+                    value = cell.get("userEnteredValue", {})
+                    sheet.cells[row_index + offset][column_index + column] = str(next(iter(value.values()), ""))
+        else:
+            # Con "range" y sin filas: borra los campos indicados en todo el rango
+            grid_range = params["range"]
+            sheet = self._find(sheets, grid_range["sheetId"])
+            self._check_range(sheet, grid_range)
+            for row in sheet.cells[grid_range.get("startRowIndex", 0):grid_range.get("endRowIndex", sheet.row_count)]:
+                for column in range(grid_range.get("startColumnIndex", 0), grid_range.get("endColumnIndex", sheet.col_count)):
+                    row[column] = ""
+    
+    def _apply_insertDimension(self, sheets: List[FakeSheet], params: Dict) -> None:
+        grid_range = params["range"]
+        sheet = self._find(sheets, grid_range["sheetId"])
+        start, end = grid_range["startIndex"], grid_range["endIndex"]
+        if grid_range["dimension"] == "ROWS":
+            if start >= sheet.row_count:
+                raise ValueError("startIndex must be less than the grid size; use appendDimension")
+            sheet.cells[start:start] = [[""] * sheet.col_count for _ in range(end - start)]
+        else:
+            if start >= sheet.col_count:
+                raise ValueError("startIndex must be less than the grid size; use appendDimension")
+            for row in sheet.cells:
+                row[start:start] = [""] * (end - start)
+    
+    def _apply_appendDimension(self, sheets: List[FakeSheet], params: Dict) -> None:
+        sheet = self._find(sheets, params["sheetId"])
+        if params["dimension"] == "ROWS":
+            sheet.cells.extend([""] * sheet.col_count for _ in range(params["length"]))
+        else:
+            for row in sheet.cells:
+                row.extend([""] * params["length"])
+    
+    def _apply_deleteDimension(self, sheets: List[FakeSheet], params: Dict) -> None:
+        grid_range = params["range"]
+        sheet = self._find(sheets, grid_range["sheetId"])
+        start, end = grid_range["startIndex"], grid_range["endIndex"]
+        if grid_range["dimension"] == "ROWS":
+            if end > sheet.row_count or end - start >= sheet.row_count:
+                raise ValueError("Invalid requests: cannot delete rows beyond or all rows of the grid")
+            del sheet.cells[start:end]
+        else:
+            if end > sheet.col_count or end - start >= sheet.col_count:
+                raise ValueError("Invalid requests: cannot delete columns beyond or all columns of the grid")
+            for row in sheet.cells:
+                del row[start:end]
+    
+    def _apply_repeatCell(self, sheets: List[FakeSheet], params: Dict) -> None:
+        grid_range = params["range"]
+        sheet = self._find(sheets, grid_range["sheetId"])
+        self._check_range(sheet, grid_range)
+        if grid_range.get("startRowIndex", 0) == 0 and grid_range.get("endRowIndex") == 1:
+            sheet.header_formatted = True
+    
+    def _apply_autoResizeDimensions(self, sheets: List[FakeSheet], params: Dict) -> None:
+        dimensions = params["dimensions"]
+        sheet = self._find(sheets, dimensions["sheetId"])
+        if dimensions.get("endIndex", 0) > sheet.col_count:
+            raise ValueError(f"Range exceeds grid limits of sheet {sheet.title}")
+
+
+class FakeSheetsClient:
+    """
+    Cliente en memoria con latencia y cuota configurables.
+    
+    Cada llamada se cuenta en `calls` (por método); las que exceden `rate_limit` llamadas
+    en `window_seconds` responden 429 y se cuentan en `rejected`.
+    """
+    
+    def __init__(self, latency_ms: float = 0, rate_limit: Optional[int] = None, window_seconds: float = 60):
+        """
+        Args:
+            latency_ms: Latencia agregada a cada llamada
+            rate_limit: Llamadas permitidas por ventana (None = sin límite)
+            window_seconds: Duración de la ventana de la cuota
+        """
+        self.latency = latency_ms / 1000
+        self.rate_limit = rate_limit
+        self.window = window_seconds
+        self.calls: Counter = Counter()
+        self.rejected = 0
+        self.applied_requests = 0
+        self.spreadsheets: Dict[str, FakeSpreadsheet] = {}
+        self._recent: deque = deque()
+        self._injected: Dict[str, deque] = defaultdict(deque)
+        self._lock = threading.Lock()
+    
+    def inject_error(self, method: str, status: int, applied: bool = False, times: int = 1) -> None:
+        """
+        Hace fallar las próximas `times` llamadas a `method` con `status`.
+        
+        Args:
+            method: Método de la API ("create", "batch_update", "values_batch_get", ...)
+            status: Código HTTP del error
+            applied: Si True, create y batch_update se aplican antes de fallar (como un 5xx
+                     que llega después de que el servidor confirmó la escritura)
+            times: Llamadas que fallan
+        """
+        with self._lock:
+            self._injected[method].extend([(status, applied)] * times)
+    
+    def _request(self, method: str) -> Optional[gspread.exceptions.APIError]:
+        """
+        Registra una llamada; lanza 429 si la cuota de la ventana está agotada, o el error
+        inyectado para `method`.
+        
+        Returns:
+            Error inyectado que la llamada debe lanzar después de aplicarse, o None
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls[method] += 1
+            if self._injected[method]:
+                status, applied = self._injected[method].popleft()
+                self.rejected += status == 429
+                error = api_error(status, f"Injected error {status}")
+                if applied and method in ("create", "batch_update"):
+                    return error
+                raise error
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= self.window:
+                self._recent.popleft()
+            if self.rate_limit is not None and len(self._recent) >= self.rate_limit:
+                self.rejected += 1
+                raise api_error(429, "Quota exceeded for quota metric 'Write requests' and limit "
+                                     "'Write requests per minute per user'")
+            self._recent.append(now)
+        return None
+    
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
+    
+    def create(self, title: str) -> FakeSpreadsheet:
+        late_error = self._request("create")
+        key = f"fake{len(self.spreadsheets) + 1}"
+        self.spreadsheets[key] = FakeSpreadsheet(self, key, title)
+        if late_error:
+            raise late_error
+        return self.spreadsheets[key]
+    
+    def open_by_url(self, url: str) -> FakeSpreadsheet:
+        self._request("open_by_url")
+        spreadsheet = self.spreadsheet(url)
+        if spreadsheet is None:
+            raise gspread.exceptions.SpreadsheetNotFound(url)
+        return spreadsheet
+    
+    def spreadsheet(self, url: str) -> Optional[FakeSpreadsheet]:
+        """Planilla de una URL sin contar una llamada (para inspeccionar el resultado)."""
+        match = re.search(r"/spreadsheets/d/([^/]+)", url)
+        return self.spreadsheets.get(match.group(1)) if match else None
@@ -0,0 +1,458 @@
+"""
+Sitio de prueba local que imita al blog de Xepelin.
+Sirve listados por categoría con el botón "Cargar más", páginas de posts con la misma
+estructura HTML y __NEXT_DATA__ que el sitio real, los endpoints /_next/data/ de Next.js,
+y robots.txt, un índice de sitemaps y un feed RSS para el descubrimiento por sitemap.
+Los posts se generan de forma determinista o se reproducen desde un snapshot grabado
+con `benchmarks.record_snapshot`.
+"""
+import hashlib
+import html
+import json
+import os
+import random
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+BUILD_ID = "fixture-build"
+SITEMAP_CHUNK = 500  # URLs por sitemap hijo del índice
+
+AUTHORS = [
+    ("Lilia Valenzuela", "SaaS Specialist"),
+    ("Tomás Herrera", "Content Manager"),
+    ("Camila Rojas", "Finance Editor"),
+    ("Diego Fuentes", "Growth Lead"),
+    ("Valentina Soto", "Product Marketing"),
+]
+
+WORDS = ("factoring pyme flujo caja crédito financiamiento empresa facturas pago proveedores "
+         "capital trabajo liquidez tasa plazo cobranza riesgo crecimiento digital").split()
+
+
+class FixtureSite:
+    """
+    Servidor HTTP local con el contenido del blog de prueba.
+    
+    Ejemplo:
+        with FixtureSite(categories) as site:
+            scraper_cls = type("S", (XepelinPlaywrightScraper,), {"BASE_URL": site.base_url})
+    """
+    
+    def __init__(self, categories: Dict[str, str], posts: int = 650, page_size: int = 12,
+                 latency_ms: float = 0, load_more_ms: float = 300, body_kb: int = 20,
+                 overlap: float = 0.05, next_data_listing: str = "first_page",
+                 snapshot_dir: Optional[str] = None, seed: int = 42,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            categories: Nombre -> slug de cada categoría (XepelinPlaywrightScraper.CATEGORIES)
+            posts: Cantidad de posts únicos a generar (ignorado con snapshot)
+            page_size: Posts por página del listado (los siguientes se cargan con "Cargar más")
+            latency_ms: Latencia agregada a cada respuesta
+            load_more_ms: Latencia extra de cada carga de "Cargar más"
+            body_kb: Tamaño aproximado del cuerpo de cada post generado
+            overlap: Fracción de posts que aparecen también en una segunda categoría
+            next_data_listing: "first_page" (el __NEXT_DATA__ del listado trae solo la primera
+                               página, como en el sitio real) o "full" (trae todo el archivo)
+            snapshot_dir: Directorio grabado con `record_snapshot` para reproducir páginas reales
+            seed: Semilla del generador
+            host: Interfaz donde escuchar
+            port: Puerto (0 = uno libre)
+        """
+        if next_data_listing not in ("first_page", "full"):
+            raise ValueError("next_data_listing debe ser 'first_page' o 'full'")
+        
+        self.categories = categories
+        self.page_size = page_size
+        self.latency = latency_ms / 1000
+        self.load_more_delay = load_more_ms / 1000
+        self.body_kb = body_kb
+        self.next_data_listing = next_data_listing
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.requests = 0
+        self._requests_lock = threading.Lock()
+        
+        # path -> datos del post; slug de categoría -> paths en orden del listado (más nuevo primero)
+        self.posts: Dict[str, Dict] = {}
+        self.listings: Dict[str, List[str]] = {slug: [] for slug in categories.values()}
+        self.recorded: Dict[str, str] = {}
+        self._rendered: Dict[str, str] = {}
+        if snapshot_dir:
+            self._load_snapshot(snapshot_dir)
+        else:
+            self._generate(posts, overlap, random.Random(seed))
+    
+    # ------------------------------------------------------------------ contenido
+    
+    def _generate(self, count: int, overlap: float, rng: random.Random) -> None:
+        """Genera `count` posts repartidos entre las categorías."""
+        slugs = list(self.categories.values())
+        base_day = 20000  # días desde 1970, ~2024
+        for i in range(count):
+            category = slugs[i % len(slugs)]
+            words = rng.sample(WORDS, 4)
+            slug = f"{'-'.join(words)}-{i}"
+            author, role = AUTHORS[rng.randrange(len(AUTHORS))]
+            day = base_day - i  # el índice más bajo es el más reciente
+            path = f"/blog/{category}/{slug}"
+            self.posts[path] = {
+                "title": " ".join(words).capitalize() + f" ({i})",
+                "slug": slug,
+                "category": category,
+                "author": author,
+                "role": role,
+                "minutes": rng.randint(3, 15),
+                "date": time.strftime("%Y-%m-%dT10:00:00.000Z", time.gmtime(day * 86400)),
+                "paragraphs": rng.randint(1, 1 << 30),
+            }
+            self.listings[category].append(path)
+            if rng.random() < overlap:
+                other = rng.choice([s for s in slugs if s != category])
+                self.listings[other].append(path)
+    
+    def _load_snapshot(self, snapshot_dir: str) -> None:
+        """Carga un snapshot grabado: manifest.json + pages/<sha1 de la URL>.html."""
+        with open(os.path.join(snapshot_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+        for slug, urls in manifest["categories"].items():
+            for url in urls:
+                path = urlparse(url).path.rstrip('/')
+                page_file = os.path.join(snapshot_dir, "pages", hashlib.sha1(url.encode()).hexdigest() + ".html")
+                if not os.path.exists(page_file):
+                    continue
+                with open(page_file, encoding="utf-8") as f:
+                    self.recorded[path] = f.read()
+                self.posts.setdefault(path, {"title": path.rsplit('/', 1)[-1].replace('-', ' '),
+                                             "slug": path.rsplit('/', 1)[-1], "category": slug})
+                self.listings.setdefault(slug, []).append(path)
+    
+    @property
+    def base_url(self) -> str:
+        """URL base del blog local (equivalente a XepelinPlaywrightScraper.BASE_URL)."""
+        return f"http://{self.host}:{self.port}/blog"
+    
+    def url(self, path: str) -> str:
+        """URL absoluta de un path del sitio."""
+        return f"http://{self.host}:{self.port}{path}"
+    
+    def expected_urls(self, category_name: Optional[str] = None) -> List[str]:
+        """
+        URLs que un scraping completo debería encontrar.
+        
+        Args:
+            category_name: Categoría; None para todos los posts únicos
+        """
+        if category_name is not None:
+            return [self.url(path) for path in self.listings[self.categories[category_name]]]
+        return [self.url(path) for path in self.posts]
+    
+    def expected_post(self, url: str) -> Optional[Dict[str, str]]:
+        """Registro que el scraper debería extraer para `url` (None con snapshot)."""
+        post = self.posts.get(urlparse(url).path.rstrip('/'))
+        if not post or "author" not in post:
+            return None
+        return {
+            "Titular": post["title"],
+            "Autor": f"{post['author']} | {post['role']}",
+            "Tiempo de lectura": f"{post['minutes']} min de lectura",
+            "Fecha": post["date"],
+            "URL": url
+        }
+    
+    def _post_node(self, path: str) -> Dict:
+        """Nodo del post tal como aparece en el JSON de Next.js."""
+        post = self.posts[path]
+        return {
+            "title": post["title"],
+            "slug": post["slug"],
+            "url": path,
+            "publishedAt": post.get("date"),
+            "readingTime": post.get("minutes"),
+            "author": {"name": post.get("author"), "position": post.get("role")},
+        }
+    
+    def _next_data(self, page: str, page_props: Dict) -> str:
+        """<script id="__NEXT_DATA__"> con los pageProps dados."""
+        payload = {"props": {"pageProps": page_props}, "page": page, "buildId": BUILD_ID}
+        return ('<script id="__NEXT_DATA__" type="application/json">'
+                + json.dumps(payload, ensure_ascii=False).replace("</", "<\\/") + "</script>")
+    
+    def _listing_props(self, slug: str) -> Dict:
+        """pageProps del listado de una categoría."""
+        paths = self.listings[slug]
+        shown = paths if self.next_data_listing == "full" else paths[:self.page_size]
+        return {"category": slug, "total": len(paths), "posts": [self._post_node(p) for p in shown]}
+    
+    def _post_props(self, path: str) -> Dict:
+        """pageProps de la página de un post (con posts relacionados, como el sitio real)."""
+        related = [p for p in self.listings[self.posts[path]["category"]][:4] if p != path][:3]
+        return {"post": self._post_node(path), "related": [self._post_node(p) for p in related]}
+    
+    def render_listing(self, slug: str) -> str:
+        """HTML del listado con la primera página y el botón "Cargar más"."""
+        paths = self.listings[slug]
+        cards = "\n".join(self._card(path) for path in paths[:self.page_size])
+        hidden = ' style="display:none"' if len(paths) <= self.page_size else ""
+        return f"""<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Blog - {html.escape(slug)}</title>
+{self._next_data("/blog/[category]", self._listing_props(slug))}</head>
+<body><main>
+<h1>Blog Xepelin</h1>
+<div id="posts">
+{cards}
+</div>
+<button id="load-more" type="button"{hidden}>Cargar más</button>
+</main>
+<script>
+(function () {{
+  var button = document.getElementById('load-more');
+  var container = document.getElementById('posts');
+  var page = 1;
+  button.addEventListener('click', function () {{
+    if (button.disabled) return;
+    button.disabled = true;
+    fetch('/api/listing/{slug}?page=' + page).then(function (r) {{ return r.json(); }}).then(function (data) {{
+      data.posts.forEach(function (post) {{
+        var card = document.createElement('a');
+        card.href = post.url;
+        card.className = 'post-card';
+        var title = document.createElement('h3');
+        title.textContent = post.title;
+        card.appendChild(title);
+        container.appendChild(card);
+      }});
+      page += 1;
+      button.disabled = false;
+      if (!data.has_more) button.style.display = 'none';
+    }});
+  }});
+}})();
+</script>
+</body></html>"""
+
+    def _card(self, path: str) -> str:
+        """Tarjeta de un post en el listado."""
+        post = self.posts[path]
+        return (f'<a class="post-card" href="{self.url(path)}"><h3>{html.escape(post["title"])}</h3>'
+                f'<p>{html.escape(post.get("author", ""))}</p></a>')
+    
+    def listing_page(self, slug: str, page: int) -> Dict:
+        """Página `page` (desde 1) de posts adicionales, como la devuelve "Cargar más"."""
+        paths = self.listings[slug]
+        start = page * self.page_size
+        chunk = paths[start:start + self.page_size]
+        return {
+            "posts": [{"url": self.url(p), "title": self.posts[p]["title"]} for p in chunk],
+            "has_more": start + self.page_size < len(paths)
+        }
+    
+    def render_post(self, path: str) -> str:
+        """HTML de un post: grabado si hay snapshot, generado si no."""
+        if path in self.recorded:
+            return self.recorded[path]
+        if path in self._rendered:
+            return self._rendered[path]
+        
+        post = self.posts[path]
+        rng = random.Random(post["paragraphs"])
+        paragraphs = []
+        size = 0
+        while size < self.body_kb * 1024:
+            text = " ".join(rng.choice(WORDS) for _ in range(80))
+            paragraphs.append(f"<p>{text}.</p>")
+            size += len(text) + 8
+        self._rendered[path] = f"""<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>{html.escape(post["title"])} | Xepelin</title>
+{self._next_data("/blog/[category]/[slug]", self._post_props(path))}</head>
+<body><main><article>
+<h1>{html.escape(post["title"])}</h1>
+<div class="Text_body__snVk8">{post["minutes"]}min de lectura</div>
+<img src="/static/cover.jpg" alt="">
+<div class="flex gap-2"><div class="text-sm dark:text-text-disabled">{html.escape(post["author"])}</div><div class="text-sm dark:text-text-disabled">| {html.escape(post["role"])}</div></div>
+{"".join(paragraphs)}
+</article></main></body></html>"""
+        return self._rendered[path]
+    
+    def render_robots(self) -> str:
+        """robots.txt con la ubicación del índice de sitemaps."""
+        return f"User-agent: *\nAllow: /\nSitemap: {self.url('/sitemap.xml')}\n"
+    
+    def render_sitemap_index(self) -> str:
+        """Índice con un sitemap hijo por cada SITEMAP_CHUNK posts."""
+        chunks = max(1, -(-len(self.posts) // SITEMAP_CHUNK))
+        items = "".join(f"<sitemap><loc>{self.url(f'/sitemap-blog-{n}.xml')}</loc></sitemap>"
+                        for n in range(1, chunks + 1))
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{items}</sitemapindex>')
+    
+    def render_sitemap(self, number: int) -> Optional[str]:
+        """Sitemap hijo `number` (desde 1) con sus URLs y lastmod; None si no existe."""
+        paths = list(self.posts)[(number - 1) * SITEMAP_CHUNK:number * SITEMAP_CHUNK]
+        if number < 1 or not paths:
+            return None
+        items = []
+        for path in paths:
+            lastmod = f"<lastmod>{self.posts[path]['date']}</lastmod>" if "date" in self.posts[path] else ""
+            items.append(f"<url><loc>{html.escape(self.url(path))}</loc>{lastmod}</url>")
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{"".join(items)}</urlset>')
+    
+    def render_rss(self) -> str:
+        """
+        Feed RSS con todos los posts; cada item lleva como <category> las categorías de todos
+        los listados donde aparece (la ruta del post solo indica la principal).
+        """
+        names = {slug: name for name, slug in self.categories.items()}
+        listed_in: Dict[str, List[str]] = {}
+        for slug, paths in self.listings.items():
+            for path in paths:
+                listed_in.setdefault(path, []).append(names.get(slug, slug))
+        items = []
+        for path, post in self.posts.items():
+            pub_date = ""
+            if "date" in post:
+                published = datetime.fromisoformat(post["date"].replace("Z", "+00:00"))
+                pub_date = f"<pubDate>{format_datetime(published, usegmt=True)}</pubDate>"
+            categories = "".join(f"<category>{html.escape(name)}</category>" for name in listed_in.get(path, []))
+            items.append(f"<item><title>{html.escape(post['title'])}</title>"
+                         f"<link>{html.escape(self.url(path))}</link>{pub_date}{categories}</item>")
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>'
+                f"<title>Blog Xepelin</title><link>{self.base_url}</link>{''.join(items)}</channel></rss>")
+    
+    # ------------------------------------------------------------------ servidor
+    
+    def _handler(self):
+        """Clase de handler HTTP ligada a este sitio."""
+        site = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, format, *args):
+                pass
+            
+            def _send(self, status: int, body: bytes, content_type: str) -> None:
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if status == 200:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def do_GET(self):
+                with site._requests_lock:
+                    site.requests += 1
+                if site.latency:
+                    time.sleep(site.latency)
+                
+                parsed = urlparse(self.path)
+                path = unquote(parsed.path).rstrip('/')  # Los slugs con tildes llegan codificados
+                parts = path.strip('/').split('/')
+                
+                if path.startswith("/api/listing/") and parts[-1] in site.listings:
+                    time.sleep(site.load_more_delay)
+                    page = int(parse_qs(parsed.query).get("page", ["1"])[0])
+                    body = json.dumps(site.listing_page(parts[-1], page)).encode()
+                    return self._send(200, body, "application/json")
+                
+                if path.startswith(f"/_next/data/{BUILD_ID}/") and path.endswith(".json"):
+                    page_path = path[len(f"/_next/data/{BUILD_ID}"):-len(".json")]
+                    page_parts = page_path.strip('/').split('/')
+                    if len(page_parts) == 2 and page_parts[1] in site.listings:
+                        props = site._listing_props(page_parts[1])
+                    elif page_path in site.posts and page_path not in site.recorded:
+                        props = site._post_props(page_path)
+                    else:
+                        return self._send(404, b"{}", "application/json")
+                    body = json.dumps({"pageProps": props}, ensure_ascii=False).encode()
+                    return self._send(200, body, "application/json")
+                
+                if path == "/robots.txt":
+                    return self._send(200, site.render_robots().encode(), "text/plain")
+                if path == "/sitemap.xml":
+                    return self._send(200, site.render_sitemap_index().encode(), "application/xml")
+                if path.startswith("/sitemap-blog-") and path.endswith(".xml"):
+                    sitemap = site.render_sitemap(int(path[len("/sitemap-blog-"):-len(".xml")] or 0))
+                    if sitemap is not None:
+                        return self._send(200, sitemap.encode(), "application/xml")
+                if path == "/blog/rss.xml":
+                    return self._send(200, site.render_rss().encode(), "application/rss+xml")
+                
+                if len(parts) == 2 and parts[0] == "blog" and parts[1] in site.listings:
+                    return self._send(200, site.render_listing(parts[1]).encode(), "text/html; charset=utf-8")
+                
+                if path in site.posts:
+                    return self._send(200, site.render_post(path).encode(), "text/html; charset=utf-8")
+                
+                self._send(404, b"Not found", "text/plain")
+        
+        return Handler
+    
+    def start(self) -> "FixtureSite":
+        """Levanta el servidor en un thread de fondo."""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-site", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Detiene el servidor."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+
+def main():
+    """Sirve el sitio de prueba hasta Ctrl+C (útil para inspeccionarlo en un navegador)."""
+    import argparse
+    from scraper_playwright import XepelinPlaywrightScraper
+    
+    parser = argparse.ArgumentParser(description="Sitio local que imita al blog de Xepelin")
+    parser.add_argument("--posts", type=int, default=650)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--load-more-ms", type=float, default=300)
+    parser.add_argument("--next-data-listing", choices=("first_page", "full"), default="first_page")
+    parser.add_argument("--snapshot", help="Directorio grabado con benchmarks.record_snapshot")
+    args = parser.parse_args()
+    
+    site = FixtureSite(XepelinPlaywrightScraper.CATEGORIES, posts=args.posts, port=args.port,
+                       latency_ms=args.latency_ms, load_more_ms=args.load_more_ms,
+                       next_data_listing=args.next_data_listing, snapshot_dir=args.snapshot)
+    with site:
+        print(f"🧪 Sitio de prueba en {site.base_url} ({len(site.posts)} posts)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
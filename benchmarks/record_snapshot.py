@@ -0,0 +1,85 @@
+"""
+Graba un snapshot del blog real para reproducirlo con FixtureSite.
+Toma las URLs de cada categoría guardadas en la caché de posts por una ejecución anterior
+(así no hace falta recorrer los listados) y descarga el HTML de cada post una sola vez.
+
+Uso:
+    python -m benchmarks.record_snapshot --cache .cache/posts.sqlite3 --out benchmarks/snapshot
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from post_cache import PostCache
+from scraper_playwright import XepelinPlaywrightScraper
+
+
+def record(cache_path: str, out_dir: str, workers: int = 4, delay: float = 0.2) -> int:
+    """
+    Descarga los posts conocidos por la caché y escribe manifest.json + pages/.
+    
+    Args:
+        cache_path: Caché de posts con los listados de una ejecución anterior
+        out_dir: Directorio del snapshot
+        workers: Descargas simultáneas
+        delay: Pausa (s) después de cada descarga, para no cargar el sitio real
+    
+    Returns:
+        Cantidad de páginas grabadas
+    """
+    cache = PostCache(cache_path)
+    categories = {}
+    for name, slug in XepelinPlaywrightScraper.CATEGORIES.items():
+        categories[slug] = cache.get_category_urls(name)
+    cache.close()
+    
+    urls = list(dict.fromkeys(url for category_urls in categories.values() for url in category_urls))
+    if not urls:
+        raise SystemExit("La caché no tiene listados: ejecuta antes un scraping completo con caché")
+    
+    pages_dir = os.path.join(out_dir, "pages")
+    os.makedirs(pages_dir, exist_ok=True)
+    session = requests.Session()
+    
+    def download(url: str) -> bool:
+        page_file = os.path.join(pages_dir, hashlib.sha1(url.encode()).hexdigest() + ".html")
+        if os.path.exists(page_file):
+            return True
+        try:
+            response = session.get(url, timeout=30)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"⚠️ No se pudo grabar {url}: {e}")
+            return False
+        with open(page_file, "w", encoding="utf-8") as f:
+            f.write(response.text)
+        time.sleep(delay)
+        return True
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        recorded = sum(executor.map(download, urls))
+    
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump({"recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                   "categories": categories}, f, indent=2)
+    print(f"✅ {recorded}/{len(urls)} páginas grabadas en {out_dir}")
+    return recorded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graba un snapshot del blog para los benchmarks")
+    parser.add_argument("--cache", default=".cache/posts.sqlite3", help="Caché de posts (POST_CACHE_PATH)")
+    parser.add_argument("--out", default="benchmarks/snapshot", help="Directorio de salida")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.2)
+    args = parser.parse_args()
+    record(args.cache, args.out, args.workers, args.delay)
+
+
+if __name__ == "__main__":
+    main()
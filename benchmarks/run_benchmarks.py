@@ -0,0 +1,286 @@
+"""
+Benchmarks end-to-end del scraper contra el sitio de prueba local.
+Cada caso (motor x backend x descubrimiento x parser x concurrencia x modo) corre en un proceso nuevo para que el
+pico de memoria sea propio; se miden throughput, percentiles de latencia por etapa y RSS
+máximo (Python + Chromium), y se valida que los registros coincidan con los esperados.
+
+Uso:
+    python -m benchmarks.run_benchmarks --backends browser,http --concurrency 1,4 --mode category,all
+    python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json  # falla si hay regresión
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from benchmarks.fixture_site import FixtureSite
+from metrics import percentile
+
+
+def case_key(case: Dict[str, Any]) -> str:
+    """Identificador estable de un caso, para comparar contra un baseline."""
+    key = (f"{case['engine']}/{case['backend']}/{case['discovery']}/{case['parser']}"
+           f"/c{case['concurrency']}/{case['mode']}")
+    return key + (f":{case['category']}" if case["mode"] == "category" else "")
+
+
+class PeakRssSampler:
+    """Muestrea en segundo plano el RSS del proceso y sus hijos (Chromium) y guarda el pico."""
+    
+    def __init__(self, interval: float = 0.2):
+        self.interval = interval
+        self.peak_total = 0
+        self.peak_chromium = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def _run(self) -> None:
+        from metrics import is_chromium, read_process_tree
+        
+        while not self._stop.is_set():
+            tree = read_process_tree()
+            chromium = sum(rss for name, rss in tree.values() if is_chromium(name))
+            self.peak_total = max(self.peak_total, sum(rss for _, rss in tree.values()))
+            self.peak_chromium = max(self.peak_chromium, chromium)
+            self._stop.wait(self.interval)
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+
+
+def _scrape(case: Dict[str, Any], base_url: str):
+    """Ejecuta el scraping del caso contra el sitio local y devuelve {categoría: posts}."""
+    import asyncio
+    from html_extractor import get_extractor
+    from scraper_playwright import XepelinPlaywrightScraper
+    from scraper_async import AsyncXepelinScraper
+    
+    # El motor async parsea con los métodos de XepelinPlaywrightScraper; el proceso es propio del caso
+    XepelinPlaywrightScraper.EXTRACTOR = get_extractor(case["parser"])
+    
+    if case["engine"] == "async":
+        scraper_cls = type("FixtureAsyncScraper", (AsyncXepelinScraper,), {"BASE_URL": base_url})
+        
+        async def run():
+            async with scraper_cls(max_navigations=case["concurrency"], backend=case["backend"],
+                                   discovery=case["discovery"]) as scraper:
+                if case["mode"] == "all":
+                    return await scraper.scrape_all_categories()
+                return {case["category"]: await scraper.scrape_category(case["category"])}
+        
+        return asyncio.run(run())
+    
+    scraper_cls = type("FixtureScraper", (XepelinPlaywrightScraper,), {"BASE_URL": base_url})
+    with scraper_cls(concurrency=case["concurrency"], backend=case["backend"],
+                     http_workers=case["http_workers"], discovery=case["discovery"]) as scraper:
+        if case["mode"] == "all":
+            return scraper.scrape_all_categories()
+        return {case["category"]: scraper.scrape_category(case["category"])}
+
+
+def _validate(results: Dict[str, List[Dict[str, str]]], expected: Dict[str, Any]) -> Dict[str, int]:
+    """Compara los registros obtenidos con los que sirve el sitio de prueba."""
+    missing = 0
+    wrong = 0
+    for category, urls in expected["urls"].items():
+        got = {post["URL"]: post for post in results.get(category, [])}
+        missing += sum(1 for url in urls if url not in got)
+        for url in urls:
+            want = expected["posts"].get(url)
+            if want and url in got and any(got[url].get(k) != v for k, v in want.items()):
+                wrong += 1
+    return {"missing": missing, "wrong": wrong}
+
+
+def _run_case(case: Dict[str, Any], base_url: str, expected: Dict[str, Any], out: "multiprocessing.Queue") -> None:
+    """Proceso hijo: corre un caso y publica sus mediciones."""
+    import metrics
+    
+    durations: Dict[str, List[float]] = defaultdict(list)
+    lock = threading.Lock()
+    
+    def record(value: float, labels: Dict[str, str]) -> None:
+        with lock:
+            durations[labels["stage"]].append(value)
+    
+    metrics.STAGE_SECONDS.add_observer(record)
+    
+    try:
+        with PeakRssSampler() as sampler:
+            started = time.perf_counter()
+            results = _scrape(case, base_url)
+            wall = time.perf_counter() - started
+    except Exception as e:
+        out.put({"case": case_key(case), "error": f"{type(e).__name__}: {e}"})
+        return
+    
+    posts = len({post["URL"] for posts in results.values() for post in posts})
+    stages = {}
+    for stage, values in sorted(durations.items()):
+        stages[stage] = {
+            "count": len(values),
+            "total_seconds": round(sum(values), 3),
+            "per_second": round(len(values) / wall, 2) if wall else None,
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+        }
+    
+    out.put({
+        "case": case_key(case),
+        "config": case,
+        "posts": posts,
+        "wall_seconds": round(wall, 2),
+        "posts_per_second": round(posts / wall, 2) if wall else None,
+        "peak_rss_mb": round(sampler.peak_total / 2**20, 1),
+        "peak_chromium_rss_mb": round(sampler.peak_chromium / 2**20, 1),
+        "fallback_posts": metrics.FALLBACK_POSTS.value(),
+        "validation": _validate(results, expected),
+        "stages": stages,
+    })
+
+
+def run_case(case: Dict[str, Any], site: FixtureSite, timeout: float) -> Dict[str, Any]:
+    """Corre un caso en un proceso nuevo y devuelve sus mediciones."""
+    from scraper_playwright import XepelinPlaywrightScraper
+    
+    categories = list(XepelinPlaywrightScraper.CATEGORIES) if case["mode"] == "all" else [case["category"]]
+    urls = {name: site.expected_urls(name) for name in categories}
+    expected = {
+        "urls": urls,
+        "posts": {url: site.expected_post(url) for name in categories for url in urls[name]},
+    }
+    
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue()
+    process = ctx.Process(target=_run_case, args=(case, site.base_url, expected, out))
+    process.start()
+    try:
+        result = out.get(timeout=timeout)
+    except queue.Empty:
+        process.terminate()
+        result = {"case": case_key(case), "error": f"timeout ({timeout}s)"}
+    process.join()
+    return result
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, max_regression: float) -> List[str]:
+    """
+    Compara contra un baseline guardado.
+    
+    Returns:
+        Descripción de cada regresión (throughput menor o RSS mayor que lo tolerado)
+    """
+    with open(baseline_path) as f:
+        baseline = {item["case"]: item for item in json.load(f)["results"] if "error" not in item}
+    
+    regressions = []
+    for result in results:
+        before = baseline.get(result["case"])
+        if not before or "error" in result:
+            continue
+        if result["posts_per_second"] < before["posts_per_second"] * (1 - max_regression):
+            regressions.append(f"{result['case']}: {before['posts_per_second']} -> "
+                               f"{result['posts_per_second']} posts/s")
+        if result["peak_rss_mb"] > before["peak_rss_mb"] * (1 + max_regression):
+            regressions.append(f"{result['case']}: RSS {before['peak_rss_mb']} -> {result['peak_rss_mb']} MB")
+    return regressions
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    """Resumen legible de los casos."""
+    print("\n" + "=" * 124)
+    print(f"{'caso':<56}{'posts':>7}{'seg':>9}{'posts/s':>9}{'nav p95':>10}{'parse p95':>11}"
+          f"{'RSS MB':>9}{'Chromium':>10}{'ok':>5}")
+    print("-" * 124)
+    for result in results:
+        if "error" in result:
+            print(f"{result['case']:<56}  ❌ {result['error']}")
+            continue
+        stages = result["stages"]
+        nav = stages.get("navigation", stages.get("http_fetch", {})).get("p95_ms", "-")
+        parse = stages.get("html_parse", {}).get("p95_ms", "-")
+        valid = result["validation"]
+        ok = "✅" if not valid["missing"] and not valid["wrong"] else "❌"
+        print(f"{result['case']:<56}{result['posts']:>7}{result['wall_seconds']:>9}{result['posts_per_second']:>9}"
+              f"{nav:>10}{parse:>11}{result['peak_rss_mb']:>9}{result['peak_chromium_rss_mb']:>10}{ok:>5}")
+    print("=" * 124)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks offline del scraper")
+    parser.add_argument("--engines", default="sync", help="sync,async")
+    parser.add_argument("--backends", default="browser,http,nextjs")
+    parser.add_argument("--discovery", default="listing", help="listing,sitemap")
+    parser.add_argument("--parsers", default="lxml", help="lxml,bs4")
+    parser.add_argument("--concurrency", default="1,4", help="Workers (sync) o navegaciones (async)")
+    parser.add_argument("--http-workers", type=int, default=8)
+    parser.add_argument("--mode", default="category,all", help="category,all")
+    parser.add_argument("--category", default="Noticias")
+    parser.add_argument("--posts", type=int, default=650)
+    parser.add_argument("--latency-ms", type=float, default=20, help="Latencia simulada por request")
+    parser.add_argument("--load-more-ms", type=float, default=300)
+    parser.add_argument("--next-data-listing", choices=("first_page", "full"), default="first_page")
+    parser.add_argument("--snapshot", help="Directorio grabado con benchmarks.record_snapshot")
+    parser.add_argument("--timeout", type=float, default=3600, help="Segundos máximos por caso")
+    parser.add_argument("--output", default="benchmarks/results.json")
+    parser.add_argument("--baseline", help="Resultados anteriores para detectar regresiones")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+    
+    from scraper_playwright import XepelinPlaywrightScraper
+    
+    cases = [
+        {"engine": engine, "backend": backend, "discovery": discovery, "parser": html_parser,
+         "concurrency": int(concurrency), "mode": mode, "category": args.category,
+         "http_workers": args.http_workers}
+        for engine in args.engines.split(",")
+        for backend in args.backends.split(",")
+        for discovery in args.discovery.split(",")
+        for html_parser in args.parsers.split(",")
+        for concurrency in args.concurrency.split(",")
+        for mode in args.mode.split(",")
+    ]
+    
+    site = FixtureSite(XepelinPlaywrightScraper.CATEGORIES, posts=args.posts, latency_ms=args.latency_ms,
+                       load_more_ms=args.load_more_ms, next_data_listing=args.next_data_listing,
+                       snapshot_dir=args.snapshot)
+    results = []
+    with site:
+        print(f"🧪 Sitio de prueba en {site.base_url} ({len(site.posts)} posts), {len(cases)} casos")
+        for case in cases:
+            print(f"\n▶️ {case_key(case)}")
+            results.append(run_case(case, site, args.timeout))
+    
+    print_table(results)
+    
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                   "site": {"posts": len(site.posts), "latency_ms": args.latency_ms,
+                            "load_more_ms": args.load_more_ms, "snapshot": args.snapshot},
+                   "results": results}, f, indent=2, ensure_ascii=False)
+    print(f"💾 Resultados en {args.output}")
+    
+    failed = [r for r in results if "error" in r or r["validation"]["missing"] or r["validation"]["wrong"]]
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.max_regression)
+        for regression in regressions:
+            print(f"📉 Regresión: {regression}")
+        failed += regressions
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
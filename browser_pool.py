@@ -0,0 +1,193 @@
+"""
+Pool de navegador a nivel de proceso.
+Lanza Chromium una sola vez en un event loop dedicado y lo comparte entre trabajos:
+cada trabajo recibe el navegador y trabaja en sus propios BrowserContext aislados.
+"""
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Optional
+from playwright.async_api import async_playwright, Browser
+
+from scraper_playwright import XepelinPlaywrightScraper
+
+
+class BrowserPool:
+    """
+    Mantiene un Chromium caliente para todo el proceso.
+    
+    Playwright no es thread-safe, así que el navegador vive en un thread con su propio
+    event loop; los trabajos (que corren en otros threads) envían corutinas con `run()`.
+    Antes de cada trabajo se verifica que el navegador siga vivo y abra contextos; si no,
+    se relanza. Al salir del proceso el navegador se cierra (atexit).
+    """
+    
+    def __init__(self, headless: bool = True, launch_timeout: float = 60.0):
+        """
+        Inicializa el pool (sin lanzar el navegador todavía).
+        
+        Args:
+            headless: Si True, ejecuta el navegador sin GUI
+            launch_timeout: Segundos máximos para lanzar Chromium
+        """
+        self.headless = headless
+        self.launch_timeout = launch_timeout
+        self.browser: Optional[Browser] = None
+        self.playwright = None
+        self.launches = 0
+        self.active_jobs = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._launch_lock: Optional[asyncio.Lock] = None
+    
+    def start(self) -> None:
+        """Arranca el event loop del pool y lanza Chromium."""
+        with self._lock:
+            if self._thread is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+        self._submit(self._ensure_browser(), timeout=self.launch_timeout)
+    
+    def stop(self) -> None:
+        """Cierra el navegador y detiene el event loop."""
+        if not self._loop:
+            return
+        try:
+            self._submit(self._shutdown(), timeout=30)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            if not self._thread.is_alive():
+                self._loop.close()
+            self._loop = None
+            self._thread = None
+            # El lock queda atado al loop detenido; un start() posterior crea otro
+            self._launch_lock = None
+    
+    def _submit(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Ejecuta una corutina en el loop del pool y espera su resultado (la cancela si vence el timeout)."""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # Sin cancelarla, la corutina seguiría usando el navegador en el loop del pool
+            future.cancel()
+            raise
+    
+    async def _ensure_browser(self) -> Browser:
+        """Devuelve un navegador sano, lanzándolo o relanzándolo si hace falta."""
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        
+        async with self._launch_lock:
+            if self.browser and self.browser.is_connected():
+                return self.browser
+            
+            if self.browser:
+                print("♻️ Chromium del pool desconectado, relanzando...")
+                try:
+                    await self.browser.close()
+                except Exception:
+                    pass
+            
+            if self.playwright is None:
+                self.playwright = await async_playwright().start()
+            
+            print("🎭 Launching pooled Chromium browser...")
+            self.browser = await self.playwright.chromium.launch(
+                headless=self.headless,
+                args=XepelinPlaywrightScraper.BROWSER_ARGS
+            )
+            self.launches += 1
+            print("✅ Pooled Chromium browser ready")
+            return self.browser
+    
+    async def _shutdown(self) -> None:
+        """Cierra navegador y driver de Playwright."""
+        if self.browser:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+    
+    async def _healthy_browser(self) -> Browser:
+        """Health check: devuelve el navegador si puede abrir un contexto; si no, lo relanza."""
+        browser = await self._ensure_browser()
+        try:
+            context = await browser.new_context()
+            await context.close()
+            return browser
+        except Exception as e:
+            print(f"♻️ Chromium del pool no responde ({e}), relanzando...")
+        
+        async with self._launch_lock:
+            if self.browser is browser:
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+                self.browser = None
+        return await self._ensure_browser()
+    
+    def health_check(self, timeout: float = 15.0) -> bool:
+        """
+        Verifica que el navegador del pool responde (y lo relanza si estaba caído).
+        
+        Args:
+            timeout: Segundos máximos del chequeo
+        
+        Returns:
+            True si el navegador está sano
+        """
+        if not self._loop:
+            return False
+        try:
+            return self._submit(self._healthy_browser(), timeout=timeout) is not None
+        except Exception as e:
+            print(f"⚠️ Health check del pool falló: {e}")
+            return False
+    
+    def run(self, job: Callable[[Browser], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """
+        Ejecuta un trabajo con el navegador del pool, bloqueando al thread llamador.
+        
+        Args:
+            job: Función que recibe el Browser y devuelve una corutina; debe crear
+                 sus propios BrowserContext y cerrarlos al terminar
+            timeout: Segundos máximos del trabajo (None = sin límite); al vencer, el
+                     trabajo se cancela y se lanza TimeoutError
+        
+        Returns:
+            Resultado de la corutina
+        """
+        if not self._loop:
+            self.start()
+        
+        async def guarded():
+            browser = await self._healthy_browser()
+            return await job(browser)
+        
+        with self._lock:
+            self.active_jobs += 1
+        try:
+            return self._submit(guarded(), timeout=timeout)
+        finally:
+            with self._lock:
+                self.active_jobs -= 1
+    
+    def status(self) -> dict:
+        """Estado del pool para endpoints de salud."""
+        return {
+            "running": self._loop is not None,
+            "connected": bool(self.browser and self.browser.is_connected()),
+            "launches": self.launches,
+            "active_jobs": self.active_jobs
+        }
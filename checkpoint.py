@@ -0,0 +1,298 @@
+"""
+Checkpoints de trabajos de scraping en SQLite.
+Cada trabajo guarda sus parámetros, las URLs descubiertas por categoría y cada post ya
+extraído, para que un reintento (o un reinicio del proceso) continúe donde quedó.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class JobCheckpoint:
+    """Checkpoint de un trabajo concreto dentro de un CheckpointStore."""
+    
+    def __init__(self, store: "CheckpointStore", key: str, params: Dict[str, Any]):
+        """
+        Args:
+            store: Almacén donde se persiste el checkpoint
+            key: Identificador estable del trabajo
+            params: Parámetros con los que se lanzó el trabajo
+        """
+        self.store = store
+        self.key = key
+        self.params = params
+    
+    def get_discovered(self) -> Dict[str, List[str]]:
+        """
+        Devuelve las URLs descubiertas por categoría en intentos anteriores.
+        
+        Returns:
+            Diccionario categoría -> URLs en orden del listado
+        """
+        return self.store.get_discovered(self.key)
+    
+    def save_discovered(self, category: str, urls: List[str]) -> None:
+        """
+        Guarda el listado descubierto de una categoría.
+        
+        Args:
+            category: Nombre de la categoría
+            urls: URLs en orden del listado
+        """
+        self.store.save_discovered(self.key, category, urls)
+    
+    def completed_posts(self) -> Dict[str, Dict[str, str]]:
+        """
+        Devuelve los posts ya extraídos en intentos anteriores.
+        
+        Returns:
+            Diccionario URL -> registro del post
+        """
+        return self.store.completed_posts(self.key)
+    
+    def add_post(self, url: str, record: Dict[str, str]) -> None:
+        """
+        Registra un post extraído.
+        
+        Args:
+            url: URL del post
+            record: Registro extraído
+        """
+        self.store.add_post(self.key, url, record)
+    
+    def fail(self, error: str) -> None:
+        """
+        Marca el intento como fallido; el progreso se conserva para el próximo intento.
+        
+        Args:
+            error: Mensaje del error
+        """
+        self.store.fail(self.key, error)
+    
+    def complete(self) -> None:
+        """Elimina el checkpoint cuando el trabajo terminó correctamente."""
+        self.store.delete(self.key)
+
+
+class CheckpointStore:
+    """Almacén SQLite de checkpoints de trabajos, compartido entre threads."""
+    
+    # Estados de un trabajo: "running" (en curso, o interrumpido si el proceso murió),
+    # "failed" (el último intento terminó con error) y "abandoned" (no se reanuda más)
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            key TEXT PRIMARY KEY,
+            params TEXT NOT NULL,
+            discovered TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'running',
+            last_error TEXT
+        );
+        CREATE TABLE IF NOT EXISTS job_posts (
+            key TEXT NOT NULL,
+            url TEXT NOT NULL,
+            record TEXT NOT NULL,
+            PRIMARY KEY (key, url)
+        );
+    """
+    
+    def __init__(self, path: str):
+        """
+        Abre (o crea) el almacén de checkpoints.
+        
+        Args:
+            path: Ruta del archivo SQLite
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+            # Almacenes creados antes de contar intentos
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, definition in (("attempts", "INTEGER NOT NULL DEFAULT 0"),
+                                       ("status", "TEXT NOT NULL DEFAULT 'running'"),
+                                       ("last_error", "TEXT")):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+            self._conn.commit()
+    
+    @staticmethod
+    def job_key(params: Dict[str, Any]) -> str:
+        """
+        Calcula un identificador estable para unos parámetros de trabajo.
+        
+        Args:
+            params: Parámetros que determinan el resultado del trabajo
+        
+        Returns:
+            Hash corto de los parámetros
+        """
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    
+    def open(self, params: Dict[str, Any], key: Optional[str] = None) -> JobCheckpoint:
+        """
+        Abre el checkpoint de un trabajo, creándolo si no existe, y cuenta un intento más.
+        Si ya existía (reintento o reinicio), conserva su progreso; si estaba abandonado,
+        empieza de cero.
+        
+        Args:
+            params: Parámetros del trabajo (se guardan para poder reanudarlo)
+            key: Identificador del trabajo (por defecto, el hash de `params`)
+        
+        Returns:
+            Checkpoint del trabajo
+        """
+        key = key or self.job_key(params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM jobs WHERE key = ?", (key,)).fetchone()
+            if row and row["status"] == "abandoned":
+                self._conn.execute("DELETE FROM job_posts WHERE key = ?", (key,))
+                self._conn.execute("DELETE FROM jobs WHERE key = ?", (key,))
+            self._conn.execute(
+                "INSERT INTO jobs (key, params, discovered, created_at, updated_at, attempts, status) "
+                "VALUES (?, ?, NULL, ?, ?, 1, 'running') "
+                "ON CONFLICT(key) DO UPDATE SET attempts = attempts + 1, status = 'running', "
+                "updated_at = excluded.updated_at",
+                (key, json.dumps(params, ensure_ascii=False), now, now)
+            )
+            self._conn.commit()
+        return JobCheckpoint(self, key, params)
+    
+    def get_discovered(self, key: str) -> Dict[str, List[str]]:
+        """
+        Devuelve las URLs descubiertas por categoría de un trabajo.
+        
+        Args:
+            key: Identificador del trabajo
+        
+        Returns:
+            Diccionario categoría -> URLs en orden del listado
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT discovered FROM jobs WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["discovered"]) if row and row["discovered"] else {}
+    
+    def save_discovered(self, key: str, category: str, urls: List[str]) -> None:
+        """
+        Guarda el listado descubierto de una categoría de un trabajo.
+        
+        Args:
+            key: Identificador del trabajo
+            category: Nombre de la categoría
+            urls: URLs en orden del listado
+        """
+        # Leer y escribir bajo el mismo lock: varias categorías pueden guardarse a la vez
+        with self._lock:
+            row = self._conn.execute("SELECT discovered FROM jobs WHERE key = ?", (key,)).fetchone()
+            discovered = json.loads(row["discovered"]) if row and row["discovered"] else {}
+            discovered[category] = urls
+            self._conn.execute(
+                "UPDATE jobs SET discovered = ?, updated_at = ? WHERE key = ?",
+                (json.dumps(discovered, ensure_ascii=False), time.time(), key)
+            )
+            self._conn.commit()
+    
+    def completed_posts(self, key: str) -> Dict[str, Dict[str, str]]:
+        """
+        Devuelve los posts ya extraídos de un trabajo.
+        
+        Args:
+            key: Identificador del trabajo
+        
+        Returns:
+            Diccionario URL -> registro del post
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT url, record FROM job_posts WHERE key = ?", (key,)).fetchall()
+        return {row["url"]: json.loads(row["record"]) for row in rows}
+    
+    def add_post(self, key: str, url: str, record: Dict[str, str]) -> None:
+        """
+        Registra un post extraído de un trabajo.
+        
+        Args:
+            key: Identificador del trabajo
+            url: URL del post
+            record: Registro extraído
+        """
+        record = {name: value for name, value in record.items() if name != "Categoría"}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO job_posts (key, url, record) VALUES (?, ?, ?)",
+                (key, url, json.dumps(record, ensure_ascii=False))
+            )
+            self._conn.execute("UPDATE jobs SET updated_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+    
+    def fail(self, key: str, error: str) -> None:
+        """
+        Marca el último intento de un trabajo como fallido.
+        
+        Args:
+            key: Identificador del trabajo
+            error: Mensaje del error
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', last_error = ?, updated_at = ? WHERE key = ?",
+                (error, time.time(), key)
+            )
+            self._conn.commit()
+    
+    def pending(self, max_attempts: int = 3, max_age_seconds: Optional[float] = None
+                ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Lista los trabajos que no terminaron y todavía se pueden reanudar. Los que ya
+        agotaron sus intentos o son más antiguos que `max_age_seconds` quedan abandonados.
+        
+        Args:
+            max_attempts: Intentos tras los cuales un trabajo no se reanuda más
+            max_age_seconds: Antigüedad máxima (desde su creación) de un trabajo reanudable
+        
+        Returns:
+            Lista de tuplas (key, parámetros), del más antiguo al más nuevo
+        """
+        oldest = time.time() - max_age_seconds if max_age_seconds is not None else float("-inf")
+        with self._lock:
+            abandoned = self._conn.execute(
+                "UPDATE jobs SET status = 'abandoned' "
+                "WHERE status != 'abandoned' AND (attempts >= ? OR created_at < ?)",
+                (max_attempts, oldest)
+            ).rowcount
+            # Su progreso ya no se va a usar
+            self._conn.execute("DELETE FROM job_posts WHERE key IN "
+                               "(SELECT key FROM jobs WHERE status = 'abandoned')")
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT key, params FROM jobs WHERE status != 'abandoned' ORDER BY created_at"
+            ).fetchall()
+        if abandoned:
+            print(f"⚠️ {abandoned} trabajo(s) abandonado(s) tras {max_attempts} intentos o por antigüedad")
+        return [(row["key"], json.loads(row["params"])) for row in rows]
+    
+    def delete(self, key: str) -> None:
+        """
+        Elimina un checkpoint y sus posts.
+        
+        Args:
+            key: Identificador del trabajo
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM job_posts WHERE key = ?", (key,))
+            self._conn.execute("DELETE FROM jobs WHERE key = ?", (key,))
+            self._conn.commit()
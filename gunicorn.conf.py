@@ -0,0 +1,10 @@
+"""
+Gunicorn settings, loaded automatically from the working directory
+(the bind, worker and timeout options stay on the command line in the Dockerfile and nixpacks.toml)
+"""
+
+
+def post_worker_init(worker):
+    """Start background work once the worker has loaded the app, not on every import of app"""
+    from app import start_background_jobs
+    start_background_jobs()
@@ -0,0 +1,274 @@
+"""
+Extracción de datos desde el HTML de posts y listados.
+Dos implementaciones intercambiables con los mismos resultados:
+- "bs4": BeautifulSoup sobre lxml (la implementación original)
+- "lxml": árbol de lxml.html con XPath compilados, sin construir objetos de BeautifulSoup
+
+Se elige con la variable de entorno HTML_PARSER (por defecto "lxml").
+"""
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from metrics import FIELD_SECONDS, timed
+from nextjs_extractor import NextDataExtractor
+
+
+class HtmlExtractor(ABC):
+    """
+    Lógica común de extracción; las subclases sólo implementan cómo parsear y buscar nodos.
+    Cada campo se mide por separado en FIELD_SECONDS y un error en uno no afecta a los demás.
+    """
+    
+    name = ""
+    
+    def extract_post(self, html: str, url: str) -> Dict[str, str]:
+        """
+        Extrae los datos de un post desde su HTML.
+        
+        Args:
+            html: HTML de la página del post
+            url: URL del post
+        
+        Returns:
+            Diccionario con los datos del post
+        """
+        with timed("html_parse"):
+            doc = self._parse(html)
+        
+        # Título: primer h1 (o h2 si no hay)
+        with timed("title", FIELD_SECONDS, "field"):
+            titulo = self._title(doc)
+            if titulo is None:
+                titulo = "Sin título"
+        
+        # Tiempo de lectura: div con clase Text_body__snVk8 debajo del título
+        with timed("reading_time", FIELD_SECONDS, "field"):
+            tiempo_lectura = "N/A"
+            try:
+                texto = self._reading_time(doc)
+                if texto is not None:
+                    # Limpiar espacios: "7min de lectura" -> "7 min de lectura"
+                    tiempo_lectura = texto.replace('min de lectura', ' min de lectura').strip()
+            except Exception:
+                pass
+        
+        # Autor: divs 'text-sm dark:text-text-disabled' dentro del contenedor 'flex gap-2'
+        with timed("author", FIELD_SECONDS, "field"):
+            autor = "N/A"
+            try:
+                autor_parts = [part for part in self._author_parts(doc) if part]
+                if autor_parts:
+                    autor = ' '.join(autor_parts)  # "Lilia Valenzuela | SaaS Specialist"
+            except Exception:
+                pass
+        
+        # Fecha: meta article:published_time, luego JSON-LD y por último __NEXT_DATA__
+        with timed("date", FIELD_SECONDS, "field"):
+            fecha = "N/A"
+            try:
+                meta_date = self._meta_published_time(doc)
+                if meta_date is not None:
+                    fecha = meta_date
+                else:
+                    json_ld = self._json_ld(doc)
+                    if json_ld:
+                        data = json.loads(json_ld)
+                        if isinstance(data, dict) and 'datePublished' in data:
+                            fecha = data['datePublished']
+                
+                if fecha == "N/A":
+                    next_data = NextDataExtractor.parse_next_data(html)
+                    if next_data:
+                        fecha = NextDataExtractor.find_post_date(next_data, url) or "N/A"
+            except Exception:
+                pass
+        
+        return {
+            "Titular": titulo,
+            "Autor": autor,
+            "Tiempo de lectura": tiempo_lectura,
+            "Fecha": fecha,
+            "URL": url
+        }
+    
+    @abstractmethod
+    def post_links(self, html: str) -> List[str]:
+        """
+        Devuelve los href de los enlaces a posts de un listado (contienen "/blog/" y "-"),
+        en orden de aparición y sin filtrar.
+        
+        Args:
+            html: HTML de la página de listado
+        """
+    
+    @abstractmethod
+    def _parse(self, html: str) -> Any:
+        ...
+    
+    @abstractmethod
+    def _title(self, doc: Any) -> Optional[str]:
+        ...
+    
+    @abstractmethod
+    def _reading_time(self, doc: Any) -> Optional[str]:
+        ...
+    
+    @abstractmethod
+    def _author_parts(self, doc: Any) -> List[str]:
+        ...
+    
+    @abstractmethod
+    def _meta_published_time(self, doc: Any) -> Optional[str]:
+        """Contenido del meta article:published_time ("N/A" si no tiene); None si no existe."""
+    
+    @abstractmethod
+    def _json_ld(self, doc: Any) -> Optional[str]:
+        ...
+
+
+class SoupExtractor(HtmlExtractor):
+    """Implementación con BeautifulSoup (árbol completo y búsquedas con find/find_all)."""
+    
+    name = "bs4"
+    
+    def post_links(self, html: str) -> List[str]:
+        soup = BeautifulSoup(html, 'lxml')
+        links = soup.find_all('a', href=lambda x: x and '/blog/' in x and '-' in x)
+        return [link.get('href', '') for link in links]
+    
+    def _parse(self, html: str) -> BeautifulSoup:
+        return BeautifulSoup(html, 'lxml')
+    
+    def _title(self, doc: BeautifulSoup) -> Optional[str]:
+        for tag in ['h1', 'h2']:
+            title_tag = doc.find(tag)
+            if title_tag:
+                return title_tag.get_text(strip=True)
+        return None
+    
+    def _reading_time(self, doc: BeautifulSoup) -> Optional[str]:
+        tiempo_div = doc.find('div', class_='Text_body__snVk8')
+        return tiempo_div.get_text(strip=True) if tiempo_div else None
+    
+    def _author_parts(self, doc: BeautifulSoup) -> List[str]:
+        author_container = doc.find('div', class_='flex gap-2')
+        if not author_container:
+            return []
+        all_divs = author_container.find_all('div', class_='text-sm dark:text-text-disabled')
+        return [div.get_text(strip=True) for div in all_divs]
+    
+    def _meta_published_time(self, doc: BeautifulSoup) -> Optional[str]:
+        meta_date = doc.find('meta', property='article:published_time')
+        return meta_date.get('content', 'N/A') if meta_date else None
+    
+    def _json_ld(self, doc: BeautifulSoup) -> Optional[str]:
+        json_ld = doc.find('script', type='application/ld+json')
+        return json_ld.string if json_ld else None
+
+
+def _has_class(name: str) -> str:
+    """Condición XPath equivalente a class_=name de BeautifulSoup para una sola clase."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Texto visible como lo junta get_text() de BeautifulSoup: sin comentarios ni el contenido
+# de script/style/template/rt/rp
+_TEXT = ".//text()[not(ancestor::script or ancestor::style or ancestor::template or ancestor::rt or ancestor::rp)]"
+
+
+class LxmlExtractor(HtmlExtractor):
+    """
+    Implementación con lxml.html: XPath compilados una vez, que devuelven sólo los nodos
+    necesarios (el recorrido ocurre en C, sin filtros en Python por cada nodo).
+    """
+    
+    name = "lxml"
+    
+    _POST_LINKS = etree.XPath("//a[contains(@href, '/blog/') and contains(@href, '-')]/@href",
+                              smart_strings=False)
+    _FIRST_H1 = etree.XPath("(//h1)[1]")
+    _FIRST_H2 = etree.XPath("(//h2)[1]")
+    _READING_TIME = etree.XPath(f"(//div[{_has_class('Text_body__snVk8')}])[1]")
+    # Con un class_ de varias palabras, BeautifulSoup compara el atributo completo
+    _AUTHOR_CONTAINER = etree.XPath("(//div[normalize-space(@class) = 'flex gap-2'])[1]")
+    _AUTHOR_DIVS = etree.XPath(".//div[normalize-space(@class) = 'text-sm dark:text-text-disabled']")
+    _META_PUBLISHED = etree.XPath("(//meta[@property = 'article:published_time'])[1]")
+    _JSON_LD = etree.XPath("(//script[@type = 'application/ld+json'])[1]")
+    _TEXT_NODES = etree.XPath(_TEXT, smart_strings=False)
+    
+    def __init__(self):
+        # Los parsers de lxml no deben compartirse entre threads
+        self._local = threading.local()
+    
+    def _parser(self) -> lxml.html.HTMLParser:
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = self._local.parser = lxml.html.HTMLParser(encoding="utf-8")
+        return parser
+    
+    @classmethod
+    def _text(cls, element) -> str:
+        """Equivalente a get_text(strip=True)."""
+        return "".join(text.strip() for text in cls._TEXT_NODES(element))
+    
+    def _parse(self, html: str):
+        try:
+            # Como bytes, para aceptar HTML con declaración de encoding
+            return lxml.html.document_fromstring(html.encode("utf-8"), parser=self._parser())
+        except etree.ParserError:
+            # Documento vacío: sin nodos, todos los campos quedan por defecto
+            return lxml.html.document_fromstring(b"<html></html>", parser=self._parser())
+    
+    def post_links(self, html: str) -> List[str]:
+        return self._POST_LINKS(self._parse(html))
+    
+    def _title(self, doc) -> Optional[str]:
+        for xpath in (self._FIRST_H1, self._FIRST_H2):
+            found = xpath(doc)
+            if found:
+                return self._text(found[0])
+        return None
+    
+    def _reading_time(self, doc) -> Optional[str]:
+        found = self._READING_TIME(doc)
+        return self._text(found[0]) if found else None
+    
+    def _author_parts(self, doc) -> List[str]:
+        found = self._AUTHOR_CONTAINER(doc)
+        if not found:
+            return []
+        return [self._text(div) for div in self._AUTHOR_DIVS(found[0])]
+    
+    def _meta_published_time(self, doc) -> Optional[str]:
+        found = self._META_PUBLISHED(doc)
+        return found[0].get('content', 'N/A') if found else None
+    
+    def _json_ld(self, doc) -> Optional[str]:
+        found = self._JSON_LD(doc)
+        return found[0].text if found else None
+
+
+EXTRACTORS = {
+    "bs4": SoupExtractor,
+    "lxml": LxmlExtractor,
+}
+
+
+def get_extractor(name: Optional[str] = None) -> HtmlExtractor:
+    """
+    Crea el extractor indicado.
+    
+    Args:
+        name: "bs4" o "lxml" (por defecto, la variable HTML_PARSER o "lxml")
+    """
+    name = (name or os.getenv("HTML_PARSER", "lxml")).lower()
+    if name not in EXTRACTORS:
+        raise ValueError(f"Parser '{name}' no válido. Parsers disponibles: {list(EXTRACTORS)}")
+    return EXTRACTORS[name]()
@@ -0,0 +1,168 @@
+"""
+Backend HTTP para extraer detalles de posts sin navegador.
+Las páginas de posts son renderizadas en el servidor, así que en la mayoría de los casos
+basta con descargar el HTML y aplicar la misma extracción que con Playwright.
+"""
+import hashlib
+import threading
+from typing import Callable, Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from nextjs_extractor import NextDataExtractor
+from post_cache import PostCache
+from metrics import FAILURES, timed
+
+
+class HttpPostFetcher:
+    """
+    Descarga posts con un cliente HTTP con pool de conexiones keep-alive.
+    Si el HTML estático no trae los campos esperados, devuelve None para que
+    el llamador recurra a Playwright.
+    """
+    
+    DEFAULT_HEADERS = {
+        "User-Agent": ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                       "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"),
+        "Accept": "text/html,application/xhtml+xml",
+        "Accept-Language": "es-CL,es;q=0.9",
+    }
+    
+    def __init__(self, parse: Callable[[str, str], Dict[str, str]], pool_size: int = 10,
+                 timeout: float = 15.0, retries: int = 2, use_next_data: bool = False,
+                 base_url: str = "https://xepelin.com/blog", cache: Optional[PostCache] = None):
+        """
+        Inicializa el cliente HTTP.
+        
+        Args:
+            parse: Función (html, url) -> dict que extrae los datos del post
+            pool_size: Conexiones keep-alive máximas por host
+            timeout: Timeout en segundos de cada request
+            retries: Reintentos ante errores de conexión o 5xx
+            use_next_data: Si True, intenta primero el JSON de /_next/data antes que el HTML
+            base_url: URL base del blog (para resolver rutas de Next.js)
+            cache: Caché persistente de posts para revalidar en vez de re-extraer
+        """
+        self.parse = parse
+        self.timeout = timeout
+        self.cache = cache
+        self._pending_validators: Dict[str, Dict[str, Optional[str]]] = {}
+        self._pending_lock = threading.Lock()
+        
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=("GET",)
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        
+        self.session = requests.Session()
+        self.session.headers.update(self.DEFAULT_HEADERS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        self.next_extractor: Optional[NextDataExtractor] = None
+        if use_next_data:
+            self.next_extractor = NextDataExtractor(base_url, session=self.session, timeout=timeout)
+    
+    def close(self) -> None:
+        """Cierra las conexiones del pool."""
+        self.session.close()
+    
+    @staticmethod
+    def is_complete(post: Dict[str, str]) -> bool:
+        """
+        Indica si el HTML estático trajo los campos que se extraen del DOM.
+        
+        Args:
+            post: Datos extraídos del post
+            
+        Returns:
+            True si no hace falta recurrir al navegador
+        """
+        return (post.get("Titular", "Sin título") != "Sin título"
+                and post.get("Autor", "N/A") != "N/A"
+                and post.get("Tiempo de lectura", "N/A") != "N/A")
+    
+    def fetch_post(self, url: str) -> Optional[Dict[str, str]]:
+        """
+        Descarga y extrae un post vía HTTP.
+        
+        Con caché: un registro dentro del TTL se devuelve sin red; uno vencido se revalida
+        con If-None-Match / If-Modified-Since y se reutiliza si el servidor responde 304
+        o si el HTML tiene el mismo hash.
+        
+        Args:
+            url: URL del post
+            
+        Returns:
+            Diccionario con los datos del post, o None si hay que usar el navegador
+        """
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry and entry["fresh"]:
+            return entry["record"]
+        
+        if self.next_extractor and entry is None:
+            post = self.next_extractor.extract_post(url)
+            if post and self.is_complete(post):
+                if self.cache is not None:
+                    self.cache.put(url, post)
+                return post
+        
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        
+        try:
+            with timed("http_fetch"):
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if entry and response.status_code == 304:
+                self.cache.touch(url)
+                return entry["record"]
+            response.raise_for_status()
+        except requests.RequestException as e:
+            if isinstance(e, requests.HTTPError):
+                FAILURES.inc(stage="http_status")
+            print(f"   ⚠️ HTTP falló para {url}: {e}")
+            return None
+        
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        if entry and entry["content_hash"] == content_hash:
+            self.cache.touch(url)
+            return entry["record"]
+        
+        validators = {
+            "content_hash": content_hash,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
+        
+        post = self.parse(response.text, url)
+        if not self.is_complete(post):
+            # El navegador completará el post; guardar los validadores para ese momento
+            with self._pending_lock:
+                self._pending_validators[url] = validators
+            return None
+        
+        if self.cache is not None:
+            self.cache.put(url, post, **validators)
+        return post
+    
+    def store(self, url: str, post: Dict[str, str]) -> None:
+        """
+        Guarda en caché un post que se extrajo con el navegador.
+        
+        Args:
+            url: URL del post
+            post: Registro extraído
+        """
+        if self.cache is None:
+            return
+        with self._pending_lock:
+            validators = self._pending_validators.pop(url, {})
+        self.cache.put(url, post, **validators)
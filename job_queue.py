@@ -0,0 +1,277 @@
+"""
+Cola de trabajos de scraping con un pool fijo de workers.
+Limita cuántos trabajos corren a la vez, rechaza trabajos nuevos cuando la cola está llena
+y fusiona pedidos idénticos en curso en una sola ejecución que notifica a todos los solicitantes.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from progress import JobCancelled, JobProgress
+from metrics import REGISTRY, Counter, Histogram
+
+JOBS_TOTAL = REGISTRY.register(Counter(
+    "scrape_jobs_total", "Trabajos de scraping terminados por estado", ("status",)))
+JOB_SECONDS = REGISTRY.register(Histogram(
+    "scrape_job_seconds", "Duración de los trabajos de scraping", ("status",),
+    buckets=(10, 30, 60, 120, 300, 600, 900, 1200, 1800, 3600)))
+
+
+class QueueFullError(Exception):
+    """La cola está llena; `retry_after` sugiere cuántos segundos esperar antes de reintentar."""
+    
+    def __init__(self, retry_after: int):
+        super().__init__(f"Cola de trabajos llena, reintentar en {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ScrapeJob:
+    """Un trabajo encolado: parámetros, solicitantes a notificar y resultado."""
+    
+    def __init__(self, key: str, params: Dict[str, Any]):
+        """
+        Args:
+            key: Clave de fusión (pedidos con la misma clave comparten ejecución)
+            params: Argumentos para la función que ejecuta el trabajo
+        """
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.params = params
+        self.subscribers: List[Tuple[str, str]] = []
+        self.status = "queued"
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.progress = JobProgress()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado del trabajo como diccionario serializable."""
+        return dict(
+            self.progress.snapshot(),
+            job_id=self.id,
+            status=self.status,
+            params={k: v for k, v in self.params.items() if k not in ("webhook_url", "email")},
+            subscribers=len(self.subscribers),
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            elapsed_seconds=round((self.finished_at or time.time()) - self.started_at, 1)
+            if self.started_at else None,
+            result=self.result,
+            error=self.error
+        )
+
+
+class JobQueue:
+    """
+    Cola acotada atendida por `workers` threads.
+    
+    `run(job)` hace el trabajo y devuelve `(resultado, error)`; al terminar, el trabajo sale
+    del registro de fusión y se llama a `notify(job)` con la lista final de solicitantes.
+    Un trabajo cancelado mientras espera sale de la cola y libera su lugar enseguida.
+    """
+    
+    def __init__(self, run: Callable[[ScrapeJob], Tuple[Any, Optional[str]]],
+                 notify: Callable[[ScrapeJob], None], workers: int = 1, max_pending: int = 10,
+                 default_duration: float = 300.0, history: int = 100):
+        """
+        Args:
+            run: Ejecuta un trabajo y devuelve (resultado, mensaje de error o None)
+            notify: Avisa a los solicitantes de un trabajo terminado
+            workers: Trabajos ejecutándose a la vez (cada uno usa su propio navegador o contexto)
+            max_pending: Máximo de trabajos esperando en la cola
+            default_duration: Duración estimada (s) de un trabajo mientras no hay mediciones
+            history: Trabajos terminados que se siguen pudiendo consultar por id
+        """
+        if workers < 1:
+            raise ValueError("workers debe ser >= 1")
+        if max_pending < 1:
+            raise ValueError("max_pending debe ser >= 1")
+        
+        self.run = run
+        self.notify = notify
+        self.workers = workers
+        self._max_pending = max_pending
+        self._pending: Deque[ScrapeJob] = deque()
+        self._lock = threading.Lock()
+        self._has_pending = threading.Condition(self._lock)
+        self._closed = False
+        self._in_flight: Dict[str, ScrapeJob] = {}
+        self._jobs: "OrderedDict[str, ScrapeJob]" = OrderedDict()
+        self._history = history
+        self._running = 0
+        self._avg_duration = default_duration
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"scrape-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, key: str, params: Dict[str, Any],
+               subscriber: Tuple[str, str]) -> Tuple[ScrapeJob, bool]:
+        """
+        Encola un trabajo, o se suma a uno idéntico que ya esté en cola o en ejecución.
+        
+        Args:
+            key: Clave de fusión del trabajo
+            params: Argumentos para `run`
+            subscriber: (webhook_url, email) a notificar al terminar
+        
+        Returns:
+            (trabajo, True si se fusionó con uno existente)
+        
+        Raises:
+            QueueFullError: Si no cabe en la cola
+            RuntimeError: Si la cola ya se detuvo con `shutdown`
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("La cola de trabajos está detenida")
+            job = self._in_flight.get(key)
+            if job:
+                if subscriber not in job.subscribers:
+                    job.subscribers.append(subscriber)
+                return job, True
+            
+            if len(self._pending) >= self._max_pending:
+                raise QueueFullError(self._retry_after())
+            job = ScrapeJob(key, params)
+            job.subscribers.append(subscriber)
+            self._pending.append(job)
+            self._has_pending.notify()
+            self._in_flight[key] = job
+            self._jobs[job.id] = job
+            self._trim_history()
+            return job, False
+    
+    def _trim_history(self) -> None:
+        """Olvida los trabajos terminados más antiguos (con `_lock` tomado)."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at]
+        for job_id in finished[:max(len(finished) - self._history, 0)]:
+            del self._jobs[job_id]
+    
+    def get(self, job_id: str) -> Optional[ScrapeJob]:
+        """Devuelve un trabajo por id (en cola, en ejecución o terminado recientemente)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def cancel(self, job_id: str) -> Optional[ScrapeJob]:
+        """
+        Cancela un trabajo. Uno en cola sale de ella y queda cancelado enseguida (sus
+        solicitantes se notifican en otro thread); uno en ejecución se detiene en el
+        próximo punto de control del scraper.
+        
+        Returns:
+            El trabajo, o None si no existe
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job.finished_at:
+                return job
+            job.progress.cancel()
+            # Un pedido idéntico posterior no debe sumarse a un trabajo cancelado
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+            if job not in self._pending:
+                return job
+            self._pending.remove(job)
+            self._finish_unstarted(job, "Trabajo cancelado")
+        threading.Thread(target=self._notify, args=(job,), name=f"scrape-notify-{job.id[:8]}",
+                         daemon=True).start()
+        return job
+    
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Detiene la cola: no acepta trabajos nuevos, cancela los que esperan (notificando a sus
+        solicitantes) y los workers salen al terminar el trabajo que estén ejecutando.
+        
+        Args:
+            wait: Esperar a que los workers terminen
+            timeout: Máximo de segundos a esperar por cada worker
+        """
+        with self._lock:
+            self._closed = True
+            dropped = list(self._pending)
+            self._pending.clear()
+            for job in dropped:
+                job.progress.cancel()
+                if self._in_flight.get(job.key) is job:
+                    del self._in_flight[job.key]
+                self._finish_unstarted(job, "Cola de trabajos detenida")
+            self._has_pending.notify_all()
+        for job in dropped:
+            self._notify(job)
+        if wait:
+            for thread in self._threads:
+                thread.join(timeout)
+    
+    def _finish_unstarted(self, job: ScrapeJob, error: str) -> None:
+        """Da por cancelado un trabajo que no llegó a ejecutarse (con `_lock` tomado)."""
+        job.result, job.error = None, error
+        job.status = "cancelled"
+        job.finished_at = time.time()
+        job.progress.set_phase(job.status)
+        JOBS_TOTAL.inc(status=job.status)
+    
+    def _retry_after(self) -> int:
+        """Estima en cuántos segundos se libera un lugar en la cola (cuando termina un worker)."""
+        return max(5, int(self._avg_duration / self.workers))
+    
+    def _worker(self) -> None:
+        """Loop de un worker: toma trabajos y los ejecuta de a uno hasta que la cola se detiene."""
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._has_pending.wait()
+                if not self._pending:
+                    return
+                job = self._pending.popleft()
+                self._running += 1
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.progress.check_cancelled()
+                job.result, job.error = self.run(job)
+                job.status = "failed" if job.error else "done"
+            except JobCancelled:
+                job.result, job.error = None, "Trabajo cancelado"
+                job.status = "cancelled"
+            except Exception as e:
+                job.result, job.error = None, str(e)
+                job.status = "failed"
+            job.finished_at = time.time()
+            job.progress.set_phase(job.status)
+            JOBS_TOTAL.inc(status=job.status)
+            JOB_SECONDS.observe(job.finished_at - job.started_at, status=job.status)
+            
+            with self._lock:
+                self._running -= 1
+                # Pedidos nuevos a partir de aquí lanzan otra ejecución
+                if self._in_flight.get(job.key) is job:
+                    del self._in_flight[job.key]
+                self._avg_duration = 0.7 * self._avg_duration + 0.3 * (job.finished_at - job.started_at)
+            
+            self._notify(job)
+    
+    def _notify(self, job: ScrapeJob) -> None:
+        """Avisa a los solicitantes de un trabajo terminado sin dejar caer al thread."""
+        try:
+            self.notify(job)
+        except Exception as e:
+            print(f"⚠️ Error notificando el trabajo {job.id}: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Estado de la cola para endpoints de salud."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queued": len(self._pending),
+                "max_pending": self._max_pending,
+                "avg_job_seconds": round(self._avg_duration, 1)
+            }
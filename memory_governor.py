@@ -0,0 +1,323 @@
+"""
+Concurrencia adaptativa según la memoria.
+En vez de una concurrencia fija y conservadora, un thread muestrea cada `interval` segundos
+el RSS del proceso Python y de sus Chromium hijos (y el uso del cgroup) y ajusta cuántas
+navegaciones pueden correr a la vez: sube de a una mientras sobra memoria y se reduce a la
+mitad al acercarse al presupuesto. Además pide reciclar contextos cuando Chromium crece
+demasiado y frena la toma de trabajo cuando el contenedor llega cerca de su límite.
+"""
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from metrics import (REGISTRY, Counter, Gauge, cgroup_memory, is_chromium, process_rss,
+                     read_process_tree, total_memory)
+
+
+CONCURRENCY_LIMIT = REGISTRY.register(Gauge(
+    "scraper_concurrency_limit", "Navegaciones simultáneas permitidas por el controlador de memoria"))
+INTAKE_PAUSED = REGISTRY.register(Gauge(
+    "scraper_intake_paused", "1 si el controlador de memoria frenó la toma de trabajo"))
+CONTEXT_RECYCLES = REGISTRY.register(Counter(
+    "scraper_context_recycles_total", "Contextos de navegador reciclados por motivo", ("reason",)))
+
+
+class MemorySample(NamedTuple):
+    """Memoria observada en un instante (bytes; None si no se pudo leer)."""
+    process_tree: int  # RSS del proceso Python y todos sus descendientes (Chromium incluido)
+    chromium: int  # RSS de los procesos de Chromium descendientes
+    cgroup_usage: Optional[int]
+    cgroup_limit: Optional[int]
+
+
+def sample_memory() -> MemorySample:
+    """Lee /proc y el cgroup."""
+    tree = read_process_tree()
+    usage, limit = cgroup_memory()
+    return MemorySample(
+        process_tree=sum(rss for _, rss in tree.values()) or process_rss(),
+        chromium=sum(rss for name, rss in tree.values() if is_chromium(name)),
+        cgroup_usage=usage,
+        cgroup_limit=limit,
+    )
+
+
+def _wake(waiter: "asyncio.Future[None]") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class MemoryGovernor:
+    """
+    Controlador AIMD de la concurrencia de navegaciones, compartido por todos los scrapers
+    del proceso.
+    
+    - Con el RSS (Python + Chromium) bajo `low_watermark` del presupuesto y todos los cupos
+      en uso, el límite sube de a uno hasta `max_concurrency`.
+    - Sobre `high_watermark` el límite baja a la mitad (no menos de `min_concurrency`) y los
+      workers reciclan su contexto en el próximo post.
+    - Sobre `pause_ratio` del presupuesto, o del límite del cgroup, no se entregan cupos
+      nuevos hasta que la memoria baje (las navegaciones en curso terminan).
+    
+    Uso:
+        with governor.slot():           # o `async with governor.slot_async():`
+            navegar...
+    """
+    
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1, initial: Optional[int] = None,
+                 budget_bytes: Optional[int] = None, high_watermark: float = 0.80,
+                 low_watermark: float = 0.60, pause_ratio: float = 0.92,
+                 context_limit_bytes: int = 300 * 2**20, interval: float = 1.0,
+                 cooldown_seconds: float = 5.0, sampler: Callable[[], MemorySample] = sample_memory):
+        """
+        Args:
+            max_concurrency: Máximo de navegaciones simultáneas
+            min_concurrency: Mínimo al reducir (siempre se puede avanzar)
+            initial: Límite inicial (por defecto, `min_concurrency`)
+            budget_bytes: Memoria disponible para el scraper; por defecto el límite del cgroup
+                          o, sin cgroup, la RAM del sistema
+            high_watermark: Fracción del presupuesto sobre la cual se reduce el límite
+            low_watermark: Fracción del presupuesto bajo la cual se puede subir
+            pause_ratio: Fracción del presupuesto (o del cgroup) desde la cual se frena la toma
+            context_limit_bytes: RSS de Chromium por cupo en uso desde el cual se recicla el contexto
+            interval: Segundos entre muestras
+            cooldown_seconds: Espera mínima entre dos reducciones (la memoria tarda en liberarse)
+            sampler: Función que mide la memoria (reemplazable en pruebas y benchmarks)
+        """
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError("Se requiere 1 <= min_concurrency <= max_concurrency")
+        if not 0 < low_watermark < high_watermark < pause_ratio <= 1:
+            raise ValueError("Se requiere 0 < low_watermark < high_watermark < pause_ratio <= 1")
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.budget_bytes = budget_bytes
+        self.high_watermark = high_watermark
+        self.low_watermark = low_watermark
+        self.pause_ratio = pause_ratio
+        self.context_limit_bytes = context_limit_bytes
+        self.interval = interval
+        self.cooldown_seconds = cooldown_seconds
+        self.sampler = sampler
+        
+        self.limit = max(min_concurrency, min(initial or min_concurrency, max_concurrency))
+        self.paused = False
+        self.in_use = 0
+        self.last_sample: Optional[MemorySample] = None
+        self._pressure_at = 0.0  # Último momento sobre high_watermark (monotonic)
+        self._changed = threading.Condition()
+        # Esperas de event loops: (loop, future) que se resuelven al liberarse un cupo o cambiar el límite
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, "asyncio.Future[None]"]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        CONCURRENCY_LIMIT.set(self.limit)
+        INTAKE_PAUSED.set(0)
+    
+    @classmethod
+    def from_env(cls, configured: int) -> Optional["MemoryGovernor"]:
+        """
+        Controlador configurado con variables de entorno, o None si MEMORY_GOVERNOR=false.
+        
+        Args:
+            configured: Concurrencia configurada del motor; es el límite inicial y, si
+                        MEMORY_GOVERNOR_MAX_CONCURRENCY no está definida, el máximo es el doble
+        """
+        if os.getenv('MEMORY_GOVERNOR', 'true').lower() != 'true':
+            return None
+        budget_mb = os.getenv('MEMORY_BUDGET_MB')
+        max_concurrency = int(os.getenv('MEMORY_GOVERNOR_MAX_CONCURRENCY', str(2 * configured)))
+        return cls(
+            max_concurrency=max_concurrency,
+            initial=min(configured, max_concurrency),
+            budget_bytes=int(budget_mb) * 2**20 if budget_mb else None,
+            high_watermark=float(os.getenv('MEMORY_HIGH_WATERMARK', '0.80')),
+            low_watermark=float(os.getenv('MEMORY_LOW_WATERMARK', '0.60')),
+            pause_ratio=float(os.getenv('MEMORY_PAUSE_RATIO', '0.92')),
+            context_limit_bytes=int(os.getenv('CONTEXT_RECYCLE_MB', '300')) * 2**20,
+        )
+    
+    def start(self) -> "MemoryGovernor":
+        """Lanza el thread de muestreo (idempotente)."""
+        if self._thread is None:
+            self.update()
+            self._thread = threading.Thread(target=self._run, name="memory-governor", daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Detiene el muestreo y libera a quien espere un cupo."""
+        self._stop.set()
+        with self._changed:
+            self.paused = False
+            self._notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.update()
+            except Exception as e:
+                print(f"⚠️ Error muestreando memoria: {e}")
+    
+    def update(self) -> None:
+        """Toma una muestra y ajusta el límite y la pausa."""
+        sample = self.sampler()
+        budget = self.budget_bytes or sample.cgroup_limit or total_memory()
+        ratio = sample.process_tree / budget if budget else 0.0
+        cgroup_ratio = (sample.cgroup_usage / sample.cgroup_limit
+                        if sample.cgroup_usage is not None and sample.cgroup_limit else 0.0)
+        now = time.monotonic()
+        
+        with self._changed:
+            self.last_sample = sample
+            previous = self.limit
+            if ratio >= self.high_watermark:
+                if now - self._pressure_at >= self.cooldown_seconds:
+                    self.limit = max(self.min_concurrency, self.limit // 2)
+                    self._pressure_at = now
+            elif ratio < self.low_watermark and self.in_use >= self.limit and not self.paused:
+                self.limit = min(self.max_concurrency, self.limit + 1)
+            paused = ratio >= self.pause_ratio or cgroup_ratio >= self.pause_ratio
+            if paused != self.paused:
+                print(f"{'⏸️ Toma de trabajo en pausa' if paused else '▶️ Toma de trabajo reanudada'} "
+                      f"(memoria {ratio:.0%} del presupuesto, cgroup {cgroup_ratio:.0%})")
+            self.paused = paused
+            if self.limit != previous:
+                print(f"🧠 Concurrencia {previous} -> {self.limit} (memoria {ratio:.0%} del presupuesto)")
+            CONCURRENCY_LIMIT.set(self.limit)
+            INTAKE_PAUSED.set(1 if paused else 0)
+            self._notify()
+    
+    def try_acquire(self) -> bool:
+        """Toma un cupo si hay uno libre y la toma no está en pausa."""
+        with self._changed:
+            return self._take()
+    
+    def _take(self) -> bool:
+        # Con la toma en pausa, un cupo solo se entrega si no hay nada en curso: siempre se avanza
+        if self.in_use < self.limit and (not self.paused or self.in_use == 0):
+            self.in_use += 1
+            return True
+        return False
+    
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera un cupo.
+        
+        Args:
+            timeout: Segundos máximos de espera (None: sin límite)
+        
+        Returns:
+            True si se obtuvo el cupo
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while not self._take():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._changed.wait(remaining if remaining is not None else self.interval)
+            return True
+    
+    def release(self) -> None:
+        """Devuelve un cupo."""
+        with self._changed:
+            self.in_use -= 1
+            self._notify()
+    
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Cupo para una navegación (API sync)."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+    
+    async def acquire_async(self) -> None:
+        """
+        Espera un cupo desde un event loop sin bloquearlo. El controlador se comparte entre
+        threads y loops, así que cada espera registra un future de su propio loop y quien
+        libera un cupo (o el thread de muestreo) lo resuelve con call_soon_threadsafe.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._changed:
+                if self._take():
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+    
+    @asynccontextmanager
+    async def slot_async(self) -> AsyncIterator[None]:
+        """Cupo para una navegación (API async)."""
+        await self.acquire_async()
+        try:
+            yield
+        finally:
+            self.release()
+    
+    def _notify(self) -> None:
+        """Despierta a quienes esperan un cupo (se llama con `_changed` tomado)."""
+        self._changed.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # Loop ya cerrado: nadie espera ese future
+    
+    def should_recycle(self, processed: int, since: float, recycle_every: int) -> bool:
+        """
+        Indica si un worker debe reciclar su contexto antes del próximo post.
+        
+        Args:
+            processed: Posts procesados con el contexto actual
+            since: Momento (time.monotonic) en que se creó el contexto
+            recycle_every: Tope de posts por contexto, aunque sobre memoria
+        
+        Returns:
+            True si se pasó el tope, hubo presión de memoria desde que se creó el contexto
+            o Chromium usa más de `context_limit_bytes` por cupo en uso
+        """
+        if processed >= recycle_every:
+            CONTEXT_RECYCLES.inc(reason="count")
+            return True
+        if processed == 0:
+            return False
+        with self._changed:
+            pressure = self._pressure_at > since
+            sample = self.last_sample
+            in_use = max(self.in_use, 1)
+        if pressure or (sample is not None and sample.chromium / in_use > self.context_limit_bytes):
+            CONTEXT_RECYCLES.inc(reason="memory")
+            return True
+        return False
+    
+    def status(self) -> Dict[str, Any]:
+        """Estado para /health."""
+        with self._changed:
+            sample = self.last_sample
+            status = {
+                "concurrency_limit": self.limit,
+                "max_concurrency": self.max_concurrency,
+                "in_use": self.in_use,
+                "paused": self.paused,
+            }
+        if sample is not None:
+            status["rss_mb"] = round(sample.process_tree / 2**20, 1)
+            status["chromium_rss_mb"] = round(sample.chromium / 2**20, 1)
+            if sample.cgroup_limit:
+                status["cgroup_limit_mb"] = round(sample.cgroup_limit / 2**20, 1)
+        return status
@@ -0,0 +1,394 @@
+"""
+Métricas y trazas del scraper.
+Registro mínimo de contadores, gauges e histogramas con salida en el formato de texto
+de Prometheus, más spans de OpenTelemetry cuando el paquete está instalado.
+"""
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from opentelemetry import trace as _otel_trace
+    _tracer = _otel_trace.get_tracer("xepelin_scraper")
+except ImportError:  # OpenTelemetry es opcional
+    _tracer = None
+
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str, quote: bool = True) -> str:
+    """Escapa `\\`, los saltos de línea y (en valores de etiquetas) `"` como pide el formato de texto."""
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quote else value
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Arma `{a="x",b="y"}` (vacío si no hay etiquetas)."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric(ABC):
+    """Base común: nombre, ayuda, etiquetas y lock."""
+    
+    TYPE = ""
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """Valores de etiquetas en el orden declarado."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: se esperaban las etiquetas {self.labelnames}, no {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def render(self) -> List[str]:
+        """Líneas de exposición de la métrica."""
+        return [f"# HELP {self.name} {_escape(self.help, quote=False)}",
+                f"# TYPE {self.name} {self.TYPE}"] + self._samples()
+    
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Líneas de las series (sin HELP ni TYPE)."""
+
+
+class Counter(_Metric):
+    """Contador monótono."""
+    
+    TYPE = "counter"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Suma `amount` a la serie de `labels`."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, **labels: str) -> float:
+        """Valor actual de una serie."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+    
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+                    for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Valor instantáneo; puede fijarse o calcularse al exponer las métricas."""
+    
+    TYPE = "gauge"
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], float]] = None):
+        """
+        Args:
+            callback: Si se indica, el gauge (sin etiquetas) se calcula con él en cada lectura
+        """
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self.callback = callback
+    
+    def set(self, value: float, **labels: str) -> None:
+        """Fija el valor de la serie de `labels`."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def _samples(self) -> List[str]:
+        if self.callback:
+            try:
+                return [f"{self.name} {self.callback()}"]
+            except Exception:
+                return []
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+                    for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Histograma acumulativo con buckets fijos (en segundos por defecto)."""
+    
+    TYPE = "histogram"
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}  # conteos por bucket + [sum, count]
+        self._observers: List[Callable[[float, Dict[str, str]], None]] = []
+    
+    def add_observer(self, observer: Callable[[float, Dict[str, str]], None]) -> None:
+        """
+        Recibe cada observación cruda (valor, etiquetas), ej: para calcular percentiles exactos.
+        
+        Args:
+            observer: Función llamada en el thread que observa; debe ser rápida
+        """
+        self._observers.append(observer)
+    
+    def observe(self, value: float, **labels: str) -> None:
+        """Registra una observación."""
+        for observer in self._observers:
+            observer(value, labels)
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+    
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Conjunto de métricas expuestas juntas."""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, metric: _Metric) -> _Metric:
+        """Agrega una métrica (o devuelve la ya registrada con ese nombre)."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+    
+    def render(self) -> str:
+        """Todas las métricas en formato de texto de Prometheus."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "scraper_stage_seconds", "Duración de cada etapa del scraper", ("stage",)))
+FIELD_SECONDS = REGISTRY.register(Histogram(
+    "scraper_field_extract_seconds", "Duración de la extracción de cada campo del post", ("field",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)))
+FAILURES = REGISTRY.register(Counter(
+    "scraper_failures_total", "Errores por etapa", ("stage",)))
+POSTS_EXTRACTED = REGISTRY.register(Counter(
+    "scraper_posts_extracted_total", "Posts extraídos por origen", ("source",)))
+FALLBACK_POSTS = REGISTRY.register(Counter(
+    "scraper_fallback_posts_total", "Posts que quedaron con el registro de respaldo (título desde la URL)"))
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Percentil por rango más cercano (None si no hay valores)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    # Rango ceil(p·n/100), multiplicando antes de dividir para no arrastrar error de punto flotante
+    index = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100) - 1))
+    return ordered[index]
+
+
+@contextmanager
+def timed(stage: str, histogram: Histogram = STAGE_SECONDS, label: str = "stage") -> Iterator[None]:
+    """
+    Mide un bloque: observa su duración en `histogram` y, con OpenTelemetry, abre un span.
+    Si el bloque lanza una excepción, además cuenta un fallo de la etapa (una cancelación,
+    `KeyboardInterrupt` o el cierre de un generador no son fallos).
+    
+    Args:
+        stage: Valor de la etiqueta (ej: "navigation", "page_content")
+        histogram: Histograma donde registrar la duración
+        label: Nombre de la etiqueta del histograma
+    """
+    span_cm = _tracer.start_as_current_span(f"scraper.{stage}") if _tracer else None
+    if span_cm:
+        span_cm.__enter__()
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        FAILURES.inc(stage=stage)
+        if span_cm:
+            span_cm.__exit__(type(e), e, e.__traceback__)
+            span_cm = None
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - started, **{label: stage})
+        if span_cm:
+            span_cm.__exit__(None, None, None)
+
+
+def read_process_tree(root_pid: Optional[int] = None) -> Dict[int, Tuple[str, int]]:
+    """
+    Lee /proc y devuelve los descendientes de `root_pid` (incluido) con su nombre y RSS.
+    
+    Args:
+        root_pid: Proceso raíz (por defecto, el actual)
+    
+    Returns:
+        {pid: (nombre, rss en bytes)}; vacío si /proc no está disponible
+    """
+    root_pid = root_pid or os.getpid()
+    page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+    parents: Dict[int, int] = {}
+    info: Dict[int, Tuple[str, int]] = {}
+    
+    try:
+        entries = [entry for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return {}
+    
+    for entry in entries:
+        pid = int(entry)
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                stat = f.read()
+            with open(f"/proc/{pid}/statm") as f:
+                rss_pages = int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        # El nombre va entre paréntesis y puede contener espacios
+        name = stat[stat.find("(") + 1:stat.rfind(")")]
+        fields = stat[stat.rfind(")") + 2:].split()
+        parents[pid] = int(fields[1])
+        info[pid] = (name, rss_pages * page_size)
+    
+    tree = {root_pid} if root_pid in info else set()
+    changed = True
+    while changed:
+        changed = False
+        for pid, ppid in parents.items():
+            if ppid in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+    return {pid: info[pid] for pid in tree}
+
+
+def is_chromium(name: str) -> bool:
+    """True si el nombre de proceso corresponde a Chromium (o su headless shell)."""
+    name = name.lower()
+    return "chrom" in name or "headless_shell" in name
+
+
+def chromium_memory() -> Tuple[int, int]:
+    """
+    Returns:
+        (cantidad de procesos de Chromium descendientes, suma de su RSS en bytes)
+    """
+    chromium = [rss for name, rss in read_process_tree().values() if is_chromium(name)]
+    return len(chromium), sum(chromium)
+
+
+def process_rss(pid: Optional[int] = None) -> int:
+    """RSS de un proceso (por defecto, el actual) en bytes; 0 si /proc no está disponible."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+# (uso, límite) de la memoria del cgroup: v2 y, si no está, v1
+_CGROUP_MEMORY_FILES = (
+    ("/sys/fs/cgroup/memory.current", "/sys/fs/cgroup/memory.max"),
+    ("/sys/fs/cgroup/memory/memory.usage_in_bytes", "/sys/fs/cgroup/memory/memory.limit_in_bytes"),
+)
+
+
+def _read_int(path: str) -> Optional[int]:
+    """Entero de un archivo de /proc o /sys; None si no existe o no es un número (ej: "max")."""
+    try:
+        with open(path) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def cgroup_memory() -> Tuple[Optional[int], Optional[int]]:
+    """
+    Memoria del contenedor según su cgroup.
+    
+    Returns:
+        (uso en bytes, límite en bytes); el límite es None si el cgroup no tiene uno
+        (o no hay cgroup), y ambos son None fuera de un contenedor
+    """
+    for usage_path, limit_path in _CGROUP_MEMORY_FILES:
+        usage = _read_int(usage_path)
+        if usage is None:
+            continue
+        limit = _read_int(limit_path)
+        # cgroup v1 informa "sin límite" como un número cercano a 2**63
+        if limit is not None and limit >= 2**60:
+            limit = None
+        return usage, limit
+    return None, None
+
+
+def _meminfo(field: str) -> Optional[int]:
+    """Campo de /proc/meminfo (ej: "MemAvailable") en bytes; None si no se pudo leer."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def total_memory() -> Optional[int]:
+    """Memoria utilizable por el proceso: el límite del cgroup si tiene uno, si no la RAM del sistema."""
+    limit = cgroup_memory()[1]
+    return limit if limit is not None else _meminfo("MemTotal")
+
+
+def available_memory() -> Optional[int]:
+    """
+    Bytes que todavía se pueden usar: lo menor entre MemAvailable del sistema y lo que
+    falta para el límite del cgroup.
+    
+    Returns:
+        Bytes disponibles, o None si no se pudo leer ninguna de las dos fuentes
+    """
+    candidates = []
+    mem_available = _meminfo("MemAvailable")
+    if mem_available is not None:
+        candidates.append(mem_available)
+    usage, limit = cgroup_memory()
+    if usage is not None and limit is not None:
+        candidates.append(max(0, limit - usage))
+    return min(candidates) if candidates else None
+
+
+REGISTRY.register(Gauge(
+    "process_resident_memory_bytes", "RSS del proceso Python", callback=process_rss))
+REGISTRY.register(Gauge(
+    "chromium_resident_memory_bytes", "RSS sumado de los procesos de Chromium hijos",
+    callback=lambda: chromium_memory()[1]))
+REGISTRY.register(Gauge(
+    "chromium_processes", "Procesos de Chromium hijos", callback=lambda: chromium_memory()[0]))
@@ -0,0 +1,320 @@
+"""
+Extracción de datos desde el payload de Next.js del blog de Xepelin.
+El sitio embebe los datos de cada página en <script id="__NEXT_DATA__"> y los expone como
+JSON en /_next/data/<buildId>/<ruta>.json, por lo que no hace falta renderizar ni recorrer el DOM.
+"""
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+import requests
+
+
+NEXT_DATA_RE = re.compile(
+    r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>',
+    re.DOTALL
+)
+
+
+class NextDataExtractor:
+    """
+    Lee posts y metadatos directamente del JSON de Next.js.
+    Los nombres de campo del CMS no están documentados, así que cada campo se busca
+    entre varias claves candidatas.
+    """
+    
+    TITLE_KEYS = ("title", "titulo", "headline", "name")
+    SLUG_KEYS = ("slug", "uid")
+    URL_KEYS = ("url", "href", "link", "permalink")
+    DATE_KEYS = ("publishedAt", "published_at", "datePublished", "publishDate", "publicationDate",
+                 "first_publication_date", "date", "createdAt", "created_at")
+    READING_TIME_KEYS = ("readingTime", "reading_time", "readTime", "tiempoLectura")
+    AUTHOR_KEYS = ("author", "autor", "authors")
+    TOTAL_KEYS = ("total", "totalPosts", "totalCount")
+    # Paginación del listado: un booleano, o la página/cursor siguiente (vacío en la última)
+    HAS_MORE_KEYS = ("has_more", "hasMore", "hasNextPage", "has_next_page")
+    NEXT_PAGE_KEYS = ("nextPage", "next_page", "nextCursor", "next_cursor")
+    # Claves propias de un post (autores y categorías también tienen nombre y slug)
+    POST_KEYS = ("content", "body", "publishedAt", "published_at", "datePublished", "publishDate",
+                 "publicationDate", "first_publication_date")
+    
+    def __init__(self, base_url: str = "https://xepelin.com/blog", session: Optional[requests.Session] = None,
+                 timeout: float = 15.0):
+        """
+        Inicializa el extractor.
+        
+        Args:
+            base_url: URL base del blog
+            session: Sesión HTTP a reutilizar (se crea una si no se entrega)
+            timeout: Timeout en segundos de cada request
+        """
+        self.base_url = base_url.rstrip('/')
+        parsed = urlparse(self.base_url)
+        self.origin = f"{parsed.scheme}://{parsed.netloc}"
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.build_id: Optional[str] = None
+    
+    @staticmethod
+    def parse_next_data(html: str) -> Optional[Dict[str, Any]]:
+        """
+        Extrae el payload __NEXT_DATA__ de un HTML.
+        
+        Args:
+            html: HTML de una página renderizada por Next.js
+        
+        Returns:
+            Payload como diccionario, o None si la página no lo trae
+        """
+        match = NEXT_DATA_RE.search(html)
+        if not match:
+            return None
+        try:
+            return json.loads(match.group(1))
+        except ValueError:
+            return None
+    
+    @classmethod
+    def _first(cls, node: Dict[str, Any], keys) -> Optional[Any]:
+        """Devuelve el primer valor no vacío entre las claves candidatas."""
+        for key in keys:
+            value = node.get(key)
+            if value not in (None, "", [], {}):
+                return value
+        return None
+    
+    @classmethod
+    def _iter_dicts(cls, obj: Any) -> Iterator[Dict[str, Any]]:
+        """Recorre en profundidad todos los diccionarios de un JSON."""
+        stack = [obj]
+        while stack:
+            current = stack.pop()
+            if isinstance(current, dict):
+                yield current
+                stack.extend(reversed(list(current.values())))
+            elif isinstance(current, list):
+                stack.extend(reversed(current))
+    
+    @classmethod
+    def _is_post_node(cls, node: Dict[str, Any]) -> bool:
+        """Un nodo es un post si tiene título, slug o URL, y contenido o fecha de publicación."""
+        return (isinstance(cls._first(node, cls.TITLE_KEYS), str)
+                and (isinstance(cls._first(node, cls.SLUG_KEYS), str)
+                     or isinstance(cls._first(node, cls.URL_KEYS), str))
+                and cls._first(node, cls.POST_KEYS) is not None)
+    
+    @classmethod
+    def find_date(cls, payload: Any) -> Optional[str]:
+        """
+        Busca la fecha de publicación en un payload de Next.js.
+        
+        Args:
+            payload: JSON completo o pageProps
+        
+        Returns:
+            Fecha tal como la expone el CMS (ISO 8601), o None
+        """
+        for node in cls._iter_dicts(payload):
+            value = cls._first(node, cls.DATE_KEYS)
+            if isinstance(value, str) and re.match(r"\d{4}-\d{2}-\d{2}", value):
+                return value
+        return None
+    
+    @classmethod
+    def find_post_date(cls, payload: Any, url: str) -> Optional[str]:
+        """
+        Busca la fecha del post de `url` dentro del __NEXT_DATA__ de su página.
+        
+        Args:
+            payload: JSON __NEXT_DATA__ de la página del post
+            url: URL del post
+        
+        Returns:
+            Fecha de publicación, o None si ningún nodo coincide con la URL por slug o ruta
+            (el payload suele traer posts relacionados: no se adivina cuál es)
+        """
+        path = urlparse(url).path.rstrip('/')
+        for node in cls._iter_dicts(payload):
+            node_url = cls._first(node, cls.URL_KEYS)
+            slug = cls._first(node, cls.SLUG_KEYS)
+            if (isinstance(node_url, str) and urlparse(node_url).path.rstrip('/') == path) or \
+                    (isinstance(slug, str) and slug.strip('/') and path.endswith('/' + slug.strip('/'))):
+                date = cls.find_date(node)
+                if date:
+                    return date
+        return None
+    
+    @classmethod
+    def has_more(cls, payload: Any) -> Optional[bool]:
+        """
+        Indica si una página del listado (ej: la respuesta de "Cargar más") tiene otra después.
+        
+        Args:
+            payload: JSON de la página del listado
+        
+        Returns:
+            True o False según la paginación del payload, o None si no la informa
+        """
+        for node in cls._iter_dicts(payload):
+            for key in cls.HAS_MORE_KEYS:
+                if isinstance(node.get(key), bool):
+                    return node[key]
+            for key in cls.NEXT_PAGE_KEYS:
+                if key in node:
+                    return node[key] not in (None, "", False)
+        return None
+    
+    @classmethod
+    def _author_name(cls, value: Any) -> Optional[str]:
+        """Normaliza el autor, que puede venir como string, objeto o lista."""
+        if isinstance(value, str):
+            return value.strip() or None
+        if isinstance(value, dict):
+            name = cls._first(value, ("name", "nombre", "fullName", "title"))
+            role = cls._first(value, ("position", "role", "cargo", "jobTitle"))
+            if isinstance(name, str):
+                return f"{name} | {role}" if isinstance(role, str) else name
+        if isinstance(value, list):
+            names = [cls._author_name(item) for item in value]
+            names = [name for name in names if name]
+            return ", ".join(names) or None
+        return None
+    
+    def _post_url(self, node: Dict[str, Any], category_slug: Optional[str] = None) -> Optional[str]:
+        """Construye la URL absoluta del post a partir de un nodo."""
+        url = self._first(node, self.URL_KEYS)
+        if isinstance(url, str):
+            if url.startswith('http'):
+                return url
+            if url.startswith('/'):
+                return f"{self.origin}{url}"
+        
+        slug = self._first(node, self.SLUG_KEYS)
+        if not isinstance(slug, str):
+            return None
+        slug = slug.strip('/')
+        if '/' in slug or not category_slug:
+            return f"{self.base_url}/{slug}"
+        return f"{self.base_url}/{category_slug}/{slug}"
+    
+    def node_to_post(self, node: Dict[str, Any], url: str) -> Dict[str, str]:
+        """
+        Convierte un nodo de post del CMS al formato de registro del scraper.
+        
+        Args:
+            node: Nodo JSON del post
+            url: URL del post
+        
+        Returns:
+            Diccionario con los datos del post
+        """
+        reading_time = self._first(node, self.READING_TIME_KEYS)
+        if isinstance(reading_time, (int, float)):
+            reading_time = f"{int(reading_time)} min de lectura"
+        
+        fecha = self.find_date(node)
+        return {
+            "Titular": str(self._first(node, self.TITLE_KEYS)).strip(),
+            "Autor": self._author_name(self._first(node, self.AUTHOR_KEYS)) or "N/A",
+            "Tiempo de lectura": reading_time if isinstance(reading_time, str) else "N/A",
+            "Fecha": fecha or "N/A",
+            "URL": url
+        }
+    
+    def _fetch_html_next_data(self, url: str) -> Optional[Dict[str, Any]]:
+        """Descarga una página y devuelve su __NEXT_DATA__ (actualizando el buildId)."""
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        data = self.parse_next_data(response.text)
+        if data and data.get("buildId"):
+            self.build_id = data["buildId"]
+        return data
+    
+    def fetch_page_props(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene los pageProps de una ruta vía /_next/data/<buildId>/<ruta>.json.
+        Si el buildId cambió (deploy nuevo) o el endpoint no responde, usa el HTML.
+        
+        Args:
+            url: URL de la página
+        
+        Returns:
+            pageProps de la página, o None si no se pudieron obtener
+        """
+        try:
+            if self.build_id:
+                path = urlparse(url).path.rstrip('/')
+                response = self.session.get(
+                    f"{self.origin}/_next/data/{self.build_id}{path}.json",
+                    timeout=self.timeout
+                )
+                if response.status_code == 200:
+                    return response.json().get("pageProps")
+            
+            data = self._fetch_html_next_data(url)
+            return data.get("props", {}).get("pageProps") if data else None
+        except (requests.RequestException, ValueError) as e:
+            print(f"   ⚠️ No se pudo leer el JSON de Next.js para {url}: {e}")
+            return None
+    
+    def list_category_posts(self, category_slug: str) -> Optional[List[Dict[str, str]]]:
+        """
+        Lista los posts de una categoría desde el payload de su página.
+        
+        Args:
+            category_slug: Slug de la categoría (ej: "pymes")
+        
+        Returns:
+            Registros de los posts en orden del listado, o None si el payload no trae
+            el listado completo (en ese caso hay que recorrer la página con el navegador)
+        """
+        props = self.fetch_page_props(f"{self.base_url}/{category_slug}")
+        if not props:
+            return None
+        
+        posts = []
+        seen = set()
+        total = None
+        for node in self._iter_dicts(props):
+            if total is None:
+                value = self._first(node, self.TOTAL_KEYS)
+                if isinstance(value, int):
+                    total = value
+            if not self._is_post_node(node):
+                continue
+            url = self._post_url(node, category_slug)
+            if not url or url in seen or url.rstrip('/') == f"{self.base_url}/{category_slug}":
+                continue
+            seen.add(url)
+            posts.append(self.node_to_post(node, url))
+        
+        # Sin un total que confirme que vino todo el archivo, no reemplazamos el listado
+        if not posts or total is None or len(posts) < total:
+            return None
+        return posts
+    
+    def extract_post(self, url: str) -> Optional[Dict[str, str]]:
+        """
+        Extrae un post desde /_next/data/<buildId>/blog/<slug>.json.
+        
+        Args:
+            url: URL del post
+        
+        Returns:
+            Diccionario con los datos del post, o None si el JSON no trae un nodo cuyo slug o
+            URL coincida (pageProps suele traer posts relacionados: no se adivina cuál es)
+        """
+        props = self.fetch_page_props(url)
+        if not props:
+            return None
+        
+        path = urlparse(url).path.rstrip('/')
+        for node in self._iter_dicts(props):
+            if not self._is_post_node(node):
+                continue
+            node_url = self._post_url(node)
+            slug = self._first(node, self.SLUG_KEYS)
+            if (node_url and urlparse(node_url).path.rstrip('/') == path) or \
+                    (isinstance(slug, str) and path.endswith('/' + slug.strip('/'))):
+                return self.node_to_post(node, url)
+        return None
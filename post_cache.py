@@ -0,0 +1,220 @@
+"""
+Caché persistente en SQLite de los posts extraídos, indexado por URL.
+Guarda el hash del contenido y los validadores HTTP (ETag / Last-Modified) para
+revalidar con requests condicionales en vez de volver a extraer cada post.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class PostCache:
+    """
+    Caché de registros de posts con TTL y expulsión LRU.
+    
+    - Dentro del TTL un registro se usa sin tocar la red.
+    - Pasado el TTL se revalida (304 o mismo hash => se reutiliza el registro).
+    - Si hay más de `max_entries`, se eliminan los menos usados recientemente.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS posts (
+            url TEXT PRIMARY KEY,
+            record TEXT NOT NULL,
+            content_hash TEXT,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_posts_accessed_at ON posts (accessed_at);
+        CREATE TABLE IF NOT EXISTS category_posts (
+            category TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            url TEXT NOT NULL,
+            PRIMARY KEY (category, position)
+        );
+    """
+    
+    def __init__(self, path: str, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 5000):
+        """
+        Abre (o crea) la caché.
+        
+        Args:
+            path: Ruta del archivo SQLite
+            ttl_seconds: Tiempo durante el cual un registro se usa sin revalidar
+            max_entries: Máximo de posts guardados antes de expulsar por LRU
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # Una sola conexión compartida entre threads, serializada con el lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(self.SCHEMA)
+    
+    def close(self) -> None:
+        """Cierra la conexión a SQLite."""
+        with self._lock:
+            self._conn.close()
+    
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Obtiene la entrada de un post y actualiza su último acceso.
+        
+        Args:
+            url: URL del post
+            
+        Returns:
+            Diccionario con record, content_hash, etag, last_modified, fetched_at y fresh;
+            o None si el post no está en caché
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM posts WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE posts SET accessed_at = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+        
+        return {
+            "record": json.loads(row["record"]),
+            "content_hash": row["content_hash"],
+            "etag": row["etag"],
+            "last_modified": row["last_modified"],
+            "fetched_at": row["fetched_at"],
+            "fresh": now - row["fetched_at"] < self.ttl_seconds
+        }
+    
+    def get_fresh(self, url: str) -> Optional[Dict[str, str]]:
+        """
+        Devuelve el registro del post solo si está dentro del TTL.
+        
+        Args:
+            url: URL del post
+            
+        Returns:
+            Registro del post, o None si no está o hay que revalidarlo
+        """
+        entry = self.get(url)
+        return entry["record"] if entry and entry["fresh"] else None
+    
+    def put(self, url: str, record: Dict[str, str], content_hash: Optional[str] = None,
+            etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Guarda (o reemplaza) el registro de un post.
+        
+        Args:
+            url: URL del post
+            record: Registro extraído
+            content_hash: Hash del HTML del que se extrajo
+            etag: Header ETag de la respuesta
+            last_modified: Header Last-Modified de la respuesta
+        """
+        # La categoría se asigna por ejecución; no forma parte del registro cacheado
+        record = {key: value for key, value in record.items() if key != "Categoría"}
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO posts (url, record, content_hash, etag, last_modified, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    record = excluded.record,
+                    content_hash = excluded.content_hash,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    fetched_at = excluded.fetched_at,
+                    accessed_at = excluded.accessed_at
+                """,
+                (url, json.dumps(record, ensure_ascii=False), content_hash, etag, last_modified, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+    
+    def touch(self, url: str) -> None:
+        """
+        Marca un post como revalidado (respuesta 304 o contenido sin cambios).
+        
+        Args:
+            url: URL del post
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE posts SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                               (now, now, url))
+            self._conn.commit()
+    
+    def get_category_urls(self, category: str) -> List[str]:
+        """
+        Devuelve las URLs de una categoría guardadas en la última ejecución.
+        
+        Args:
+            category: Nombre de la categoría
+            
+        Returns:
+            URLs en orden del listado (más nuevas primero)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url FROM category_posts WHERE category = ? ORDER BY position",
+                (category,)
+            ).fetchall()
+        return [row["url"] for row in rows]
+    
+    def set_category_urls(self, category: str, urls: List[str]) -> None:
+        """
+        Reemplaza el listado guardado de una categoría.
+        
+        Args:
+            category: Nombre de la categoría
+            urls: URLs en orden del listado
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM category_posts WHERE category = ?", (category,))
+            self._conn.executemany(
+                "INSERT INTO category_posts (category, position, url) VALUES (?, ?, ?)",
+                [(category, position, url) for position, url in enumerate(urls)]
+            )
+            self._conn.commit()
+    
+    def get_record(self, url: str) -> Optional[Dict[str, str]]:
+        """
+        Devuelve el registro guardado de un post sin importar el TTL.
+        
+        Args:
+            url: URL del post
+            
+        Returns:
+            Registro del post, o None si no está en caché
+        """
+        entry = self.get(url)
+        return entry["record"] if entry else None
+    
+    def _evict(self) -> None:
+        """
+        Elimina los posts menos usados si se supera `max_entries` (requiere el lock).
+        Los listados de categorías se conservan: un post expulsado se vuelve a extraer.
+        """
+        count = self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM posts WHERE url IN "
+                "(SELECT url FROM posts ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,)
+            )
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
@@ -0,0 +1,455 @@
+"""
+Destinos (sinks) para los registros que producen los scrapers.
+Los scrapers entregan los posts a medida que se extraen (`iter_posts`); StreamingWriter los
+agrupa en micro-lotes por categoría y los pasa al sink desde un thread propio, así la
+escritura avanza en paralelo con el scraping y la memoria queda acotada por el tamaño
+de los lotes en vuelo, no por el del archivo del blog.
+
+Además de Google Sheets (sheets_manager.SheetsSink) hay sinks locales: JSONL (append),
+CSV, Parquet (requiere pyarrow) y una tabla SQLite con upsert por URL.
+"""
+import contextlib
+import csv
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, ContextManager, Dict, List, Optional, Tuple
+
+from metrics import FAILURES, timed
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pyarrow es opcional: solo lo necesita ParquetSink
+    pyarrow = None
+
+
+# Campos de un registro de post (como los entrega el scraper) y su columna en los
+# formatos tabulares pensados para análisis (Parquet, SQLite)
+FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("Titular", "titular"),
+    ("Categoría", "categoria"),
+    ("Autor", "autor"),
+    ("Tiempo de lectura", "tiempo_lectura"),
+    ("Fecha", "fecha"),
+    ("URL", "url"),
+)
+
+
+class PostSink(ABC):
+    """
+    Interfaz de un destino de registros.
+    
+    Recibe micro-lotes de posts de una misma categoría, en el orden en que se produjeron
+    (dentro de cada categoría, el orden del listado), y se finaliza con `close`.
+    """
+    
+    @abstractmethod
+    def write_batch(self, category: str, posts: List[Dict[str, str]]) -> None:
+        """
+        Escribe un micro-lote.
+        
+        Args:
+            category: Nombre de la categoría de los posts
+            posts: Registros del lote
+        """
+    
+    def close(self) -> Optional[str]:
+        """
+        Termina la escritura (ej: borra lo que ya no corresponde, cierra archivos).
+        
+        Returns:
+            Referencia al resultado (URL, ruta), o None si no se escribió nada
+        """
+        return None
+    
+    def abort(self) -> None:
+        """Libera recursos tras un error; lo ya escrito se conserva."""
+
+
+class StreamingWriter:
+    """
+    Agrupa registros en micro-lotes por categoría y los entrega a un PostSink en un thread.
+    
+    La cola entre el productor y el sink admite `max_pending_batches` lotes: si el sink es
+    más lento que el scraping, `put` espera (backpressure) en vez de acumular registros.
+    Si el sink falla, el error se relanza en el próximo `put` o en `close`.
+    
+    Con `lock`, cada entrega al sink (un lote, el cierre) se hace con el lock tomado: varios
+    writers pueden compartir un destino sin bloquearse durante todo el scraping.
+    
+    Ejemplo:
+        with StreamingWriter(sink, batch_size=50) as writer:
+            for post in scraper.iter_posts("Pymes"):
+                writer.put(post)
+        print(writer.result)
+    """
+    
+    def __init__(self, sink: PostSink, batch_size: int = 50, max_pending_batches: int = 4,
+                 on_batch: Optional[Callable[[str, int], None]] = None,
+                 lock: Optional[ContextManager] = None):
+        """
+        Args:
+            sink: Destino de los registros
+            batch_size: Registros por micro-lote
+            max_pending_batches: Lotes que pueden esperar al sink antes de frenar al productor
+            on_batch: Callback (categoría, cantidad) invocado tras escribir cada lote
+            lock: Lock del destino, tomado en cada escritura del sink (None: sin lock)
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size debe ser >= 1")
+        self.sink = sink
+        self.batch_size = batch_size
+        self.on_batch = on_batch
+        self.lock = lock if lock is not None else contextlib.nullcontext()
+        self.result: Optional[str] = None
+        self.written: Dict[str, int] = {}
+        self._buffers: Dict[str, List[Dict[str, str]]] = {}
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_pending_batches)
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+    
+    def start(self) -> None:
+        """Lanza el thread que escribe en el sink."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sink-writer", daemon=True)
+            self._thread.start()
+    
+    def put(self, post: Dict[str, str]) -> None:
+        """
+        Agrega un registro; cuando su categoría completa un lote, el lote pasa al sink.
+        
+        Args:
+            post: Registro con su "Categoría"
+        
+        Raises:
+            Exception: El error del sink, si falló al escribir un lote anterior
+        """
+        self._check_error()
+        category = post.get("Categoría", "")
+        buffer = self._buffers.setdefault(category, [])
+        buffer.append(post)
+        if len(buffer) >= self.batch_size:
+            self._submit(category)
+    
+    def flush(self) -> None:
+        """Pasa al sink los lotes incompletos de todas las categorías."""
+        for category in list(self._buffers):
+            self._submit(category)
+    
+    def close(self) -> Optional[str]:
+        """
+        Escribe lo pendiente, espera al sink y lo finaliza.
+        
+        Returns:
+            Resultado de `PostSink.close`
+        """
+        self.start()
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        self._check_error()
+        with self.lock:
+            self.result = self.sink.close()
+        return self.result
+    
+    def abort(self) -> None:
+        """Descarta los lotes incompletos, detiene el thread y avisa al sink."""
+        self._buffers.clear()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+        with self.lock:
+            self.sink.abort()
+    
+    def _submit(self, category: str) -> None:
+        batch = self._buffers.pop(category, None)
+        if batch:
+            self._check_error()
+            self._queue.put((category, batch))
+    
+    def _check_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+    
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                # Tras un error se vacía la cola para no bloquear al productor
+                continue
+            category, batch = item
+            try:
+                with self.lock, timed("sink_write"):
+                    self.sink.write_batch(category, batch)
+            except Exception as e:
+                FAILURES.inc(stage="sink_write")
+                print(f"❌ Error escribiendo un lote de {category}: {e}")
+                self._error = e
+                continue
+            self.written[category] = self.written.get(category, 0) + len(batch)
+            if self.on_batch:
+                self.on_batch(category, len(batch))
+
+
+class FileSink(PostSink):
+    """
+    Base de los sinks que escriben un archivo local.
+    
+    Por defecto se escribe en `<path>.part` y el archivo se mueve a `path` recién en
+    `close`, así un lector nunca ve un archivo a medio escribir; `abort` lo borra.
+    """
+    
+    EXTENSION = ""
+    ATOMIC = True
+    
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Ruta del archivo de salida (se crean los directorios que falten)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.rows = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def _write_path(self) -> str:
+        return self.path + ".part" if self.ATOMIC else self.path
+    
+    def write_batch(self, category: str, posts: List[Dict[str, str]]) -> None:
+        with self._lock:
+            self._write(posts)
+            self.rows += len(posts)
+    
+    def close(self) -> Optional[str]:
+        with self._lock:
+            self._finish()
+            if self.ATOMIC and os.path.exists(self._write_path):
+                if not self.rows:
+                    os.remove(self._write_path)
+                else:
+                    os.replace(self._write_path, self.path)
+        if self.rows:
+            print(f"💾 {self.rows} posts escritos en {self.path}")
+            return self.path
+        return None
+    
+    def abort(self) -> None:
+        with self._lock:
+            self._finish()
+            if self.ATOMIC and os.path.exists(self._write_path):
+                os.remove(self._write_path)
+    
+    @abstractmethod
+    def _write(self, posts: List[Dict[str, str]]) -> None:
+        """Escribe un lote en el archivo (con el lock del sink tomado)."""
+    
+    def _finish(self) -> None:
+        """Cierra el archivo (se llama una sola vez, en close o abort)."""
+
+
+class JsonlSink(FileSink):
+    """
+    Un objeto JSON por línea; los lotes se agregan al final del archivo (append-only).
+    
+    No deduplica: cada trabajo de la API escribe su propio archivo, porque un trabajo
+    reanudado vuelve a entregar los posts del intento anterior.
+    """
+    
+    EXTENSION = ".jsonl"
+    ATOMIC = False
+    
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._file = open(path, "a", encoding="utf-8")
+    
+    def _write(self, posts: List[Dict[str, str]]) -> None:
+        self._file.writelines(json.dumps(post, ensure_ascii=False) + "\n" for post in posts)
+        self._file.flush()
+    
+    def _finish(self) -> None:
+        self._file.close()
+
+
+class CsvSink(FileSink):
+    """CSV con encabezado, columnas en el orden de FIELDS (UTF-8 con BOM para Excel)."""
+    
+    EXTENSION = ".csv"
+    
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._file = open(self._write_path, "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([field for field, _ in FIELDS])
+    
+    def _write(self, posts: List[Dict[str, str]]) -> None:
+        self._writer.writerows([post.get(field, "N/A") for field, _ in FIELDS] for post in posts)
+    
+    def _finish(self) -> None:
+        self._file.close()
+
+
+class ParquetSink(FileSink):
+    """
+    Parquet con columnas de texto (nombres de FIELDS) y compresión.
+    
+    Los micro-lotes se acumulan hasta `row_group_size` filas antes de escribir un row
+    group: row groups de 50 filas comprimen mal y hacen lenta la lectura por columnas.
+    """
+    
+    EXTENSION = ".parquet"
+    
+    def __init__(self, path: str, compression: str = "zstd", row_group_size: int = 10000):
+        """
+        Args:
+            path: Ruta del archivo de salida
+            compression: Códec de Parquet ("zstd", "snappy", "gzip", "none")
+            row_group_size: Filas por row group
+        
+        Raises:
+            RuntimeError: Si pyarrow no está instalado
+        """
+        if pyarrow is None:
+            raise RuntimeError("La salida Parquet requiere pyarrow (pip install pyarrow)")
+        super().__init__(path)
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self._schema = pyarrow.schema([(column, pyarrow.string()) for _, column in FIELDS])
+        self._pending: List[Dict[str, str]] = []
+        self._writer = None
+    
+    def _write(self, posts: List[Dict[str, str]]) -> None:
+        self._pending.extend(posts)
+        if len(self._pending) >= self.row_group_size:
+            self._write_row_group()
+    
+    def _write_row_group(self) -> None:
+        if not self._pending:
+            return
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self._write_path, self._schema,
+                                                         compression=self.compression)
+        table = pyarrow.Table.from_pydict(
+            {column: [post.get(field, "N/A") for post in self._pending] for field, column in FIELDS},
+            schema=self._schema
+        )
+        self._writer.write_table(table, row_group_size=self.row_group_size)
+        self._pending = []
+    
+    def _finish(self) -> None:
+        self._write_row_group()
+        if self._writer is not None:
+            self._writer.close()
+    
+    def abort(self) -> None:
+        # Lo acumulado se descarta: no vale la pena escribir un archivo que se va a borrar
+        self._pending = []
+        super().abort()
+
+
+class SqliteSink(FileSink):
+    """
+    Tabla SQLite con un registro por URL: un post ya guardado se actualiza (upsert), así
+    ejecuciones sucesivas mantienen la tabla al día sin duplicados.
+    """
+    
+    EXTENSION = ".sqlite"
+    ATOMIC = False
+    
+    def __init__(self, path: str, table: str = "posts"):
+        """
+        Args:
+            path: Ruta de la base SQLite (se crea si no existe)
+            table: Nombre de la tabla
+        """
+        super().__init__(path)
+        self.table = table
+        columns = [column for _, column in FIELDS]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != "url")
+        self._upsert = (f'INSERT INTO "{table}" ({", ".join(columns)}, updated_at) '
+                        f'VALUES ({", ".join("?" * (len(columns) + 1))}) '
+                        f'ON CONFLICT(url) DO UPDATE SET {updates}, updated_at = excluded.updated_at')
+        # Una conexión compartida: la abre este thread y la usa el del StreamingWriter
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}" ('
+            + ", ".join(f"{column} TEXT" + (" PRIMARY KEY" if column == "url" else "") for column in columns)
+            + ", updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+    
+    def _write(self, posts: List[Dict[str, str]]) -> None:
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(self._upsert, [
+                [post.get(field, "N/A") for field, _ in FIELDS] + [now] for post in posts
+            ])
+    
+    def _finish(self) -> None:
+        self._conn.close()
+
+
+# Formatos de salida local -> clase del sink
+FILE_SINKS: Dict[str, type] = {
+    "jsonl": JsonlSink,
+    "csv": CsvSink,
+    "parquet": ParquetSink,
+    "sqlite": SqliteSink,
+}
+
+
+def available_formats() -> List[str]:
+    """Formatos de FILE_SINKS que se pueden usar en este entorno (Parquet solo con pyarrow)."""
+    return [name for name in FILE_SINKS if name != "parquet" or pyarrow is not None]
+
+
+def sink_format(path: str) -> Optional[str]:
+    """
+    Formato de salida según la extensión de un archivo (ej: "posts.parquet" -> "parquet").
+    
+    Returns:
+        Clave de FILE_SINKS, o None si la extensión no corresponde a ninguno
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".db", ".sqlite3"):
+        return "sqlite"
+    for name, sink_class in FILE_SINKS.items():
+        if sink_class.EXTENSION == extension:
+            return name
+    return None
+
+
+def open_file_sink(output: str, path: str) -> FileSink:
+    """
+    Crea el sink local de un formato.
+    
+    Args:
+        output: Clave de FILE_SINKS
+        path: Ruta del archivo de salida
+    
+    Raises:
+        ValueError: Si el formato no existe
+    """
+    if output not in FILE_SINKS:
+        raise ValueError(f"Formato de salida desconocido: '{output}' (disponibles: {', '.join(FILE_SINKS)})")
+    return FILE_SINKS[output](path)
@@ -0,0 +1,181 @@
+"""
+Progreso observable de un trabajo de scraping.
+Los scrapers informan fase, posts descubiertos y posts extraídos; la API lo expone
+(consulta puntual o stream) y puede pedir la cancelación del trabajo.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class JobCancelled(Exception):
+    """El trabajo fue cancelado mientras se ejecutaba."""
+
+
+class JobProgress:
+    """
+    Contadores de progreso de un trabajo, seguros entre threads.
+    
+    Cada cambio incrementa `version` y despierta a quienes esperan en `wait_for_update`,
+    para que los streams envíen actualizaciones sin hacer polling.
+    """
+    
+    TERMINAL_PHASES = ("done", "failed", "cancelled")
+    
+    def __init__(self):
+        self.phase = "queued"
+        self.categories: Dict[str, int] = {}
+        self.discovered = 0
+        self.total = 0
+        self.extracted = 0
+        self.written = 0
+        self.result_url: Optional[str] = None
+        self.version = 0
+        self._extract_started_at: Optional[float] = None
+        self._extract_started_count = 0
+        self._extract_finished_at: Optional[float] = None
+        self._cancel = threading.Event()
+        self._changed = threading.Condition()
+    
+    def _bump(self) -> None:
+        """Registra un cambio y notifica a los observadores (con `_changed` tomado)."""
+        self.version += 1
+        self._changed.notify_all()
+    
+    def set_phase(self, phase: str) -> None:
+        """
+        Cambia la fase del trabajo.
+        
+        Args:
+            phase: "queued", "discovering", "extracting", "writing", "done", "failed" o "cancelled"
+        """
+        with self._changed:
+            if self.phase in self.TERMINAL_PHASES:
+                return
+            if self.phase == "extracting" and phase != "extracting":
+                self._extract_finished_at = time.time()
+            self.phase = phase
+            self._bump()
+    
+    def add_discovered(self, category: str, count: int) -> None:
+        """
+        Registra las URLs descubiertas en el listado de una categoría.
+        
+        Args:
+            category: Nombre de la categoría
+            count: Cantidad de URLs del listado
+        """
+        with self._changed:
+            self.categories[category] = count
+            self.discovered = sum(self.categories.values())
+            self._bump()
+    
+    def start_extracting(self, total: int, ready: int = 0) -> None:
+        """
+        Entra en la fase de extracción.
+        
+        Args:
+            total: Posts únicos que tendrá el resultado
+            ready: Posts que ya estaban completos (caché, checkpoint o listado)
+        """
+        with self._changed:
+            if self.phase not in self.TERMINAL_PHASES:
+                self.phase = "extracting"
+            self.total = total
+            self.extracted = ready
+            self._extract_started_at = time.time()
+            self._extract_started_count = ready
+            # Con varias categorías se extrae más de una vez: el throughput es de la actual
+            self._extract_finished_at = None
+            self._bump()
+    
+    def post_done(self) -> None:
+        """Registra un post extraído."""
+        with self._changed:
+            self.extracted += 1
+            self._bump()
+    
+    def add_written(self, count: int, result_url: Optional[str] = None) -> None:
+        """
+        Registra posts ya escritos en el destino (escritura en streaming).
+        
+        Args:
+            count: Posts escritos en el último lote
+            result_url: Dónde ver los resultados parciales (ej: URL de la planilla)
+        """
+        with self._changed:
+            self.written += count
+            if result_url:
+                self.result_url = result_url
+            self._bump()
+    
+    def throughput(self) -> Optional[float]:
+        """Posts extraídos por segundo desde que empezó la extracción."""
+        if self._extract_started_at is None:
+            return None
+        elapsed = (self._extract_finished_at or time.time()) - self._extract_started_at
+        if elapsed <= 0:
+            return None
+        return (self.extracted - self._extract_started_count) / elapsed
+    
+    def eta_seconds(self) -> Optional[float]:
+        """Segundos estimados hasta terminar la extracción, según el throughput actual."""
+        rate = self.throughput()
+        if not rate:
+            return None
+        return max(self.total - self.extracted, 0) / rate
+    
+    def cancel(self) -> None:
+        """Pide la cancelación; el trabajo se detiene en el próximo punto de control."""
+        self._cancel.set()
+        with self._changed:
+            self._bump()
+    
+    @property
+    def cancelled(self) -> bool:
+        """True si se pidió la cancelación."""
+        return self._cancel.is_set()
+    
+    def check_cancelled(self) -> None:
+        """
+        Punto de control para los scrapers.
+        
+        Raises:
+            JobCancelled: Si se pidió la cancelación
+        """
+        if self._cancel.is_set():
+            raise JobCancelled("Trabajo cancelado")
+    
+    def wait_for_update(self, version: int, timeout: float) -> int:
+        """
+        Espera hasta que haya un cambio posterior a `version`.
+        
+        Args:
+            version: Última versión vista por el observador
+            timeout: Segundos máximos de espera
+        
+        Returns:
+            Versión actual (igual a `version` si no hubo cambios)
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado actual como diccionario serializable."""
+        with self._changed:
+            throughput = self.throughput()
+            eta = self.eta_seconds() if self.phase == "extracting" else None
+            return {
+                "phase": self.phase,
+                "categories": dict(self.categories),
+                "posts_discovered": self.discovered,
+                "posts_total": self.total,
+                "posts_extracted": self.extracted,
+                "posts_written": self.written,
+                "result_url": self.result_url,
+                "throughput_posts_per_second": round(throughput, 3) if throughput is not None else None,
+                "eta_seconds": round(eta) if eta is not None else None,
+                "cancel_requested": self.cancelled,
+                "version": self.version
+            }
@@ -0,0 +1,873 @@
+#!/usr/bin/env python3
+"""
+Scraper asíncrono con Playwright para el blog de Xepelin.
+Recorre los listados de categorías y los posts de forma concurrente en un solo event loop.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import aclosing, asynccontextmanager
+from urllib.parse import urlparse
+from typing import AsyncIterator, Awaitable, Callable, Deque, Iterable, List, Dict, Optional, Set, Tuple
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, TimeoutError as PlaywrightTimeout
+
+from scraper_playwright import DiscoveryMixin, ListingHarvest, XepelinPlaywrightScraper
+from http_fetcher import HttpPostFetcher
+from post_cache import PostCache
+from sitemap_discovery import SitemapDiscovery
+from checkpoint import JobCheckpoint
+from memory_governor import MemoryGovernor
+from progress import JobProgress, JobCancelled
+from metrics import FALLBACK_POSTS, FAILURES, POSTS_EXTRACTED, timed
+
+
+class ContextRecycler:
+    """
+    BrowserContext compartido por las navegaciones concurrentes de una ejecución, que se
+    reemplaza por uno nuevo cuando `should_recycle` lo pide (cantidad de posts o memoria).
+    Las páginas abiertas terminan en el contexto viejo, que se cierra cuando suelta la última.
+    
+    Ejemplo:
+        contexts = ContextRecycler(browser, new_page, scraper._should_recycle)
+        async with contexts.page() as page:
+            await page.goto(url)
+        await contexts.close()
+    """
+    
+    def __init__(self, browser: Browser, new_page: Callable[[BrowserContext], Awaitable[Page]],
+                 should_recycle: Callable[[int, float], bool]):
+        """
+        Args:
+            browser: Navegador donde crear los contextos
+            new_page: Corutina que abre una página configurada en un contexto
+            should_recycle: (posts procesados con el contexto actual, momento de su creación) -> reciclar
+        """
+        self.browser = browser
+        self.new_page = new_page
+        self.should_recycle = should_recycle
+        self.context: Optional[BrowserContext] = None
+        self.processed = 0  # Páginas cerradas del contexto actual
+        self.created_at = 0.0
+        self.recycled = 0
+        self._open_pages: Dict[BrowserContext, int] = {}
+        self._lock = asyncio.Lock()
+    
+    async def _current(self) -> BrowserContext:
+        """Contexto para una página nueva, reemplazando el actual si corresponde."""
+        async with self._lock:
+            if self.context is None or self.should_recycle(self.processed, self.created_at):
+                old = self.context
+                self.context = await self.browser.new_context()
+                self._open_pages[self.context] = 0
+                self.processed, self.created_at = 0, time.monotonic()
+                if old is not None:
+                    self.recycled += 1
+                    await self._close_if_idle(old)
+            self._open_pages[self.context] += 1
+            return self.context
+    
+    async def _close_if_idle(self, context: BrowserContext) -> None:
+        """Cierra un contexto reemplazado cuando ya no tiene páginas abiertas."""
+        if context is not self.context and self._open_pages.get(context) == 0:
+            del self._open_pages[context]
+            try:
+                await context.close()
+            except Exception as e:
+                print(f"   ⚠️ Error cerrando contexto: {e}")
+    
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Página nueva en el contexto vigente; se cierra al salir."""
+        context = await self._current()
+        try:
+            page = await self.new_page(context)
+            try:
+                yield page
+            finally:
+                await page.close()
+        finally:
+            if context in self._open_pages:  # Sigue abierto (no pasó por `close`)
+                self._open_pages[context] -= 1
+            if context is self.context:
+                self.processed += 1
+            await self._close_if_idle(context)
+    
+    async def close(self) -> None:
+        """Cierra todos los contextos (los reemplazados que seguían abiertos y el actual)."""
+        open_contexts, self._open_pages, self.context = list(self._open_pages), {}, None
+        for context in open_contexts:
+            try:
+                await context.close()
+            except Exception as e:
+                print(f"   ⚠️ Error cerrando contexto: {e}")
+
+
+class AsyncXepelinScraper(DiscoveryMixin):
+    """
+    Versión asíncrona de XepelinPlaywrightScraper.
+    Expone la misma interfaz pública (`scrape_category`, `scrape_all_categories`, `CATEGORIES`)
+    pero con corutinas; un semáforo limita cuántas navegaciones hay en curso a la vez.
+    """
+    
+    BASE_URL = XepelinPlaywrightScraper.BASE_URL
+    CATEGORIES = XepelinPlaywrightScraper.CATEGORIES
+    BROWSER_ARGS = XepelinPlaywrightScraper.BROWSER_ARGS
+    BLOCKED_RESOURCES = XepelinPlaywrightScraper.BLOCKED_RESOURCES
+    
+    def __init__(self, headless: bool = True, timeout: int = 60000, max_navigations: int = 4,
+                 backend: str = "browser", cache: Optional[PostCache] = None,
+                 browser: Optional[Browser] = None, progress: Optional[JobProgress] = None,
+                 discovery: str = "listing", governor: Optional[MemoryGovernor] = None,
+                 recycle_every: int = 50):
+        """
+        Inicializa el scraper asíncrono.
+        
+        Args:
+            headless: Si True, ejecuta el navegador sin GUI
+            timeout: Timeout en milisegundos para operaciones de página
+            max_navigations: Máximo de navegaciones simultáneas (listados + posts)
+            backend: "browser", "http" o "nextjs" (ver XepelinPlaywrightScraper)
+            cache: Caché persistente de posts (ver XepelinPlaywrightScraper)
+            browser: Navegador ya lanzado (ej: de un BrowserPool); el scraper no lo cierra
+            progress: Progreso del trabajo (ver XepelinPlaywrightScraper)
+            discovery: "listing" o "sitemap" (ver XepelinPlaywrightScraper)
+            governor: Controlador de memoria compartido; si se indica, `max_navigations` pasa
+                      a ser el máximo y el controlador decide cuántas navegaciones corren a la vez
+                      y cuándo reciclar el contexto
+            recycle_every: Cada cuántas páginas se reemplaza el contexto para liberar memoria
+        """
+        if max_navigations < 1:
+            raise ValueError("max_navigations debe ser >= 1")
+        if recycle_every < 1:
+            raise ValueError("recycle_every debe ser >= 1")
+        if backend not in XepelinPlaywrightScraper.BACKENDS:
+            raise ValueError(f"Backend '{backend}' no válido. "
+                             f"Backends disponibles: {list(XepelinPlaywrightScraper.BACKENDS)}")
+        XepelinPlaywrightScraper._check_discovery(discovery)
+        
+        self.headless = headless
+        self.timeout = timeout
+        self.max_navigations = max_navigations
+        self.backend = backend
+        self.cache = cache
+        self.progress = progress
+        self.governor = governor
+        self.recycle_every = recycle_every
+        self.http_fetcher: Optional[HttpPostFetcher] = None
+        if backend in ("http", "nextjs"):
+            self.http_fetcher = HttpPostFetcher(parse=XepelinPlaywrightScraper._parse_post_html,
+                                                pool_size=max_navigations * 2,
+                                                use_next_data=(backend == "nextjs"),
+                                                base_url=self.BASE_URL,
+                                                cache=cache)
+        self.sitemap: Optional[SitemapDiscovery] = None
+        if discovery == "sitemap":
+            self.sitemap = SitemapDiscovery(self.BASE_URL, self.CATEGORIES,
+                                            session=self.http_fetcher.session if self.http_fetcher else None)
+        # Título y extracto de la tarjeta de cada post visto en los listados, por URL
+        self.listing_cards: Dict[str, Dict[str, str]] = {}
+        self.browser: Optional[Browser] = browser
+        self._owns_browser = browser is None
+        self.playwright = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def __aenter__(self):
+        """Context manager asíncrono para manejar el navegador."""
+        if self._owns_browser:
+            self.playwright = await async_playwright().start()
+            print("🎭 Launching Chromium browser (async) with memory optimizations...")
+            self.browser = await self.playwright.chromium.launch(
+                headless=self.headless,
+                args=self.BROWSER_ARGS
+            )
+            print("✅ Chromium browser launched successfully")
+        # El semáforo debe crearse dentro del event loop que lo usa
+        self._semaphore = asyncio.Semaphore(self.max_navigations)
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Cierra el navegador al salir (solo si lo lanzó este scraper)."""
+        if self.browser and self._owns_browser:
+            await self.browser.close()
+        if self.playwright:
+            await self.playwright.stop()
+        if self.http_fetcher:
+            self.http_fetcher.close()
+    
+    @asynccontextmanager
+    async def _navigation_slot(self) -> AsyncIterator[None]:
+        """Cupo para abrir una página: el semáforo local y, si hay, el del controlador de memoria."""
+        async with self._semaphore:
+            if self.governor is None:
+                yield
+            else:
+                async with self.governor.slot_async():
+                    yield
+    
+    def _contexts(self) -> ContextRecycler:
+        """Contextos de una ejecución, reciclados como los de los workers sync (ver `_should_recycle`)."""
+        return ContextRecycler(self.browser, self._new_page, self._should_recycle)
+    
+    def _should_recycle(self, processed: int, created_at: float) -> bool:
+        """Ver XepelinPlaywrightScraper._should_recycle."""
+        if self.governor:
+            return self.governor.should_recycle(processed, created_at, self.recycle_every)
+        return processed >= self.recycle_every
+    
+    async def _new_page(self, context: BrowserContext) -> Page:
+        """
+        Crea una página con timeout por defecto y bloqueo de recursos innecesarios.
+        
+        Args:
+            context: BrowserContext donde crear la página
+        
+        Returns:
+            Página de Playwright lista para navegar
+        """
+        page = await context.new_page()
+        page.set_default_timeout(self.timeout)
+        
+        async def block_resources(route):
+            if route.request.resource_type in self.BLOCKED_RESOURCES:
+                await route.abort()
+            else:
+                await route.continue_()
+        
+        await page.route("**/*", block_resources)
+        return page
+    
+    async def _load_all_posts(self, page: Page, stop_urls: Optional[Set[str]] = None,
+                              harvest: Optional[ListingHarvest] = None) -> None:
+        """
+        Hace scroll y carga todos los posts clickeando "Cargar más" hasta que no haya más.
+        Misma estrategia por eventos que XepelinPlaywrightScraper._load_all_posts.
+        
+        Args:
+            page: Página de Playwright
+            stop_urls: URLs ya conocidas; la carga se detiene apenas aparece alguna
+            harvest: Recolección en curso de las tarjetas del listado
+        """
+        harvest = harvest if harvest is not None else ListingHarvest()
+        max_clicks = 100  # Límite de seguridad
+        clicks = 0
+        misses = 0
+        load_timeout = XepelinPlaywrightScraper.LOAD_MORE_MAX_WAIT_MS / 2
+        scroll_loads_posts = None
+        
+        while clicks < max_clicks:
+            with timed("load_more_iteration"):
+                try:
+                    new_urls = await self._harvest_links(page, harvest)
+                    if stop_urls and any(url in stop_urls for url in new_urls):
+                        break
+                    
+                    posts_before = harvest.seen
+                    
+                    if scroll_loads_posts is not False:
+                        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                        grew, elapsed = await self._wait_for_more_posts(page, posts_before, min(load_timeout, 1500))
+                        if grew:
+                            scroll_loads_posts = True
+                            misses = 0
+                            load_timeout = XepelinPlaywrightScraper._adapt_load_timeout(load_timeout, elapsed)
+                            clicks += 1
+                            continue
+                        scroll_loads_posts = False
+                    
+                    load_more_button = page.locator(XepelinPlaywrightScraper.LOAD_MORE_SELECTOR).first
+                    if not await self._is_visible(load_more_button):
+                        break
+                    
+                    grew, elapsed, finished = await self._click_load_more(page, load_more_button, posts_before,
+                                                                          load_timeout)
+                    if grew:
+                        misses = 0
+                        load_timeout = XepelinPlaywrightScraper._adapt_load_timeout(load_timeout, elapsed)
+                        clicks += 1
+                    if finished:
+                        break
+                    if not grew:
+                        misses += 1
+                        load_timeout = XepelinPlaywrightScraper.LOAD_MORE_MAX_WAIT_MS
+                        if misses >= XepelinPlaywrightScraper.LOAD_MORE_MAX_MISSES:
+                            break
+                
+                except PlaywrightTimeout:
+                    break
+                except Exception as e:
+                    FAILURES.inc(stage="load_more")
+                    print(f"⚠️ Error al cargar más posts: {e}")
+                    break
+    
+    @staticmethod
+    async def _is_visible(locator) -> bool:
+        """El botón existe y está visible."""
+        return await locator.count() > 0 and await locator.is_visible()
+    
+    async def _click_load_more(self, page: Page, button, previous_count: int,
+                               timeout_ms: float) -> Tuple[bool, float, bool]:
+        """
+        Clickea "Cargar más" y espera posts nuevos o el fin del listado
+        (ver XepelinPlaywrightScraper._click_load_more).
+        
+        Returns:
+            Tupla (hubo posts nuevos, milisegundos esperados, el sitio indicó que no hay más)
+        """
+        listing_path = urlparse(page.url).path
+        post_links = page.locator(XepelinPlaywrightScraper.POST_LINK_SELECTOR)
+        responses = []
+        
+        def on_response(response) -> None:
+            if XepelinPlaywrightScraper._is_page_response(response, listing_path):
+                responses.append(response)
+        
+        page.on("response", on_response)
+        try:
+            await button.click()
+            signal, elapsed = await self._wait_for_more_posts(page, previous_count, timeout_ms,
+                                                              end_on_button_gone=True)
+            grew = await post_links.count() > previous_count
+            if signal and not grew and not responses:
+                # Botón oculto antes de la respuesta: esperarla y volver a mirar
+                try:
+                    await page.wait_for_event(
+                        "response", lambda r: XepelinPlaywrightScraper._is_page_response(r, listing_path),
+                        timeout=timeout_ms)
+                except PlaywrightTimeout:
+                    pass  # Se ocultó sin pedir otra página: no hay más
+                else:
+                    _, more = await self._wait_for_more_posts(page, previous_count, timeout_ms,
+                                                              end_on_button_gone=True)
+                    elapsed += more
+                grew = await post_links.count() > previous_count
+        finally:
+            page.remove_listener("response", on_response)
+        
+        payloads = []
+        for response in responses:
+            try:
+                payloads.append(await response.json())
+            except Exception:
+                payloads.append(None)
+        has_more = XepelinPlaywrightScraper._has_more(payloads)
+        button_gone = not await self._is_visible(page.locator(XepelinPlaywrightScraper.LOAD_MORE_SELECTOR).first)
+        return grew, elapsed, has_more is False or (button_gone and (grew or signal))
+    
+    async def _harvest_links(self, page: Page, harvest: ListingHarvest) -> List[str]:
+        """
+        Recolecta en el navegador los enlaces a posts agregados desde la última llamada
+        (ver XepelinPlaywrightScraper._harvest_links).
+        
+        Returns:
+            URLs nuevas, en orden del listado
+        """
+        with timed("listing_harvest"):
+            result = await page.eval_on_selector_all(XepelinPlaywrightScraper.POST_LINK_SELECTOR,
+                                                     XepelinPlaywrightScraper.HARVEST_LINKS_JS, harvest.key)
+        return harvest.add(result)
+    
+    async def _wait_for_more_posts(self, page: Page, previous_count: int, timeout_ms: float,
+                                   end_on_button_gone: bool = False) -> tuple:
+        """
+        Espera a que aumente la cantidad de enlaces a posts (o, con `end_on_button_gone`, a
+        que ya no haya un "Cargar más" visible).
+        
+        Returns:
+            Tupla (hubo señal, milisegundos esperados)
+        """
+        started = time.monotonic()
+        try:
+            await page.wait_for_function(
+                XepelinPlaywrightScraper.MORE_POSTS_JS,
+                arg=[XepelinPlaywrightScraper.POST_LINK_SELECTOR, previous_count, end_on_button_gone],
+                timeout=timeout_ms
+            )
+            return True, (time.monotonic() - started) * 1000
+        except PlaywrightTimeout:
+            return False, timeout_ms
+    
+    async def _collect_category_urls(self, contexts: ContextRecycler, category_name: str,
+                                     known_urls: Optional[Set[str]] = None) -> List[str]:
+        """
+        Carga el listado completo de una categoría y devuelve las URLs de sus posts.
+        
+        Args:
+            contexts: Contextos de la ejecución
+            category_name: Nombre de la categoría
+            known_urls: URLs ya conocidas; la carga se detiene al llegar a ellas
+        
+        Returns:
+            Lista de URLs de posts sin duplicados
+        """
+        url = f"{self.BASE_URL}/{self.CATEGORIES[category_name]}"
+        
+        async with self._navigation_slot(), contexts.page() as page:
+            print(f"🌐 [{category_name}] Navegando a {url}...")
+            with timed("listing_navigation"):
+                try:
+                    await page.goto(url, wait_until="networkidle", timeout=30000)
+                except Exception:
+                    await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+            try:
+                await page.wait_for_selector(XepelinPlaywrightScraper.POST_LINK_SELECTOR, timeout=15000)
+            except PlaywrightTimeout:
+                print(f"⚠️  [{category_name}] Timeout esperando posts - intentando continuar de todos modos")
+            
+            harvest = ListingHarvest()
+            await self._load_all_posts(page, stop_urls=known_urls, harvest=harvest)
+            # Solo los enlaces que faltan y su tarjeta cruzan desde el navegador, no el HTML
+            await self._harvest_links(page, harvest)
+        
+        urls = XepelinPlaywrightScraper._filter_post_urls(list(harvest.cards))
+        for post_url in urls:
+            self.listing_cards[post_url] = harvest.cards[post_url]
+        return urls
+    
+    async def _extract_post_details(self, contexts: ContextRecycler, url: str) -> Dict[str, str]:
+        """
+        Navega a un post individual para extraer sus detalles completos.
+        
+        Args:
+            contexts: Contextos de la ejecución
+            url: URL del post
+        
+        Returns:
+            Diccionario con los datos del post
+        """
+        if self.http_fetcher:
+            # requests es bloqueante: ejecutarlo en un thread para no frenar el event loop. Una
+            # descarga ocupa un cupo de navegación, así el controlador de memoria también la cuenta
+            async with self._navigation_slot():
+                post = await asyncio.to_thread(self.http_fetcher.fetch_post, url)
+            if post is not None:
+                POSTS_EXTRACTED.inc(source="http")
+                return post
+        elif self.cache is not None:
+            post = await asyncio.to_thread(self.cache.get_fresh, url)
+            if post is not None:
+                POSTS_EXTRACTED.inc(source="cache")
+                return post
+        
+        async with self._navigation_slot():
+            try:
+                async with contexts.page() as page:
+                    with timed("navigation"):
+                        await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+                    try:
+                        await page.wait_for_selector('h1', state="attached", timeout=5000)
+                    except PlaywrightTimeout:
+                        pass
+                    with timed("page_content"):
+                        html = await page.content()
+            except Exception as e:
+                FAILURES.inc(stage="post_extraction")
+                FALLBACK_POSTS.inc()
+                print(f"⚠️ Error extrayendo detalles de {url}: {str(e)}")
+                return self._fallback_post(url)
+        
+        try:
+            post = await asyncio.to_thread(XepelinPlaywrightScraper._parse_post_html, html, url)
+        except Exception as e:
+            FAILURES.inc(stage="parse")
+            FALLBACK_POSTS.inc()
+            print(f"⚠️ Error parseando {url}: {str(e)}")
+            return self._fallback_post(url)
+        
+        POSTS_EXTRACTED.inc(source="browser")
+        if self.http_fetcher:
+            await asyncio.to_thread(self.http_fetcher.store, url, post)
+        elif self.cache is not None:
+            await asyncio.to_thread(self.cache.put, url, post)
+        return post
+    
+    @staticmethod
+    async def _ready(post: Dict[str, str]) -> Dict[str, str]:
+        """Envuelve un registro ya disponible para mezclarlo con las corutinas pendientes."""
+        return post
+    
+    async def _discover_category(self, contexts: ContextRecycler, category_name: str, incremental: bool = False,
+                                 checkpoint: Optional[JobCheckpoint] = None) -> Tuple[List[str], Dict[str, Dict[str, str]]]:
+        """
+        Obtiene las URLs de los posts de una categoría, sin visitar cada post.
+        
+        Args:
+            contexts: Contextos de la ejecución
+            category_name: Nombre de la categoría
+            incremental: Si True, solo carga los posts nuevos y los combina con el listado guardado
+            checkpoint: Checkpoint del trabajo (reutiliza o guarda el listado)
+        
+        Returns:
+            Tupla (URLs en orden del listado, registros ya completos por URL)
+        """
+        if checkpoint:
+            discovered = await asyncio.to_thread(checkpoint.get_discovered)
+            if category_name in discovered:
+                print(f"♻️ Listado de {category_name} recuperado del checkpoint")
+                if self.progress:
+                    self.progress.add_discovered(category_name, len(discovered[category_name]))
+                return discovered[category_name], {}
+        
+        if self.progress:
+            self.progress.check_cancelled()
+            self.progress.set_phase("discovering")
+        urls, ready = await self._discover_new(contexts, category_name, incremental)
+        if self.progress:
+            self.progress.add_discovered(category_name, len(urls))
+        
+        if checkpoint:
+            for url, post in ready.items():
+                await asyncio.to_thread(checkpoint.add_post, url, post)
+            await asyncio.to_thread(checkpoint.save_discovered, category_name, urls)
+        return urls, ready
+    
+    async def _discover_new(self, contexts: ContextRecycler, category_name: str,
+                            incremental: bool) -> Tuple[List[str], Dict[str, Dict[str, str]]]:
+        """
+        Descubre el listado de una categoría (ver `_discover_category`).
+        
+        Returns:
+            Tupla (URLs en orden del listado, registros ya completos por URL)
+        """
+        if self.sitemap:
+            # Descarga y parseo de XML bloqueantes: fuera del event loop
+            found = await asyncio.to_thread(self._discover_from_sitemap, category_name, incremental)
+            if found is not None:
+                return found
+            print(f"⚠️ [{category_name}] No aparece en sitemaps ni feeds - se recorre el listado")
+        
+        known = await asyncio.to_thread(self.cache.get_category_urls, category_name) if incremental else []
+        urls, ready = await self._discover_listing(contexts, category_name, set(known))
+        if not known:
+            return urls, ready
+        return await asyncio.to_thread(self._merge_incremental, urls, ready, known)
+    
+    async def _discover_listing(self, contexts: ContextRecycler, category_name: str,
+                                known_urls: Set[str]) -> Tuple[List[str], Dict[str, Dict[str, str]]]:
+        """
+        Lee el listado de una categoría desde __NEXT_DATA__ o, si no está completo, con el navegador.
+        
+        Returns:
+            Tupla (URLs en orden del listado, registros ya completos por URL)
+        """
+        listing = None
+        if self.http_fetcher and self.http_fetcher.next_extractor:
+            listing = await asyncio.to_thread(self.http_fetcher.next_extractor.list_category_posts,
+                                              self.CATEGORIES[category_name])
+        
+        if listing is None:
+            return await self._collect_category_urls(contexts, category_name, known_urls), {}
+        
+        urls = [post["URL"] for post in listing]
+        for post in listing:
+            self.listing_cards[post["URL"]] = {"url": post["URL"], "title": post["Titular"], "excerpt": ""}
+        ready = {post["URL"]: post for post in listing
+                 if HttpPostFetcher.is_complete(post) and post["Fecha"] != "N/A"}
+        return urls, ready
+    
+    async def _fetch_posts(self, contexts: ContextRecycler, urls: List[str], ready: Dict[str, Dict[str, str]],
+                           checkpoint: Optional[JobCheckpoint] = None) -> List[Dict[str, str]]:
+        """
+        Completa los registros de `urls` concurrentemente, visitando solo los que no están en `ready`.
+        Con checkpoint, reutiliza los posts ya extraídos y registra cada post nuevo.
+        
+        Returns:
+            Lista de diccionarios con los datos de cada post, en el mismo orden que `urls`
+        """
+        async with aclosing(self._iter_fetched(contexts, urls, ready, checkpoint)) as posts:
+            return [post async for post in posts]
+    
+    async def _iter_fetched(self, contexts: ContextRecycler, urls: List[str], ready: Dict[str, Dict[str, str]],
+                            checkpoint: Optional[JobCheckpoint] = None,
+                            window: Optional[int] = None) -> AsyncIterator[Dict[str, str]]:
+        """
+        Completa los registros de `urls` concurrentemente y los entrega en el mismo orden.
+        A lo sumo `window` posts están en curso o esperando su turno, lo que acota la memoria;
+        el semáforo sigue limitando las navegaciones simultáneas.
+        
+        Args:
+            contexts: Contextos de la ejecución
+            urls: URLs de los posts
+            ready: Registros ya completos por URL
+            checkpoint: Checkpoint del trabajo (ver `_fetch_posts`)
+            window: Posts en vuelo (por defecto, `_stream_window`)
+        
+        Yields:
+            El registro de cada URL, en el orden de `urls`
+        """
+        if checkpoint:
+            completed = await asyncio.to_thread(checkpoint.completed_posts)
+            ready = dict(ready, **{url: completed[url] for url in urls if url in completed})
+        
+        async def extract(url: str) -> Dict[str, str]:
+            if self.progress:
+                self.progress.check_cancelled()
+            post = await self._extract_post_details(contexts, url)
+            if checkpoint and post != self._fallback_post(url):
+                await asyncio.to_thread(checkpoint.add_post, url, post)
+            if self.progress:
+                self.progress.post_done()
+            return post
+        
+        pending = sum(1 for url in urls if url not in ready)
+        if self.progress:
+            self.progress.check_cancelled()
+            self.progress.start_extracting(len(urls), ready=len(urls) - pending)
+        print(f"📋 Procesando {pending} posts individuales...")
+        
+        window = window or self._stream_window(1)
+        remaining = iter(urls)
+        tasks: Deque[asyncio.Future] = deque()
+        
+        def schedule() -> None:
+            while len(tasks) < window:
+                url = next(remaining, None)
+                if url is None:
+                    return
+                tasks.append(asyncio.ensure_future(self._ready(ready[url]) if url in ready else extract(url)))
+        
+        schedule()
+        try:
+            while tasks:
+                post = await tasks.popleft()
+                schedule()
+                yield post
+        finally:
+            # Cancelación, error o iteración abandonada: no dejar navegaciones huérfanas
+            # sobre un contexto que se va a cerrar. Se esperan las tareas canceladas para que
+            # cierren sus páginas antes de que quien llamó cierre los contextos
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    @staticmethod
+    async def _aiter(posts: Iterable[Dict[str, str]]) -> AsyncIterator[Dict[str, str]]:
+        """Recorre registros ya disponibles con la misma interfaz que `_iter_fetched`."""
+        for post in posts:
+            yield post
+    
+    def _stream_window(self, batch_size: int) -> int:
+        """Posts en vuelo para los iteradores: al menos dos por navegación permitida."""
+        return max(batch_size, self.max_navigations * 2)
+    
+    async def scrape_category(self, category_name: str, incremental: bool = False,
+                              checkpoint: Optional[JobCheckpoint] = None,
+                              detail_level: str = "full") -> List[Dict[str, str]]:
+        """
+        Scrapea TODOS los posts de una categoría específica.
+        
+        Args:
+            category_name: Nombre de la categoría (ej: "Pymes")
+            incremental: Si True, solo carga los posts nuevos desde la ejecución anterior (requiere `cache`)
+            checkpoint: Checkpoint para reanudar el trabajo si se interrumpe
+            detail_level: "full" o "listing" (ver XepelinPlaywrightScraper.scrape_category)
+        
+        Returns:
+            Lista de diccionarios con los posts de la categoría, en orden del listado
+        """
+        return [post async for post in self._iter_category(category_name, incremental, checkpoint, detail_level)]
+    
+    def iter_posts(self, category_name: str, incremental: bool = False,
+                   checkpoint: Optional[JobCheckpoint] = None, detail_level: str = "full",
+                   batch_size: int = 50) -> AsyncIterator[Dict[str, str]]:
+        """
+        Como `scrape_category`, pero entrega los posts a medida que se completan, en orden
+        del listado y con a lo sumo `batch_size` posts en vuelo.
+        
+        Args:
+            category_name: Nombre de la categoría (ej: "Pymes")
+            incremental: Ver `scrape_category`
+            checkpoint: Ver `scrape_category`
+            detail_level: Ver `scrape_category`
+            batch_size: Posts en vuelo (al menos dos por navegación permitida)
+        
+        Yields:
+            Cada post con su "Categoría"
+        """
+        return self._iter_category(category_name, incremental, checkpoint, detail_level,
+                                   self._stream_window(batch_size))
+    
+    async def _iter_category(self, category_name: str, incremental: bool, checkpoint: Optional[JobCheckpoint],
+                             detail_level: str, window: Optional[int] = None) -> AsyncIterator[Dict[str, str]]:
+        """Implementación de `scrape_category` e `iter_posts` (`window` posts en vuelo)."""
+        XepelinPlaywrightScraper._check_category(category_name)
+        self._check_incremental(incremental)
+        XepelinPlaywrightScraper._check_detail_level(detail_level)
+        
+        if not self.browser:
+            raise RuntimeError("Browser no inicializado. Usa 'async with AsyncXepelinScraper():'")
+        
+        print(f"\n🎯 Scrapeando categoría: {category_name}")
+        
+        # Contextos aislados por ejecución, reciclados al acumular posts o memoria; al
+        # cerrarlos se libera toda su memoria
+        contexts = self._contexts()
+        count = 0
+        try:
+            urls, ready = await self._discover_category(contexts, category_name, incremental, checkpoint)
+            if detail_level == "listing":
+                posts = self._aiter(await asyncio.to_thread(self._listing_posts, urls, ready))
+            else:
+                posts = self._iter_fetched(contexts, urls, ready, checkpoint, window)
+            # Cerrar el iterador (y sus tareas) antes que los contextos, aunque el consumidor se vaya
+            async with aclosing(posts):
+                async for post in posts:
+                    post["Categoría"] = category_name
+                    count += 1
+                    yield post
+        finally:
+            await contexts.close()
+        
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.set_category_urls, category_name, urls)
+        
+        print(f"✅ {count} posts extraídos de {category_name}")
+    
+    async def scrape_all_categories(self, incremental: bool = False,
+                                    checkpoint: Optional[JobCheckpoint] = None,
+                                    detail_level: str = "full") -> Dict[str, List[Dict[str, str]]]:
+        """
+        Scrapea TODOS los posts de TODAS las categorías de forma concurrente.
+        
+        Los listados se recorren en paralelo; luego cada post único se visita una sola
+        vez y su registro se reparte a todas las categorías donde aparece.
+        
+        Args:
+            incremental: Si True, solo carga los posts nuevos de cada categoría (requiere `cache`)
+            checkpoint: Checkpoint para reanudar el trabajo si se interrumpe
+            detail_level: "full" o "listing" (ver XepelinPlaywrightScraper.scrape_category)
+        
+        Returns:
+            Diccionario con categorías como keys y listas de posts como values
+        """
+        if not self.browser:
+            raise RuntimeError("Browser no inicializado. Usa 'async with AsyncXepelinScraper():'")
+        self._check_incremental(incremental)
+        XepelinPlaywrightScraper._check_detail_level(detail_level)
+        
+        print("\n" + "="*70)
+        print("🚀 INICIANDO SCRAPING COMPLETO DE TODAS LAS CATEGORÍAS (async)")
+        print("="*70)
+        
+        contexts = self._contexts()
+        try:
+            discovered, ready = await self._discover_all(contexts, incremental, checkpoint)
+            
+            unique_urls = XepelinPlaywrightScraper._dedupe_urls(discovered)
+            total_listed = sum(len(urls) for urls in discovered.values())
+            print(f"\n🔗 {total_listed} enlaces en listados, {len(unique_urls)} posts únicos")
+            if detail_level == "listing":
+                posts = await asyncio.to_thread(self._listing_posts, unique_urls, ready)
+            else:
+                posts = await self._fetch_posts(contexts, unique_urls, ready, checkpoint)
+        finally:
+            await contexts.close()
+        
+        results = XepelinPlaywrightScraper._fan_out(discovered, dict(zip(unique_urls, posts)))
+        await self._save_category_urls(discovered)
+        XepelinPlaywrightScraper._print_summary({category_name: len(posts)
+                                                 for category_name, posts in results.items()})
+        return results
+    
+    async def iter_all_posts(self, incremental: bool = False, checkpoint: Optional[JobCheckpoint] = None,
+                             detail_level: str = "full", batch_size: int = 50) -> AsyncIterator[Dict[str, str]]:
+        """
+        Como `scrape_all_categories`, pero entrega los registros a medida que se completan
+        (ver XepelinPlaywrightScraper.iter_all_posts para el orden dentro de cada categoría).
+        
+        Args:
+            incremental: Ver `scrape_all_categories`
+            checkpoint: Ver `scrape_all_categories`
+            detail_level: Ver `scrape_all_categories`
+            batch_size: Posts únicos en vuelo (al menos dos por navegación permitida)
+        
+        Yields:
+            Cada post con su "Categoría"
+        """
+        if not self.browser:
+            raise RuntimeError("Browser no inicializado. Usa 'async with AsyncXepelinScraper():'")
+        self._check_incremental(incremental)
+        XepelinPlaywrightScraper._check_detail_level(detail_level)
+        
+        print("\n" + "="*70)
+        print("🚀 INICIANDO SCRAPING COMPLETO DE TODAS LAS CATEGORÍAS (async, streaming)")
+        print("="*70)
+        
+        contexts = self._contexts()
+        counts = {}
+        try:
+            discovered, ready = await self._discover_all(contexts, incremental, checkpoint)
+            unique_urls = XepelinPlaywrightScraper._dedupe_urls(discovered)
+            print(f"\n🔗 {sum(len(urls) for urls in discovered.values())} enlaces en listados, "
+                  f"{len(unique_urls)} posts únicos")
+            if detail_level == "listing":
+                posts = self._aiter(await asyncio.to_thread(self._listing_posts, unique_urls, ready))
+            else:
+                posts = self._iter_fetched(contexts, unique_urls, ready, checkpoint, self._stream_window(batch_size))
+            
+            categories_of = XepelinPlaywrightScraper._categories_of(discovered)
+            counts = {category_name: 0 for category_name in discovered}
+            index = 0
+            async with aclosing(posts):
+                async for post in posts:
+                    for category_name in categories_of[unique_urls[index]]:
+                        counts[category_name] += 1
+                        yield dict(post, **{"Categoría": category_name})
+                    index += 1
+        finally:
+            await contexts.close()
+        
+        await self._save_category_urls(discovered)
+        XepelinPlaywrightScraper._print_summary(counts)
+    
+    async def _discover_all(self, contexts: ContextRecycler, incremental: bool,
+                            checkpoint: Optional[JobCheckpoint]) -> Tuple[Dict[str, List[str]], Dict[str, Dict[str, str]]]:
+        """
+        Descubre las URLs de todas las categorías en paralelo.
+        
+        Returns:
+            Tupla (URLs por categoría, registros ya completos por URL); una categoría que
+            falla queda sin URLs
+        """
+        category_names = list(self.CATEGORIES.keys())
+        outcomes = await asyncio.gather(
+            *(self._discover_category(contexts, name, incremental, checkpoint) for name in category_names),
+            return_exceptions=True
+        )
+        
+        discovered = {}
+        ready = {}
+        for category_name, outcome in zip(category_names, outcomes):
+            if isinstance(outcome, (JobCancelled, asyncio.CancelledError)):
+                # Una cancelación no es un fallo de la categoría: detiene todo el trabajo
+                raise outcome
+            if isinstance(outcome, BaseException):
+                print(f"❌ Error scrapeando {category_name}: {outcome}")
+                discovered[category_name] = []
+            else:
+                discovered[category_name], category_ready = outcome
+                ready.update(category_ready)
+        return discovered, ready
+    
+    async def _save_category_urls(self, discovered: Dict[str, List[str]]) -> None:
+        """Guarda en la caché el listado de cada categoría descubierta (para el modo incremental)."""
+        if self.cache is not None:
+            for category_name, urls in discovered.items():
+                if urls:
+                    await asyncio.to_thread(self.cache.set_category_urls, category_name, urls)
+
+async def test_async_scraper():
+    """Función de prueba para el scraper asíncrono."""
+    print("🧪 Probando Async Playwright Scraper...\n")
+    
+    async with AsyncXepelinScraper(headless=True) as scraper:
+        posts = await scraper.scrape_category("Noticias")
+        print(f"\n✅ {len(posts)} posts encontrados en Noticias")
+        for i, post in enumerate(posts[:3], 1):
+            print(f"\n{i}. {post['Titular']}")
+            print(f"   URL: {post['URL']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_async_scraper())
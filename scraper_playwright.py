@@ -4,13 +4,192 @@ Scraper con Playwright para obtener TODOS los posts del blog de Xepelin.
 Requiere dependencias del sistema instaladas: sudo playwright install-deps
 """
 import time
+import queue
+import uuid
+import threading
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
-from playwright.sync_api import sync_playwright, Page, Browser, TimeoutError as PlaywrightTimeout
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Dict, Optional, Set, Tuple
+from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext, TimeoutError as PlaywrightTimeout
 
+from http_fetcher import HttpPostFetcher
+from nextjs_extractor import NextDataExtractor
+from post_cache import PostCache
+from checkpoint import JobCheckpoint
+from progress import JobProgress, JobCancelled
+from html_extractor import HtmlExtractor, get_extractor
+from sitemap_discovery import SitemapDiscovery
+from memory_governor import MemoryGovernor
+from metrics import FALLBACK_POSTS, FAILURES, POSTS_EXTRACTED, timed
 
-class XepelinPlaywrightScraper:
+
+class ListingHarvest:
+    """
+    Tarjetas de posts recolectadas dentro del navegador a medida que crece el listado.
+    Cada llamada a HARVEST_LINKS_JS recorre todos los enlaces (los nuevos pueden insertarse
+    antes de otros ya vistos, ej: del menú o el pie) pero devuelve solo las URLs que todavía
+    no cruzaron con su título; la página recuerda cuáles ya envió bajo `key`.
+    """
+    
+    def __init__(self):
+        self.key = uuid.uuid4().hex  # Identifica esta recolección en la página
+        self.seen = 0  # Enlaces a posts en el DOM en la última recolección
+        self.cards: Dict[str, Dict[str, str]] = {}  # URL -> {"url", "title", "excerpt"}, en orden
+    
+    def add(self, result: Dict) -> List[str]:
+        """
+        Incorpora el resultado de HARVEST_LINKS_JS.
+        
+        Args:
+            result: {"total": enlaces en el DOM, "cards": tarjetas nuevas}
+        
+        Returns:
+            URLs que no se habían visto antes
+        """
+        self.seen = result["total"]
+        new_urls = []
+        for card in result["cards"]:
+            known = self.cards.get(card["url"])
+            if known is None:
+                self.cards[card["url"]] = card
+                new_urls.append(card["url"])
+            else:
+                known["title"] = known["title"] or card["title"]
+                known["excerpt"] = known["excerpt"] or card["excerpt"]
+        return new_urls
+
+
+class DiscoveryMixin:
+    """
+    Descubrimiento sin navegador compartido por XepelinPlaywrightScraper y AsyncXepelinScraper.
+    Usa los atributos `CATEGORIES`, `cache`, `progress`, `sitemap` y `listing_cards` de la clase
+    que lo hereda.
+    """
+    
+    def _check_incremental(self, incremental: bool) -> None:
+        """Valida que el modo incremental tenga una caché con la ejecución anterior."""
+        if incremental and self.cache is None:
+            raise ValueError("El modo incremental requiere una caché (parámetro 'cache')")
+    
+    def _merge_incremental(self, urls: List[str], ready: Dict[str, Dict[str, str]],
+                           known: List[str]) -> Tuple[List[str], Dict[str, Dict[str, str]]]:
+        """
+        Combina los posts nuevos del listado con el listado de la ejecución anterior.
+        Los posts conocidos usan su registro guardado sin importar el TTL.
+        
+        Args:
+            urls: URLs cargadas en esta ejecución (nuevas primero)
+            ready: Registros ya completos por URL
+            known: URLs de la ejecución anterior
+        
+        Returns:
+            Tupla (URLs combinadas, registros ya completos por URL)
+        """
+        known_set = set(known)
+        new_urls = [url for url in urls if url not in known_set]
+        merged = list(dict.fromkeys(urls + known))
+        
+        ready = dict(ready)
+        for url in merged:
+            if url in known_set and url not in ready:
+                record = self.cache.get_record(url)
+                if record is not None:
+                    ready[url] = record
+        
+        print(f"🆕 {len(new_urls)} posts nuevos, {len(known)} de la ejecución anterior")
+        return merged, ready
+    
+    def _discover_from_sitemap(self, category_name: str,
+                               incremental: bool) -> Optional[Tuple[List[str], Dict[str, Dict[str, str]]]]:
+        """
+        Obtiene el listado de una categoría desde sitemaps y feeds.
+        En modo incremental, `lastmod` decide qué posts re-extraer: los que están en la caché
+        y no cambiaron desde que se guardaron se reutilizan sin importar el TTL.
+        
+        Args:
+            category_name: Nombre de la categoría (ej: "Pymes")
+            incremental: Si True, reutiliza los posts guardados que no cambiaron
+        
+        Returns:
+            Tupla (URLs de más nuevo a más antiguo, registros ya completos por URL),
+            o None si la categoría no aparece en sitemaps ni feeds
+        """
+        entries = self.sitemap.category_entries(self.CATEGORIES[category_name])
+        if not entries:
+            return None
+        
+        urls = [entry.url for entry in entries]
+        for entry in entries:
+            if entry.title:
+                self.listing_cards.setdefault(entry.url, {"url": entry.url, "title": entry.title, "excerpt": ""})
+        print(f"🗺️ {len(urls)} posts de {category_name} obtenidos desde sitemaps/feeds")
+        
+        ready = {}
+        if incremental:
+            for entry in entries:
+                cached = self.cache.get(entry.url)
+                # Sin lastmod no hay forma de saber si cambió: se trata como sin cambios
+                if cached and (entry.lastmod is None or entry.lastmod <= cached["fetched_at"]):
+                    ready[entry.url] = cached["record"]
+            print(f"🆕 {len(urls) - len(ready)} posts nuevos o modificados según lastmod, "
+                  f"{len(ready)} sin cambios")
+        return urls, ready
+    
+    @staticmethod
+    def _fallback_post(url: str) -> Dict[str, str]:
+        """
+        Construye un registro básico a partir de la URL cuando no se pudo extraer el post.
+        
+        Args:
+            url: URL del post
+        
+        Returns:
+            Diccionario con los datos mínimos del post
+        """
+        return {
+            "Titular": url.split('/')[-1].replace('-', ' ').title(),
+            "Autor": "N/A",
+            "Tiempo de lectura": "N/A",
+            "Fecha": "N/A",
+            "URL": url
+        }
+    
+    def _listing_posts(self, urls: List[str], ready: Dict[str, Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Arma los registros sin visitar los posts: usa los ya completos (listado de Next.js
+        o caché vigente) y, para el resto, el título de la tarjeta del listado.
+        Estos registros parciales no se guardan en la caché ni en el checkpoint, así que
+        una ejecución "full" posterior los completa.
+        
+        Args:
+            urls: URLs de los posts
+            ready: Registros ya completos por URL
+        
+        Returns:
+            Lista de diccionarios con los datos de cada post, en el mismo orden que `urls`
+        """
+        if self.progress:
+            self.progress.start_extracting(len(urls), ready=len(urls))
+        
+        posts = []
+        from_cards = 0
+        for url in urls:
+            post = ready.get(url) or (self.cache.get_fresh(url) if self.cache is not None else None)
+            if post is None:
+                post = self._fallback_post(url)
+                card = self.listing_cards.get(url)
+                if card and card["title"]:
+                    post["Titular"] = card["title"]
+                from_cards += 1
+            posts.append(post)
+        
+        POSTS_EXTRACTED.inc(from_cards, source="listing")
+        print(f"📋 {len(posts)} posts desde el listado ({from_cards} solo con los datos de la tarjeta)")
+        return posts
+
+
+class XepelinPlaywrightScraper(DiscoveryMixin):
     """
     Scraper que usa Playwright para manejar carga dinámica del blog.
     Capaz de obtener TODOS los posts, incluyendo los cargados con el botón "Cargar más".
@@ -27,16 +206,151 @@ class XepelinPlaywrightScraper:
         "Casos de éxito": "empresarios-exitosos"
     }
     
-    def __init__(self, headless: bool = True, timeout: int = 60000):
+    # Flags de Chromium para reducir el consumo de memoria
+    BROWSER_ARGS = [
+        '--disable-dev-shm-usage',  # Evita problemas de memoria compartida
+        '--disable-gpu',  # Desactiva GPU (no necesaria para scraping)
+        '--no-sandbox',  # Necesario en algunos entornos containerizados
+        '--disable-software-rasterizer',
+        '--disable-extensions',
+        '--disable-background-networking',
+        '--disable-background-timer-throttling',
+        '--disable-backgrounding-occluded-windows',
+        '--disable-breakpad',
+        '--disable-component-extensions-with-background-pages',
+        '--disable-features=TranslateUI,BlinkGenPropertyTrees',
+        '--disable-ipc-flooding-protection',
+        '--disable-renderer-backgrounding',
+        '--enable-features=NetworkService,NetworkServiceInProcess',
+        '--force-color-profile=srgb',
+        '--hide-scrollbars',
+        '--metrics-recording-only',
+        '--mute-audio',
+        '--no-first-run',
+        '--disable-blink-features=AutomationControlled'
+    ]
+    
+    # Tipos de recursos que no se necesitan para extraer datos
+    BLOCKED_RESOURCES = ["image", "stylesheet", "font", "media"]
+    
+    # Selectores del listado
+    POST_LINK_SELECTOR = 'a[href*="/blog/"][href*="-"]'
+    LOAD_MORE_SELECTOR = 'button:has-text("Cargar más")'
+    
+    # Parser de HTML ("lxml" o "bs4", ver html_extractor); se elige con HTML_PARSER
+    EXTRACTOR: HtmlExtractor = get_extractor()
+    
+    # Condición evaluada en el navegador: hay más enlaces a posts, o (si se pide) ya no queda
+    # un botón "Cargar más" visible
+    MORE_POSTS_JS = """([selector, previous, endOnButtonGone]) => {
+        if (document.querySelectorAll(selector).length > previous) return true;
+        if (!endOnButtonGone) return false;
+        return ![...document.querySelectorAll('button')].some(
+            b => b.textContent.includes('Cargar más') && b.offsetParent !== null);
+    }"""
+    
+    # Recolección en el navegador de los enlaces a posts: devuelve solo URLs sin duplicados con
+    # el título y extracto de su tarjeta, no el HTML completo del listado. Las URLs que ya se
+    # enviaron con título (guardadas en la página bajo `key`) no se vuelven a enviar.
+    # Los href relativos se resuelven contra la página; los que no son http ni "/" se descartan.
+    HARVEST_LINKS_JS = """(els, key) => {
+        const text = (root, selector) => {
+            const el = root && root.querySelector(selector);
+            return el ? el.textContent.trim() : '';
+        };
+        const harvested = window.__listingHarvest = window.__listingHarvest || {};
+        const sent = harvested[key] = harvested[key] || new Set();
+        const cards = new Map();
+        for (const e of els) {
+            const raw = e.getAttribute('href') || '';
+            if (!raw.startsWith('http') && !raw.startsWith('/')) continue;
+            const url = raw.startsWith('http') ? raw : e.href;
+            if (sent.has(url)) continue;
+            const box = e.closest('article, li') || e;
+            const card = cards.get(url) || {url: url, title: '', excerpt: ''};
+            card.title = card.title || text(e, 'h1, h2, h3, h4') || text(box, 'h1, h2, h3, h4');
+            card.excerpt = card.excerpt || text(e, 'p') || text(box, 'p');
+            cards.set(url, card);
+        }
+        for (const card of cards.values()) {
+            if (card.title) sent.add(card.url);
+        }
+        return {total: els.length, cards: [...cards.values()]};
+    }"""
+    
+    # Límites del timeout adaptativo de "Cargar más" (milisegundos)
+    LOAD_MORE_MIN_WAIT_MS = 1500
+    LOAD_MORE_MAX_WAIT_MS = 10000
+    
+    # Límite de seguridad: clics seguidos sin posts nuevos ni señal de fin antes de abandonar la carga
+    # (el fin normal lo indican el botón oculto tras la última respuesta o la paginación del JSON)
+    LOAD_MORE_MAX_MISSES = 3
+    
+    # Backends para extraer el detalle de cada post
+    BACKENDS = ("browser", "http", "nextjs")
+    
+    # Cómo se descubren las URLs: recorriendo el listado o desde sitemap.xml y feeds RSS/Atom
+    DISCOVERY_BACKENDS = ("listing", "sitemap")
+    
+    # "full" visita cada post; "listing" arma los registros desde las tarjetas del listado
+    DETAIL_LEVELS = ("listing", "full")
+    
+    def __init__(self, headless: bool = True, timeout: int = 60000,
+                 concurrency: int = 1, recycle_every: int = 50,
+                 backend: str = "browser", http_workers: int = 8,
+                 cache: Optional[PostCache] = None, progress: Optional[JobProgress] = None,
+                 discovery: str = "listing", governor: Optional[MemoryGovernor] = None):
         """
         Inicializa el scraper con Playwright.
         
         Args:
             headless: Si True, ejecuta el navegador sin GUI
             timeout: Timeout en milisegundos para operaciones de página
+            concurrency: Número de workers que extraen detalles de posts en paralelo
+            recycle_every: Cada cuántos posts un worker recicla su página/contexto para liberar memoria
+            backend: "browser" visita cada post con Playwright; "http" descarga el HTML
+                     y usa Playwright solo para los posts cuyo HTML estático está incompleto;
+                     "nextjs" además lee listados y posts desde el JSON de Next.js
+            http_workers: Requests HTTP simultáneos con el backend "http"
+            cache: Caché persistente de posts; los posts vigentes no se vuelven a extraer y,
+                   con los backends HTTP, los vencidos se revalidan con requests condicionales
+            progress: Progreso del trabajo; recibe fases y conteos, y si se cancela el
+                      scraping se detiene con JobCancelled
+            discovery: "listing" recorre el listado con el navegador; "sitemap" lee las URLs
+                       desde sitemap.xml y feeds (con lastmod para el modo incremental) y solo
+                       recorre el listado de las categorías que no aparecen ahí
+            governor: Controlador de memoria (ver memory_governor.py); si se indica,
+                      `concurrency` pasa a ser el máximo de workers y el controlador decide
+                      cuántos navegan a la vez y cuándo reciclar sus contextos
         """
+        if concurrency < 1:
+            raise ValueError("concurrency debe ser >= 1")
+        if recycle_every < 1:
+            raise ValueError("recycle_every debe ser >= 1")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend '{backend}' no válido. Backends disponibles: {list(self.BACKENDS)}")
+        self._check_discovery(discovery)
+        
         self.headless = headless
         self.timeout = timeout
+        self.concurrency = concurrency
+        self.recycle_every = recycle_every
+        self.backend = backend
+        self.http_workers = http_workers
+        self.cache = cache
+        self.progress = progress
+        self.governor = governor
+        self.http_fetcher: Optional[HttpPostFetcher] = None
+        if backend in ("http", "nextjs"):
+            self.http_fetcher = HttpPostFetcher(parse=self._parse_post_html, pool_size=http_workers,
+                                                use_next_data=(backend == "nextjs"), base_url=self.BASE_URL,
+                                                cache=cache)
+        self.sitemap: Optional[SitemapDiscovery] = None
+        if discovery == "sitemap":
+            self.sitemap = SitemapDiscovery(self.BASE_URL, self.CATEGORIES,
+                                            session=self.http_fetcher.session if self.http_fetcher else None)
+        # Título y extracto de la tarjeta de cada post visto en los listados, por URL
+        self.listing_cards: Dict[str, Dict[str, str]] = {}
         self.browser: Optional[Browser] = None
         self.playwright = None
     
@@ -48,13 +362,6 @@ class XepelinPlaywrightScraper:
         browsers_path = os.environ.get('PLAYWRIGHT_BROWSERS_PATH', '/opt/render/.cache/ms-playwright')
         if os.path.exists(browsers_path):
             print(f"✅ Playwright browsers path exists: {browsers_path}")
-            # Listar contenido para debug
-            try:
-                import subprocess
-                result = subprocess.run(['ls', '-la', browsers_path], capture_output=True, text=True)
-                print(f"Contents:\n{result.stdout}")
-            except Exception as e:
-                print(f"Could not list directory: {e}")
         else:
             print(f"⚠️  WARNING: Playwright browsers path does not exist: {browsers_path}")
         
@@ -62,31 +369,7 @@ class XepelinPlaywrightScraper:
         print("🎭 Launching Chromium browser with memory optimizations...")
         
         # Lanzar navegador con flags de optimización de memoria
-        self.browser = self.playwright.chromium.launch(
-            headless=self.headless,
-            args=[
-                '--disable-dev-shm-usage',  # Evita problemas de memoria compartida
-                '--disable-gpu',  # Desactiva GPU (no necesaria para scraping)
-                '--no-sandbox',  # Necesario en algunos entornos containerizados
-                '--disable-software-rasterizer',
-                '--disable-extensions',
-                '--disable-background-networking',
-                '--disable-background-timer-throttling',
-                '--disable-backgrounding-occluded-windows',
-                '--disable-breakpad',
-                '--disable-component-extensions-with-background-pages',
-                '--disable-features=TranslateUI,BlinkGenPropertyTrees',
-                '--disable-ipc-flooding-protection',
-                '--disable-renderer-backgrounding',
-                '--enable-features=NetworkService,NetworkServiceInProcess',
-                '--force-color-profile=srgb',
-                '--hide-scrollbars',
-                '--metrics-recording-only',
-                '--mute-audio',
-                '--no-first-run',
-                '--disable-blink-features=AutomationControlled'
-            ]
-        )
+        self.browser = self._launch_browser(self.playwright)
         print("✅ Chromium browser launched successfully")
         return self
     
@@ -96,86 +379,271 @@ class XepelinPlaywrightScraper:
             self.browser.close()
         if self.playwright:
             self.playwright.stop()
+        if self.http_fetcher:
+            self.http_fetcher.close()
+    
+    def _launch_browser(self, playwright) -> Browser:
+        """
+        Lanza Chromium con los flags de optimización de memoria.
+        
+        Args:
+            playwright: Instancia de Playwright (una por thread)
+        
+        Returns:
+            Navegador lanzado
+        """
+        return playwright.chromium.launch(headless=self.headless, args=self.BROWSER_ARGS)
+    
+    def _new_page(self, target) -> Page:
+        """
+        Crea una página con timeout por defecto y bloqueo de recursos innecesarios.
+        
+        Args:
+            target: Browser o BrowserContext donde crear la página
+        
+        Returns:
+            Página de Playwright lista para navegar
+        """
+        page = target.new_page()
+        page.set_default_timeout(self.timeout)
+        
+        # Bloquear recursos innecesarios para ahorrar memoria y ancho de banda
+        page.route("**/*", lambda route: route.abort() if route.request.resource_type in self.BLOCKED_RESOURCES else route.continue_())
+        return page
     
-    def _load_all_posts(self, page: Page) -> None:
+    def _load_all_posts(self, page: Page, stop_urls: Optional[Set[str]] = None,
+                        harvest: Optional[ListingHarvest] = None) -> None:
         """
         Hace scroll y carga todos los posts clickeando "Cargar más" hasta que no haya más.
         
+        En vez de pausas fijas espera señales reales: que crezca la cantidad de enlaces
+        a posts, la respuesta de la página siguiente y el estado del botón. La carga termina
+        apenas el sitio indica que no hay más: el botón ya no está visible después de la
+        última respuesta, o el JSON de esa respuesta informa que no hay otra página.
+        El timeout de cada espera se adapta a lo que tardaron las cargas anteriores; los
+        clics sin ninguna señal solo cuentan hasta LOAD_MORE_MAX_MISSES, como límite de
+        seguridad. Los enlaces se recolectan en cada iteración.
+        
         Args:
             page: Página de Playwright
+            stop_urls: URLs ya conocidas; como el listado va de más nuevo a más antiguo,
+                       la carga se detiene apenas aparece alguna de ellas
+            harvest: Recolección en curso de las tarjetas del listado
         """
+        harvest = harvest if harvest is not None else ListingHarvest()
         max_clicks = 100  # Límite de seguridad
         clicks = 0
-        no_change_count = 0
+        misses = 0  # Clics seguidos sin posts nuevos ni señal de fin
+        load_timeout = self.LOAD_MORE_MAX_WAIT_MS / 2
+        scroll_loads_posts = None  # Se descubre en la primera iteración
         
         print("🔄 Cargando posts dinámicamente...")
         
         while clicks < max_clicks:
-            try:
-                # Contar posts antes del scroll
-                posts_before = page.locator('a[href*="/blog/"][href*="-"]').count()
-                
-                # Hacer scroll hasta el final
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                time.sleep(5)
-                
-                # Contar posts después del scroll
-                posts_after_scroll = page.locator('a[href*="/blog/"][href*="-"]').count()
-                
-                # Si el scroll cargó más posts, continuar
-                if posts_after_scroll > posts_before:
-                    print(f"   ✅ +{posts_after_scroll - posts_before} posts cargados (total: {posts_after_scroll})")
-                    no_change_count = 0
-                    clicks += 1
-                    continue
-                
-                # Buscar el botón "Cargar más"
-                load_more_button = page.locator('button:has-text("Cargar más")').first
-                
-                if load_more_button.count() > 0:
-                    try:
-                        if load_more_button.is_visible(timeout=2000):
-                            load_more_button.scroll_into_view_if_needed()
-                            time.sleep(1)
-                            load_more_button.click()
-                            time.sleep(5)
-                            
-                            # Verificar si se cargaron posts nuevos
-                            posts_after_click = page.locator('a[href*="/blog/"][href*="-"]').count()
-                            new_posts = posts_after_click - posts_after_scroll
-                            
-                            if new_posts > 0:
-                                print(f"   ✅ Botón clickeado: +{new_posts} posts (total: {posts_after_click})")
-                                no_change_count = 0
-                                clicks += 1
-                            else:
-                                no_change_count += 1
-                        else:
-                            no_change_count += 1
-                    except Exception:
-                        no_change_count += 1
-                else:
-                    no_change_count += 1
+            with timed("load_more_iteration"):
+                try:
+                    new_urls = self._harvest_links(page, harvest)
+                    if stop_urls and any(url in stop_urls for url in new_urls):
+                        print("   ✅ Se alcanzaron posts de la ejecución anterior - carga incremental completa")
+                        break
+                    
+                    posts_before = harvest.seen
+                    
+                    # Probar si el scroll dispara carga infinita (solo mientras funcione)
+                    if scroll_loads_posts is not False:
+                        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                        grew, elapsed = self._wait_for_more_posts(page, posts_before, min(load_timeout, 1500))
+                        if grew:
+                            scroll_loads_posts = True
+                            misses = 0
+                            load_timeout = self._adapt_load_timeout(load_timeout, elapsed)
+                            posts_after = page.locator(self.POST_LINK_SELECTOR).count()
+                            print(f"   ✅ +{posts_after - posts_before} posts cargados (total: {posts_after})")
+                            clicks += 1
+                            continue
+                        scroll_loads_posts = False
+                    
+                    # La página inicial (o la última respuesta) ya llegó: sin botón no hay más posts
+                    load_more_button = page.locator(self.LOAD_MORE_SELECTOR).first
+                    if not self._is_visible(load_more_button):
+                        print(f"   ✅ Carga completa - Total: {posts_before} posts encontrados")
+                        break
+                    
+                    grew, elapsed, finished = self._click_load_more(page, load_more_button, posts_before,
+                                                                    load_timeout)
+                    if grew:
+                        misses = 0
+                        load_timeout = self._adapt_load_timeout(load_timeout, elapsed)
+                        posts_after = page.locator(self.POST_LINK_SELECTOR).count()
+                        print(f"   ✅ Botón clickeado: +{posts_after - posts_before} posts (total: {posts_after})")
+                        clicks += 1
+                    if finished:
+                        print("   ✅ Carga completa - el sitio no tiene más posts")
+                        break
+                    if not grew:
+                        # Sin posts nuevos ni señal de fin: reintentar con la espera máxima
+                        misses += 1
+                        load_timeout = self.LOAD_MORE_MAX_WAIT_MS
+                        if misses >= self.LOAD_MORE_MAX_MISSES:
+                            print(f"   ⚠️ Sin respuesta del botón - Total: {posts_before} posts encontrados")
+                            break
                 
-                # Si no hubo cambios en 3 iteraciones, terminar
-                if no_change_count >= 3:
-                    print(f"   ✅ Carga completa - Total: {posts_after_scroll} posts encontrados")
+                except PlaywrightTimeout:
+                    # No se encontró el botón o no es visible
+                    print("✅ No hay más posts para cargar (timeout)")
+                    break
+                except Exception as e:
+                    FAILURES.inc(stage="load_more")
+                    print(f"⚠️ Error al cargar más posts: {e}")
                     break
-                    
-            except PlaywrightTimeout:
-                # No se encontró el botón o no es visible
-                print("✅ No hay más posts para cargar (timeout)")
-                break
-            except Exception as e:
-                print(f"⚠️ Error al cargar más posts: {e}")
-                break
         
         if clicks >= max_clicks:
             print(f"⚠️ Se alcanzó el límite de {max_clicks} clics (puedes aumentarlo en el código si necesitas más)")
+    
+    @staticmethod
+    def _is_visible(locator) -> bool:
+        """El botón existe y está visible."""
+        return locator.count() > 0 and locator.is_visible()
+    
+    def _click_load_more(self, page: Page, button, previous_count: int, timeout_ms: float) -> Tuple[bool, float, bool]:
+        """
+        Clickea "Cargar más" y espera posts nuevos o el fin del listado.
+        
+        El botón puede ocultarse mientras se pide la página siguiente, así que su ausencia
+        solo cuenta como fin después de recibir esa respuesta.
+        
+        Args:
+            page: Página de Playwright con el listado
+            button: Locator del botón "Cargar más"
+            previous_count: Cantidad de enlaces a posts antes del clic
+            timeout_ms: Tiempo máximo de cada espera en milisegundos
+        
+        Returns:
+            Tupla (hubo posts nuevos, milisegundos esperados, el sitio indicó que no hay más)
+        """
+        listing_path = urlparse(page.url).path
+        responses = []
         
-        # Hacer un último scroll para asegurar que todo esté cargado
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        time.sleep(2)
+        def on_response(response) -> None:
+            if self._is_page_response(response, listing_path):
+                responses.append(response)
+        
+        page.on("response", on_response)
+        try:
+            button.click()
+            signal, elapsed = self._wait_for_more_posts(page, previous_count, timeout_ms, end_on_button_gone=True)
+            grew = page.locator(self.POST_LINK_SELECTOR).count() > previous_count
+            if signal and not grew and not responses:
+                # Botón oculto antes de la respuesta: esperarla y volver a mirar
+                try:
+                    page.wait_for_event("response", lambda r: self._is_page_response(r, listing_path),
+                                        timeout=timeout_ms)
+                except PlaywrightTimeout:
+                    pass  # Se ocultó sin pedir otra página: no hay más
+                else:
+                    _, more = self._wait_for_more_posts(page, previous_count, timeout_ms, end_on_button_gone=True)
+                    elapsed += more
+                grew = page.locator(self.POST_LINK_SELECTOR).count() > previous_count
+        finally:
+            page.remove_listener("response", on_response)
+        
+        has_more = self._has_more([self._response_json(response) for response in responses])
+        button_gone = not self._is_visible(page.locator(self.LOAD_MORE_SELECTOR).first)
+        return grew, elapsed, has_more is False or (button_gone and (grew or signal))
+    
+    @staticmethod
+    def _is_page_response(response, listing_path: str) -> bool:
+        """
+        Respuesta de una página del listado pedida por "Cargar más".
+        
+        Args:
+            response: Respuesta de Playwright
+            listing_path: Ruta del listado (ej: "/blog/pymes")
+        """
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return False
+        path = urlparse(response.url).path
+        if "/_next/data/" in path:
+            # Next.js también precarga los posts enlazados: solo cuenta el JSON del listado
+            return path.endswith(listing_path.rstrip('/') + ".json")
+        return True
+    
+    @staticmethod
+    def _response_json(response):
+        """JSON de una respuesta, o None si no lo es."""
+        try:
+            return response.json()
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _has_more(payloads: List) -> Optional[bool]:
+        """
+        Paginación informada por las respuestas de "Cargar más" (la última que la informe).
+        
+        Returns:
+            True o False, o None si ninguna respuesta la informa
+        """
+        for payload in reversed(payloads):
+            has_more = NextDataExtractor.has_more(payload) if payload is not None else None
+            if has_more is not None:
+                return has_more
+        return None
+    
+    def _harvest_links(self, page: Page, harvest: ListingHarvest) -> List[str]:
+        """
+        Recolecta en el navegador los enlaces a posts aún no recolectados, en cualquier posición del listado.
+        
+        Args:
+            page: Página de Playwright con el listado
+            harvest: Recolección en curso
+        
+        Returns:
+            URLs nuevas, en orden del listado
+        """
+        with timed("listing_harvest"):
+            result = page.eval_on_selector_all(self.POST_LINK_SELECTOR, self.HARVEST_LINKS_JS, harvest.key)
+        return harvest.add(result)
+    
+    def _wait_for_more_posts(self, page: Page, previous_count: int, timeout_ms: float,
+                             end_on_button_gone: bool = False) -> tuple:
+        """
+        Espera a que aumente la cantidad de enlaces a posts.
+        
+        Args:
+            page: Página de Playwright
+            previous_count: Cantidad de enlaces antes de la acción
+            timeout_ms: Tiempo máximo de espera en milisegundos
+            end_on_button_gone: Si True, que ya no haya un "Cargar más" visible también termina la espera
+        
+        Returns:
+            Tupla (hubo señal, milisegundos esperados)
+        """
+        started = time.monotonic()
+        try:
+            page.wait_for_function(
+                self.MORE_POSTS_JS,
+                arg=[self.POST_LINK_SELECTOR, previous_count, end_on_button_gone],
+                timeout=timeout_ms
+            )
+            return True, (time.monotonic() - started) * 1000
+        except PlaywrightTimeout:
+            return False, timeout_ms
+    
+    @classmethod
+    def _adapt_load_timeout(cls, current_ms: float, elapsed_ms: float) -> float:
+        """
+        Ajusta el timeout de carga según la última latencia observada.
+        
+        Args:
+            current_ms: Timeout actual en milisegundos
+            elapsed_ms: Lo que tardó la última carga exitosa
+        
+        Returns:
+            Nuevo timeout: ~3x la latencia suavizada, acotado entre el mínimo y el máximo
+        """
+        smoothed = 0.7 * (current_ms / 3) + 0.3 * elapsed_ms
+        return max(cls.LOAD_MORE_MIN_WAIT_MS, min(cls.LOAD_MORE_MAX_WAIT_MS, smoothed * 3))
     
     def _extract_post_details(self, page: Page, url: str) -> Dict[str, str]:
         """
@@ -184,121 +652,88 @@ class XepelinPlaywrightScraper:
         Args:
             page: Página de Playwright
             url: URL del post
-            
+        
         Returns:
             Diccionario con los datos del post
         """
         try:
             # Navegar al post
-            page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            page.wait_for_timeout(1000)  # Reducido de 2000 a 1000ms para mayor velocidad
-            
-            html = page.content()
-            soup = BeautifulSoup(html, 'lxml')
-            
-            # Extraer título
-            titulo = "Sin título"
-            for tag in ['h1', 'h2']:
-                title_tag = soup.find(tag)
-                if title_tag:
-                    titulo = title_tag.get_text(strip=True)
-                    break
-            
-            # Extraer tiempo de lectura (debajo del título)
-            # Usar el selector CSS específico: div con clase Text_body__snVk8
-            tiempo_lectura = "N/A"
-            try:
-                tiempo_div = soup.find('div', class_='Text_body__snVk8')
-                if tiempo_div:
-                    tiempo_lectura = tiempo_div.get_text(strip=True)
-                    # Limpiar espacios: "7min de lectura" -> "7 min de lectura"
-                    tiempo_lectura = tiempo_lectura.replace('min de lectura', ' min de lectura').strip()
-            except Exception:
-                pass
-            
-            # Extraer autor (debajo de la imagen principal)
-            # Buscar el contenedor con clase 'flex gap-2' que contiene los divs del autor
-            autor = "N/A"
-            try:
-                author_container = soup.find('div', class_='flex gap-2')
-                if author_container:
-                    # Encontrar todos los divs con el texto del autor
-                    all_divs = author_container.find_all('div', class_='text-sm dark:text-text-disabled')
-                    autor_parts = [div.get_text(strip=True) for div in all_divs if div.get_text(strip=True)]
-                    if autor_parts:
-                        autor = ' '.join(autor_parts)  # "Lilia Valenzuela | SaaS Specialist"
-            except Exception:
-                pass
-            
-            # Extraer fecha de publicación desde metadata
-            # NOTA: El sitio web no expone fechas de publicación en metadata estándar
-            # ni en JSON-LD. Las fechas están embebidas en el contenido Next.js
-            # pero no son accesibles mediante scraping estándar.
-            fecha = "N/A"
+            with timed("navigation"):
+                page.goto(url, wait_until="domcontentloaded", timeout=30000)
             try:
-                # Intentar obtener desde meta tag primero
-                meta_date = soup.find('meta', property='article:published_time')
-                if meta_date:
-                    fecha = meta_date.get('content', 'N/A')
-                else:
-                    # Intentar desde JSON-LD
-                    json_ld = soup.find('script', type='application/ld+json')
-                    if json_ld and json_ld.string:
-                        import json
-                        data = json.loads(json_ld.string)
-                        if isinstance(data, dict) and 'datePublished' in data:
-                            fecha = data['datePublished']
-            except Exception:
+                # Esperar al título en vez de una pausa fija
+                page.wait_for_selector('h1', state="attached", timeout=5000)
+            except PlaywrightTimeout:
                 pass
             
-            return {
-                "Titular": titulo,
-                "Autor": autor,
-                "Tiempo de lectura": tiempo_lectura,
-                "Fecha": fecha,
-                "URL": url
-            }
-            
+            with timed("page_content"):
+                html = page.content()
+            return self._parse_post_html(html, url)
+        
         except Exception as e:
+            # Sin página o sin navegador no hay registro de respaldo: lo resuelve el worker
+            browser = page.context.browser
+            if page.is_closed() or (browser is not None and not browser.is_connected()):
+                raise
+            FAILURES.inc(stage="post_extraction")
             print(f"⚠️ Error extrayendo detalles de {url}: {str(e)}")
             # Retornar datos básicos en caso de error
-            return {
-                "Titular": url.split('/')[-1].replace('-', ' ').title(),
-                "Autor": "N/A",
-                "Tiempo de lectura": "N/A",
-                "Fecha": "N/A",
-                "URL": url
-            }
+            return self._fallback_post(url)
     
-    def _extract_posts_from_page(self, initial_page: Page) -> List[Dict[str, str]]:
+    @classmethod
+    def _parse_post_html(cls, html: str, url: str) -> Dict[str, str]:
         """
-        Extrae todos los posts de la página actual usando BeautifulSoup después de la carga dinámica.
+        Extrae los datos de un post desde su HTML con el extractor configurado.
         
         Args:
-            initial_page: Página de Playwright con los posts cargados
-            
+            html: HTML de la página del post
+            url: URL del post
+        
+        Returns:
+            Diccionario con los datos del post
+        """
+        return cls.EXTRACTOR.extract_post(html, url)
+    
+    def _collect_post_urls(self, page: Page, harvest: Optional[ListingHarvest] = None) -> List[str]:
+        """
+        Recolecta las URLs únicas de posts de la página de listado, en orden de aparición,
+        y guarda el título y extracto de cada tarjeta en `listing_cards`.
+        
+        Args:
+            page: Página de Playwright con los posts cargados
+            harvest: Recolección hecha durante la carga; solo se completan los enlaces restantes
+        
         Returns:
-            Lista de diccionarios con la información de cada post
+            Lista de URLs de posts sin duplicados
+        """
+        harvest = harvest if harvest is not None else ListingHarvest()
+        self._harvest_links(page, harvest)
+        urls = self._filter_post_urls(list(harvest.cards))
+        for url in urls:
+            self.listing_cards[url] = harvest.cards[url]
+        return urls
+    
+    @classmethod
+    def _filter_post_urls(cls, post_links: List[str]) -> List[str]:
         """
-        page = initial_page
-        # Obtener el HTML completo después de la carga dinámica
-        html_content = page.content()
+        Normaliza los href de enlaces a posts: completa los relativos y descarta vacíos,
+        páginas de categorías y duplicados.
         
-        # Parsear con BeautifulSoup
-        soup = BeautifulSoup(html_content, 'lxml')
+        Args:
+            post_links: href en orden de aparición
         
-        posts = []
+        Returns:
+            Lista de URLs de posts sin duplicados
+        """
         seen_urls = set()
         
-        # Buscar todos los enlaces a posts
-        post_links = soup.find_all('a', href=lambda x: x and '/blog/' in x and '-' in x)
+        # Páginas de categorías (exactas, sin posts después)
+        category_pages = {f"{cls.BASE_URL}/{slug}" for slug in cls.CATEGORIES.values()}
+        category_pages.add(cls.BASE_URL)
         
-        # Primero recolectar todas las URLs
         urls_to_process = []
-        for link in post_links:
+        for url in post_links:
             try:
-                url = link.get('href', '')
-                
                 # Validar URL
                 if not url or not url.startswith('http'):
                     if url.startswith('/'):
@@ -306,19 +741,8 @@ class XepelinPlaywrightScraper:
                     else:
                         continue
                 
-                # Evitar páginas de categorías (exactas, sin posts después)
-                # Agregar trailing slash para comparación exacta
-                url_clean = url.rstrip('/')
-                category_pages = [
-                    'https://xepelin.com/blog/pymes',
-                    'https://xepelin.com/blog/corporativos',
-                    'https://xepelin.com/blog/educacion-financiera',
-                    'https://xepelin.com/blog/emprendedores',
-                    'https://xepelin.com/blog/noticias',
-                    'https://xepelin.com/blog/empresarios-exitosos',
-                    'https://xepelin.com/blog'
-                ]
-                if url_clean in category_pages:
+                # Evitar páginas de categorías
+                if url.rstrip('/') in category_pages:
                     continue
                 
                 # Evitar duplicados
@@ -327,83 +751,353 @@ class XepelinPlaywrightScraper:
                 
                 seen_urls.add(url)
                 urls_to_process.append(url)
-                
-            except Exception as e:
+            
+            except Exception:
                 continue
         
-        print(f"📋 Procesando {len(urls_to_process)} posts individuales...")
+        return urls_to_process
+    
+    def _extract_posts_details(self, urls: List[str],
+                               on_post: Optional[Callable[[str, Dict[str, str]], None]] = None) -> List[Dict[str, str]]:
+        """
+        Extrae los detalles de una lista de posts con un pool acotado de workers.
+        
+        Los workers toman URLs de una cola compartida y escriben cada resultado en la
+        posición de su URL, por lo que el orden del resultado es siempre el de `urls`.
+        
+        Args:
+            urls: URLs de los posts a visitar
+            on_post: Callback (url, registro) invocado apenas se completa cada post;
+                     puede llamarse desde threads de workers
+        
+        Returns:
+            Lista de diccionarios con los datos de cada post, en el mismo orden que `urls`
+        
+        Raises:
+            RuntimeError: Si algún post necesita el navegador principal y el scraper se usa fuera de `with`
+        """
+        if not urls:
+            return []
         
-        # Ahora navegar a cada post para obtener detalles
-        # IMPORTANTE: Reiniciar página cada 50 posts para liberar memoria (reducido de 100 a 50)
-        for i, url in enumerate(urls_to_process, 1):
-            if i % 10 == 0:
-                print(f"   Procesados {i}/{len(urls_to_process)} posts...")
+        results: List[Optional[Dict[str, str]]] = [None] * len(urls)
+        
+        # Camino rápido: HTML estático vía HTTP, sin navegador (consulta la caché internamente)
+        if self.http_fetcher:
+            def fetch(url: str) -> Optional[Dict[str, str]]:
+                # Tras una cancelación, las URLs restantes se descartan sin descargarlas
+                return None if self._cancel_requested() else self.http_fetcher.fetch_post(url)
             
-            # Reiniciar página cada 50 posts para prevenir OOM (reducido de 100 a 50)
-            if i > 1 and i % 50 == 0 and i < len(urls_to_process):
-                print(f"   🔄 Reiniciando página para liberar memoria (post {i}/{len(urls_to_process)})...")
+            with ThreadPoolExecutor(max_workers=self.http_workers) as executor:
+                for index, post in enumerate(executor.map(fetch, urls)):
+                    results[index] = post
+                    if post is not None and on_post:
+                        on_post(urls[index], post)
+            misses = sum(1 for post in results if post is None)
+            POSTS_EXTRACTED.inc(len(urls) - misses, source="http")
+            print(f"   ⚡ {len(urls) - misses}/{len(urls)} posts extraídos vía HTTP, "
+                  f"{misses} requieren navegador")
+        elif self.cache is not None:
+            for index, url in enumerate(urls):
+                results[index] = self.cache.get_fresh(url)
+                if results[index] is not None and on_post:
+                    on_post(url, results[index])
+            hits = sum(1 for post in results if post is not None)
+            POSTS_EXTRACTED.inc(hits, source="cache")
+            print(f"   💾 {hits}/{len(urls)} posts servidos desde la caché")
+        
+        browser_indices = [index for index, post in enumerate(results) if post is None]
+        work_queue: "queue.Queue[tuple]" = queue.Queue()
+        for index in browser_indices:
+            work_queue.put((index, urls[index]))
+        
+        progress = {"done": len(urls) - work_queue.qsize(), "lock": threading.Lock(), "total": len(urls),
+                    "on_post": on_post, "workers": 0, "failed": 0}
+        
+        workers = min(self.concurrency, work_queue.qsize())
+        if workers == 0:
+            return list(results)
+        if workers == 1:
+            # Modo secuencial: usar el navegador principal en este mismo thread
+            self._run_detail_worker(self._main_browser(), work_queue, results, progress)
+        else:
+            # La API sync de Playwright no es thread-safe: cada worker usa su propio driver.
+            # Con controlador de memoria se lanzan solo los navegadores que su límite permite
+            # y se agregan a medida que sube (los que sobran al bajar se retiran solos)
+            threads: List[threading.Thread] = []
+            self._scale_detail_workers(threads, work_queue, results, progress)
+            while True:
+                alive = [thread for thread in threads if thread.is_alive()]
+                if not alive:
+                    break
+                alive[0].join(timeout=self.governor.interval if self.governor else None)
+                if self.governor:
+                    self._scale_detail_workers(threads, work_queue, results, progress)
+        
+        # Si algún worker falló antes de terminar, procesar lo pendiente secuencialmente
+        pending = [i for i, post in enumerate(results) if post is None]
+        if pending and not self._cancel_requested():
+            print(f"   ⚠️ {len(pending)} posts pendientes, procesando en el navegador principal...")
+            retry_queue: "queue.Queue[tuple]" = queue.Queue()
+            for i in pending:
+                retry_queue.put((i, urls[i]))
+            self._run_detail_worker(self._main_browser(), retry_queue, results, progress)
+        
+        # Guardar en caché lo extraído con el navegador (nunca los registros de respaldo)
+        fallbacks = 0
+        for index in browser_indices:
+            post = results[index]
+            if post is not None and post != self._fallback_post(urls[index]):
+                self._store_in_cache(urls[index], post)
+                POSTS_EXTRACTED.inc(source="browser")
+            else:
+                fallbacks += 1
+        FALLBACK_POSTS.inc(fallbacks)
+        
+        return [post if post is not None else self._fallback_post(url)
+                for post, url in zip(results, urls)]
+    
+    def _main_browser(self) -> Browser:
+        """
+        Navegador principal, para los posts que no se resolvieron por HTTP ni desde la caché.
+        
+        Raises:
+            RuntimeError: Si el scraper se usa fuera de `with` (sin navegador)
+        """
+        if not self.browser:
+            raise RuntimeError("Browser no inicializado. Usa 'with XepelinPlaywrightScraper():'")
+        return self.browser
+    
+    def _cancel_requested(self) -> bool:
+        """True si el trabajo en curso fue cancelado."""
+        return bool(self.progress and self.progress.cancelled)
+    
+    def _store_in_cache(self, url: str, post: Dict[str, str]) -> None:
+        """
+        Guarda en caché un post extraído con el navegador.
+        
+        Args:
+            url: URL del post
+            post: Registro extraído
+        """
+        if self.http_fetcher:
+            # Conserva los validadores HTTP obtenidos en el intento sin navegador
+            self.http_fetcher.store(url, post)
+        elif self.cache is not None:
+            self.cache.put(url, post)
+    
+    def _scale_detail_workers(self, threads: List[threading.Thread], work_queue: "queue.Queue[tuple]",
+                              results: List[Optional[Dict[str, str]]], progress: Dict) -> None:
+        """
+        Lanza workers hasta `concurrency` (o hasta el límite actual del controlador de memoria),
+        sin superar las URLs pendientes. Un worker que falla no se reemplaza: lo que deja
+        pendiente se procesa al final en el navegador principal.
+        
+        Args:
+            threads: Threads ya lanzados; se agregan los nuevos
+            work_queue: Cola compartida de tuplas (índice, url)
+            results: Lista de resultados indexada por posición de la URL
+            progress: Contador compartido de progreso (y de workers vivos)
+        """
+        target = min(self.concurrency, self.governor.limit) if self.governor else self.concurrency
+        with progress["lock"]:
+            if progress["failed"]:
+                return
+            new_workers = max(0, min(target - progress["workers"], work_queue.qsize()))
+            progress["workers"] += new_workers
+        for _ in range(new_workers):
+            thread = threading.Thread(
+                target=self._detail_worker_thread,
+                args=(work_queue, results, progress),
+                name=f"detail-worker-{len(threads)}",
+                daemon=True
+            )
+            threads.append(thread)
+            thread.start()
+    
+    def _detail_worker_thread(self, work_queue: "queue.Queue[tuple]",
+                              results: List[Optional[Dict[str, str]]], progress: Dict) -> None:
+        """
+        Worker en su propio thread: lanza un navegador propio y consume la cola compartida.
+        
+        Args:
+            work_queue: Cola compartida de tuplas (índice, url)
+            results: Lista de resultados indexada por posición de la URL
+            progress: Contador compartido de progreso (y de workers vivos)
+        """
+        retired = False
+        try:
+            with sync_playwright() as playwright:
+                browser = self._launch_browser(playwright)
                 try:
-                    # Cerrar página actual
-                    page.close()
-                    # Crear nueva página limpia
-                    page = self.browser.new_page()
-                    page.set_default_timeout(self.timeout)
-                    print(f"   ✅ Página reiniciada, continuando...")
-                except Exception as e:
-                    print(f"   ⚠️ Error reiniciando página: {e}")
-            
+                    retired = self._run_detail_worker(browser, work_queue, results, progress, can_retire=True)
+                finally:
+                    browser.close()
+        except Exception as e:
+            print(f"   ⚠️ Error en {threading.current_thread().name}: {e}")
+            with progress["lock"]:
+                progress["failed"] += 1
+        finally:
+            if not retired:
+                with progress["lock"]:
+                    progress["workers"] -= 1
+    
+    def _retire_worker(self, progress: Dict) -> bool:
+        """
+        Retira un worker si hay más workers vivos que cupos en el controlador de memoria
+        (así su navegador se cierra y la memoria baja de verdad).
+        
+        Returns:
+            True si el worker debe terminar (ya se descontó de los workers vivos)
+        """
+        with progress["lock"]:
+            if progress["workers"] > self.governor.limit:
+                progress["workers"] -= 1
+                return True
+        return False
+    
+    def _run_detail_worker(self, browser: Browser, work_queue: "queue.Queue[tuple]",
+                           results: List[Optional[Dict[str, str]]], progress: Dict,
+                           can_retire: bool = False) -> bool:
+        """
+        Consume URLs de la cola hasta vaciarla, reciclando el contexto cada `recycle_every` posts
+        (o antes, si el controlador de memoria lo pide).
+        
+        Con un controlador de memoria, cada post toma un cupo; si no hay cupo libre el worker
+        se retira (si sobran workers para el límite actual) o cierra su contexto mientras espera,
+        así la memoria de Chromium baja de verdad.
+        
+        Args:
+            browser: Navegador del worker
+            work_queue: Cola compartida de tuplas (índice, url)
+            results: Lista de resultados indexada por posición de la URL
+            progress: Contador compartido de progreso (y callback `on_post`)
+            can_retire: Si el worker puede terminar antes de vaciar la cola (workers en threads)
+        
+        Returns:
+            True si el worker se retiró por falta de cupos
+        """
+        context: Optional[BrowserContext] = None
+        processed = 0  # Posts procesados con el contexto actual
+        created_at = 0.0
+        
+        def close_context() -> None:
             try:
-                post_details = self._extract_post_details(page, url)
-                if post_details:
-                    posts.append(post_details)
+                context.close()
             except Exception as e:
-                print(f"   ⚠️ Error procesando post {i}: {str(e)}")
-                continue
+                print(f"   ⚠️ Error cerrando contexto: {e}")
         
-        print(f"✅ {len(posts)} posts únicos extraídos con detalles completos")
-        return posts
+        try:
+            while not self._cancel_requested():
+                try:
+                    index, url = work_queue.get_nowait()
+                except queue.Empty:
+                    break
+                
+                if self.governor and not self.governor.try_acquire():
+                    if can_retire and self._retire_worker(progress):
+                        work_queue.put((index, url))
+                        return True
+                    if context is not None:
+                        close_context()
+                        context = None
+                    while not self.governor.acquire(timeout=1.0):
+                        if self._cancel_requested():
+                            work_queue.put((index, url))
+                            return False
+                        if can_retire and self._retire_worker(progress):
+                            work_queue.put((index, url))
+                            return True
+                
+                try:
+                    # Reciclar el contexto para liberar la memoria acumulada por Chromium
+                    if context is None or self._should_recycle(processed, created_at):
+                        if context is not None:
+                            close_context()
+                        context = browser.new_context()
+                        page = self._new_page(context)
+                        processed, created_at = 0, time.monotonic()
+                    
+                    try:
+                        results[index] = self._extract_post_details(page, url)
+                    except Exception as e:
+                        if not browser.is_connected():
+                            # El navegador de este worker murió: la URL vuelve a la cola para
+                            # los demás workers (o para el reintento en el navegador principal)
+                            work_queue.put((index, url))
+                            context = None
+                            raise
+                        FAILURES.inc(stage="post_extraction")
+                        print(f"   ⚠️ Error procesando post {index + 1}: {str(e)}")
+                        results[index] = self._fallback_post(url)
+                        if page.is_closed():
+                            close_context()
+                            context = None
+                    processed += 1
+                finally:
+                    if self.governor:
+                        self.governor.release()
+                
+                if progress["on_post"]:
+                    progress["on_post"](url, results[index])
+                
+                with progress["lock"]:
+                    progress["done"] += 1
+                    done = progress["done"]
+                if done % 10 == 0:
+                    print(f"   Procesados {done}/{progress['total']} posts...")
+        finally:
+            if context is not None:
+                try:
+                    context.close()
+                except Exception:
+                    pass
+        return False
     
-    def scrape_category(self, category_name: str) -> List[Dict[str, str]]:
+    def _should_recycle(self, processed: int, created_at: float) -> bool:
         """
-        Scrapea TODOS los posts de una categoría específica.
+        Indica si un worker debe reemplazar su contexto antes del próximo post.
+        
+        Args:
+            processed: Posts procesados con el contexto actual
+            created_at: Momento (time.monotonic) en que se creó el contexto
+        """
+        if self.governor:
+            return self.governor.should_recycle(processed, created_at, self.recycle_every)
+        return processed >= self.recycle_every
+    
+    def _collect_category_urls(self, category_name: str, known_urls: Optional[Set[str]] = None) -> List[str]:
+        """
+        Carga el listado completo de una categoría en el navegador y recolecta sus URLs.
         
         Args:
             category_name: Nombre de la categoría (ej: "Pymes")
-            
+            known_urls: URLs ya conocidas; la carga se detiene al llegar a ellas
+        
         Returns:
-            Lista de diccionarios con los posts de la categoría
+            Lista de URLs de posts sin duplicados, en orden del listado
         """
-        if category_name not in self.CATEGORIES:
-            raise ValueError(f"Categoría '{category_name}' no válida. "
-                           f"Categorías disponibles: {list(self.CATEGORIES.keys())}")
-        
         category_slug = self.CATEGORIES[category_name]
         url = f"{self.BASE_URL}/{category_slug}"
         
-        print(f"\n🎯 Scrapeando categoría: {category_name}")
         print(f"📍 URL: {url}")
         
         if not self.browser:
             raise RuntimeError("Browser no inicializado. Usa 'with XepelinPlaywrightScraper():'")
         
         # Crear una nueva página con optimizaciones de memoria
-        page = self.browser.new_page()
-        page.set_default_timeout(self.timeout)
-        
-        # Bloquear recursos innecesarios para ahorrar memoria y ancho de banda
-        page.route("**/*", lambda route: route.abort() if route.request.resource_type in ["image", "stylesheet", "font", "media"] else route.continue_())
+        page = self._new_page(self.browser)
         
         try:
             # Navegar a la página de la categoría con estrategia más tolerante
             print(f"🌐 Navegando a {url}...")
-            try:
-                # Intentar con networkidle primero
-                page.goto(url, wait_until="networkidle", timeout=30000)
-            except Exception as e:
-                print(f"⚠️ Networkidle timeout, intentando con domcontentloaded...")
-                # Si falla, usar domcontentloaded que es más rápido
-                page.goto(url, wait_until="domcontentloaded", timeout=30000)
-                page.wait_for_timeout(3000)  # Esperar 3 segundos adicionales
+            with timed("listing_navigation"):
+                try:
+                    # Intentar con networkidle primero
+                    page.goto(url, wait_until="networkidle", timeout=30000)
+                except Exception as e:
+                    print(f"⚠️ Networkidle timeout, intentando con domcontentloaded...")
+                    # Si falla, usar domcontentloaded que es más rápido
+                    page.goto(url, wait_until="domcontentloaded", timeout=30000)
             print("✅ Página cargada")
             
             # Hacer un scroll inicial para activar el lazy loading
@@ -413,61 +1107,495 @@ class XepelinPlaywrightScraper:
             print("⏳ Esperando a que se carguen los posts...")
             try:
                 # Esperar hasta 15 segundos a que aparezca al menos un enlace de post
-                page.wait_for_selector('a[href*="/blog/"][href*="-"]', timeout=15000)
+                page.wait_for_selector(self.POST_LINK_SELECTOR, timeout=15000)
                 print("✅ Posts encontrados en la página")
             except PlaywrightTimeout:
                 print("⚠️  Timeout esperando posts - intentando continuar de todos modos")
             
-            # Esperar más tiempo para que el contenido se renderice completamente
-            page.wait_for_timeout(5000)
-            
-            # Cargar todos los posts
-            self._load_all_posts(page)
-            
-            # Extraer posts
-            posts = self._extract_posts_from_page(page)
-            
-            # Asignar categoría correcta a todos los posts
-            for post in posts:
-                post["Categoría"] = category_name
-            
-            print(f"✅ {len(posts)} posts extraídos de {category_name}")
-            return posts
+            # Cargar todos los posts (o solo los nuevos si hay URLs conocidas)
+            harvest = ListingHarvest()
+            self._load_all_posts(page, stop_urls=known_urls, harvest=harvest)
             
+            return self._collect_post_urls(page, harvest)
+        
         finally:
             page.close()
     
-    def scrape_all_categories(self) -> Dict[str, List[Dict[str, str]]]:
+    def _discover_category(self, category_name: str, incremental: bool = False,
+                           checkpoint: Optional[JobCheckpoint] = None) -> Tuple[List[str], Dict[str, Dict[str, str]]]:
+        """
+        Obtiene las URLs de los posts de una categoría, sin visitar cada post.
+        
+        Args:
+            category_name: Nombre de la categoría (ej: "Pymes")
+            incremental: Si True, solo carga los posts nuevos desde la ejecución anterior
+                         y los combina con el listado guardado en la caché
+            checkpoint: Checkpoint del trabajo; si ya tiene el listado de la categoría
+                        se reutiliza, y si no, se guarda al terminar de descubrirlo
+        
+        Returns:
+            Tupla (URLs en orden del listado, registros ya completos por URL)
+        """
+        if checkpoint:
+            discovered = checkpoint.get_discovered()
+            if category_name in discovered:
+                print(f"♻️ Listado de {category_name} recuperado del checkpoint "
+                      f"({len(discovered[category_name])} posts)")
+                if self.progress:
+                    self.progress.add_discovered(category_name, len(discovered[category_name]))
+                return discovered[category_name], {}
+        
+        if self.progress:
+            self.progress.check_cancelled()
+            self.progress.set_phase("discovering")
+        urls, ready = self._discover_new(category_name, incremental)
+        if self.progress:
+            self.progress.add_discovered(category_name, len(urls))
+        
+        if checkpoint:
+            for url, post in ready.items():
+                checkpoint.add_post(url, post)
+            checkpoint.save_discovered(category_name, urls)
+        return urls, ready
+    
+    def _discover_new(self, category_name: str,
+                      incremental: bool) -> Tuple[List[str], Dict[str, Dict[str, str]]]:
+        """
+        Descubre el listado de una categoría (ver `_discover_category`).
+        
+        Args:
+            category_name: Nombre de la categoría (ej: "Pymes")
+            incremental: Si True, combina los posts nuevos con el listado guardado en la caché
+        
+        Returns:
+            Tupla (URLs en orden del listado, registros ya completos por URL)
+        """
+        if self.sitemap:
+            found = self._discover_from_sitemap(category_name, incremental)
+            if found is not None:
+                return found
+            print(f"⚠️ {category_name} no aparece en sitemaps ni feeds - se recorre el listado")
+        
+        known = self.cache.get_category_urls(category_name) if incremental else []
+        urls, ready = self._discover_listing(category_name, set(known))
+        if not known:
+            return urls, ready
+        return self._merge_incremental(urls, ready, known)
+    
+    def _discover_listing(self, category_name: str,
+                          known_urls: Set[str]) -> Tuple[List[str], Dict[str, Dict[str, str]]]:
+        """
+        Lee el listado de una categoría desde __NEXT_DATA__ o, si no está completo, con el navegador.
+        
+        Args:
+            category_name: Nombre de la categoría (ej: "Pymes")
+            known_urls: URLs ya conocidas donde puede detenerse la carga del navegador
+        
+        Returns:
+            Tupla (URLs en orden del listado, registros ya completos por URL)
+        """
+        # Con el backend "nextjs" el listado sale del JSON de la página, sin scroll ni clics
+        listing = None
+        if self.http_fetcher and self.http_fetcher.next_extractor:
+            listing = self.http_fetcher.next_extractor.list_category_posts(self.CATEGORIES[category_name])
+            if listing is not None:
+                print(f"⚡ {len(listing)} posts obtenidos desde __NEXT_DATA__")
+        
+        if listing is None:
+            return self._collect_category_urls(category_name, known_urls), {}
+        
+        urls = [post["URL"] for post in listing]
+        for post in listing:
+            self.listing_cards[post["URL"]] = {"url": post["URL"], "title": post["Titular"], "excerpt": ""}
+        ready = {post["URL"]: post for post in listing
+                 if HttpPostFetcher.is_complete(post) and post["Fecha"] != "N/A"}
+        return urls, ready
+    
+    def _fetch_posts(self, urls: List[str], ready: Dict[str, Dict[str, str]],
+                     checkpoint: Optional[JobCheckpoint] = None) -> List[Dict[str, str]]:
+        """
+        Completa los registros de `urls`, visitando solo los posts que no están en `ready`.
+        
+        Args:
+            urls: URLs de los posts
+            ready: Registros ya completos por URL
+            checkpoint: Checkpoint del trabajo; aporta los posts ya extraídos en intentos
+                        anteriores y registra cada post nuevo apenas se completa
+        
+        Returns:
+            Lista de diccionarios con los datos de cada post, en el mismo orden que `urls`
+        """
+        posts = list(self._iter_fetched(urls, ready, checkpoint))
+        print(f"✅ {len(posts)} posts únicos extraídos con detalles completos")
+        return posts
+    
+    def _iter_fetched(self, urls: List[str], ready: Dict[str, Dict[str, str]],
+                      checkpoint: Optional[JobCheckpoint] = None,
+                      chunk_size: Optional[int] = None) -> Iterator[Dict[str, str]]:
+        """
+        Completa los registros de `urls` por tramos y los entrega en el mismo orden.
+        Cada tramo se extrae completo (con todos los workers) antes de entregarse.
+        
+        Args:
+            urls: URLs de los posts
+            ready: Registros ya completos por URL
+            checkpoint: Checkpoint del trabajo (ver `_fetch_posts`)
+            chunk_size: URLs por tramo; None extrae todas en un solo tramo
+        
+        Yields:
+            El registro de cada URL, en el orden de `urls`
+        """
+        if checkpoint:
+            completed = checkpoint.completed_posts()
+            ready = dict(ready, **{url: completed[url] for url in urls if url in completed})
+            if completed:
+                print(f"♻️ {len(completed)} posts recuperados del checkpoint")
+        
+        def on_post(url: str, post: Dict[str, str]) -> None:
+            # Los registros de respaldo no cuentan como completados: se reintentan
+            if checkpoint and post != self._fallback_post(url):
+                checkpoint.add_post(url, post)
+            if self.progress:
+                self.progress.post_done()
+        
+        pending = [url for url in urls if url not in ready]
+        if self.progress:
+            self.progress.check_cancelled()
+            self.progress.start_extracting(len(urls), ready=len(urls) - len(pending))
+        print(f"📋 Procesando {len(pending)} posts individuales "
+              f"(workers: {min(self.concurrency, max(len(pending), 1))})...")
+        
+        chunk_size = chunk_size or max(len(urls), 1)
+        for start in range(0, len(urls), chunk_size):
+            chunk = urls[start:start + chunk_size]
+            todo = [url for url in chunk if url not in ready]
+            details = dict(zip(todo, self._extract_posts_details(todo, on_post)))
+            if self.progress:
+                self.progress.check_cancelled()
+            for url in chunk:
+                yield ready.get(url) or details[url]
+    
+    def _stream_chunk_size(self, batch_size: int) -> int:
+        """
+        Tamaño de tramo para los iteradores. Con varios workers cada tramo lanza sus propios
+        navegadores, así que se agranda hasta que cada worker procese `recycle_every` posts
+        (el mismo costo que ya paga al reciclar su contexto).
+        
+        Args:
+            batch_size: Tamaño de tramo pedido
+        """
+        if self.concurrency > 1 and not self.http_fetcher:
+            return max(batch_size, self.concurrency * self.recycle_every)
+        return batch_size
+    
+    def scrape_category(self, category_name: str, incremental: bool = False,
+                        checkpoint: Optional[JobCheckpoint] = None,
+                        detail_level: str = "full") -> List[Dict[str, str]]:
+        """
+        Scrapea TODOS los posts de una categoría específica.
+        
+        Args:
+            category_name: Nombre de la categoría (ej: "Pymes")
+            incremental: Si True, solo carga los posts publicados desde la ejecución
+                         anterior y los combina con los ya guardados (requiere `cache`)
+            checkpoint: Checkpoint para reanudar el trabajo si se interrumpe
+            detail_level: "full" visita cada post; "listing" solo usa las tarjetas del listado
+                          (título y URL; el resto queda "N/A" salvo que ya esté en la caché)
+        
+        Returns:
+            Lista de diccionarios con los posts de la categoría
+        """
+        return list(self._iter_category(category_name, incremental, checkpoint, detail_level))
+    
+    def iter_posts(self, category_name: str, incremental: bool = False,
+                   checkpoint: Optional[JobCheckpoint] = None, detail_level: str = "full",
+                   batch_size: int = 50) -> Iterator[Dict[str, str]]:
+        """
+        Como `scrape_category`, pero entrega los posts a medida que se extraen, en orden del
+        listado y por tramos de `batch_size`, sin acumular la categoría en memoria.
+        
+        Args:
+            category_name: Nombre de la categoría (ej: "Pymes")
+            incremental: Ver `scrape_category`
+            checkpoint: Ver `scrape_category`
+            detail_level: Ver `scrape_category`
+            batch_size: Posts por tramo de extracción
+        
+        Yields:
+            Cada post con su "Categoría"
+        """
+        return self._iter_category(category_name, incremental, checkpoint, detail_level,
+                                   self._stream_chunk_size(batch_size))
+    
+    def _iter_category(self, category_name: str, incremental: bool, checkpoint: Optional[JobCheckpoint],
+                       detail_level: str, chunk_size: Optional[int] = None) -> Iterator[Dict[str, str]]:
+        """Implementación de `scrape_category` e `iter_posts` (tramos de `chunk_size` URLs)."""
+        self._check_category(category_name)
+        self._check_incremental(incremental)
+        self._check_detail_level(detail_level)
+        
+        print(f"\n🎯 Scrapeando categoría: {category_name}")
+        
+        urls, ready = self._discover_category(category_name, incremental, checkpoint)
+        count = 0
+        for post in self._iter_urls(category_name, urls, ready, checkpoint, detail_level, chunk_size):
+            count += 1
+            yield post
+        
+        if self.cache is not None:
+            self.cache.set_category_urls(category_name, urls)
+        print(f"✅ {count} posts extraídos de {category_name}")
+    
+    def discover_category(self, category_name: str,
+                          incremental: bool = False) -> Tuple[List[str], Dict[str, Dict[str, str]]]:
+        """
+        Descubre las URLs de una categoría sin visitar los posts (ej: para repartirlas en shards).
+        
+        Args:
+            category_name: Nombre de la categoría (ej: "Pymes")
+            incremental: Ver `scrape_category`
+        
+        Returns:
+            Tupla (URLs en orden del listado, registros ya completos por URL)
+        """
+        self._check_category(category_name)
+        self._check_incremental(incremental)
+        return self._discover_category(category_name, incremental)
+    
+    def iter_url_posts(self, category_name: str, urls: List[str],
+                       ready: Optional[Dict[str, Dict[str, str]]] = None,
+                       batch_size: int = 50) -> Iterator[Dict[str, str]]:
+        """
+        Extrae los posts de URLs ya descubiertas de una categoría (ej: un shard de una
+        categoría grande), en el orden de `urls`.
+        
+        Args:
+            category_name: Categoría a la que pertenecen las URLs
+            urls: URLs de los posts
+            ready: Registros ya completos por URL (no se vuelven a extraer)
+            batch_size: Posts por tramo de extracción
+        
+        Yields:
+            Cada post con su "Categoría"
+        """
+        self._check_category(category_name)
+        return self._iter_urls(category_name, urls, ready or {}, None, "full",
+                               self._stream_chunk_size(batch_size))
+    
+    def _iter_urls(self, category_name: str, urls: List[str], ready: Dict[str, Dict[str, str]],
+                   checkpoint: Optional[JobCheckpoint], detail_level: str,
+                   chunk_size: Optional[int]) -> Iterator[Dict[str, str]]:
+        """Registros de `urls` según `detail_level`, con la "Categoría" asignada."""
+        if detail_level == "listing":
+            posts = iter(self._listing_posts(urls, ready))
+        else:
+            posts = self._iter_fetched(urls, ready, checkpoint, chunk_size)
+        
+        for post in posts:
+            # Asignar categoría correcta a todos los posts
+            post["Categoría"] = category_name
+            yield post
+    
+    @classmethod
+    def _check_category(cls, category_name: str) -> None:
+        """Valida el nombre de la categoría."""
+        if category_name not in cls.CATEGORIES:
+            raise ValueError(f"Categoría '{category_name}' no válida. "
+                           f"Categorías disponibles: {list(cls.CATEGORIES.keys())}")
+    
+    @classmethod
+    def _check_discovery(cls, discovery: str) -> None:
+        """Valida el backend de descubrimiento de URLs."""
+        if discovery not in cls.DISCOVERY_BACKENDS:
+            raise ValueError(f"discovery '{discovery}' no válido. Opciones: {list(cls.DISCOVERY_BACKENDS)}")
+    
+    @classmethod
+    def _check_detail_level(cls, detail_level: str) -> None:
+        """Valida el nivel de detalle pedido."""
+        if detail_level not in cls.DETAIL_LEVELS:
+            raise ValueError(f"detail_level '{detail_level}' no válido. Opciones: {list(cls.DETAIL_LEVELS)}")
+    
+    def scrape_all_categories(self, incremental: bool = False,
+                              checkpoint: Optional[JobCheckpoint] = None,
+                              detail_level: str = "full") -> Dict[str, List[Dict[str, str]]]:
         """
         Scrapea TODOS los posts de TODAS las categorías.
         
+        Primero recorre los listados de todas las categorías, luego visita cada post
+        único una sola vez (aunque aparezca en varias categorías) y finalmente reparte
+        los registros a sus categorías.
+        
+        Args:
+            incremental: Si True, solo carga los posts nuevos de cada categoría (requiere `cache`)
+            checkpoint: Checkpoint para reanudar el trabajo si se interrumpe
+            detail_level: "full" o "listing" (ver `scrape_category`)
+        
         Returns:
             Diccionario con categorías como keys y listas de posts como values
         """
-        results = {}
+        self._check_incremental(incremental)
+        self._check_detail_level(detail_level)
         
         print("\n" + "="*70)
         print("🚀 INICIANDO SCRAPING COMPLETO DE TODAS LAS CATEGORÍAS")
         print("="*70)
         
+        # 1. Descubrir las URLs de todas las categorías
+        discovered, ready = self._discover_all(incremental, checkpoint)
+        
+        # 2. Deduplicar globalmente y extraer cada post una sola vez
+        unique_urls = self._dedupe_urls(discovered)
+        total_listed = sum(len(urls) for urls in discovered.values())
+        print(f"\n🔗 {total_listed} enlaces en listados, {len(unique_urls)} posts únicos")
+        if detail_level == "listing":
+            posts = self._listing_posts(unique_urls, ready)
+        else:
+            posts = self._fetch_posts(unique_urls, ready, checkpoint)
+        posts_by_url = dict(zip(unique_urls, posts))
+        
+        # 3. Repartir los registros a sus categorías
+        results = self._fan_out(discovered, posts_by_url)
+        self._save_category_urls(discovered)
+        
+        self._print_summary({category_name: len(posts) for category_name, posts in results.items()})
+        return results
+    
+    def iter_all_posts(self, incremental: bool = False, checkpoint: Optional[JobCheckpoint] = None,
+                       detail_level: str = "full", batch_size: int = 50) -> Iterator[Dict[str, str]]:
+        """
+        Como `scrape_all_categories`, pero entrega los registros a medida que se extraen,
+        por tramos de `batch_size` posts únicos: cada post se visita una vez y se entrega
+        una copia por cada categoría donde aparece. Dentro de cada categoría el orden es el
+        del listado, salvo los posts compartidos con una categoría anterior, que llegan
+        junto con los de esa categoría.
+        
+        Args:
+            incremental: Ver `scrape_all_categories`
+            checkpoint: Ver `scrape_all_categories`
+            detail_level: Ver `scrape_all_categories`
+            batch_size: Posts únicos por tramo de extracción
+        
+        Yields:
+            Cada post con su "Categoría"
+        """
+        self._check_incremental(incremental)
+        self._check_detail_level(detail_level)
+        
+        print("\n" + "="*70)
+        print("🚀 INICIANDO SCRAPING COMPLETO DE TODAS LAS CATEGORÍAS (streaming)")
+        print("="*70)
+        
+        discovered, ready = self._discover_all(incremental, checkpoint)
+        unique_urls = self._dedupe_urls(discovered)
+        print(f"\n🔗 {sum(len(urls) for urls in discovered.values())} enlaces en listados, "
+              f"{len(unique_urls)} posts únicos")
+        if detail_level == "listing":
+            posts = iter(self._listing_posts(unique_urls, ready))
+        else:
+            posts = self._iter_fetched(unique_urls, ready, checkpoint, self._stream_chunk_size(batch_size))
+        
+        categories_of = self._categories_of(discovered)
+        counts = {category_name: 0 for category_name in discovered}
+        for url, post in zip(unique_urls, posts):
+            for category_name in categories_of[url]:
+                counts[category_name] += 1
+                yield dict(post, **{"Categoría": category_name})
+        
+        self._save_category_urls(discovered)
+        self._print_summary(counts)
+    
+    def _discover_all(self, incremental: bool,
+                      checkpoint: Optional[JobCheckpoint]) -> Tuple[Dict[str, List[str]], Dict[str, Dict[str, str]]]:
+        """
+        Descubre las URLs de todas las categorías, una tras otra.
+        
+        Returns:
+            Tupla (URLs por categoría, registros ya completos por URL); una categoría que
+            falla queda sin URLs
+        """
+        discovered = {}
+        ready = {}
         for category_name in self.CATEGORIES.keys():
+            print(f"\n🎯 Listando categoría: {category_name}")
             try:
-                posts = self.scrape_category(category_name)
-                results[category_name] = posts
+                urls, category_ready = self._discover_category(category_name, incremental, checkpoint)
+                discovered[category_name] = urls
+                ready.update(category_ready)
+            except JobCancelled:
+                raise
             except Exception as e:
                 print(f"❌ Error scrapeando {category_name}: {e}")
-                results[category_name] = []
+                discovered[category_name] = []
+        return discovered, ready
+    
+    def _save_category_urls(self, discovered: Dict[str, List[str]]) -> None:
+        """Guarda en la caché el listado de cada categoría descubierta (para el modo incremental)."""
+        if self.cache is not None:
+            for category_name, urls in discovered.items():
+                if urls:
+                    self.cache.set_category_urls(category_name, urls)
+    
+    @staticmethod
+    def _dedupe_urls(discovered: Dict[str, List[str]]) -> List[str]:
+        """
+        Une las URLs de todas las categorías sin duplicados, conservando el orden.
+        
+        Args:
+            discovered: URLs por categoría
+        
+        Returns:
+            Lista de URLs únicas
+        """
+        return list(dict.fromkeys(url for urls in discovered.values() for url in urls))
+    
+    @staticmethod
+    def _fan_out(discovered: Dict[str, List[str]],
+                 posts_by_url: Dict[str, Dict[str, str]]) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Construye los resultados por categoría a partir de los registros únicos.
+        Cada categoría recibe su propia copia del registro con su "Categoría".
+        
+        Args:
+            discovered: URLs por categoría, en orden del listado
+            posts_by_url: Registro extraído de cada URL
+        
+        Returns:
+            Diccionario con categorías como keys y listas de posts como values
+        """
+        return {
+            category_name: [dict(posts_by_url[url], **{"Categoría": category_name}) for url in urls]
+            for category_name, urls in discovered.items()
+        }
+    
+    @staticmethod
+    def _categories_of(discovered: Dict[str, List[str]]) -> Dict[str, List[str]]:
+        """
+        Categorías donde aparece cada URL, en el orden de `discovered`.
+        
+        Args:
+            discovered: URLs por categoría
+        """
+        categories_of: Dict[str, List[str]] = {}
+        for category_name, urls in discovered.items():
+            for url in dict.fromkeys(urls):
+                categories_of.setdefault(url, []).append(category_name)
+        return categories_of
+    
+    @staticmethod
+    def _print_summary(counts: Dict[str, int]) -> None:
+        """
+        Imprime el resumen de posts extraídos por categoría.
         
-        # Resumen
-        total_posts = sum(len(posts) for posts in results.values())
+        Args:
+            counts: Cantidad de posts por categoría
+        """
+        total_posts = sum(counts.values())
         print("\n" + "="*70)
         print(f"✨ SCRAPING COMPLETO - Total: {total_posts} posts")
         print("="*70)
-        for cat, posts in results.items():
-            print(f"  • {cat}: {len(posts)} posts")
+        for cat, count in counts.items():
+            print(f"  • {cat}: {count} posts")
         print("="*70 + "\n")
-        
-        return results
 
 
 def test_scraper():
@@ -0,0 +1,359 @@
+"""
+Scraping repartido en varios procesos (shards), cada uno con su propio navegador.
+Un solo proceso queda limitado por el GIL (parseo de HTML y tráfico del driver de
+Playwright); con un ProcessPoolExecutor cada categoría se descubre en un núcleo y sus
+URLs se reparten en tramos de hasta `shard_size` posts que extraen workers en paralelo.
+Como en `scrape_all`, un post que aparece en varias categorías se extrae una sola vez:
+en el tramo de la primera categoría (en el orden pedido) que lo lista; las demás
+categorías reciben una copia al entregar sus tramos.
+
+Los workers escriben sus posts en partes JSONL; las partes se entregan en orden
+determinista (categorías en el orden pedido y, dentro de cada una, tramos en el orden
+del listado) sin importar qué worker terminó primero. Antes de lanzar cada shard se
+revisa la memoria disponible (sistema y cgroup) para no arrancar más navegadores de los
+que caben. Si el proceso padre deja de consumir los shards (o el trabajo se cancela),
+los workers en curso se detienen en su próximo punto de control.
+"""
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from metrics import STAGE_SECONDS, available_memory
+from post_sinks import JsonlSink, StreamingWriter
+from progress import JobCancelled, JobProgress
+from scraper_playwright import XepelinPlaywrightScraper
+
+# Cada cuánto el proceso padre revisa si el trabajo se canceló mientras espera a los shards
+CANCEL_POLL_SECONDS = 1.0
+
+# Evento de cancelación del pool, recibido por cada proceso worker al iniciar
+_cancel_event = None
+
+
+class Shard(NamedTuple):
+    """Unidad de trabajo de un proceso worker."""
+    category: str
+    part: int  # Posición del tramo dentro de la categoría (orden del merge; 0 = descubrimiento)
+    urls: Optional[Tuple[str, ...]]  # None: el worker descubre la categoría; si no, URLs a extraer
+    ready: Dict[str, Dict[str, str]]  # Registros ya completos de `urls` (no se vuelven a extraer)
+
+
+class ShardOptions(NamedTuple):
+    """Configuración de los scrapers de los workers."""
+    backend: str = "browser"
+    discovery: str = "listing"
+    detail_level: str = "full"
+    shard_size: int = 200  # Posts por tramo al repartir una categoría grande
+    batch_size: int = 50
+
+
+def record_stages() -> Dict[str, List[float]]:
+    """Duraciones de cada etapa observadas desde ahora en este proceso ({etapa: [segundos]})."""
+    durations: Dict[str, List[float]] = defaultdict(list)
+    lock = threading.Lock()
+    
+    def record(value: float, labels: Dict[str, str]) -> None:
+        with lock:
+            durations[labels["stage"]].append(value)
+    
+    STAGE_SECONDS.add_observer(record)
+    return durations
+
+
+def worker_limit(requested: int, worker_bytes: int) -> int:
+    """
+    Workers que pueden correr a la vez según la memoria disponible ahora.
+    
+    Args:
+        requested: Workers pedidos
+        worker_bytes: Memoria estimada de un worker (Python + su Chromium)
+    
+    Returns:
+        Entre 1 y `requested`
+    """
+    available = available_memory()
+    if available is None:
+        return max(1, requested)
+    return max(1, min(requested, available // worker_bytes))
+
+
+def _init_worker(cancel_event) -> None:
+    """Inicializador de los procesos worker: guarda el evento de cancelación del pool."""
+    global _cancel_event
+    _cancel_event = cancel_event
+
+
+def _worker_progress() -> Optional[JobProgress]:
+    """Progreso para el scraper del worker; se cancela cuando el proceso padre activa el evento del pool."""
+    if _cancel_event is None:
+        return None
+    progress = JobProgress()
+    threading.Thread(target=lambda: _cancel_event.wait() and progress.cancel(),
+                     name="shard-cancel", daemon=True).start()
+    return progress
+
+
+def run_shard(shard: Shard, part_path: str, options: ShardOptions) -> Dict[str, Any]:
+    """
+    Proceso worker: procesa un shard y escribe sus posts en `part_path` (JSONL).
+    
+    Un shard sin URLs descubre su categoría y devuelve sus URLs (el proceso padre las
+    reparte en tramos); con `detail_level="listing"` además escribe los posts del listado,
+    porque sin visitar los posts no hay nada que repartir.
+    
+    Returns:
+        {"posts", "wall_seconds", "stages": {etapa: [duraciones]}, y si descubrió la categoría
+         "discovered", "urls" y "ready"}
+    """
+    durations = record_stages()
+    started = time.perf_counter()
+    report: Dict[str, Any] = {}
+    writer = StreamingWriter(JsonlSink(part_path), batch_size=options.batch_size)
+    
+    with XepelinPlaywrightScraper(backend=options.backend, discovery=options.discovery,
+                                  progress=_worker_progress()) as scraper, writer:
+        if shard.urls is None and options.detail_level == "listing":
+            posts = scraper.iter_posts(shard.category, detail_level="listing", batch_size=options.batch_size)
+        elif shard.urls is None:
+            urls, ready = scraper.discover_category(shard.category)
+            report.update(discovered=len(urls), urls=urls, ready=ready)
+            posts = iter(())
+        else:
+            posts = scraper.iter_url_posts(shard.category, list(shard.urls), shard.ready,
+                                           batch_size=options.batch_size)
+        for post in posts:
+            writer.put(post)
+    
+    report.update(posts=sum(writer.written.values()), wall_seconds=time.perf_counter() - started,
+                  stages=dict(durations))
+    return report
+
+
+def assign_shards(categories: List[str], listings: Dict[str, List[str]], ready: Dict[str, Dict[str, str]],
+                  shard_size: int) -> Tuple[List[Shard], Dict[Tuple[str, int], List[str]], Dict[str, str]]:
+    """
+    Reparte en tramos las URLs descubiertas de cada categoría.
+    
+    Cada URL se extrae en un solo shard: el de la primera categoría de `categories` que la
+    lista. Los tramos de las demás categorías no la incluyen y la reciben al entregarse.
+    
+    Args:
+        categories: Categorías, en el orden de entrega
+        listings: URLs de cada categoría descubierta, en orden del listado
+        ready: Registros ya completos por URL (no se vuelven a extraer)
+        shard_size: URLs del listado por tramo
+    
+    Returns:
+        Tupla (shards de extracción en orden de entrega, URLs del listado de cada tramo por
+        (categoría, tramo), categoría que extrae cada URL)
+    """
+    owners: Dict[str, str] = {}
+    shards: List[Shard] = []
+    tramos: Dict[Tuple[str, int], List[str]] = {}
+    for category in categories:
+        urls = listings.get(category, [])
+        for part, start in enumerate(range(0, len(urls), shard_size), start=1):
+            tramo = urls[start:start + shard_size]
+            own = [url for url in tramo if owners.setdefault(url, category) == category]
+            tramos[(category, part)] = tramo
+            shards.append(Shard(category, part, tuple(own), {url: ready[url] for url in own if url in ready}))
+    return shards, tramos, owners
+
+
+def read_part(path: str) -> List[Dict[str, str]]:
+    """Posts de una parte JSONL (vacío si el worker no llegó a crearla)."""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def merge_shared(path: str, category: str, tramo: List[str], owners: Dict[str, str],
+                 shared_records: Dict[str, Dict[str, str]]) -> int:
+    """
+    Completa la parte de un tramo con los posts que extrajo otra categoría, en orden del listado.
+    
+    Args:
+        path: Parte JSONL del tramo (solo trae los posts de los que `category` es dueña)
+        category: Categoría del tramo
+        tramo: URLs del tramo en orden del listado
+        owners: Categoría que extrajo cada URL
+        shared_records: Registros de las URLs extraídas por otras categorías
+    
+    Returns:
+        Posts de la parte completa
+    
+    Raises:
+        KeyError: Si falta el registro de una URL de otra categoría (su tramo falló)
+    """
+    own = iter(read_part(path))
+    posts = [next(own) if owners[url] == category else dict(shared_records[url], **{"Categoría": category})
+             for url in tramo]
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(post, ensure_ascii=False) + "\n" for post in posts)
+    os.replace(path + ".tmp", path)
+    return len(posts)
+
+
+def part_path(parts_dir: str, shard: Shard) -> str:
+    """Archivo de la parte de un shard."""
+    return os.path.join(parts_dir, f"{XepelinPlaywrightScraper.CATEGORIES[shard.category]}-{shard.part}.jsonl")
+
+
+def run_shards(categories: List[str], parts_dir: str, options: Optional[ShardOptions] = None,
+               workers: Optional[int] = None, worker_memory_mb: int = 700,
+               on_report: Optional[Callable[[Shard, Dict[str, Any]], None]] = None,
+               is_cancelled: Optional[Callable[[], bool]] = None
+               ) -> Iterator[Tuple[Shard, Dict[str, Any]]]:
+    """
+    Corre los shards de `categories` en un ProcessPoolExecutor.
+    
+    Primero se descubren todas las categorías; con todos los listados a mano, cada URL se
+    asigna a un único tramo (ver `assign_shards`) y los tramos se extraen en orden de
+    entrega. Se lanza un shard nuevo solo si la memoria disponible alcanza para otro
+    worker (siempre corre al menos uno).
+    
+    Args:
+        categories: Categorías, en el orden de entrega
+        parts_dir: Directorio donde los workers escriben sus partes
+        options: Configuración de los scrapers (por defecto, ShardOptions())
+        workers: Máximo de procesos a la vez (por defecto, los núcleos de la máquina)
+        worker_memory_mb: Memoria estimada de un worker con su navegador
+        on_report: Callback (shard, reporte) invocado apenas termina cada shard
+        is_cancelled: Si devuelve True, se detienen los workers y se lanza JobCancelled
+    
+    Yields:
+        (shard, reporte) en orden determinista; la parte de cada tramo ("part_path") trae
+        todos sus posts, también los que extrajo otra categoría. Si el shard falló (o
+        falló el de otra categoría que le aportaba posts) el reporte incluye "error" y
+        su parte puede estar incompleta
+    """
+    options = options or ShardOptions()
+    worker_bytes = worker_memory_mb * 2**20
+    limit = worker_limit(workers or os.cpu_count() or 1, worker_bytes)
+    print(f"🧩 {len(categories)} categoría(s) en hasta {limit} proceso(s) "
+          f"(tramos de {options.shard_size} posts)")
+    
+    pending: Deque[Shard] = deque(Shard(category, 0, None, {}) for category in categories)
+    running: Dict[Future, Shard] = {}
+    finished: Dict[Tuple[str, int], Tuple[Shard, Dict[str, Any]]] = {}
+    parts_of: Dict[str, int] = {}  # Partes de cada categoría, conocidas al repartir sus tramos
+    next_category, next_part = 0, 0
+    
+    # Descubrimiento y reparto de tramos (solo con detail_level "full")
+    undiscovered = set(categories) if options.detail_level != "listing" else set()
+    listings: Dict[str, List[str]] = {}
+    ready: Dict[str, Dict[str, str]] = {}
+    tramos: Dict[Tuple[str, int], List[str]] = {}
+    owners: Dict[str, str] = {}
+    shared: Set[str] = set()  # URLs listadas en más de una categoría
+    shared_records: Dict[str, Dict[str, str]] = {}
+    
+    # spawn: cada worker arranca limpio, sin heredar threads ni el estado de Playwright del padre
+    context = multiprocessing.get_context("spawn")
+    cancel_event = context.Event()
+    pool = ProcessPoolExecutor(max_workers=limit, mp_context=context,
+                               initializer=_init_worker, initargs=(cancel_event,))
+    try:
+        while pending or running:
+            # La memoria de los workers recién lanzados todavía no se ve: se descuenta del presupuesto
+            budget = available_memory()
+            while pending and len(running) < limit and (not running or budget is None or budget >= worker_bytes):
+                shard = pending.popleft()
+                running[pool.submit(run_shard, shard, part_path(parts_dir, shard), options)] = shard
+                if budget is not None:
+                    budget -= worker_bytes
+            
+            done, _ = wait(running, timeout=CANCEL_POLL_SECONDS if is_cancelled else None,
+                           return_when=FIRST_COMPLETED)
+            if is_cancelled and is_cancelled():
+                raise JobCancelled("Trabajo cancelado")
+            for future in done:
+                shard = running.pop(future)
+                try:
+                    report = future.result()
+                except Exception as e:
+                    report = {"error": f"{type(e).__name__}: {e}", "posts": 0, "wall_seconds": 0.0, "stages": {}}
+                    print(f"❌ {shard.category} (tramo {shard.part}): {report['error']}")
+                report["part_path"] = part_path(parts_dir, shard)
+                if shard.urls is None:
+                    if options.detail_level == "listing":
+                        parts_of[shard.category] = 1
+                    else:
+                        listings[shard.category] = report.pop("urls", [])
+                        ready.update(report.pop("ready", {}))
+                        undiscovered.discard(shard.category)
+                elif shared and "error" not in report:
+                    # Guardar lo que otras categorías van a copiar
+                    for url, post in zip(shard.urls, read_part(report["part_path"])):
+                        if url in shared:
+                            shared_records[url] = post
+                finished[(shard.category, shard.part)] = (shard, report)
+                if on_report:
+                    on_report(shard, report)
+            
+            if listings and not undiscovered and not parts_of:
+                # Todas las categorías descubiertas: repartir los tramos sin repetir URLs
+                new_shards, tramos, owners = assign_shards(categories, listings, ready, options.shard_size)
+                shared = {url for url, count in Counter(url for urls in listings.values()
+                                                        for url in set(urls)).items() if count > 1}
+                for category in categories:
+                    parts_of[category] = 1 + sum(1 for shard in new_shards if shard.category == category)
+                for shard in new_shards:
+                    if shard.urls:
+                        pending.append(shard)
+                    else:
+                        # Tramo sin URLs propias: solo copias de otras categorías, no hace falta un worker
+                        open(part_path(parts_dir, shard), "w").close()
+                        finished[(shard.category, shard.part)] = (shard, {
+                            "posts": 0, "wall_seconds": 0.0, "stages": {}, "part_path": part_path(parts_dir, shard)})
+            
+            # Entregar en orden todo lo que ya terminó
+            while next_category < len(categories):
+                category = categories[next_category]
+                if category not in parts_of or (category, next_part) not in finished:
+                    break
+                shard, report = finished.pop((category, next_part))
+                tramo = tramos.get((category, next_part), ())
+                if "error" not in report and any(owners[url] != category for url in tramo):
+                    try:
+                        report["posts"] = merge_shared(report["part_path"], category, tramo, owners, shared_records)
+                    except KeyError as e:
+                        report["error"] = f"Falta el post {e} (falló el tramo de otra categoría que lo extraía)"
+                yield shard, report
+                next_part += 1
+                if next_part >= parts_of[category]:
+                    next_category, next_part = next_category + 1, 0
+    finally:
+        # Los workers que siguen corriendo se detienen en su próximo punto de control
+        cancel_event.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def iter_sharded_posts(categories: List[str], options: Optional[ShardOptions] = None,
+                       workers: Optional[int] = None, worker_memory_mb: int = 700,
+                       on_report: Optional[Callable[[Shard, Dict[str, Any]], None]] = None,
+                       is_cancelled: Optional[Callable[[], bool]] = None
+                       ) -> Iterator[Dict[str, str]]:
+    """
+    Posts de `categories` extraídos con `run_shards`, en orden determinista.
+    
+    Raises:
+        RuntimeError: Si algún shard falló (los posts ya entregados quedan entregados)
+        JobCancelled: Si `is_cancelled` devuelve True mientras se espera a los shards
+    """
+    with tempfile.TemporaryDirectory(prefix="xepelin-shards-") as parts_dir:
+        for shard, report in run_shards(categories, parts_dir, options, workers, worker_memory_mb, on_report,
+                                        is_cancelled):
+            if "error" in report:
+                raise RuntimeError(f"Falló el tramo {shard.part} de {shard.category}: {report['error']}")
+            with open(report["part_path"], encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+            os.remove(report["part_path"])
@@ -4,11 +4,16 @@ Google Sheets integration for storing scraped blog data
 
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
-from typing import List, Dict
+from typing import List, Dict, Optional, Set
 import json
 import os
+import random
+import time
 from datetime import datetime
 
+from metrics import FAILURES, timed
+from post_sinks import PostSink
+
 
 class GoogleSheetsManager:
     """Manages Google Sheets operations for blog data"""
@@ -27,17 +32,32 @@ class GoogleSheetsManager:
         'URL'
     ]
     
-    def __init__(self, credentials_json: str = None):
+    # Rate limits (429) and transient server errors are retried. A 429 is rejected before the
+    # request runs, but a 5xx may arrive after the server already committed it, so calls that
+    # are not idempotent (create, position-based batch_update) only retry 429
+    RETRY_STATUSES = (429, 500, 503)
+    REJECTED_STATUSES = (429,)
+    
+    def __init__(self, credentials_json: str = None, client=None, max_retries: int = None,
+                 retry_base_seconds: float = 1.0, retry_max_seconds: float = 64.0):
         """
         Initialize Google Sheets manager
         
         Args:
             credentials_json: JSON string with Google API credentials
                             or path to credentials file
+            client: Already authorized gspread client (skips authorization)
+            max_retries: Retries per API call on 429/5xx (default SHEETS_MAX_RETRIES or 6)
+            retry_base_seconds: First backoff delay, doubled on every retry
+            retry_max_seconds: Upper bound for a single backoff delay
         """
         self.credentials_json = credentials_json or os.getenv('GOOGLE_CREDENTIALS_JSON')
-        self.client = None
-        self._authorize()
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('SHEETS_MAX_RETRIES', '6'))
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.client = client
+        if self.client is None:
+            self._authorize()
     
     def _authorize(self):
         """Authorize with Google Sheets API"""
@@ -66,6 +86,33 @@ class GoogleSheetsManager:
             print(f"Error authorizing with Google Sheets: {e}")
             raise
     
+    def _call(self, function, *args, idempotent: bool = True, **kwargs):
+        """
+        Call the Sheets API, retrying rate limits and transient errors with exponential backoff
+        
+        Args:
+            function: gspread method to call
+            *args, **kwargs: Arguments for the call
+            idempotent: False for calls that must not run twice (only rejected calls are retried)
+        
+        Returns:
+            Whatever the call returns
+        """
+        retry_statuses = self.RETRY_STATUSES if idempotent else self.REJECTED_STATUSES
+        for attempt in range(self.max_retries + 1):
+            try:
+                return function(*args, **kwargs)
+            except gspread.exceptions.APIError as e:
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                if status not in retry_statuses or attempt == self.max_retries:
+                    raise
+                FAILURES.inc(stage="sheets_retry")
+                # Full jitter keeps concurrent writers from retrying in lockstep
+                delay = random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2 ** attempt))
+                print(f"Sheets API answered {status}, retrying in {delay:.1f}s "
+                      f"({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+    
     def create_spreadsheet(self, title: str = None) -> str:
         """
         Create a new Google Spreadsheet
@@ -80,10 +127,10 @@ class GoogleSheetsManager:
             title = f"Xepelin Blog Data - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
         
         try:
-            spreadsheet = self.client.create(title)
+            spreadsheet = self._call(self.client.create, title, idempotent=False)
             
             # Make it publicly readable
-            spreadsheet.share('', perm_type='anyone', role='reader')
+            self._call(spreadsheet.share, '', perm_type='anyone', role='reader')
             
             url = spreadsheet.url
             print(f"Created spreadsheet: {url}")
@@ -136,19 +183,11 @@ class GoogleSheetsManager:
             # Prepare data
             data = [self.HEADERS]
             
-            for post in posts:
-                row = [
-                    post.get('Titular', 'N/A'),
-                    post.get('Categoría', 'N/A'),
-                    post.get('Autor', 'N/A'),
-                    post.get('Tiempo de lectura', 'N/A'),
-                    post.get('Fecha de publicación', 'N/A'),
-                    post.get('URL', 'N/A')
-                ]
-                data.append(row)
+            data.extend(self._post_to_row(post) for post in posts)
             
             # Write to sheet
-            worksheet.update('A1', data)
+            with timed("sheets_write"):
+                worksheet.update('A1', data)
             
             # Format header row
             worksheet.format('A1:F1', {
@@ -176,6 +215,10 @@ class GoogleSheetsManager:
         """
         Write multiple categories to different worksheets
         
+        Every category sheet is cleared and rewritten. Sheet creation, clearing, values,
+        header formatting, column resizing and removal of stale sheets go in a single
+        batch_update after one worksheets() listing.
+        
         Args:
             categories_data: Dictionary mapping category names to lists of posts
             spreadsheet_url: URL of existing spreadsheet (creates new if None)
@@ -185,78 +228,46 @@ class GoogleSheetsManager:
         """
         try:
             # Create or open spreadsheet
-            if spreadsheet_url:
-                spreadsheet = self.client.open_by_url(spreadsheet_url)
-            else:
+            if not spreadsheet_url:
                 title = f"Xepelin Blog - All Categories - {datetime.now().strftime('%Y-%m-%d')}"
                 spreadsheet_url = self.create_spreadsheet(title)
-                spreadsheet = self.client.open_by_url(spreadsheet_url)
+            spreadsheet = self._call(self.client.open_by_url, spreadsheet_url)
             
-            # Primero: Obtener lista de hojas existentes ANTES de escribir
-            existing_sheets_before = {ws.title for ws in spreadsheet.worksheets()}
-            categories_to_write = set(categories_data.keys())
+            worksheets = {ws.title: ws for ws in self._call(spreadsheet.worksheets)}
+            sheets_to_keep = {category[:30] for category in categories_data}  # Google Sheets has 31 char limit
             
-            # Write each category to its own sheet
+            requests = []
+            next_sheet_id = max((ws.id for ws in worksheets.values()), default=0) + 1
+            created = False
             for category_name, posts in categories_data.items():
                 if not posts:
                     continue
                 
-                sheet_title = category_name[:30]  # Google Sheets has 31 char limit
-                
+                sheet_title = category_name[:30]
+                rows = [self._post_to_row(post) for post in posts]
                 print(f"Writing {len(posts)} posts for category: {category_name}")
                 
-                try:
-                    worksheet = spreadsheet.worksheet(sheet_title)
-                    worksheet.clear()
-                except gspread.exceptions.WorksheetNotFound:
-                    worksheet = spreadsheet.add_worksheet(
-                        title=sheet_title,
-                        rows=len(posts) + 10,
-                        cols=10
-                    )
-                
-                # Prepare data
-                data = [self.HEADERS]
-                for post in posts:
-                    row = [
-                        post.get('Titular', 'N/A'),
-                        post.get('Categoría', 'N/A'),
-                        post.get('Autor', 'N/A'),
-                        post.get('Tiempo de lectura', 'N/A'),
-                        post.get('Fecha de publicación', 'N/A'),
-                        post.get('URL', 'N/A')
-                    ]
-                    data.append(row)
-                
-                # Write to sheet
-                worksheet.update('A1', data)
-                
-                # Format header
-                worksheet.format('A1:F1', {
-                    'textFormat': {'bold': True},
-                    'backgroundColor': {'red': 0.2, 'green': 0.6, 'blue': 0.86}
-                })
-                
-                worksheet.columns_auto_resize(0, 5)
+                worksheet = worksheets.get(sheet_title)
+                if worksheet is None:
+                    requests.extend(self._new_sheet_requests(next_sheet_id, sheet_title, rows))
+                    next_sheet_id += 1
+                    created = True
+                else:
+                    requests.extend(self._grid_requests(worksheet, len(rows) + 1))
+                    requests.extend([
+                        # Clear values only, like Worksheet.clear()
+                        {"updateCells": {"range": {"sheetId": worksheet.id}, "fields": "userEnteredValue"}},
+                        self._update_cells(worksheet.id, 0, [self.HEADERS] + rows),
+                        self._header_format(worksheet.id),
+                        self._auto_resize(worksheet.id)
+                    ])
             
             # Borrar hojas que NO están en las categorías escritas
-            # Esto asegura que solo queden las hojas solicitadas
-            try:
-                all_worksheets = spreadsheet.worksheets()
-                sheets_to_keep = {cat[:30] for cat in categories_to_write}  # Truncar a 30 chars
-                
-                for ws in all_worksheets:
-                    # Borrar si NO está en las categorías a mantener
-                    if ws.title not in sheets_to_keep:
-                        try:
-                            spreadsheet.del_worksheet(ws)
-                            print(f"Deleted old worksheet: {ws.title}")
-                        except Exception as e:
-                            # Ignorar error si es la última hoja (Google no permite borrar todas)
-                            if "can't remove all the sheets" not in str(e).lower():
-                                print(f"Warning: Could not delete {ws.title}: {e}")
-            except Exception as e:
-                print(f"Warning: Could not clean up worksheets: {e}")
+            requests.extend(self._stale_sheet_requests(worksheets, sheets_to_keep, created))
+            
+            if requests:
+                with timed("sheets_write"):
+                    self._call(spreadsheet.batch_update, {"requests": requests}, idempotent=False)
             
             clean_url = self._clean_sheet_url(spreadsheet.url)
             print(f"Successfully wrote all categories to Google Sheet: {clean_url}")
@@ -267,6 +278,221 @@ class GoogleSheetsManager:
             print(f"Error writing multiple categories: {e}")
             raise
     
+    def sync_multiple_categories(self, categories_data: Dict[str, List[Dict[str, str]]],
+                                 spreadsheet_url: str = None) -> str:
+        """
+        Write multiple categories by diffing against what the sheet already holds
+        
+        Reads every category worksheet in one request, computes a row-level diff keyed by
+        URL and sends all inserts, updates and deletes in a single batch_update. Unchanged
+        rows are not touched and readers never see an emptied sheet.
+        
+        Args:
+            categories_data: Dictionary mapping category names to lists of posts
+            spreadsheet_url: URL of existing spreadsheet (creates new if None)
+        
+        Returns:
+            Spreadsheet URL (cleaned)
+        """
+        if not spreadsheet_url:
+            # A brand new spreadsheet has nothing to diff against
+            return self.write_multiple_categories(categories_data, spreadsheet_url)
+        
+        try:
+            spreadsheet = self._call(self.client.open_by_url, spreadsheet_url)
+            worksheets = {ws.title: ws for ws in self._call(spreadsheet.worksheets)}
+            sheets_to_keep = {category[:30] for category in categories_data}  # Google Sheets has 31 char limit
+            
+            to_write = {category[:30]: [self._post_to_row(post) for post in posts]
+                        for category, posts in categories_data.items() if posts}
+            with timed("sheets_read"):
+                current = self._read_sheets(spreadsheet, [title for title in to_write if title in worksheets])
+            
+            requests = []
+            stats = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+            next_sheet_id = max((ws.id for ws in worksheets.values()), default=0) + 1
+            created = False
+            for title, rows in to_write.items():
+                if title in worksheets:
+                    worksheet = worksheets[title]
+                    requests.extend(self._grid_requests(worksheet, 0))
+                    requests.extend(self._diff_requests(worksheet.id, worksheet.row_count,
+                                                        current.get(title, []), rows, stats))
+                else:
+                    print(f"Creating worksheet: {title}")
+                    requests.extend(self._new_sheet_requests(next_sheet_id, title, rows))
+                    stats["inserted"] += len(rows)
+                    next_sheet_id += 1
+                    created = True
+            
+            requests.extend(self._stale_sheet_requests(worksheets, sheets_to_keep, created))
+            
+            if requests:
+                with timed("sheets_write"):
+                    self._call(spreadsheet.batch_update, {"requests": requests}, idempotent=False)
+            
+            clean_url = self._clean_sheet_url(spreadsheet.url)
+            print(f"Synced Google Sheet in {1 if requests else 0} write request(s): "
+                  f"{stats['inserted']} inserted, {stats['updated']} updated, "
+                  f"{stats['deleted']} deleted, {stats['unchanged']} unchanged")
+            return clean_url
+        
+        except Exception as e:
+            print(f"Error syncing categories: {e}")
+            raise
+    
+    def _read_sheets(self, spreadsheet, titles: List[str]) -> Dict[str, List[List[str]]]:
+        """
+        Read the current values of several worksheets in a single request
+        
+        Args:
+            spreadsheet: gspread Spreadsheet
+            titles: Worksheet titles
+        
+        Returns:
+            Rows of each worksheet (header included), keyed by title
+        """
+        if not titles:
+            return {}
+        ranges = []
+        for title in titles:
+            quoted = title.replace("'", "''")
+            ranges.append(f"'{quoted}'!A:{chr(ord('A') + len(self.HEADERS) - 1)}")
+        response = self._call(spreadsheet.values_batch_get, ranges)
+        return {title: value_range.get("values", [])
+                for title, value_range in zip(titles, response.get("valueRanges", []))}
+    
+    def _diff_requests(self, sheet_id: int, row_count: int, current: List[List[str]],
+                       rows: List[List[str]], stats: Dict[str, int]) -> List[dict]:
+        """
+        Build the batch_update requests that turn a worksheet's rows into `rows`
+        
+        Rows are matched by URL. Existing rows keep their place; new ones are inserted right
+        after the row that precedes them in `rows`. Deletes go first, bottom-up, so the
+        indexes of the inserts and updates that follow are computed on the final layout.
+        
+        Args:
+            sheet_id: Worksheet id
+            row_count: Current grid size of the worksheet
+            current: Current values, header included
+            rows: Desired data rows (without header)
+            stats: Counters updated with inserted/updated/deleted/unchanged rows
+        
+        Returns:
+            Requests for Spreadsheet.batch_update
+        """
+        layout = SheetLayout(self, sheet_id, row_count, current)
+        url_column = self.HEADERS.index('URL')
+        requests = layout.header_requests()
+        requests.extend(layout.delete_rows({row[url_column] for row in rows}))
+        requests.extend(layout.upsert(rows))
+        for key, value in layout.stats.items():
+            stats[key] += value
+        return requests
+    
+    def _new_sheet_requests(self, sheet_id: int, title: str, rows: List[List[str]]) -> List[dict]:
+        """Requests that create a formatted worksheet holding `rows`"""
+        return [
+            {"addSheet": {"properties": {
+                "sheetId": sheet_id, "title": title,
+                "gridProperties": {"rowCount": len(rows) + 10, "columnCount": 10}}}},
+            self._update_cells(sheet_id, 0, [self.HEADERS] + rows),
+            self._header_format(sheet_id),
+            self._auto_resize(sheet_id)
+        ]
+    
+    def _grid_requests(self, worksheet, rows_needed: int) -> List[dict]:
+        """
+        Requests that grow a worksheet's grid; updateCells, unlike values.update, does not
+        expand the grid by itself
+        
+        Args:
+            worksheet: gspread Worksheet
+            rows_needed: Rows the data will take (header included)
+        """
+        requests = []
+        if worksheet.row_count < rows_needed:
+            requests.append({"appendDimension": {
+                "sheetId": worksheet.id, "dimension": "ROWS", "length": rows_needed - worksheet.row_count}})
+        if worksheet.col_count < len(self.HEADERS):
+            requests.append({"appendDimension": {
+                "sheetId": worksheet.id, "dimension": "COLUMNS", "length": len(self.HEADERS) - worksheet.col_count}})
+        return requests
+    
+    @staticmethod
+    def _stale_sheet_requests(worksheets: Dict[str, object], sheets_to_keep: set, created: bool) -> List[dict]:
+        """
+        deleteSheet requests for worksheets of categories that were not requested
+        
+        Args:
+            worksheets: Existing worksheets by title
+            sheets_to_keep: Titles of the requested categories
+            created: Whether the same batch adds new worksheets
+        """
+        stale = [ws for title, ws in worksheets.items() if title not in sheets_to_keep]
+        # Google refuses to delete every sheet of a spreadsheet
+        if len(stale) == len(worksheets) and not created:
+            stale = stale[1:]
+        for ws in stale:
+            print(f"Deleting old worksheet: {ws.title}")
+        return [{"deleteSheet": {"sheetId": ws.id}} for ws in stale]
+    
+    @staticmethod
+    def _update_cells(sheet_id: int, row_index: int, rows: List[List[str]]) -> dict:
+        """updateCells request writing `rows` as plain strings starting at `row_index`"""
+        return {"updateCells": {
+            "start": {"sheetId": sheet_id, "rowIndex": row_index, "columnIndex": 0},
+            "rows": [{"values": [{"userEnteredValue": {"stringValue": str(value)}} for value in row]}
+                     for row in rows],
+            "fields": "userEnteredValue"
+        }}
+    
+    def _auto_resize(self, sheet_id: int) -> dict:
+        """autoResizeDimensions request for the data columns"""
+        return {"autoResizeDimensions": {"dimensions": {
+            "sheetId": sheet_id, "dimension": "COLUMNS", "startIndex": 0, "endIndex": len(self.HEADERS)}}}
+    
+    def _header_format(self, sheet_id: int) -> dict:
+        """repeatCell request with the header style (bold, blue background)"""
+        return {"repeatCell": {
+            "range": {"sheetId": sheet_id, "startRowIndex": 0, "endRowIndex": 1,
+                      "startColumnIndex": 0, "endColumnIndex": len(self.HEADERS)},
+            "cell": {"userEnteredFormat": {
+                "textFormat": {"bold": True},
+                "backgroundColor": {"red": 0.2, "green": 0.6, "blue": 0.86}}},
+            "fields": "userEnteredFormat(textFormat,backgroundColor)"
+        }}
+    
+    @staticmethod
+    def _contiguous(indexes: List[int]) -> List[tuple]:
+        """Group sorted row indexes into (start, end) half-open ranges"""
+        ranges = []
+        for index in indexes:
+            if ranges and ranges[-1][1] == index:
+                ranges[-1] = (ranges[-1][0], index + 1)
+            else:
+                ranges.append((index, index + 1))
+        return ranges
+    
+    def _post_to_row(self, post: Dict[str, str]) -> List[str]:
+        """
+        Convert a post dictionary to a sheet row in HEADERS order
+        
+        Args:
+            post: Blog post dictionary (the scraper stores the date under 'Fecha')
+        
+        Returns:
+            Row values
+        """
+        return [
+            post.get('Titular', 'N/A'),
+            post.get('Categoría', 'N/A'),
+            post.get('Autor', 'N/A'),
+            post.get('Tiempo de lectura', 'N/A'),
+            post.get('Fecha de publicación', post.get('Fecha', 'N/A')),
+            post.get('URL', 'N/A')
+        ]
+    
     def _clean_sheet_url(self, url: str) -> str:
         """
         Clean Google Sheets URL by removing edit parameters
@@ -284,6 +510,259 @@ class GoogleSheetsManager:
         return url
 
 
+
+class SheetLayout:
+    """
+    Rows of one worksheet keyed by URL, as the next batch_update request will see them
+    
+    Every request built here is computed on the layout left by the previous ones, so a
+    list of them can be sent in a single batch_update (requests are applied in order).
+    """
+    
+    def __init__(self, manager: GoogleSheetsManager, sheet_id: int, row_count: int, current: List[List[str]]):
+        """
+        Args:
+            manager: Manager that builds the cell requests
+            sheet_id: Worksheet id
+            row_count: Current grid size of the worksheet
+            current: Current values, header included
+        """
+        self.manager = manager
+        self.sheet_id = sheet_id
+        self.row_count = row_count
+        self.width = len(manager.HEADERS)
+        self.url_column = manager.HEADERS.index('URL')
+        current = [(list(row) + [''] * self.width)[:self.width] for row in current]
+        self.header_ok = bool(current) and current[0] == manager.HEADERS
+        # URL of each data row in sheet order; None marks rows without URL or duplicated
+        self.order: List[Optional[str]] = []
+        self.values: Dict[str, List[str]] = {}
+        for row in current[1:]:
+            url = row[self.url_column]
+            if url and url not in self.values:
+                self.order.append(url)
+                self.values[url] = row
+            else:
+                self.order.append(None)
+        self.stats = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    
+    def header_requests(self) -> List[dict]:
+        """Write and format the header row if the sheet does not have it"""
+        if self.header_ok:
+            return []
+        self.header_ok = True
+        return [self.manager._update_cells(self.sheet_id, 0, [self.manager.HEADERS]),
+                self.manager._header_format(self.sheet_id)]
+    
+    def delete_rows(self, keep: Set[str]) -> List[dict]:
+        """
+        Delete the rows whose URL is not in `keep` (and rows without URL or duplicated)
+        
+        Args:
+            keep: URLs that stay in the sheet
+        """
+        deleted = [index for index, url in enumerate(self.order, start=1) if url is None or url not in keep]
+        requests = [{"deleteDimension": {"range": {
+                        "sheetId": self.sheet_id, "dimension": "ROWS", "startIndex": start, "endIndex": end}}}
+                    for start, end in reversed(self.manager._contiguous(deleted))]
+        for index in reversed(deleted):
+            url = self.order.pop(index - 1)
+            self.values.pop(url, None)
+        self.row_count -= len(deleted)
+        self.stats["deleted"] += len(deleted)
+        return requests
+    
+    def upsert(self, rows: List[List[str]], after: Optional[str] = None) -> List[dict]:
+        """
+        Update changed rows in place and insert new ones after their predecessor in `rows`
+        
+        Args:
+            rows: Data rows in listing order
+            after: URL of the row that precedes rows[0] (None inserts new leading rows at the top)
+        """
+        requests = []
+        position = self.order.index(after) + 1 if after in self.values else 0  # Next insert goes here
+        pending: List[List[str]] = []
+        
+        def flush() -> None:
+            nonlocal position
+            if not pending:
+                return
+            start = position + 1  # Header is row 0
+            if start < self.row_count:
+                requests.append({"insertDimension": {"range": {
+                    "sheetId": self.sheet_id, "dimension": "ROWS", "startIndex": start, "endIndex": start + len(pending)},
+                    "inheritFromBefore": False}})
+            else:
+                requests.append({"appendDimension": {
+                    "sheetId": self.sheet_id, "dimension": "ROWS", "length": start + len(pending) - self.row_count}})
+            requests.append(self.manager._update_cells(self.sheet_id, start, pending))
+            self.order[position:position] = [row[self.url_column] for row in pending]
+            for row in pending:
+                self.values[row[self.url_column]] = row
+            self.row_count = max(self.row_count, start) + len(pending)
+            self.stats["inserted"] += len(pending)
+            position += len(pending)
+            pending.clear()
+        
+        for row in rows:
+            url = row[self.url_column]
+            if url in self.values:
+                flush()
+                position = self.order.index(url) + 1
+                if self.values[url] == row:
+                    self.stats["unchanged"] += 1
+                else:
+                    requests.append(self.manager._update_cells(self.sheet_id, position, [row]))
+                    self.values[url] = row
+                    self.stats["updated"] += 1
+            elif all(queued[self.url_column] != url for queued in pending):
+                pending.append(row)
+        flush()
+        return requests
+
+
+# Writes made by the sinks of this process to each spreadsheet (by URL): a sink that sees
+# the count move between two of its batches knows another job wrote and re-reads the sheets
+_revisions: Dict[str, int] = {}
+
+
+class SheetsSink(PostSink):
+    """
+    Stream posts into one worksheet per category as they are scraped
+    
+    Every micro-batch is upserted by URL in one batch_update: changed rows are updated in
+    place and new rows are inserted after the previous post of the same category, so the
+    sheet fills up while the scrape runs and is never emptied. On close, rows whose URL
+    was not streamed are deleted, together with the worksheets of categories that were
+    not requested.
+    
+    Jobs sharing a spreadsheet only need to hold its lock per batch (see StreamingWriter):
+    if another sink wrote since this one's last batch, the layouts are read again first.
+    """
+    
+    def __init__(self, manager: GoogleSheetsManager, spreadsheet_url: str = None,
+                 categories: Optional[List[str]] = None):
+        """
+        Args:
+            manager: Authorized Google Sheets manager
+            spreadsheet_url: URL of existing spreadsheet (creates new on the first batch if None)
+            categories: Requested categories; their sheets are read in one request and every
+                        other worksheet is deleted on close (None keeps all worksheets)
+        """
+        self.manager = manager
+        self.spreadsheet_url = spreadsheet_url
+        self.categories = categories
+        self.url: Optional[str] = None
+        self.spreadsheet = None
+        self._worksheets: Dict[str, object] = {}
+        self._layouts: Dict[str, SheetLayout] = {}
+        self._streamed: Dict[str, Set[str]] = {}
+        self._last_url: Dict[str, str] = {}
+        self._created: Set[str] = set()
+        self._next_sheet_id = 1
+        self._revision = 0
+        self._stats = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+    
+    def _open(self) -> None:
+        """Open (or create) the spreadsheet and read the requested sheets once"""
+        if not self.spreadsheet_url:
+            title = f"Xepelin Blog - All Categories - {datetime.now().strftime('%Y-%m-%d')}"
+            self.spreadsheet_url = self.manager.create_spreadsheet(title)
+        self.spreadsheet = self.manager._call(self.manager.client.open_by_url, self.spreadsheet_url)
+        self.url = self.manager._clean_sheet_url(self.spreadsheet.url)
+        self._revision = _revisions.get(self.url, 0)
+        self._load_worksheets()
+        self._read([category[:30] for category in self.categories or []])
+    
+    def _load_worksheets(self) -> None:
+        self._worksheets = {ws.title: ws for ws in self.manager._call(self.spreadsheet.worksheets)}
+        self._next_sheet_id = max((ws.id for ws in self._worksheets.values()), default=0) + 1
+    
+    def _refresh(self) -> None:
+        """Read the worksheets and layouts again if another sink wrote since the last batch"""
+        if _revisions.get(self.url, 0) == self._revision:
+            return
+        titles = list(self._layouts)
+        for layout in self._layouts.values():
+            for key, value in layout.stats.items():
+                self._stats[key] += value
+        self._layouts = {}
+        self._revision = _revisions.get(self.url, 0)
+        self._load_worksheets()
+        self._read(titles)
+    
+    def _send(self, requests: List[dict]) -> None:
+        with timed("sheets_write"):
+            self.manager._call(self.spreadsheet.batch_update, {"requests": requests},
+                              idempotent=False)
+        self._revision = _revisions[self.url] = _revisions.get(self.url, 0) + 1
+    
+    def _read(self, titles: List[str]) -> None:
+        """Build the layouts of existing worksheets (one values_batch_get for all of them)"""
+        titles = [title for title in titles if title in self._worksheets and title not in self._layouts]
+        with timed("sheets_read"):
+            current = self.manager._read_sheets(self.spreadsheet, titles)
+        for title in titles:
+            worksheet = self._worksheets[title]
+            self._layouts[title] = SheetLayout(self.manager, worksheet.id, worksheet.row_count, current.get(title, []))
+    
+    def write_batch(self, category: str, posts: List[Dict[str, str]]) -> None:
+        if self.spreadsheet is None:
+            self._open()
+        else:
+            self._refresh()
+        
+        title = category[:30]  # Google Sheets has 31 char limit
+        requests = []
+        if title not in self._layouts:
+            self._read([title])
+        layout = self._layouts.get(title)
+        if layout is None:
+            print(f"Creating worksheet: {title}")
+            requests.extend(self.manager._new_sheet_requests(self._next_sheet_id, title, []))
+            layout = SheetLayout(self.manager, self._next_sheet_id, 10, [self.manager.HEADERS])
+            self._layouts[title] = layout
+            self._created.add(title)
+            self._next_sheet_id += 1
+        elif title in self._worksheets and title not in self._streamed:
+            requests.extend(self.manager._grid_requests(self._worksheets[title], 0))
+        
+        rows = [self.manager._post_to_row(post) for post in posts]
+        requests.extend(layout.header_requests())
+        requests.extend(layout.upsert(rows, after=self._last_url.get(title)))
+        self._streamed.setdefault(title, set()).update(row[layout.url_column] for row in rows)
+        self._last_url[title] = rows[-1][layout.url_column]
+        
+        if requests:
+            self._send(requests)
+    
+    def close(self) -> Optional[str]:
+        if self.spreadsheet is None:
+            return None
+        
+        self._refresh()
+        requests = []
+        # A sheet deleted by another job meanwhile has no layout left
+        for title, urls in self._streamed.items():
+            if title in self._layouts:
+                requests.extend(self._layouts[title].delete_rows(urls))
+        for title in self._created & set(self._layouts):
+            requests.append(self.manager._auto_resize(self._layouts[title].sheet_id))
+        if self.categories is not None:
+            sheets_to_keep = {category[:30] for category in self.categories}
+            requests.extend(self.manager._stale_sheet_requests(self._worksheets, sheets_to_keep,
+                                                               bool(self._created)))
+        if requests:
+            self._send(requests)
+        
+        stats = {key: self._stats[key] + sum(layout.stats[key] for layout in self._layouts.values())
+                 for key in self._stats}
+        print(f"Streamed to Google Sheet: {stats['inserted']} inserted, {stats['updated']} updated, "
+              f"{stats['deleted']} deleted, {stats['unchanged']} unchanged")
+        return self.url
+
+
 if __name__ == "__main__":
     # Test the Google Sheets manager
     print("Testing Google Sheets Manager...")
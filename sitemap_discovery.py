@@ -0,0 +1,292 @@
+"""
+Descubrimiento de posts desde sitemap.xml, índices de sitemaps y feeds RSS/Atom.
+Reemplaza el recorrido del listado con "Cargar más": unas pocas descargas de XML, leídas
+en streaming (cada <url>/<item>/<entry> se procesa y se descarta), dan todas las URLs con
+su fecha de modificación.
+"""
+import gzip
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
+import requests
+
+from metrics import FAILURES, timed
+
+
+class SitemapEntry(NamedTuple):
+    """Post encontrado en un sitemap o feed."""
+    url: str
+    lastmod: Optional[float]  # Epoch en segundos; None si la fuente no la informa
+    title: str
+    categories: Tuple[str, ...]  # Categorías declaradas en el feed (nombres o slugs)
+
+
+def parse_date(value: Optional[str]) -> Optional[float]:
+    """
+    Convierte una fecha de sitemap (ISO 8601) o de RSS (RFC 822) a epoch.
+    
+    Args:
+        value: Texto de <lastmod>, <pubDate>, <updated> o <published>
+    
+    Returns:
+        Segundos desde 1970, o None si no se pudo interpretar
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _local(tag: str) -> str:
+    """Nombre de un tag sin su namespace ("{ns}loc" -> "loc")."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child_text(element: ET.Element, name: str) -> str:
+    """Texto del primer hijo `name` (sin namespace), o "" si no existe."""
+    for child in element:
+        if _local(child.tag) == name:
+            return (child.text or "").strip()
+    return ""
+
+
+class SitemapDiscovery:
+    """
+    Lee los sitemaps (declarados en robots.txt o en /sitemap.xml) y los feeds del blog
+    una sola vez por instancia, y reparte las URLs de posts entre las categorías.
+    Una URL pertenece a una categoría si su ruta es <blog>/<slug>/<post> o si el feed
+    la etiqueta con el nombre o el slug de la categoría.
+    """
+    
+    SITEMAP_PATHS = ("/sitemap.xml",)
+    FEED_PATHS = ("/blog/rss.xml", "/blog/feed.xml", "/rss.xml", "/feed.xml")
+    MAX_SITEMAPS = 200  # Límite de seguridad para índices anidados
+    
+    def __init__(self, base_url: str, categories: Dict[str, str], session: Optional[requests.Session] = None,
+                 timeout: float = 15.0, sitemap_urls: Optional[List[str]] = None,
+                 feed_urls: Optional[List[str]] = None):
+        """
+        Inicializa el descubrimiento.
+        
+        Args:
+            base_url: URL base del blog (ej: "https://xepelin.com/blog")
+            categories: Nombre de categoría -> slug (XepelinPlaywrightScraper.CATEGORIES)
+            session: Sesión HTTP a reutilizar (se crea una si no se entrega)
+            timeout: Timeout en segundos de cada request
+            sitemap_urls: Sitemaps a leer; por defecto los de robots.txt o /sitemap.xml
+            feed_urls: Feeds RSS/Atom a leer; por defecto FEED_PATHS (los que no existen se ignoran)
+        """
+        self.base_url = base_url.rstrip('/')
+        parsed = urlparse(self.base_url)
+        self.origin = f"{parsed.scheme}://{parsed.netloc}"
+        self.blog_path = parsed.path.rstrip('/')
+        self.categories = categories
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.sitemap_urls = sitemap_urls
+        self.feed_urls = feed_urls if feed_urls is not None else [self.origin + path for path in self.FEED_PATHS]
+        self._entries: Optional[Dict[str, SitemapEntry]] = None
+        self._lock = threading.Lock()
+        
+        # Nombre o slug en minúsculas -> slug
+        self._category_aliases = {}
+        for name, slug in categories.items():
+            self._category_aliases[name.lower()] = slug
+            self._category_aliases[slug.lower()] = slug
+    
+    # ------------------------------------------------------------------ consulta
+    
+    def entries(self) -> Dict[str, SitemapEntry]:
+        """Todas las entradas de posts del blog por URL (se descargan en la primera llamada)."""
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load()
+            return self._entries
+    
+    def category_entries(self, category_slug: str) -> List[SitemapEntry]:
+        """
+        Posts de una categoría, del más reciente al más antiguo (como el listado).
+        
+        Args:
+            category_slug: Slug de la categoría (ej: "pymes")
+        
+        Returns:
+            Entradas de la categoría; vacío si los sitemaps/feeds no permiten resolverla
+        """
+        found = [entry for entry in self.entries().values() if category_slug in self.categories_of(entry)]
+        # Orden estable: primero por fecha descendente, las que no tienen fecha al final
+        found.sort(key=lambda entry: -(entry.lastmod or 0))
+        return found
+    
+    def categories_of(self, entry: SitemapEntry) -> Set[str]:
+        """
+        Slugs de las categorías a las que pertenece una entrada.
+        
+        Args:
+            entry: Entrada de sitemap o feed
+        """
+        slugs = {self._category_aliases[name.lower()] for name in entry.categories
+                 if name.lower() in self._category_aliases}
+        path = urlparse(entry.url).path.rstrip('/')
+        if path.startswith(self.blog_path + '/'):
+            parts = path[len(self.blog_path) + 1:].split('/')
+            if len(parts) >= 2 and parts[0].lower() in self._category_aliases:
+                slugs.add(self._category_aliases[parts[0].lower()])
+        return slugs
+    
+    # ------------------------------------------------------------------ descarga
+    
+    def _load(self) -> Dict[str, SitemapEntry]:
+        """Lee sitemaps y feeds y combina las entradas de posts del blog."""
+        entries: Dict[str, SitemapEntry] = {}
+        pending = list(self.sitemap_urls or self._robots_sitemaps() or
+                       [self.origin + path for path in self.SITEMAP_PATHS])
+        visited = set()
+        
+        with timed("sitemap_discovery"):
+            while pending and len(visited) < self.MAX_SITEMAPS:
+                url = pending.pop(0)
+                if url in visited:
+                    continue
+                visited.add(url)
+                for kind, value in self._read(url):
+                    if kind == "sitemap":
+                        pending.append(urljoin(url, value))
+                    else:
+                        self._merge(entries, value)
+            
+            for url in self.feed_urls:
+                for kind, value in self._read(url, quiet=True):
+                    if kind == "entry":
+                        self._merge(entries, value)
+        
+        print(f"🗺️ {len(entries)} posts encontrados en {len(visited)} sitemap(s) y feeds")
+        return entries
+    
+    def _merge(self, entries: Dict[str, SitemapEntry], entry: SitemapEntry) -> None:
+        """Agrega una entrada del blog, combinando fecha, título y categorías si ya existía."""
+        if not entry.url.startswith(self.base_url + '/'):
+            return
+        known = entries.get(entry.url)
+        if known is None:
+            entries[entry.url] = entry
+            return
+        lastmods = [value for value in (known.lastmod, entry.lastmod) if value is not None]
+        entries[entry.url] = SitemapEntry(
+            url=entry.url,
+            lastmod=max(lastmods) if lastmods else None,
+            title=known.title or entry.title,
+            categories=tuple(dict.fromkeys(known.categories + entry.categories))
+        )
+    
+    def _robots_sitemaps(self) -> List[str]:
+        """URLs declaradas con "Sitemap:" en robots.txt."""
+        try:
+            response = self.session.get(f"{self.origin}/robots.txt", timeout=self.timeout)
+            if response.status_code != 200:
+                return []
+        except requests.RequestException:
+            return []
+        return [line.split(':', 1)[1].strip() for line in response.text.splitlines()
+                if line.lower().startswith("sitemap:")]
+    
+    def _read(self, url: str, quiet: bool = False) -> Iterator[Tuple[str, object]]:
+        """
+        Descarga y parsea en streaming un sitemap, índice de sitemaps o feed.
+        
+        Args:
+            url: URL del documento XML (se descomprime si termina en .gz)
+            quiet: Si True, no reporta documentos inexistentes (feeds opcionales)
+        
+        Yields:
+            ("sitemap", url de un sitemap hijo) o ("entry", SitemapEntry)
+        """
+        try:
+            response = self.session.get(url, timeout=self.timeout, stream=True)
+        except requests.RequestException as e:
+            FAILURES.inc(stage="sitemap")
+            print(f"⚠️ No se pudo descargar {url}: {e}")
+            return
+        
+        with response:
+            if response.status_code != 200:
+                if not quiet:
+                    print(f"⚠️ {url} respondió {response.status_code}")
+                return
+            response.raw.decode_content = True
+            stream = gzip.GzipFile(fileobj=response.raw) if urlparse(url).path.endswith(".gz") else response.raw
+            try:
+                yield from self._parse(stream)
+            except (ET.ParseError, OSError) as e:
+                FAILURES.inc(stage="sitemap")
+                print(f"⚠️ XML inválido en {url}: {e}")
+    
+    @staticmethod
+    def _parse(stream) -> Iterator[Tuple[str, object]]:
+        """
+        Recorre el XML sin cargarlo entero: cada <sitemap>, <url>, <item> o <entry> se
+        procesa al cerrarse y se quita del árbol.
+        
+        Args:
+            stream: Archivo binario con el XML
+        
+        Yields:
+            ("sitemap", loc) o ("entry", SitemapEntry)
+        """
+        stack: List[ET.Element] = []
+        for event, element in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                stack.append(element)
+                continue
+            stack.pop()
+            name = _local(element.tag)
+            
+            if name == "sitemap":
+                loc = _child_text(element, "loc")
+                if loc:
+                    yield "sitemap", loc
+            elif name == "url":
+                loc = _child_text(element, "loc")
+                if loc:
+                    yield "entry", SitemapEntry(loc, parse_date(_child_text(element, "lastmod")), "", ())
+            elif name == "item":
+                # RSS 2.0
+                link = _child_text(element, "link")
+                if link:
+                    categories = tuple((child.text or "").strip() for child in element
+                                       if _local(child.tag) == "category" and child.text)
+                    yield "entry", SitemapEntry(link, parse_date(_child_text(element, "pubDate")),
+                                                _child_text(element, "title"), categories)
+            elif name == "entry":
+                # Atom
+                link = ""
+                categories = []
+                for child in element:
+                    child_name = _local(child.tag)
+                    if child_name == "link" and child.get("rel", "alternate") == "alternate" and not link:
+                        link = child.get("href", "")
+                    elif child_name == "category" and child.get("term"):
+                        categories.append(child.get("term"))
+                if link:
+                    updated = _child_text(element, "updated") or _child_text(element, "published")
+                    yield "entry", SitemapEntry(link, parse_date(updated), _child_text(element, "title"),
+                                                tuple(categories))
+            else:
+                continue
+            
+            # Liberar el elemento ya procesado
+            element.clear()
+            if stack:
+                stack[-1].remove(element)
@@ -0,0 +1,18 @@
+"""
+Configuración de app.py para las pruebas: se fija antes de importarlo, porque el módulo crea
+la caché, los checkpoints, el pool de navegadores y el controlador de memoria al cargarse.
+"""
+import os
+import tempfile
+
+_STATE_DIR = tempfile.mkdtemp(prefix="xepelin-tests-")
+
+for name, value in {
+    "CHECKPOINT_PATH": os.path.join(_STATE_DIR, "checkpoints.sqlite3"),
+    "POST_CACHE_PATH": "",
+    "OUTPUT_DIR": os.path.join(_STATE_DIR, "output"),
+    "SCRAPER_ENGINE": "sync",  # Sin pool: nada lanza Chromium al importar
+    "MEMORY_GOVERNOR": "false",
+    "RESUME_JOBS_ON_STARTUP": "false",
+}.items():
+    os.environ[name] = value
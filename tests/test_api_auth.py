@@ -0,0 +1,75 @@
+"""
+Token de la API (API_TOKEN) en /scrape, /jobs y /outputs, y links de descarga armados solo
+con la URL base configurada: el header Host de un pedido no puede cambiarlos.
+"""
+import os
+
+import pytest
+
+import app
+
+TOKEN = "s3creto"
+
+
+class FakeJob:
+    id = "job-1"
+    status = "queued"
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "output_dir", str(tmp_path))
+    monkeypatch.setattr(app, "submit_scraping_job", lambda *args, **kwargs: (FakeJob(), False))
+    (tmp_path / "pymes.csv").write_text("Titular\nPost 1\n", encoding="utf-8")
+    (tmp_path / "pymes.csv.part").write_text("Titular\n", encoding="utf-8")
+    return app.app.test_client()
+
+
+def scrape(client, **headers):
+    return client.post("/scrape", json={"categoria": "Pymes", "webhook": "https://hook"}, headers=headers)
+
+
+def test_without_api_token_the_endpoints_are_open(client, monkeypatch):
+    monkeypatch.setattr(app, "api_token", "")
+    
+    assert client.get("/outputs/pymes.csv").status_code == 200
+    assert scrape(client).status_code == 202
+
+
+def test_api_token_protects_scrape_jobs_and_outputs(client, monkeypatch):
+    monkeypatch.setattr(app, "api_token", TOKEN)
+    auth = {"Authorization": f"Bearer {TOKEN}"}
+    
+    for headers in ({}, {"Authorization": "Bearer otro"}, {"Authorization": TOKEN}):
+        response = client.get("/outputs/pymes.csv", headers=headers)
+        assert response.status_code == 401 and response.headers["WWW-Authenticate"] == "Bearer"
+        assert scrape(client, **headers).status_code == 401
+        assert client.get("/jobs/job-1", headers=headers).status_code == 401
+        assert client.post("/jobs/job-1/cancel", headers=headers).status_code == 401
+    
+    download = client.get("/outputs/pymes.csv", headers=auth)
+    assert download.status_code == 200 and download.data == b"Titular\nPost 1\n"
+    assert scrape(client, **auth).status_code == 202
+    assert client.get("/jobs/desconocido", headers=auth).status_code == 404
+    assert client.get("/categories").status_code == 200  # Los endpoints informativos siguen abiertos
+
+
+def test_outputs_only_serve_finished_files_inside_the_output_dir(client, monkeypatch):
+    monkeypatch.setattr(app, "api_token", "")
+    
+    assert client.get("/outputs/pymes.csv.part").status_code == 404
+    assert client.get("/outputs/../app.py").status_code == 404
+    assert client.get("/outputs/no-existe.csv").status_code == 404
+
+
+def test_download_links_ignore_the_host_header(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(app, "api_token", "")
+    monkeypatch.setattr(app, "public_url", "")
+    path = os.path.join(str(tmp_path), "all 1.csv")
+    
+    assert scrape(client, Host="atacante.example").status_code == 202
+    
+    assert app.public_url == ""
+    assert app.output_download_url(path) == "/outputs/all%201.csv"
+    monkeypatch.setattr(app, "public_url", "https://api.example")
+    assert app.output_download_url(path) == "https://api.example/outputs/all%201.csv"
@@ -0,0 +1,173 @@
+"""
+BrowserPool (browser_pool.py) con un Playwright falso: un solo lanzamiento compartido, el
+health check que relanza un navegador que no abre contextos o se desconectó, la cancelación
+de un trabajo que vence su timeout y el cierre del pool.
+"""
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+import browser_pool
+from browser_pool import BrowserPool
+
+TIMEOUT = 5
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+    
+    async def close(self):
+        self.browser.open_contexts -= 1
+
+
+class FakeBrowser:
+    def __init__(self, number):
+        self.number = number
+        self.connected = True
+        self.broken = False  # Conectado pero sin poder abrir contextos (Chromium colgado)
+        self.open_contexts = 0
+    
+    def is_connected(self):
+        return self.connected
+    
+    async def new_context(self):
+        if self.broken:
+            raise RuntimeError("Target page, context or browser has been closed")
+        self.open_contexts += 1
+        return FakeContext(self)
+    
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self):
+        self.browsers = []
+        self.fail = False
+    
+    async def launch(self, headless=True, args=None):
+        if self.fail:
+            raise RuntimeError("Executable doesn't exist")
+        self.browsers.append(FakeBrowser(len(self.browsers)))
+        return self.browsers[-1]
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+        self.stopped = False
+    
+    async def start(self):
+        return self
+    
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def playwright(monkeypatch):
+    playwright = FakePlaywright()
+    monkeypatch.setattr(browser_pool, "async_playwright", lambda: playwright)
+    return playwright
+
+
+@pytest.fixture
+def pool(playwright):
+    pool = BrowserPool()
+    yield pool
+    pool.stop()
+
+
+async def browser_number(browser):
+    context = await browser.new_context()
+    await context.close()
+    return browser.number
+
+
+def test_jobs_share_one_browser(pool, playwright):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.run(browser_number, timeout=TIMEOUT)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(TIMEOUT)
+    
+    assert results == [0] * 4
+    assert pool.launches == 1 and len(playwright.chromium.browsers) == 1
+    assert pool.status() == {"running": True, "connected": True, "launches": 1, "active_jobs": 0}
+
+
+def test_unresponsive_browser_is_relaunched_before_the_job(pool, playwright):
+    pool.start()
+    old = playwright.chromium.browsers[0]
+    old.broken = True
+    
+    assert pool.run(browser_number, timeout=TIMEOUT) == 1
+    
+    assert not old.connected and pool.launches == 2
+
+
+def test_disconnected_browser_is_relaunched(pool, playwright):
+    pool.start()
+    playwright.chromium.browsers[0].connected = False
+    
+    assert pool.health_check(timeout=TIMEOUT)
+    
+    assert pool.browser is playwright.chromium.browsers[1]
+    assert pool.status()["connected"]
+
+
+def test_health_check_reports_a_failed_launch(pool, playwright):
+    assert not pool.health_check()  # Sin arrancar
+    pool.start()
+    playwright.chromium.browsers[0].broken = True
+    playwright.chromium.fail = True
+    
+    assert not pool.health_check(timeout=TIMEOUT)
+    
+    playwright.chromium.fail = False
+    assert pool.health_check(timeout=TIMEOUT)
+
+
+def test_timed_out_job_is_cancelled_in_the_pool_loop(pool):
+    started, cancelled = threading.Event(), threading.Event()
+    
+    async def hang(browser):
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    with pytest.raises(concurrent.futures.TimeoutError):
+        pool.run(hang, timeout=0.2)
+    
+    assert started.is_set() and cancelled.wait(TIMEOUT)
+    assert pool.status()["active_jobs"] == 0
+    assert pool.run(browser_number, timeout=TIMEOUT) == 0  # El pool sigue sirviendo
+
+
+def test_job_errors_reach_the_caller(pool):
+    async def fail(browser):
+        raise ValueError("selector no encontrado")
+    
+    with pytest.raises(ValueError):
+        pool.run(fail, timeout=TIMEOUT)
+    
+    assert pool.status()["active_jobs"] == 0
+
+
+def test_stop_closes_everything_and_the_pool_can_start_again(pool, playwright):
+    pool.start()
+    browser = pool.browser
+    
+    pool.stop()
+    
+    assert not browser.connected and playwright.stopped
+    assert pool.status()["running"] is False
+    assert pool.run(browser_number, timeout=TIMEOUT) == 1
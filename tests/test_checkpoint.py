@@ -0,0 +1,191 @@
+"""
+Checkpoints de trabajos (checkpoint.py y su uso en app.py): un reintento retoma los posts ya
+extraídos, un trabajo que siempre falla se abandona tras el límite de intentos y uno terminado
+no deja rastro.
+"""
+import json
+import os
+import time
+from urllib.parse import unquote
+
+import pytest
+
+import app
+from checkpoint import CheckpointStore
+
+PARAMS = {"category": "Pymes", "scrape_all": False, "incremental": False}
+URLS = [f"https://xepelin.com/blog/pymes/post-{i}" for i in range(6)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+
+
+def attempts(store, key):
+    return store._conn.execute("SELECT attempts FROM jobs WHERE key = ?", (key,)).fetchone()["attempts"]
+
+
+def test_reopening_keeps_progress_and_counts_attempts(store):
+    checkpoint = store.open(PARAMS)
+    checkpoint.save_discovered("Pymes", URLS)
+    checkpoint.add_post(URLS[0], {"URL": URLS[0], "Titular": "Uno", "Categoría": "Pymes"})
+    checkpoint.fail("timeout")
+    
+    resumed = store.open(PARAMS)
+    
+    assert resumed.key == checkpoint.key
+    assert resumed.get_discovered() == {"Pymes": URLS}
+    # La categoría no se guarda: un post compartido se copia a cada categoría al retomar
+    assert resumed.completed_posts() == {URLS[0]: {"URL": URLS[0], "Titular": "Uno"}}
+    assert attempts(store, resumed.key) == 2
+
+
+def test_complete_removes_the_checkpoint(store):
+    checkpoint = store.open(PARAMS)
+    checkpoint.add_post(URLS[0], {"URL": URLS[0]})
+    
+    checkpoint.complete()
+    
+    assert store.pending() == []
+    assert store.completed_posts(checkpoint.key) == {}
+
+
+def test_pending_abandons_jobs_at_the_attempt_cap(store):
+    failing = store.open(PARAMS)
+    failing.add_post(URLS[0], {"URL": URLS[0]})
+    failing.fail("boom")
+    store.open(PARAMS).fail("boom")
+    other = store.open(dict(PARAMS, category="Noticias"))
+    
+    assert store.pending(max_attempts=3) == [(failing.key, PARAMS), (other.key, dict(PARAMS, category="Noticias"))]
+    store.open(PARAMS).fail("boom")
+    
+    assert store.pending(max_attempts=3) == [(other.key, dict(PARAMS, category="Noticias"))]
+    assert store.completed_posts(failing.key) == {}
+    # Un pedido nuevo con los mismos parámetros empieza de cero
+    assert attempts(store, store.open(PARAMS).key) == 1
+
+
+def test_pending_abandons_old_jobs(store):
+    old = store.open(PARAMS)
+    store._conn.execute("UPDATE jobs SET created_at = ? WHERE key = ?", (time.time() - 7200, old.key))
+    store._conn.commit()
+    
+    assert store.pending(max_age_seconds=3600) == []
+
+
+def test_checkpoint_key_covers_every_job_key_parameter():
+    base = app.checkpoint_key_params("Pymes")
+    
+    # Trabajos con la clave de antes (hoja nueva, salida a Sheets) conservan su checkpoint
+    assert base == {"category": "Pymes", "scrape_all": False, "incremental": False}
+    variants = [
+        app.checkpoint_key_params("Pymes", sheet_url="https://docs.google.com/spreadsheets/d/a"),
+        app.checkpoint_key_params("Pymes", sheet_url="https://docs.google.com/spreadsheets/d/b"),
+        app.checkpoint_key_params("Pymes", output="jsonl"),
+        app.checkpoint_key_params("Pymes", output="csv"),
+        app.checkpoint_key_params("Pymes", detail_level="listing"),
+        app.checkpoint_key_params("Pymes", incremental=True),
+        app.checkpoint_key_params("Pymes", scrape_all=True),
+    ]
+    keys = {CheckpointStore.job_key(params) for params in [base] + variants}
+    assert len(keys) == len(variants) + 1
+
+
+class FlakyBlog:
+    """Reemplazo de app._stream_blog que falla tras `fail_after` posts nuevos."""
+    
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.extracted = []
+        self.resumed = []
+    
+    def __call__(self, category, scrape_all, incremental, checkpoint, progress, detail_level, writer):
+        done = checkpoint.completed_posts()
+        for url in URLS:
+            if url in done:
+                self.resumed.append(url)
+                writer.put(dict(done[url], Categoría=category))
+                continue
+            if self.fail_after is not None and len(self.extracted) >= self.fail_after:
+                raise RuntimeError("navegador caído")
+            record = {"URL": url, "Titular": url.rsplit("/", 1)[-1], "Categoría": category}
+            checkpoint.add_post(url, record)
+            self.extracted.append(url)
+            writer.put(record)
+
+
+@pytest.fixture
+def job_env(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "checkpoint_store", store)
+    monkeypatch.setattr(app, "output_dir", str(tmp_path / "output"))
+    os.makedirs(app.output_dir)
+    return store
+
+
+def run_job(output="jsonl", sheet_url=None):
+    return app.process_scraping_job("Pymes", "https://hooks.test/a", "a@test.cl", sheet_url=sheet_url,
+                                    output=output)
+
+
+def test_failed_job_is_resumed_and_completed(job_env, monkeypatch):
+    first = FlakyBlog(fail_after=2)
+    monkeypatch.setattr(app, "_stream_blog", first)
+    
+    result, error = run_job()
+    
+    assert result is None and error == "navegador caído"
+    [(key, params)] = job_env.pending()
+    assert params["output"] == "jsonl" and params["webhook_url"] == "https://hooks.test/a"
+    
+    # Al reiniciar se vuelve a encolar con los mismos parámetros
+    submitted = []
+    monkeypatch.setattr(app, "submit_scraping_job", lambda **params: submitted.append(params))
+    app.resume_pending_jobs()
+    assert submitted == [params]
+    
+    second = FlakyBlog()
+    monkeypatch.setattr(app, "_stream_blog", second)
+    result, error = app.process_scraping_job(**submitted[0])
+    
+    assert error is None
+    assert second.resumed == URLS[:2]
+    assert second.extracted == URLS[2:]
+    assert job_env.pending() == []
+    # Cada intento escribe su archivo: el del trabajo reanudado trae cada post una sola vez
+    path = os.path.join(app.output_dir, unquote(result.rsplit("/outputs/", 1)[1]))
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line)["URL"] for line in f] == URLS
+
+
+def test_checkpoint_is_not_resumed_into_another_destination(job_env, monkeypatch):
+    monkeypatch.setattr(app, "_stream_blog", FlakyBlog(fail_after=2))
+    run_job(output="jsonl")
+    
+    other = FlakyBlog()
+    monkeypatch.setattr(app, "_stream_blog", other)
+    result, error = run_job(output="csv")
+    
+    assert error is None
+    assert other.resumed == []
+    assert other.extracted == URLS
+    # El trabajo JSONL sigue pendiente con sus posts
+    [(key, params)] = job_env.pending()
+    assert params["output"] == "jsonl"
+    assert len(job_env.completed_posts(key)) == 2
+
+
+def test_resume_stops_at_the_attempt_cap(job_env, monkeypatch):
+    monkeypatch.setattr(app, "_stream_blog", FlakyBlog(fail_after=0))
+    monkeypatch.setenv("RESUME_MAX_ATTEMPTS", "2")
+    submitted = []
+    monkeypatch.setattr(app, "submit_scraping_job", lambda **params: submitted.append(params))
+    
+    run_job()
+    app.resume_pending_jobs()
+    run_job()
+    app.resume_pending_jobs()
+    
+    assert len(submitted) == 1
+    assert job_env.pending() == []
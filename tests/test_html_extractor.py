@@ -0,0 +1,96 @@
+"""
+Los dos backends de html_extractor.py ("bs4" y "lxml") deben dar exactamente el mismo
+resultado sobre las páginas de benchmarks.fixture_site y sus variantes.
+"""
+import json
+
+import pytest
+
+from benchmarks.fixture_site import FixtureSite
+from html_extractor import HtmlExtractor, LxmlExtractor, SoupExtractor, get_extractor
+
+CATEGORIES = {"Pymes": "pymes", "Noticias": "noticias", "Corporativos": "corporativos"}
+
+
+@pytest.fixture(params=["bs4", "lxml"])
+def parser(request):
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def site():
+    return FixtureSite(CATEGORIES, posts=40, page_size=12, body_kb=2)
+
+
+def both(method, *args):
+    soup, lxml = get_extractor("bs4"), get_extractor("lxml")
+    return getattr(soup, method)(*args), getattr(lxml, method)(*args)
+
+
+def variants(html):
+    """Variantes de una página de post con la fecha y el autor por otros caminos."""
+    head = "</title>"
+    yield "original", html
+    yield "meta", html.replace(head, head + '<meta property="article:published_time" content="2024-05-01T09:00:00Z">')
+    yield "meta sin contenido", html.replace(head, head + '<meta property="article:published_time">')
+    json_ld = json.dumps({"@type": "BlogPosting", "datePublished": "2024-06-01"})
+    yield "json-ld", html.replace(head, head + f'<script type="application/ld+json">{json_ld}</script>')
+    yield "json-ld roto", html.replace(head, head + '<script type="application/ld+json">{no es json</script>')
+    yield "sin autor", html.replace('class="flex gap-2"', 'class="flex"')
+    yield "sin h1", html.replace("<h1>", "<h2>").replace("</h1>", "</h2>")
+    yield "sin lectura", html.replace("Text_body__snVk8", "Text_other")
+
+
+def test_posts_match_between_backends(site):
+    for url in site.expected_urls():
+        html = site.render_post(url[len(site.url("")):])
+        for name, page in variants(html):
+            soup, lxml = both("extract_post", page, url)
+            assert soup == lxml, name
+        assert soup["Titular"] == site.expected_post(url)["Titular"]
+
+
+def test_fixture_post_is_fully_extracted(site):
+    url = site.expected_urls("Noticias")[0]
+    
+    soup, lxml = both("extract_post", site.render_post(url[len(site.url("")):]), url)
+    
+    assert soup == lxml == site.expected_post(url)
+
+
+@pytest.mark.parametrize("variant, field, expected", [
+    ("meta", "Fecha", "2024-05-01T09:00:00Z"),
+    ("json-ld", "Fecha", "2024-06-01"),
+    ("sin autor", "Autor", "N/A"),
+    ("sin lectura", "Tiempo de lectura", "N/A"),
+])
+def test_variants_take_the_other_path(site, parser, variant, field, expected):
+    url = site.expected_urls("Pymes")[0]
+    page = dict(variants(site.render_post(url[len(site.url("")):])))[variant]
+    
+    assert get_extractor(parser).extract_post(page, url)[field] == expected
+
+
+def test_listing_links_match_between_backends(site):
+    for slug in CATEGORIES.values():
+        soup, lxml = both("post_links", site.render_listing(slug))
+        assert soup == lxml
+        assert soup == [site.url(path) for path in site.listings[slug][:12]]
+
+
+def test_empty_and_broken_html():
+    for page in ["", "<html>", "<p>sin cierre", "<h1>Sólo título"]:
+        soup, lxml = both("extract_post", page, "https://xepelin.com/blog/pymes/x")
+        assert soup == lxml, page
+
+
+def test_backends_implement_every_hook():
+    assert isinstance(get_extractor("bs4"), SoupExtractor)
+    assert isinstance(get_extractor("lxml"), LxmlExtractor)
+    
+    class Incomplete(HtmlExtractor):
+        def _parse(self, html):
+            return html
+    
+    with pytest.raises(TypeError):
+        Incomplete()
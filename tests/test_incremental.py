@@ -0,0 +1,126 @@
+"""
+Modo incremental de XepelinPlaywrightScraper contra el contenido de benchmarks.fixture_site:
+el listado se carga hasta el primer post conocido y se combina con el de la ejecución anterior,
+reutilizando los registros guardados sin importar el TTL y sin duplicar URLs.
+"""
+import pytest
+
+from benchmarks.fixture_site import FixtureSite
+from checkpoint import CheckpointStore
+from post_cache import PostCache
+from progress import JobProgress
+from scraper_playwright import XepelinPlaywrightScraper
+
+CATEGORIES = {"Pymes": "pymes", "Noticias": "noticias", "Corporativos": "corporativos"}
+NEW_POSTS = 3  # Posts publicados desde la ejecución anterior
+
+
+@pytest.fixture(scope="module")
+def site():
+    return FixtureSite(CATEGORIES, posts=45, body_kb=1)
+
+
+@pytest.fixture
+def cache(tmp_path, site):
+    """Caché de la ejecución anterior: el listado de Pymes sin sus posts más nuevos."""
+    # TTL 0: ningún registro está vigente, los conocidos se reutilizan igual
+    cache = PostCache(str(tmp_path / "posts.sqlite3"), ttl_seconds=0)
+    known = site.expected_urls("Pymes")[NEW_POSTS:]
+    for url in known:
+        cache.put(url, dict(site.expected_post(url), Categoría="Pymes"))
+    cache.set_category_urls("Pymes", known)
+    yield cache
+    cache.close()
+
+
+class ListingScraper(XepelinPlaywrightScraper):
+    """Scraper cuyo listado se "carga" hasta la primera URL conocida, sin navegador."""
+    
+    def __init__(self, site, **kwargs):
+        super().__init__(**kwargs)
+        self.site = site
+        self.known_urls = []
+    
+    def _discover_listing(self, category_name, known_urls):
+        self.known_urls.append(known_urls)
+        urls = []
+        for url in self.site.expected_urls(category_name):
+            urls.append(url)
+            if url in known_urls:
+                break  # El primer post conocido también llega, como con "Cargar más"
+        return urls, {}
+
+
+def test_merge_reuses_known_records_regardless_of_ttl(site, cache):
+    listing = site.expected_urls("Pymes")
+    known = cache.get_category_urls("Pymes")
+    scraper = XepelinPlaywrightScraper(cache=cache)
+    
+    urls, ready = scraper._merge_incremental(listing[:NEW_POSTS + 1], {}, known)
+    
+    assert urls == listing  # Nuevos primero, sin repetir el conocido que cargó el listado
+    assert set(ready) == set(known)
+    assert all(ready[url] == site.expected_post(url) for url in known)
+    assert all(cache.get_fresh(url) is None for url in known)
+
+
+def test_merge_keeps_ready_records_and_skips_evicted_posts(site, cache, tmp_path):
+    listing = site.expected_urls("Pymes")
+    known = cache.get_category_urls("Pymes")
+    # Caché chica: los posts menos usados se expulsaron pero el listado se conserva
+    small = PostCache(str(tmp_path / "small.sqlite3"), ttl_seconds=0, max_entries=2)
+    for url in known:
+        small.put(url, site.expected_post(url))
+    scraper = XepelinPlaywrightScraper(cache=small)
+    from_listing = {listing[0]: dict(site.expected_post(listing[0]), Titular="Desde __NEXT_DATA__")}
+    
+    urls, ready = scraper._merge_incremental(listing[:NEW_POSTS], from_listing, known)
+    small.close()
+    
+    assert urls == listing
+    assert ready[listing[0]]["Titular"] == "Desde __NEXT_DATA__"
+    assert set(ready) == {listing[0]} | set(known[-2:])  # Los expulsados se vuelven a extraer
+
+
+def test_incremental_discovery_stops_at_known_posts(site, cache):
+    progress = JobProgress()
+    scraper = ListingScraper(site, cache=cache, progress=progress)
+    known = cache.get_category_urls("Pymes")
+    
+    urls, ready = scraper._discover_category("Pymes", incremental=True)
+    
+    assert scraper.known_urls == [set(known)]
+    assert urls == site.expected_urls("Pymes")
+    assert len(urls) == len(set(urls))
+    assert set(ready) == set(known)
+    assert progress.snapshot()["categories"] == {"Pymes": len(urls)}
+
+
+def test_incremental_discovery_is_saved_in_the_checkpoint(site, cache, tmp_path):
+    checkpoint = CheckpointStore(str(tmp_path / "checkpoints.sqlite3")).open({"category": "Pymes"})
+    scraper = ListingScraper(site, cache=cache)
+    
+    urls, ready = scraper._discover_category("Pymes", incremental=True, checkpoint=checkpoint)
+    
+    assert checkpoint.get_discovered() == {"Pymes": urls}
+    assert checkpoint.completed_posts() == ready  # Los conocidos no se re-extraen al retomar
+    assert scraper._discover_category("Pymes", checkpoint=checkpoint) == (urls, {})
+    assert len(scraper.known_urls) == 1  # El segundo intento no vuelve al listado
+
+
+def test_full_discovery_ignores_the_saved_listing(site, cache):
+    scraper = ListingScraper(site, cache=cache)
+    
+    urls, ready = scraper._discover_category("Pymes", incremental=False)
+    
+    assert scraper.known_urls == [set()]
+    assert urls == site.expected_urls("Pymes") and ready == {}
+
+
+def test_first_incremental_run_loads_the_whole_listing(site, cache):
+    scraper = ListingScraper(site, cache=cache)
+    
+    urls, ready = scraper._discover_category("Noticias", incremental=True)
+    
+    assert scraper.known_urls == [set()]
+    assert urls == site.expected_urls("Noticias") and ready == {}
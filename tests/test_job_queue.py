@@ -0,0 +1,177 @@
+"""
+Cola de trabajos (job_queue.py) con una función `run` que se bloquea hasta que la prueba la
+libera: fusión de pedidos idénticos, cola llena (503 + Retry-After en /scrape), cancelación
+de un trabajo en cola que libera su lugar y detención de los workers.
+"""
+import threading
+
+import pytest
+
+from job_queue import JobQueue, QueueFullError
+
+TIMEOUT = 5
+
+
+class Runner:
+    """`run` de JobQueue: cada trabajo espera a `release(key)` y revisa la cancelación."""
+    
+    def __init__(self):
+        self.started = []
+        self.notified = []
+        self._gates = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+    
+    def _gate(self, key):
+        with self._lock:
+            return self._gates.setdefault(key, threading.Event())
+    
+    def __call__(self, job):
+        with self._changed:
+            self.started.append(job.key)
+            self._changed.notify_all()
+        assert self._gate(job.key).wait(TIMEOUT)
+        job.progress.check_cancelled()
+        return f"resultado {job.key}", None
+    
+    def notify(self, job):
+        with self._changed:
+            self.notified.append(job)
+            self._changed.notify_all()
+    
+    def release(self, key):
+        self._gate(key).set()
+    
+    def wait_for(self, predicate):
+        with self._changed:
+            assert self._changed.wait_for(lambda: predicate(self), TIMEOUT)
+
+
+def stop(queue, runner):
+    """Detiene la cola sin dejar trabajos esperando a una liberación que no llega."""
+    queue.shutdown(wait=False)
+    for key in list(runner.started):
+        runner.release(key)
+    queue.shutdown(timeout=TIMEOUT)
+
+
+@pytest.fixture
+def runner():
+    return Runner()
+
+
+@pytest.fixture
+def jobs(runner):
+    queue = JobQueue(run=runner, notify=runner.notify, workers=1, max_pending=1)
+    yield queue
+    stop(queue, runner)
+
+
+def test_identical_requests_share_one_execution(jobs, runner):
+    job, coalesced = jobs.submit("a", {}, ("https://hook/1", "x@y"))
+    runner.wait_for(lambda r: r.started == ["a"])
+    
+    same, joined = jobs.submit("a", {}, ("https://hook/2", "x@y"))
+    again, _ = jobs.submit("a", {}, ("https://hook/2", "x@y"))
+    runner.release("a")
+    runner.wait_for(lambda r: len(r.notified) == 1)
+    
+    assert not coalesced and joined and job is same is again
+    assert job.subscribers == [("https://hook/1", "x@y"), ("https://hook/2", "x@y")]
+    assert job.status == "done" and job.result == "resultado a"
+    # Terminado el trabajo, un pedido igual lanza otra ejecución
+    assert jobs.submit("a", {}, ("https://hook/1", "x@y"))[0] is not job
+
+
+def test_full_queue_rejects_with_retry_after(jobs, runner):
+    jobs.submit("a", {}, ("https://hook", "x@y"))
+    runner.wait_for(lambda r: r.started == ["a"])
+    jobs.submit("b", {}, ("https://hook", "x@y"))
+    
+    with pytest.raises(QueueFullError) as exc:
+        jobs.submit("c", {}, ("https://hook", "x@y"))
+    
+    assert exc.value.retry_after >= 5
+    assert jobs.stats()["running"] == 1 and jobs.stats()["queued"] == 1
+
+
+def test_cancelled_queued_job_frees_its_place(jobs, runner):
+    jobs.submit("a", {}, ("https://hook", "x@y"))
+    runner.wait_for(lambda r: r.started == ["a"])
+    queued, _ = jobs.submit("b", {}, ("https://hook", "x@y"))
+    
+    assert jobs.cancel(queued.id) is queued
+    runner.wait_for(lambda r: queued in r.notified)
+    
+    assert queued.status == "cancelled" and queued.finished_at
+    assert jobs.stats()["queued"] == 0
+    retried, coalesced = jobs.submit("b", {}, ("https://hook", "x@y"))
+    assert not coalesced and retried is not queued
+    
+    runner.release("a")
+    runner.release("b")
+    runner.wait_for(lambda r: len(r.notified) == 3)
+    assert runner.started == ["a", "b"]  # El cancelado nunca se ejecutó
+    assert retried.status == "done"
+
+
+def test_running_job_stops_at_its_next_checkpoint(jobs, runner):
+    job, _ = jobs.submit("a", {}, ("https://hook", "x@y"))
+    runner.wait_for(lambda r: r.started == ["a"])
+    
+    jobs.cancel(job.id)
+    assert job.status == "running"
+    runner.release("a")
+    runner.wait_for(lambda r: job in r.notified)
+    
+    assert job.status == "cancelled" and job.error == "Trabajo cancelado"
+    assert jobs.cancel(job.id) is job  # Ya terminado: no cambia nada
+
+
+def test_shutdown_finishes_the_running_job_and_drops_the_queued_ones(runner):
+    jobs = JobQueue(run=runner, notify=runner.notify, workers=2, max_pending=5)
+    running, _ = jobs.submit("a", {}, ("https://hook", "x@y"))
+    other, _ = jobs.submit("b", {}, ("https://hook", "x@y"))
+    runner.wait_for(lambda r: sorted(r.started) == ["a", "b"])
+    queued, _ = jobs.submit("c", {}, ("https://hook", "x@y"))
+    
+    stopper = threading.Thread(target=jobs.shutdown)
+    stopper.start()
+    runner.wait_for(lambda r: queued in r.notified)
+    with pytest.raises(RuntimeError):
+        jobs.submit("d", {}, ("https://hook", "x@y"))
+    runner.release("a")
+    runner.release("b")
+    stopper.join(TIMEOUT)
+    
+    assert not stopper.is_alive()
+    assert not any(thread.is_alive() for thread in jobs._threads)
+    assert running.status == other.status == "done"
+    assert queued.status == "cancelled" and "c" not in runner.started
+
+
+def test_scrape_answers_503_when_the_queue_is_full(monkeypatch, runner):
+    import app
+    
+    jobs = JobQueue(run=runner, notify=runner.notify, workers=1, max_pending=1)
+    monkeypatch.setattr(app, "job_queue", jobs)
+    client = app.app.test_client()
+    
+    def scrape(category):
+        return client.post("/scrape", json={"categoria": category, "webhook": "https://hook"})
+    
+    try:
+        first = scrape("Pymes")
+        runner.wait_for(lambda r: len(r.started) == 1)
+        second = scrape("Noticias")
+        full = scrape("Corporativos")
+        
+        assert first.status_code == second.status_code == 202
+        assert full.status_code == 503
+        assert int(full.headers["Retry-After"]) == full.get_json()["retry_after"] >= 5
+        
+        cancelled = client.post(f"/jobs/{second.get_json()['job_id']}/cancel")
+        assert cancelled.status_code == 200 and cancelled.get_json()["status"] == "cancelled"
+        assert scrape("Corporativos").status_code == 202
+    finally:
+        stop(jobs, runner)
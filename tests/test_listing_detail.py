@@ -0,0 +1,118 @@
+"""
+Nivel de detalle "listing" de XepelinPlaywrightScraper con el contenido de benchmarks.fixture_site:
+los registros salen de los ya completos, de la caché vigente o de la tarjeta del listado, sin
+visitar ningún post, en el orden del listado y sin guardar los registros parciales.
+"""
+import pytest
+
+from benchmarks.fixture_site import FixtureSite
+from post_cache import PostCache
+from progress import JobProgress
+from scraper_playwright import XepelinPlaywrightScraper
+
+CATEGORIES = {"Pymes": "pymes", "Noticias": "noticias", "Corporativos": "corporativos"}
+
+
+@pytest.fixture(scope="module")
+def site():
+    return FixtureSite(CATEGORIES, posts=45, body_kb=1)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PostCache(str(tmp_path / "posts.sqlite3"))
+    yield cache
+    cache.close()
+
+
+class CardsScraper(XepelinPlaywrightScraper):
+    """
+    Scraper cuyo listado sale de la tarjeta de cada post del sitio de prueba; visitar un post
+    es un error.
+    """
+    
+    def __init__(self, site, untitled=(), **kwargs):
+        super().__init__(**kwargs)
+        self.site = site
+        self.untitled = set(untitled)  # URLs cuya tarjeta llegó sin título
+    
+    def _discover_listing(self, category_name, known_urls):
+        urls = self.site.expected_urls(category_name)
+        for url in urls:
+            title = "" if url in self.untitled else self.site.expected_post(url)["Titular"]
+            self.listing_cards[url] = {"url": url, "title": title, "excerpt": ""}
+        return urls, {}
+    
+    def _iter_fetched(self, urls, ready, checkpoint=None, chunk_size=None):
+        raise AssertionError("El nivel 'listing' no debe visitar posts")
+
+
+def test_listing_posts_prefer_complete_records(site, cache):
+    progress = JobProgress()
+    scraper = CardsScraper(site, cache=cache, progress=progress)
+    urls = site.expected_urls("Pymes")
+    scraper._discover_listing("Pymes", set())
+    ready = {urls[0]: site.expected_post(urls[0])}
+    cache.put(urls[1], site.expected_post(urls[1]))
+    
+    posts = scraper._listing_posts(urls, ready)
+    
+    assert [post["URL"] for post in posts] == urls
+    assert posts[0] is ready[urls[0]]
+    assert posts[1] == site.expected_post(urls[1])  # Vigente en la caché
+    for url, post in zip(urls[2:], posts[2:]):
+        assert post == dict(XepelinPlaywrightScraper._fallback_post(url), Titular=site.expected_post(url)["Titular"])
+    state = progress.snapshot()
+    assert state["posts_total"] == state["posts_extracted"] == len(urls)
+
+
+def test_posts_without_card_title_use_the_slug(site):
+    urls = site.expected_urls("Noticias")[:2]
+    scraper = CardsScraper(site, untitled=urls[:1])
+    scraper._discover_listing("Noticias", set())
+    
+    posts = scraper._listing_posts(urls, {})
+    
+    assert posts[0] == XepelinPlaywrightScraper._fallback_post(urls[0])
+    assert posts[0]["Titular"] == urls[0].rsplit("/", 1)[-1].replace("-", " ").title()
+    assert posts[1]["Titular"] == site.expected_post(urls[1])["Titular"]
+    assert posts[1]["Autor"] == "N/A"
+
+
+def test_stale_cache_entries_are_not_used(site, tmp_path):
+    url = site.expected_urls("Pymes")[0]
+    stale = PostCache(str(tmp_path / "stale.sqlite3"), ttl_seconds=0)
+    stale.put(url, site.expected_post(url))
+    scraper = CardsScraper(site, cache=stale)
+    scraper._discover_listing("Pymes", set())
+    
+    post, = scraper._listing_posts([url], {})
+    stale.close()
+    
+    assert post["Autor"] == "N/A" and post["Titular"] == site.expected_post(url)["Titular"]
+
+
+def test_scrape_category_at_listing_level_does_not_cache_partial_records(site, cache):
+    scraper = CardsScraper(site, cache=cache)
+    
+    posts = scraper.scrape_category("Corporativos", detail_level="listing")
+    
+    assert [post["URL"] for post in posts] == site.expected_urls("Corporativos")
+    assert {post["Categoría"] for post in posts} == {"Corporativos"}
+    assert len(cache) == 0  # Una ejecución "full" posterior los completa
+    assert cache.get_category_urls("Corporativos") == site.expected_urls("Corporativos")
+
+
+def test_scrape_all_categories_at_listing_level(site):
+    scraper = CardsScraper(site)
+    
+    results = scraper.scrape_all_categories(detail_level="listing")
+    
+    for name in CATEGORIES:
+        assert [post["URL"] for post in results[name]] == site.expected_urls(name)
+        assert {post["Categoría"] for post in results[name]} == {name}
+
+
+def test_unknown_detail_level_is_rejected(site):
+    with pytest.raises(ValueError):
+        CardsScraper(site).scrape_category("Pymes", detail_level="summary")
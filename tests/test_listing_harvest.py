@@ -0,0 +1,125 @@
+"""
+Recolección de enlaces del listado (ListingHarvest) con los listados de benchmarks.fixture_site.
+HARVEST_LINKS_JS corre en el navegador, así que la página falsa devuelve resultados con su misma
+forma y reglas (tarjetas sin duplicados, URLs ya enviadas con título omitidas): cada URL se
+incorpora una vez y el título o extracto que falte se completa cuando llega.
+"""
+from urllib.parse import urljoin
+
+import pytest
+from bs4 import BeautifulSoup
+
+from benchmarks.fixture_site import FixtureSite
+from scraper_playwright import ListingHarvest, XepelinPlaywrightScraper
+
+CATEGORIES = {"Pymes": "pymes", "Noticias": "noticias", "Corporativos": "corporativos"}
+
+
+@pytest.fixture(scope="module")
+def site():
+    return FixtureSite(CATEGORIES, posts=60, page_size=6, body_kb=1)
+
+
+class HarvestPage:
+    """Página de listado cuyo `eval_on_selector_all` reproduce HARVEST_LINKS_JS sobre su HTML."""
+    
+    def __init__(self, site, html):
+        self.url = site.url("/blog/pymes")
+        self.html = html
+        self.sent = {}  # key -> URLs ya enviadas con título (window.__listingHarvest)
+    
+    def eval_on_selector_all(self, selector, script, key):
+        assert script == XepelinPlaywrightScraper.HARVEST_LINKS_JS
+        sent = self.sent.setdefault(key, set())
+        
+        def text(root, selector):
+            found = root.select_one(selector)
+            return found.get_text(strip=True) if found else ""
+        
+        links = BeautifulSoup(self.html, "html.parser").select(selector)
+        cards = {}
+        for link in links:
+            raw = link.get("href", "")
+            if not raw.startswith("http") and not raw.startswith("/"):
+                continue
+            url = raw if raw.startswith("http") else urljoin(self.url, raw)
+            if url in sent:
+                continue
+            box = link.find_parent(["article", "li"]) or link
+            card = cards.setdefault(url, {"url": url, "title": "", "excerpt": ""})
+            card["title"] = card["title"] or text(link, "h1, h2, h3, h4") or text(box, "h1, h2, h3, h4")
+            card["excerpt"] = card["excerpt"] or text(link, "p") or text(box, "p")
+        sent.update(url for url, card in cards.items() if card["title"])
+        return {"total": len(links), "cards": list(cards.values())}
+
+
+def test_add_keeps_each_url_once_and_fills_missing_fields():
+    harvest = ListingHarvest()
+    first = {"url": "https://x/blog/pymes/a-1", "title": "", "excerpt": "Resumen"}
+    
+    assert harvest.add({"total": 2, "cards": [first, {"url": "https://x/blog/pymes/b-2", "title": "B",
+                                                      "excerpt": ""}]}) == [first["url"], "https://x/blog/pymes/b-2"]
+    assert harvest.add({"total": 3, "cards": [{"url": first["url"], "title": "A", "excerpt": "Otro"},
+                                              {"url": "https://x/blog/pymes/b-2", "title": "Otro B",
+                                               "excerpt": "Extracto B"}]}) == []
+    
+    assert harvest.seen == 3
+    assert harvest.cards[first["url"]] == {"url": first["url"], "title": "A", "excerpt": "Resumen"}
+    assert harvest.cards["https://x/blog/pymes/b-2"]["title"] == "B"  # El primero no se reemplaza
+    assert harvest.cards["https://x/blog/pymes/b-2"]["excerpt"] == "Extracto B"
+
+
+def test_harvest_matches_the_fixture_listing(site):
+    slug = CATEGORIES["Pymes"]
+    html = site.render_listing(slug)
+    scraper = XepelinPlaywrightScraper()
+    harvest = ListingHarvest()
+    
+    new_urls = scraper._harvest_links(HarvestPage(site, html), harvest)
+    
+    expected = [site.url(path) for path in site.listings[slug][:site.page_size]]
+    assert new_urls == list(harvest.cards) == expected
+    assert new_urls == XepelinPlaywrightScraper.EXTRACTOR.post_links(html)
+    for url in expected:
+        post = site.posts[url[len(site.url("")):]]
+        assert harvest.cards[url] == {"url": url, "title": post["title"], "excerpt": post["author"]}
+
+
+def test_growing_listing_only_sends_new_cards(site):
+    slug = CATEGORIES["Pymes"]
+    shown, more = site.listings[slug][:site.page_size], site.listings[slug][site.page_size:2 * site.page_size]
+    # El destacado enlaza (sin título, con ruta relativa) a un post que aún no cargó su tarjeta
+    hero = f'<a href="{more[0]}">Destacado</a>'
+    footer = f'<a href="{site.url(shown[0])}">Leer más</a>'  # Repite un post ya enviado
+    html = site.render_listing(slug).replace('<div id="posts">', hero + '<div id="posts">')
+    page = HarvestPage(site, html.replace("</main>", footer + "</main>"))
+    scraper = XepelinPlaywrightScraper()
+    harvest = ListingHarvest()
+    
+    first = scraper._harvest_links(page, harvest)
+    assert first == [site.url(more[0])] + [site.url(path) for path in shown]
+    assert harvest.cards[site.url(more[0])]["title"] == ""
+    
+    # "Cargar más": llegan las tarjetas de la segunda página, como las arma el script del listado
+    cards = "".join(f'<a class="post-card" href="{post["url"]}"><h3>{post["title"]}</h3></a>'
+                    for post in site.listing_page(slug, 1)["posts"])
+    page.html = page.html.replace('</div>\n<button', cards + '</div>\n<button')
+    
+    second = scraper._harvest_links(page, harvest)
+    
+    assert second == [site.url(path) for path in more[1:]]
+    assert harvest.cards[site.url(more[0])]["title"] == site.posts[more[0]]["title"]
+    assert harvest.cards[site.url(more[0])]["excerpt"] == ""
+    assert list(harvest.cards) == [site.url(more[0])] + [site.url(path) for path in shown + more[1:]]
+    assert harvest.seen == 2 + len(shown) + len(more)
+
+
+def test_collect_post_urls_fills_the_listing_cards(site):
+    slug = CATEGORIES["Noticias"]
+    scraper = XepelinPlaywrightScraper()
+    
+    urls = scraper._collect_post_urls(HarvestPage(site, site.render_listing(slug)))
+    
+    assert urls == [site.url(path) for path in site.listings[slug][:site.page_size]]
+    assert [scraper.listing_cards[url]["title"] for url in urls] == [
+        site.posts[path]["title"] for path in site.listings[slug][:site.page_size]]
@@ -0,0 +1,300 @@
+"""
+Bucle de "Cargar más" de XepelinPlaywrightScraper contra una página falsa: termina con la señal
+del sitio (botón oculto tras la respuesta o paginación del JSON) sin esperas ociosas, y los
+clics sin respuesta solo cuentan como límite de seguridad.
+"""
+import asyncio
+
+import pytest
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
+from nextjs_extractor import NextDataExtractor
+from scraper_async import AsyncXepelinScraper
+from scraper_playwright import ListingHarvest, XepelinPlaywrightScraper
+
+BASE = "https://example.test"
+
+
+class FakeResponse:
+    def __init__(self, url, payload, resource_type="fetch"):
+        self.url = url
+        self.payload = payload
+        self.request = type("Request", (), {"resource_type": resource_type})()
+    
+    def json(self):
+        if self.payload is None:
+            raise ValueError("no es JSON")
+        return self.payload
+
+
+class FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+    
+    @property
+    def first(self):
+        return self
+    
+    def count(self):
+        if self.selector == XepelinPlaywrightScraper.LOAD_MORE_SELECTOR:
+            return 1
+        return len(self.page.links)
+    
+    def is_visible(self):
+        return self.page.button_visible
+    
+    def click(self):
+        self.page.click()
+
+
+class FakeListingPage:
+    """
+    Listado con páginas de posts; cada clic pide la siguiente.
+    
+    Args:
+        pages: URLs de cada página del listado (la primera ya está cargada)
+        payload: "has_more" (respuesta con paginación), "plain" (sin paginación) o None (no JSON)
+        hide_until_response: El botón se oculta al clickear y la respuesta llega después
+        stuck_after: Clics desde los que el botón deja de responder
+        response_cls: Clase de las respuestas que reciben los listeners
+    """
+    
+    def __init__(self, pages, payload="has_more", hide_until_response=False, stuck_after=None,
+                 response_cls=FakeResponse):
+        self.url = f"{BASE}/blog/pymes"
+        self.pages = pages
+        self.loaded = 1
+        self.links = list(pages[0])
+        self.button_visible = len(pages) > 1
+        self.payload = payload
+        self.hide_until_response = hide_until_response
+        self.stuck_after = stuck_after
+        self.clicks = 0
+        self.listeners = []
+        self.deferred = None
+        self.waited_ms = 0  # Tiempo perdido en esperas que vencieron
+        self.sent = set()
+        self.response_cls = response_cls
+    
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+    
+    def evaluate(self, script):
+        pass
+    
+    def eval_on_selector_all(self, selector, script, key):
+        cards = [{"url": url, "title": url, "excerpt": ""} for url in self.links if url not in self.sent]
+        self.sent.update(card["url"] for card in cards)
+        return {"total": len(self.links), "cards": cards}
+    
+    def on(self, event, listener):
+        self.listeners.append(listener)
+    
+    def remove_listener(self, event, listener):
+        self.listeners.remove(listener)
+    
+    def click(self):
+        self.clicks += 1
+        if self.stuck_after is not None and self.clicks > self.stuck_after:
+            return
+        if self.hide_until_response:
+            self.button_visible = False
+            self.deferred = self._respond
+        else:
+            self._respond()
+    
+    def _respond(self):
+        posts = self.pages[self.loaded]
+        self.loaded += 1
+        has_more = self.loaded < len(self.pages)
+        payload = {"posts": [{"url": url} for url in posts]}
+        if self.payload == "has_more":
+            payload["has_more"] = has_more
+        response = self.response_cls(f"{BASE}/api/listing/pymes?page={self.loaded}",
+                                payload if self.payload else None)
+        self.links.extend(posts)
+        self.button_visible = has_more
+        for listener in list(self.listeners):
+            listener(response)
+        return response
+    
+    def wait_for_function(self, script, arg, timeout):
+        _, previous, end_on_button_gone = arg
+        if len(self.links) > previous or (end_on_button_gone and not self.button_visible):
+            return True
+        self.waited_ms += timeout
+        raise PlaywrightTimeout("timeout")
+    
+    def wait_for_event(self, event, predicate, timeout):
+        if self.deferred is None:
+            self.waited_ms += timeout
+            raise PlaywrightTimeout("timeout")
+        respond, self.deferred = self.deferred, None
+        response = respond()
+        assert predicate(response)
+        return response
+
+
+class AsyncFakeLocator:
+    def __init__(self, locator):
+        self.locator = locator
+    
+    @property
+    def first(self):
+        return self
+    
+    async def count(self):
+        return self.locator.count()
+    
+    async def is_visible(self):
+        return self.locator.is_visible()
+    
+    async def click(self):
+        self.locator.click()
+
+
+class AsyncFakeListingPage:
+    """La misma página falsa con la interfaz de playwright.async_api."""
+    
+    def __init__(self, page):
+        self.page = page
+        self.url = page.url
+    
+    def locator(self, selector):
+        return AsyncFakeLocator(self.page.locator(selector))
+    
+    def on(self, event, listener):
+        self.page.on(event, listener)
+    
+    def remove_listener(self, event, listener):
+        self.page.remove_listener(event, listener)
+    
+    async def evaluate(self, script):
+        return self.page.evaluate(script)
+    
+    async def eval_on_selector_all(self, selector, script, key):
+        return self.page.eval_on_selector_all(selector, script, key)
+    
+    async def wait_for_function(self, script, arg, timeout):
+        return self.page.wait_for_function(script, arg, timeout)
+    
+    async def wait_for_event(self, event, predicate, timeout):
+        return self.page.wait_for_event(event, predicate, timeout)
+
+
+class AsyncFakeResponse(FakeResponse):
+    async def json(self):
+        return super().json()
+
+
+def make_pages(sizes):
+    count = 0
+    pages = []
+    for size in sizes:
+        pages.append([f"{BASE}/blog/pymes/post-{count + i}" for i in range(size)])
+        count += size
+    return pages
+
+
+def load(page, **kwargs):
+    scraper = XepelinPlaywrightScraper()
+    harvest = ListingHarvest()
+    scraper._load_all_posts(page, harvest=harvest, **kwargs)
+    scraper._harvest_links(page, harvest)
+    return list(harvest.cards)
+
+
+@pytest.mark.parametrize("payload", ["has_more", "plain", None])
+def test_stops_on_the_last_page_without_idle_waits(payload):
+    pages = make_pages([12, 12, 5])
+    page = FakeListingPage(pages, payload=payload)
+    
+    urls = load(page)
+    
+    assert urls == [url for chunk in pages for url in chunk]
+    assert page.clicks == 2
+    # Solo la prueba del scroll (una vez) espera sin señal
+    assert page.waited_ms == 1500
+
+
+@pytest.mark.parametrize("hide_until_response", [False, True])
+def test_async_engine_stops_on_the_last_page(hide_until_response):
+    pages = make_pages([12, 12, 5])
+    page = FakeListingPage(pages, hide_until_response=hide_until_response, response_cls=AsyncFakeResponse)
+    harvest = ListingHarvest()
+    
+    async def run():
+        scraper = AsyncXepelinScraper()
+        await scraper._load_all_posts(AsyncFakeListingPage(page), harvest=harvest)
+        await scraper._harvest_links(AsyncFakeListingPage(page), harvest)
+    
+    asyncio.run(run())
+    
+    assert list(harvest.cards) == [url for chunk in pages for url in chunk]
+    assert page.clicks == 2
+    assert page.waited_ms == 1500
+
+
+def test_single_page_listing_needs_no_click():
+    page = FakeListingPage(make_pages([7]))
+    
+    assert len(load(page)) == 7
+    assert page.clicks == 0
+
+
+def test_button_hidden_until_the_response_arrives():
+    pages = make_pages([12, 12, 12])
+    page = FakeListingPage(pages, payload="plain", hide_until_response=True)
+    
+    urls = load(page)
+    
+    assert len(urls) == 36
+    assert page.clicks == 2
+    assert page.waited_ms == 1500
+
+
+def test_unresponsive_button_is_capped():
+    page = FakeListingPage(make_pages([12, 12, 12, 12]), stuck_after=1)
+    
+    urls = load(page)
+    
+    assert len(urls) == 24
+    assert page.clicks == 1 + XepelinPlaywrightScraper.LOAD_MORE_MAX_MISSES
+
+
+def test_stops_at_known_urls():
+    pages = make_pages([12, 12, 12])
+    page = FakeListingPage(pages)
+    
+    load(page, stop_urls={pages[1][3]})
+    
+    assert page.clicks == 1
+
+
+def test_page_response_filter():
+    listing = "/blog/pymes"
+    assert XepelinPlaywrightScraper._is_page_response(FakeResponse(f"{BASE}/api/listing/pymes?page=2", {}), listing)
+    assert XepelinPlaywrightScraper._is_page_response(
+        FakeResponse(f"{BASE}/_next/data/build/blog/pymes.json?page=2", {}), listing)
+    # Precarga de un post enlazado y recursos que no son fetch/xhr
+    assert not XepelinPlaywrightScraper._is_page_response(
+        FakeResponse(f"{BASE}/_next/data/build/blog/pymes/post-1.json", {}), listing)
+    assert not XepelinPlaywrightScraper._is_page_response(
+        FakeResponse(f"{BASE}/blog/pymes", {}, resource_type="document"), listing)
+
+
+@pytest.mark.parametrize("payload, expected", [
+    ({"posts": [], "has_more": False}, False),
+    ({"pageProps": {"pagination": {"hasNextPage": True}}}, True),
+    ({"pageInfo": {"nextCursor": None}}, False),
+    ({"nextPage": 3}, True),
+    ({"posts": [{"title": "a"}]}, None),
+])
+def test_has_more(payload, expected):
+    assert NextDataExtractor.has_more(payload) is expected
+
+
+def test_has_more_uses_the_last_informative_response():
+    assert XepelinPlaywrightScraper._has_more([{"has_more": True}, None, {"has_more": False}, {"x": 1}]) is False
+    assert XepelinPlaywrightScraper._has_more([None, {"posts": []}]) is None
@@ -0,0 +1,284 @@
+"""
+Controlador de memoria con lecturas de /proc y del cgroup falsas: límite AIMD, pausa de la toma
+de trabajo y pedido de reciclar contextos.
+"""
+import asyncio
+import time
+
+import pytest
+
+import memory_governor
+from memory_governor import MemoryGovernor, MemorySample
+from scraper_async import ContextRecycler
+
+MB = 2**20
+
+
+class FakeSampler:
+    """Devuelve la muestra que indique la prueba."""
+    
+    def __init__(self, process_tree=0, chromium=0, cgroup_usage=None, cgroup_limit=None):
+        self.set(process_tree, chromium, cgroup_usage, cgroup_limit)
+    
+    def set(self, process_tree=0, chromium=0, cgroup_usage=None, cgroup_limit=None):
+        self.sample = MemorySample(process_tree, chromium, cgroup_usage, cgroup_limit)
+    
+    def __call__(self):
+        return self.sample
+
+
+def make_governor(sampler, **kwargs):
+    options = dict(max_concurrency=8, initial=4, budget_bytes=1000 * MB, cooldown_seconds=0,
+                   context_limit_bytes=100 * MB, sampler=sampler)
+    options.update(kwargs)
+    return MemoryGovernor(**options)
+
+
+def take(governor, count):
+    for _ in range(count):
+        assert governor.try_acquire()
+
+
+def test_sample_memory_reads_process_tree_and_cgroup(monkeypatch):
+    tree = {1: ("python", 200 * MB), 2: ("chrome", 300 * MB), 3: ("headless_shell", 50 * MB)}
+    monkeypatch.setattr(memory_governor, "read_process_tree", lambda: tree)
+    monkeypatch.setattr(memory_governor, "cgroup_memory", lambda: (700 * MB, 1024 * MB))
+    
+    assert memory_governor.sample_memory() == MemorySample(550 * MB, 350 * MB, 700 * MB, 1024 * MB)
+
+
+def test_sample_memory_without_proc(monkeypatch):
+    monkeypatch.setattr(memory_governor, "read_process_tree", lambda: {})
+    monkeypatch.setattr(memory_governor, "process_rss", lambda: 80 * MB)
+    monkeypatch.setattr(memory_governor, "cgroup_memory", lambda: (None, None))
+    
+    assert memory_governor.sample_memory() == MemorySample(80 * MB, 0, None, None)
+
+
+def test_limit_grows_by_one_only_when_slots_are_full():
+    sampler = FakeSampler(process_tree=300 * MB)
+    governor = make_governor(sampler)
+    
+    governor.update()
+    assert governor.limit == 4  # Sobra memoria pero los cupos no se usan
+    
+    take(governor, 4)
+    governor.update()
+    assert governor.limit == 5
+    governor.update()
+    assert governor.limit == 5  # Hasta que se use el cupo nuevo
+    take(governor, 1)
+    governor.update()
+    assert governor.limit == 6
+
+
+def test_limit_halves_under_pressure_down_to_the_minimum():
+    sampler = FakeSampler(process_tree=850 * MB)
+    governor = make_governor(sampler, initial=8, min_concurrency=3)
+    
+    governor.update()
+    assert governor.limit == 4
+    governor.update()
+    assert governor.limit == 3
+    governor.update()
+    assert governor.limit == 3
+
+
+def test_cooldown_between_reductions():
+    sampler = FakeSampler(process_tree=850 * MB)
+    governor = make_governor(sampler, initial=8, cooldown_seconds=60)
+    
+    governor.update()
+    governor.update()
+    
+    assert governor.limit == 4
+
+
+def test_limit_stays_between_watermarks():
+    sampler = FakeSampler(process_tree=700 * MB)
+    governor = make_governor(sampler)
+    take(governor, 4)
+    
+    governor.update()
+    
+    assert governor.limit == 4
+
+
+def test_budget_defaults_to_the_cgroup_limit():
+    sampler = FakeSampler(process_tree=850 * MB, cgroup_usage=850 * MB, cgroup_limit=2000 * MB)
+    governor = make_governor(sampler, budget_bytes=None)
+    take(governor, 4)
+    
+    governor.update()
+    
+    assert governor.limit == 5  # 850 MB es poco para un cgroup de 2000 MB
+
+
+def test_cgroup_near_its_limit_pauses_intake():
+    # El proceso usa poco del presupuesto, pero el contenedor (con otros procesos) está al límite
+    sampler = FakeSampler(process_tree=100 * MB, cgroup_usage=950 * MB, cgroup_limit=1000 * MB)
+    governor = make_governor(sampler)
+    
+    governor.update()
+    
+    assert governor.paused
+    assert governor.try_acquire()  # Sin nada en curso siempre se avanza
+    assert not governor.try_acquire()
+    
+    sampler.set(process_tree=100 * MB, cgroup_usage=500 * MB, cgroup_limit=1000 * MB)
+    governor.update()
+    assert not governor.paused
+    assert governor.try_acquire()
+
+
+def test_pause_over_the_budget():
+    sampler = FakeSampler(process_tree=950 * MB)
+    governor = make_governor(sampler)
+    
+    governor.update()
+    
+    assert governor.paused
+    assert governor.status()["paused"]
+
+
+def test_should_recycle_by_count_pressure_and_chromium_size():
+    sampler = FakeSampler(process_tree=300 * MB, chromium=150 * MB)
+    governor = make_governor(sampler)
+    governor.update()
+    created_at = 0.0
+    
+    assert governor.should_recycle(50, created_at, recycle_every=50)
+    assert not governor.should_recycle(0, created_at, recycle_every=50)
+    # 150 MB de Chromium para un solo cupo en uso supera los 100 MB por cupo
+    assert governor.should_recycle(3, created_at, recycle_every=50)
+    take(governor, 2)
+    assert not governor.should_recycle(3, created_at, recycle_every=50)
+    
+    # Presión de memoria después de crear el contexto
+    created_at = time.monotonic()
+    sampler.set(process_tree=850 * MB, chromium=150 * MB)
+    governor.update()
+    assert governor.should_recycle(3, created_at, recycle_every=50)
+
+
+def test_async_waiter_wakes_when_a_slot_is_released():
+    governor = make_governor(FakeSampler(), initial=1, max_concurrency=1)
+    order = []
+    
+    async def run():
+        await governor.acquire_async()
+        
+        async def second():
+            async with governor.slot_async():
+                order.append("second")
+        
+        task = asyncio.ensure_future(second())
+        await asyncio.sleep(0.01)
+        order.append("release")
+        governor.release()
+        await asyncio.wait_for(task, 1)
+    
+    asyncio.run(run())
+    
+    assert order == ["release", "second"]
+    assert governor.in_use == 0
+
+
+def test_rejects_inconsistent_watermarks():
+    with pytest.raises(ValueError):
+        MemoryGovernor(max_concurrency=2, low_watermark=0.9, high_watermark=0.8)
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+    
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+    
+    async def new_page(self):
+        assert not self.closed
+        return FakePage(self)
+    
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+    
+    async def new_context(self):
+        self.contexts.append(FakeContext(len(self.contexts)))
+        return self.contexts[-1]
+
+
+def make_recycler(should_recycle):
+    browser = FakeBrowser()
+    
+    async def new_page(context):
+        return await context.new_page()
+    
+    return browser, ContextRecycler(browser, new_page, should_recycle)
+
+
+def test_recycler_swaps_the_context_every_n_pages():
+    browser, contexts = make_recycler(lambda processed, created_at: processed >= 2)
+    
+    async def run():
+        for _ in range(5):
+            async with contexts.page() as page:
+                assert not page.context.closed
+        await contexts.close()
+    
+    asyncio.run(run())
+    
+    assert len(browser.contexts) == 3
+    assert contexts.recycled == 2
+    assert all(context.closed for context in browser.contexts)
+
+
+def test_recycled_context_closes_after_its_last_page():
+    recycle = {"now": False}
+    browser, contexts = make_recycler(lambda processed, created_at: recycle["now"])
+    
+    async def run():
+        async with contexts.page() as slow:
+            recycle["now"] = True
+            async with contexts.page() as fast:
+                recycle["now"] = False
+                assert fast.context is not slow.context
+            assert not slow.context.closed  # La página lenta sigue en el contexto viejo
+        assert slow.context.closed and slow.closed
+        assert not fast.context.closed
+        await contexts.close()
+        assert fast.context.closed
+    
+    asyncio.run(run())
+    
+    assert contexts.recycled == 1
+
+
+def test_recycler_uses_the_governor_decision():
+    sampler = FakeSampler(process_tree=300 * MB, chromium=500 * MB)
+    governor = make_governor(sampler)
+    governor.update()
+    browser, contexts = make_recycler(lambda processed, created_at: governor.should_recycle(processed, created_at, 50))
+    
+    async def run():
+        for _ in range(2):
+            async with governor.slot_async(), contexts.page():
+                pass
+        await contexts.close()
+    
+    asyncio.run(run())
+    
+    # Chromium supera el límite por cupo: cada página nueva llega a un contexto limpio
+    assert len(browser.contexts) == 2
@@ -0,0 +1,90 @@
+"""
+Percentil por rango más cercano de metrics.percentile, exposición en formato de texto de
+Prometheus y conteo de fallos de metrics.timed.
+"""
+import asyncio
+
+import pytest
+
+from metrics import FAILURES, Counter, Gauge, Histogram, MetricsRegistry, _Metric, percentile, timed
+
+
+@pytest.mark.parametrize("pct, expected", [(1, 1), (7, 7), (50, 50), (95, 95), (99, 99), (100, 100)])
+def test_percentile_of_one_to_hundred(pct, expected):
+    assert percentile(list(range(1, 101)), pct) == expected
+
+
+def test_percentile_small_samples():
+    values = [0.3, 0.1, 0.2, 0.4]
+    
+    assert percentile(values, 0) == 0.1
+    assert percentile(values, 25) == 0.1
+    assert percentile(values, 50) == 0.2
+    assert percentile(values, 51) == 0.3
+    assert percentile(values, 95) == 0.4
+    assert percentile([5.0], 99) == 5.0
+
+
+def test_percentile_without_values():
+    assert percentile([], 50) is None
+
+
+def test_exposition_escapes_label_values_and_help():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("jobs_total", "Trabajos\nterminados \\ por estado", ("error",)))
+    counter.inc(error='falta "x" en C:\\tmp\nsegunda línea')
+    
+    lines = registry.render().splitlines()
+    
+    assert lines == [
+        "# HELP jobs_total Trabajos\\nterminados \\\\ por estado",
+        "# TYPE jobs_total counter",
+        'jobs_total{error="falta \\"x\\" en C:\\\\tmp\\nsegunda línea"} 1',
+    ]
+
+
+def test_exposition_of_every_metric_type():
+    registry = MetricsRegistry()
+    registry.register(Gauge("queued", "En cola", callback=lambda: 3))
+    histogram = registry.register(Histogram("seconds", "Duración", ("stage",), buckets=(0.1, 1)))
+    histogram.observe(0.05, stage="a")
+    histogram.observe(0.5, stage="a")
+    
+    assert registry.render().splitlines() == [
+        "# HELP queued En cola",
+        "# TYPE queued gauge",
+        "queued 3",
+        "# HELP seconds Duración",
+        "# TYPE seconds histogram",
+        'seconds_bucket{stage="a",le="0.1"} 1',
+        'seconds_bucket{stage="a",le="1"} 2',
+        'seconds_bucket{stage="a",le="+Inf"} 2',
+        'seconds_sum{stage="a"} 0.55',
+        'seconds_count{stage="a"} 2',
+    ]
+
+
+def test_metric_types_must_render_samples():
+    class Incomplete(_Metric):
+        TYPE = "untyped"
+    
+    with pytest.raises(TypeError):
+        Incomplete("x", "y")
+
+
+def test_timed_counts_errors_but_not_cancellation():
+    histogram = Histogram("test_timed_seconds", "Prueba", ("stage",))
+    before = FAILURES.value(stage="timed-test")
+    
+    with pytest.raises(ValueError):
+        with timed("timed-test", histogram):
+            raise ValueError("falla")
+    with pytest.raises(asyncio.CancelledError):
+        with timed("timed-test", histogram):
+            raise asyncio.CancelledError()
+    with pytest.raises(KeyboardInterrupt):
+        with timed("timed-test", histogram):
+            raise KeyboardInterrupt()
+    
+    assert FAILURES.value(stage="timed-test") == before + 1
+    assert 'test_timed_seconds_count{stage="timed-test"} 3' in histogram.render()
@@ -0,0 +1,66 @@
+"""
+Lectura del JSON de Next.js contra el sitio de benchmarks.fixture_site: cada dato se toma del
+nodo del post pedido, nunca de los posts relacionados que trae el mismo payload.
+"""
+import json
+
+import pytest
+
+from benchmarks.fixture_site import FixtureSite
+from html_extractor import get_extractor
+from nextjs_extractor import NextDataExtractor
+
+CATEGORIES = {"Pymes": "pymes", "Noticias": "noticias"}
+
+
+@pytest.fixture(scope="module")
+def site():
+    with FixtureSite(CATEGORIES, posts=20) as site:
+        yield site
+
+
+def next_data_page(props):
+    payload = json.dumps({"props": {"pageProps": props}, "page": "/blog/[category]/[slug]"})
+    return f'<html><body><h1>Post</h1><script id="__NEXT_DATA__" type="application/json">{payload}</script></body></html>'
+
+
+def test_find_post_date_takes_the_matching_node(site):
+    url = site.expected_urls("Pymes")[2]
+    payload = NextDataExtractor.parse_next_data(site.render_post(url[len(site.url("")):]))
+    
+    assert payload["props"]["pageProps"]["related"]  # Hay otros posts con fecha en el payload
+    assert NextDataExtractor.find_post_date(payload, url) == site.expected_post(url)["Fecha"]
+
+
+def test_find_post_date_matches_by_url_path():
+    payload = {"props": {"pageProps": {"post": {"url": "/blog/pymes/otro-post",
+                                                "publishedAt": "2024-03-01T10:00:00Z"}}}}
+    
+    assert NextDataExtractor.find_post_date(payload, "https://xepelin.com/blog/pymes/otro-post/") == \
+        "2024-03-01T10:00:00Z"
+
+
+def test_find_post_date_does_not_guess():
+    # Solo posts relacionados y la fecha del listado: ninguno es el post pedido
+    props = {"date": "2024-01-01", "related": [{"slug": "relacionado-1", "publishedAt": "2024-02-02T00:00:00Z"}]}
+    
+    assert NextDataExtractor.find_post_date({"props": {"pageProps": props}},
+                                            "https://xepelin.com/blog/pymes/mi-post") is None
+
+
+@pytest.mark.parametrize("parser", ["bs4", "lxml"])
+def test_html_date_is_not_taken_from_another_post(parser):
+    html = next_data_page({"related": [{"slug": "relacionado-1", "title": "Otro",
+                                        "publishedAt": "2024-02-02T00:00:00Z"}]})
+    
+    post = get_extractor(parser).extract_post(html, "https://xepelin.com/blog/pymes/mi-post")
+    
+    assert post["Fecha"] == "N/A"
+
+
+def test_extract_post_ignores_related_posts(site):
+    extractor = NextDataExtractor(site.base_url)
+    url = site.expected_urls("Noticias")[1]
+    
+    assert extractor.extract_post(url) == site.expected_post(url)
+    assert extractor.extract_post(site.url("/blog/noticias/no-existe")) is None
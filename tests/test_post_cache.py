@@ -0,0 +1,204 @@
+"""
+Caché de posts (post_cache.py) y su revalidación en http_fetcher.py con un reloj falso y una
+sesión de requests falsa: vencimiento por TTL, expulsión LRU y requests condicionales con
+ETag / Last-Modified (304 o mismo hash => se reutiliza el registro sin parsear).
+"""
+import pytest
+
+import post_cache
+from http_fetcher import HttpPostFetcher
+from post_cache import PostCache
+
+URL = "https://xepelin.com/blog/pymes/post-1"
+RECORD = {"Titular": "Post 1", "Autor": "Ana | Editora", "Tiempo de lectura": "5 min de lectura",
+          "Fecha": "2024-01-01", "URL": URL}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+    
+    def __call__(self):
+        return self.now
+    
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(post_cache.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = PostCache(str(tmp_path / "posts.sqlite3"), ttl_seconds=3600, max_entries=3)
+    yield cache
+    cache.close()
+
+
+def test_records_expire_after_the_ttl(cache, clock):
+    cache.put(URL, dict(RECORD, Categoría="Pymes"))
+    
+    assert cache.get_fresh(URL) == RECORD  # La categoría no se guarda
+    clock.advance(3599)
+    assert cache.get_fresh(URL) == RECORD
+    clock.advance(2)
+    assert cache.get_fresh(URL) is None
+    assert cache.get_record(URL) == RECORD  # Sigue disponible para revalidar
+    cache.touch(URL)
+    assert cache.get_fresh(URL) == RECORD
+
+
+def test_least_recently_used_posts_are_evicted(cache, clock):
+    for i in range(3):
+        cache.put(f"{URL}-{i}", RECORD)
+        clock.advance(1)
+    cache.get(f"{URL}-0")  # Usado recientemente: sobrevive
+    clock.advance(1)
+    
+    cache.put(f"{URL}-3", RECORD)
+    
+    assert len(cache) == 3
+    assert cache.get(f"{URL}-1") is None
+    assert all(cache.get(f"{URL}-{i}") for i in (0, 2, 3))
+
+
+def test_category_urls_survive_eviction(cache):
+    urls = [f"{URL}-{i}" for i in range(5)]
+    cache.set_category_urls("Pymes", urls)
+    for url in urls:
+        cache.put(url, RECORD)
+    
+    assert cache.get_category_urls("Pymes") == urls
+    cache.set_category_urls("Pymes", urls[:2])
+    assert cache.get_category_urls("Pymes") == urls[:2]
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.content = body
+        self.text = body.decode("utf-8")
+        self.headers = headers or {}
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.HTTPError(f"{self.status_code}")
+
+
+class FakeSession:
+    """Sesión de requests que responde con la cola `responses` y guarda los headers enviados."""
+    
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+    
+    def get(self, url, headers=None, timeout=None):
+        self.sent.append(dict(headers or {}))
+        return self.responses.pop(0)
+    
+    def close(self):
+        pass
+
+
+class Parser:
+    def __init__(self, complete=True):
+        self.calls = 0
+        self.complete = complete
+    
+    def __call__(self, html, url):
+        self.calls += 1
+        title = html.split("<h1>")[1].split("</h1>")[0]
+        if not self.complete:
+            return dict(RECORD, Titular=title, Autor="N/A")
+        return dict(RECORD, Titular=title)
+
+
+def make_fetcher(cache, session, parser):
+    fetcher = HttpPostFetcher(parse=parser, cache=cache)
+    fetcher.session.close()
+    fetcher.session = session
+    return fetcher
+
+
+def page(title):
+    return f"<html><h1>{title}</h1></html>".encode()
+
+
+def test_revalidates_with_etag_and_last_modified(cache, clock):
+    validators = {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 10:00:00 GMT"}
+    session = FakeSession(FakeResponse(200, page("Post 1"), validators), FakeResponse(304))
+    parser = Parser()
+    fetcher = make_fetcher(cache, session, parser)
+    
+    assert fetcher.fetch_post(URL)["Titular"] == "Post 1"
+    assert fetcher.fetch_post(URL)["Titular"] == "Post 1"  # Dentro del TTL: sin red
+    assert len(session.sent) == 1
+    
+    clock.advance(7200)
+    assert fetcher.fetch_post(URL)["Titular"] == "Post 1"
+    
+    assert session.sent == [{}, {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 10:00:00 GMT"}]
+    assert parser.calls == 1
+    assert cache.get(URL)["fresh"]  # El 304 renueva el TTL
+
+
+def test_same_content_is_not_parsed_again(cache, clock):
+    session = FakeSession(FakeResponse(200, page("Post 1")), FakeResponse(200, page("Post 1")))
+    parser = Parser()
+    fetcher = make_fetcher(cache, session, parser)
+    
+    fetcher.fetch_post(URL)
+    clock.advance(7200)
+    fetcher.fetch_post(URL)
+    
+    assert session.sent == [{}, {}]  # Sin validadores solo queda comparar el hash
+    assert parser.calls == 1
+    assert cache.get(URL)["fresh"]
+
+
+def test_changed_content_replaces_the_record(cache, clock):
+    session = FakeSession(FakeResponse(200, page("Antes"), {"ETag": '"v1"'}),
+                          FakeResponse(200, page("Después"), {"ETag": '"v2"'}))
+    fetcher = make_fetcher(cache, session, Parser())
+    
+    fetcher.fetch_post(URL)
+    clock.advance(7200)
+    
+    assert fetcher.fetch_post(URL)["Titular"] == "Después"
+    assert cache.get(URL)["etag"] == '"v2"'
+
+
+def test_browser_result_keeps_the_http_validators(cache):
+    session = FakeSession(FakeResponse(200, page("Post 1"), {"ETag": '"v1"'}))
+    fetcher = make_fetcher(cache, session, Parser(complete=False))
+    
+    assert fetcher.fetch_post(URL) is None  # HTML incompleto: lo completa el navegador
+    fetcher.store(URL, RECORD)
+    
+    entry = cache.get(URL)
+    assert entry["record"] == RECORD
+    assert entry["etag"] == '"v1"' and entry["content_hash"]
+
+
+def test_http_errors_fall_back_to_the_browser(cache, clock):
+    session = FakeSession(FakeResponse(200, page("Post 1"), {"ETag": '"v1"'}), FakeResponse(404))
+    fetcher = make_fetcher(cache, session, Parser())
+    
+    fetcher.fetch_post(URL)
+    clock.advance(7200)
+    
+    assert fetcher.fetch_post(URL) is None
+
+
+def test_empty_cache_is_still_a_cache(cache):
+    from scraper_playwright import XepelinPlaywrightScraper
+    
+    assert len(cache) == 0
+    XepelinPlaywrightScraper(cache=cache)._check_incremental(True)
+    with pytest.raises(ValueError):
+        XepelinPlaywrightScraper()._check_incremental(True)
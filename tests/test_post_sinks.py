@@ -0,0 +1,151 @@
+"""
+Sinks locales de post_sinks.py escritos con StreamingWriter y leídos de vuelta: JSONL, CSV
+(atómico vía `.part`), Parquet (si hay pyarrow) y SQLite con upsert por URL.
+"""
+import csv
+import json
+import os
+import sqlite3
+
+import pytest
+
+from post_sinks import (FIELDS, CsvSink, FileSink, JsonlSink, ParquetSink, PostSink, SqliteSink,
+                        StreamingWriter, open_file_sink, sink_format)
+
+
+def make_posts(count, category="Pymes", title="Post"):
+    return [{"Titular": f"{title} {i}", "Categoría": category, "Autor": "Ana | Editora",
+             "Tiempo de lectura": f"{i + 3} min de lectura", "Fecha": f"2024-01-{i + 1:02d}",
+             "URL": f"https://xepelin.com/blog/{category.lower()}/post-{i}"} for i in range(count)]
+
+
+def write(sink, posts, batch_size=3):
+    with StreamingWriter(sink, batch_size=batch_size) as writer:
+        for post in posts:
+            writer.put(post)
+    return writer
+
+
+def test_jsonl_round_trip(tmp_path):
+    path = str(tmp_path / "out" / "posts.jsonl")
+    posts = make_posts(7) + make_posts(2, category="Noticias")
+    
+    writer = write(JsonlSink(path), posts)
+    
+    assert writer.result == path
+    assert writer.written == {"Pymes": 7, "Noticias": 2}
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line) for line in f] == posts
+
+
+def test_csv_is_written_to_part_and_renamed(tmp_path):
+    path = str(tmp_path / "posts.csv")
+    sink = CsvSink(path)
+    posts = make_posts(5)
+    posts[0]["Titular"] = 'Con "comillas", comas\ny salto de línea'
+    del posts[1]["Autor"]
+    
+    sink.write_batch("Pymes", posts)
+    assert os.path.exists(path + ".part") and not os.path.exists(path)
+    assert sink.close() == path
+    
+    assert not os.path.exists(path + ".part")
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [field for field, _ in FIELDS] == list(rows[0])
+    assert rows[0]["Titular"] == posts[0]["Titular"]
+    assert rows[1]["Autor"] == "N/A"
+    assert [row["URL"] for row in rows] == [post["URL"] for post in posts]
+
+
+def test_csv_abort_and_empty_close_leave_no_file(tmp_path):
+    aborted = CsvSink(str(tmp_path / "aborted.csv"))
+    aborted.write_batch("Pymes", make_posts(2))
+    aborted.abort()
+    empty = CsvSink(str(tmp_path / "empty.csv"))
+    
+    assert empty.close() is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_failed_writer_keeps_no_partial_csv(tmp_path):
+    path = str(tmp_path / "posts.csv")
+    
+    with pytest.raises(RuntimeError):
+        with StreamingWriter(CsvSink(path), batch_size=2) as writer:
+            for post in make_posts(3):
+                writer.put(post)
+            raise RuntimeError("scraper caído")
+    
+    assert os.listdir(tmp_path) == []
+
+
+def test_parquet_round_trip(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "posts.parquet")
+    posts = make_posts(25)
+    
+    write(ParquetSink(path, row_group_size=10), posts, batch_size=4)
+    
+    table = parquet.read_table(path)
+    assert table.column_names == [column for _, column in FIELDS]
+    assert table.to_pylist() == [{column: post[field] for field, column in FIELDS} for post in posts]
+    assert parquet.ParquetFile(path).metadata.num_row_groups == 3
+
+
+def test_sqlite_upserts_by_url(tmp_path):
+    path = str(tmp_path / "posts.sqlite")
+    write(SqliteSink(path), make_posts(4))
+    write(SqliteSink(path), make_posts(6, title="Editado"))
+    
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT titular, url FROM posts ORDER BY url").fetchall()
+    
+    assert len(rows) == 6
+    assert {title for title, _ in rows} == {f"Editado {i}" for i in range(6)}
+
+
+def test_format_detection_and_factory(tmp_path):
+    assert sink_format("salida/posts.jsonl") == "jsonl"
+    assert sink_format("x.CSV") == "csv"
+    assert sink_format("x.db") == sink_format("x.sqlite3") == "sqlite"
+    assert sink_format("x.txt") is None
+    assert isinstance(open_file_sink("sqlite", str(tmp_path / "x.sqlite")), SqliteSink)
+    with pytest.raises(ValueError):
+        open_file_sink("xml", str(tmp_path / "x.xml"))
+
+
+class FailingSink(PostSink):
+    """Falla desde el segundo lote."""
+    
+    def __init__(self):
+        self.batches = []
+    
+    def write_batch(self, category, posts):
+        if self.batches:
+            raise IOError("disco lleno")
+        self.batches.append(posts)
+
+
+def test_writer_raises_the_sink_error_on_the_producer():
+    sink = FailingSink()
+    
+    with pytest.raises(IOError):
+        with StreamingWriter(sink, batch_size=1, max_pending_batches=1) as writer:
+            for post in make_posts(5):
+                writer.put(post)
+    
+    assert len(sink.batches) == 1
+
+
+def test_sinks_must_implement_the_writes():
+    class NoWrite(PostSink):
+        pass
+    
+    class NoFileWrite(FileSink):
+        pass
+    
+    with pytest.raises(TypeError):
+        NoWrite()
+    with pytest.raises(TypeError):
+        NoFileWrite("x.txt")
@@ -0,0 +1,231 @@
+"""
+Progreso de un trabajo (progress.py) y los endpoints de app.py que lo exponen, con el cliente
+de pruebas de Flask y una cola cuyo trabajo avanza de fase cuando la prueba lo libera:
+estado en GET /jobs/<id>, cancelación y el stream SSE de /jobs/<id>/events.
+"""
+import json
+import threading
+
+import pytest
+
+import progress as progress_module
+from job_queue import JobQueue
+from progress import JobCancelled, JobProgress
+
+TIMEOUT = 5
+
+
+def test_phases_and_counters():
+    progress = JobProgress()
+    progress.set_phase("discovering")
+    progress.add_discovered("Pymes", 10)
+    progress.add_discovered("Noticias", 5)
+    progress.add_discovered("Pymes", 12)  # Una categoría reportada dos veces no se suma doble
+    progress.start_extracting(17, ready=7)
+    progress.post_done()
+    progress.add_written(8, "https://sheet")
+    
+    state = progress.snapshot()
+    
+    assert state["phase"] == "extracting"
+    assert state["categories"] == {"Pymes": 12, "Noticias": 5}
+    assert (state["posts_discovered"], state["posts_total"], state["posts_extracted"]) == (17, 17, 8)
+    assert (state["posts_written"], state["result_url"]) == (8, "https://sheet")
+    assert state["version"] == 7
+
+
+def test_terminal_phase_is_final():
+    progress = JobProgress()
+    progress.set_phase("extracting")
+    progress.set_phase("cancelled")
+    progress.set_phase("done")
+    progress.start_extracting(3)
+    
+    assert progress.phase == "cancelled"
+
+
+def test_throughput_and_eta(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(progress_module.time, "time", lambda: now[0])
+    progress = JobProgress()
+    assert progress.throughput() is None and progress.eta_seconds() is None
+    
+    progress.start_extracting(30, ready=10)
+    for _ in range(4):
+        progress.post_done()
+    now[0] += 2
+    
+    assert progress.throughput() == 2
+    assert progress.snapshot()["eta_seconds"] == 8
+    
+    progress.set_phase("writing")
+    now[0] += 60
+    assert progress.throughput() == 2  # La escritura no cuenta para el throughput
+    assert progress.snapshot()["eta_seconds"] is None
+    
+    # La categoría siguiente vuelve a medir desde su propio comienzo
+    progress.set_phase("discovering")
+    progress.start_extracting(10)
+    progress.post_done()
+    now[0] += 1
+    assert progress.throughput() == 1
+
+
+def test_cancel_wakes_waiters_and_raises_at_checkpoints():
+    progress = JobProgress()
+    version = progress.version
+    progress.check_cancelled()
+    
+    threading.Timer(0.05, progress.cancel).start()
+    
+    assert progress.wait_for_update(version, timeout=TIMEOUT) > version
+    assert progress.cancelled and progress.snapshot()["cancel_requested"]
+    with pytest.raises(JobCancelled):
+        progress.check_cancelled()
+    assert progress.wait_for_update(progress.version, timeout=0.01) == progress.version
+
+
+class Steps:
+    """`run` de JobQueue que recorre las fases de un scraping; cada paso espera a `next()`."""
+    
+    def __init__(self):
+        self._steps = threading.Semaphore(0)
+    
+    def next(self, count=1):
+        for _ in range(count):
+            self._steps.release()
+    
+    def _wait(self, job):
+        assert self._steps.acquire(timeout=TIMEOUT)
+        job.progress.check_cancelled()
+    
+    def __call__(self, job):
+        progress = job.progress
+        self._wait(job)
+        progress.set_phase("discovering")
+        progress.add_discovered(job.params["category"], 3)
+        self._wait(job)
+        progress.start_extracting(3)
+        for _ in range(3):
+            self._wait(job)
+            progress.post_done()
+        self._wait(job)
+        progress.set_phase("writing")
+        progress.add_written(3, "https://sheet")
+        return "https://sheet", None
+
+
+@pytest.fixture
+def api(monkeypatch):
+    import app
+    
+    steps = Steps()
+    jobs = JobQueue(run=steps, notify=lambda job: None, workers=1, max_pending=5)
+    monkeypatch.setattr(app, "job_queue", jobs)
+    monkeypatch.setenv("SSE_KEEPALIVE_SECONDS", "0.05")
+    client = app.app.test_client()
+    
+    def scrape(category="Pymes"):
+        response = client.post("/scrape", json={"categoria": category, "webhook": "https://hook"})
+        assert response.status_code == 202
+        return response.get_json()["job_id"]
+    
+    yield client, steps, scrape
+    jobs.shutdown(wait=False)
+    steps.next(10)
+    jobs.shutdown(timeout=TIMEOUT)
+
+
+def wait_for_phase(client, job_id, phase):
+    """Lee GET /jobs/<id> hasta que el trabajo llegue a `phase`."""
+    for _ in range(TIMEOUT * 100):
+        state = client.get(f"/jobs/{job_id}").get_json()
+        if state["phase"] == phase:
+            return state
+        threading.Event().wait(0.01)
+    raise AssertionError(f"El trabajo no llegó a la fase {phase}: {state}")
+
+
+def test_status_follows_the_job(api):
+    client, steps, scrape = api
+    running = scrape("Pymes")
+    queued = scrape("Noticias")
+    
+    assert client.get(f"/jobs/{queued}").get_json()["status"] == "queued"
+    assert client.get("/jobs/desconocido").status_code == 404
+    
+    steps.next(2)
+    state = wait_for_phase(client, running, "extracting")
+    assert state["status"] == "running" and state["posts_discovered"] == 3
+    assert state["params"] == {"category": "Pymes", "scrape_all": False, "incremental": False,
+                               "detail_level": "full", "output": "sheets",
+                               "sheet_url": state["params"]["sheet_url"]}
+    
+    steps.next(4)
+    state = wait_for_phase(client, running, "done")
+    assert state["status"] == "done" and state["result"] == "https://sheet"
+    assert (state["posts_extracted"], state["posts_written"]) == (3, 3)
+    assert state["elapsed_seconds"] is not None and state["eta_seconds"] is None
+
+
+def test_cancel_running_and_queued_jobs(api):
+    client, steps, scrape = api
+    running = scrape("Pymes")
+    queued = scrape("Noticias")
+    steps.next(1)
+    wait_for_phase(client, running, "discovering")
+    
+    response = client.post(f"/jobs/{queued}/cancel")
+    assert response.status_code == 200 and response.get_json()["job"]["phase"] == "cancelled"
+    
+    response = client.post(f"/jobs/{running}/cancel")
+    assert response.status_code == 202 and response.get_json()["job"]["cancel_requested"]
+    
+    steps.next(1)
+    state = wait_for_phase(client, running, "cancelled")
+    assert state["status"] == "cancelled" and state["error"] == "Trabajo cancelado"
+    assert client.post(f"/jobs/{running}/cancel").status_code == 409
+    assert client.post("/jobs/desconocido/cancel").status_code == 404
+
+
+def read_events(response):
+    """Separa el stream SSE en eventos: ("progress" | "end", datos) o ("keep-alive", None)."""
+    buffer = ""
+    for chunk in response.response:
+        buffer += chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk
+        while "\n\n" in buffer:
+            message, buffer = buffer.split("\n\n", 1)
+            if message.startswith(":"):
+                yield "keep-alive", None
+                continue
+            fields = dict(line.split(": ", 1) for line in message.splitlines())
+            yield fields["event"], json.loads(fields["data"])
+
+
+def test_event_stream_reports_progress_until_the_end(api):
+    client, steps, scrape = api
+    job_id = scrape()
+    response = client.get(f"/jobs/{job_id}/events", buffered=False)
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    
+    events = read_events(response)
+    event, state = next(events)
+    assert event == "progress" and state["job_id"] == job_id
+    assert next(events) == ("keep-alive", None)  # Sin cambios: solo el comentario
+    
+    steps.next(6)
+    seen = [(event, state) for event, state in events if event != "keep-alive"]
+    response.close()
+    
+    assert [event for event, _ in seen[:-1]] == ["progress"] * (len(seen) - 1)
+    assert seen[-1][0] == "end"
+    assert seen[-1][1]["status"] == "done" and seen[-1][1]["posts_extracted"] == 3
+    extracted = [state["posts_extracted"] for _, state in seen]
+    assert extracted == sorted(extracted)
+
+
+def test_event_stream_of_unknown_job():
+    import app
+    
+    assert app.app.test_client().get("/jobs/desconocido/events").status_code == 404
@@ -0,0 +1,237 @@
+"""
+Motor asíncrono (scraper_async.py) sobre un navegador falso: posts en vuelo acotados, las
+descargas HTTP ocupan un cupo de navegación y, al cancelar o abandonar la iteración, ninguna
+página queda abierta cuando se cierran los contextos.
+"""
+import asyncio
+import threading
+import time
+from contextlib import aclosing
+
+import pytest
+
+from progress import JobCancelled, JobProgress
+from scraper_async import AsyncXepelinScraper
+
+BASE = "https://example.test/blog/pymes"
+URLS = [f"{BASE}/post-{i}" for i in range(30)]
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+    
+    def set_default_timeout(self, timeout):
+        pass
+    
+    async def route(self, pattern, handler):
+        pass
+    
+    async def goto(self, url, wait_until=None, timeout=None):
+        self.url = url
+        await asyncio.sleep(self.context.browser.delays.get(url, 0.001))
+    
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        pass
+    
+    async def content(self):
+        return f"<html><body><h1>{self.url.rsplit('/', 1)[-1]}</h1></body></html>"
+    
+    async def close(self):
+        self.closed = True
+        self.context.open_pages -= 1
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.open_pages = 0
+        self.open_at_close = None
+    
+    async def new_page(self):
+        self.open_pages += 1
+        self.browser.max_open = max(self.browser.max_open, self.browser.open_pages())
+        return FakePage(self)
+    
+    async def close(self):
+        self.open_at_close = self.open_pages
+
+
+class FakeBrowser:
+    def __init__(self, delays=None):
+        self.contexts = []
+        self.delays = delays or {}
+        self.max_open = 0
+    
+    async def new_context(self):
+        self.contexts.append(FakeContext(self))
+        return self.contexts[-1]
+    
+    def open_pages(self):
+        return sum(context.open_pages for context in self.contexts)
+
+
+def make_scraper(browser, urls=URLS, **kwargs):
+    scraper = AsyncXepelinScraper(browser=browser, max_navigations=2, **kwargs)
+    
+    async def discover(contexts, category_name, incremental=False, checkpoint=None):
+        return list(urls), {}
+    
+    scraper._discover_category = discover
+    return scraper
+
+
+def assert_closed_cleanly(browser):
+    assert browser.contexts
+    assert [context.open_at_close for context in browser.contexts] == [0] * len(browser.contexts)
+    assert [task for task in asyncio.all_tasks() if task is not asyncio.current_task()] == []
+
+
+def test_posts_in_flight_are_bounded_and_ordered():
+    browser = FakeBrowser()
+    scraper = make_scraper(browser)
+    in_flight = {"now": 0, "max": 0}
+    
+    async def extract(contexts, url):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.001 * (len(url) % 3))
+        in_flight["now"] -= 1
+        return {"URL": url}
+    
+    async def run():
+        async with scraper:
+            scraper._extract_post_details = extract
+            return await scraper.scrape_category("Pymes")
+    
+    posts = asyncio.run(run())
+    
+    assert [post["URL"] for post in posts] == URLS
+    # Sin `window` explícito también se acota: dos por navegación permitida
+    assert in_flight["max"] == scraper._stream_window(1) == 4
+
+
+def test_browser_navigations_respect_the_limit():
+    browser = FakeBrowser()
+    scraper = make_scraper(browser)
+    
+    async def run():
+        async with scraper:
+            return await scraper.scrape_category("Pymes")
+    
+    posts = asyncio.run(run())
+    
+    assert [post["Titular"] for post in posts] == [url.rsplit("/", 1)[-1] for url in URLS]
+    assert browser.max_open == 2
+
+
+class FakeFetcher:
+    """HttpPostFetcher bloqueante que cuenta las descargas simultáneas."""
+    
+    next_extractor = None
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+    
+    def fetch_post(self, url):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.005)
+        with self.lock:
+            self.running -= 1
+        return {"URL": url, "Titular": url}
+    
+    def close(self):
+        pass
+
+
+def test_http_fetches_take_a_navigation_slot():
+    browser = FakeBrowser()
+    scraper = make_scraper(browser, backend="http")
+    scraper.http_fetcher.close()
+    scraper.http_fetcher = FakeFetcher()
+    
+    async def run():
+        async with scraper:
+            return await scraper.scrape_category("Pymes")
+    
+    posts = asyncio.run(run())
+    
+    assert [post["URL"] for post in posts] == URLS
+    assert scraper.http_fetcher.max_running == 2
+    assert browser.open_pages() == 0
+
+
+def test_abandoned_iteration_closes_pages_before_contexts():
+    browser = FakeBrowser({url: 5 for url in URLS[1:]})  # Todo salvo el primero queda colgado
+    scraper = make_scraper(browser)
+    
+    async def run():
+        async with scraper:
+            async with aclosing(scraper.iter_posts("Pymes", batch_size=1)) as posts:
+                async for post in posts:
+                    break
+            assert_closed_cleanly(browser)
+    
+    started = time.perf_counter()
+    asyncio.run(run())
+    
+    assert time.perf_counter() - started < 2
+
+
+def test_consumer_error_closes_pages_before_contexts():
+    browser = FakeBrowser({url: 5 for url in URLS[2:]})
+    scraper = make_scraper(browser)
+    
+    async def run():
+        async with scraper:
+            with pytest.raises(IOError):
+                async with aclosing(scraper.iter_posts("Pymes", batch_size=1)) as posts:
+                    async for post in posts:
+                        raise IOError("sink caído")
+            assert_closed_cleanly(browser)
+    
+    asyncio.run(run())
+
+
+def test_cancelled_job_stops_without_orphan_navigations():
+    progress = JobProgress()
+    browser = FakeBrowser({url: 5 for url in URLS[4:]})
+    scraper = make_scraper(browser, progress=progress)
+    received = []
+    
+    async def run():
+        async with scraper:
+            with pytest.raises(JobCancelled):
+                async with aclosing(scraper.iter_posts("Pymes", batch_size=1)) as posts:
+                    async for post in posts:
+                        received.append(post["URL"])
+                        if len(received) == 2:
+                            progress.cancel()
+            assert_closed_cleanly(browser)
+    
+    asyncio.run(run())
+    
+    # Los posts ya extraídos de la ventana se entregan; los que no empezaron no navegan
+    assert received == URLS[:4]
+
+
+def test_cancelled_task_closes_pages_before_contexts():
+    browser = FakeBrowser({url: 5 for url in URLS})
+    scraper = make_scraper(browser)
+    
+    async def run():
+        async with scraper:
+            task = asyncio.ensure_future(scraper.scrape_category("Pymes"))
+            while browser.open_pages() < 2:
+                await asyncio.sleep(0.001)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            assert_closed_cleanly(browser)
+    
+    asyncio.run(run())
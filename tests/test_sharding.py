@@ -0,0 +1,72 @@
+"""
+Reparto de URLs en tramos de sharding.py: cada post se extrae una sola vez y las categorías
+que lo comparten reciben una copia en orden del listado.
+"""
+import json
+
+import pytest
+
+from sharding import Shard, assign_shards, merge_shared, read_part
+
+LISTINGS = {
+    "Pymes": ["a", "b", "c", "d", "e"],
+    "Noticias": ["x", "b", "y", "e"],
+    "Corporativos": ["b", "e"],
+}
+
+
+def write_part(path, category, urls):
+    with open(path, "w", encoding="utf-8") as f:
+        for url in urls:
+            f.write(json.dumps({"URL": url, "Titular": url.upper(), "Categoría": category}) + "\n")
+
+
+def test_assign_shards_extracts_each_url_once():
+    ready = {"d": {"URL": "d"}, "y": {"URL": "y"}}
+    
+    shards, tramos, owners = assign_shards(["Pymes", "Noticias", "Corporativos"], LISTINGS, ready, shard_size=2)
+    
+    assert shards == [
+        Shard("Pymes", 1, ("a", "b"), {}),
+        Shard("Pymes", 2, ("c", "d"), {"d": {"URL": "d"}}),
+        Shard("Pymes", 3, ("e",), {}),
+        Shard("Noticias", 1, ("x",), {}),
+        Shard("Noticias", 2, ("y",), {"y": {"URL": "y"}}),
+        Shard("Corporativos", 1, (), {}),
+    ]
+    assert tramos[("Noticias", 1)] == ["x", "b"]
+    assert tramos[("Corporativos", 1)] == ["b", "e"]
+    assert owners == {"a": "Pymes", "b": "Pymes", "c": "Pymes", "d": "Pymes", "e": "Pymes",
+                      "x": "Noticias", "y": "Noticias"}
+
+
+def test_assign_shards_follows_category_order():
+    _, _, owners = assign_shards(["Corporativos", "Pymes"], LISTINGS, {}, shard_size=10)
+    
+    assert owners["b"] == owners["e"] == "Corporativos"
+    assert owners["a"] == "Pymes"
+
+
+def test_merge_shared_keeps_listing_order(tmp_path):
+    _, tramos, owners = assign_shards(["Pymes", "Noticias"], LISTINGS, {}, shard_size=10)
+    path = str(tmp_path / "noticias-1.jsonl")
+    write_part(path, "Noticias", ["x", "y"])
+    shared = {"b": {"URL": "b", "Titular": "B", "Categoría": "Pymes"},
+              "e": {"URL": "e", "Titular": "E", "Categoría": "Pymes"}}
+    
+    count = merge_shared(path, "Noticias", tramos[("Noticias", 1)], owners, shared)
+    
+    posts = read_part(path)
+    assert count == 4
+    assert [post["URL"] for post in posts] == ["x", "b", "y", "e"]
+    assert {post["Categoría"] for post in posts} == {"Noticias"}
+    assert shared["b"]["Categoría"] == "Pymes"
+
+
+def test_merge_shared_fails_without_the_owner_record(tmp_path):
+    _, tramos, owners = assign_shards(["Pymes", "Noticias"], LISTINGS, {}, shard_size=10)
+    path = str(tmp_path / "noticias-1.jsonl")
+    write_part(path, "Noticias", ["x", "y"])
+    
+    with pytest.raises(KeyError):
+        merge_shared(path, "Noticias", tramos[("Noticias", 1)], owners, {"b": {"URL": "b"}})
@@ -0,0 +1,109 @@
+"""
+Posts compartidos entre categorías en XepelinPlaywrightScraper, con los listados de
+benchmarks.fixture_site (parte de los posts aparece en dos categorías): cada post se visita
+una sola vez y cada categoría recibe su propia copia del registro con su "Categoría".
+"""
+import threading
+
+import pytest
+
+from benchmarks.fixture_site import FixtureSite
+from scraper_playwright import XepelinPlaywrightScraper
+
+CATEGORIES = {"Pymes": "pymes", "Noticias": "noticias", "Corporativos": "corporativos"}
+
+
+@pytest.fixture(scope="module")
+def site():
+    site = FixtureSite(CATEGORIES, posts=45, overlap=0.3, body_kb=1)
+    assert len(site.expected_urls()) < sum(len(site.expected_urls(name)) for name in CATEGORIES)
+    return site
+
+
+@pytest.fixture(scope="module")
+def discovered(site):
+    return {name: site.expected_urls(name) for name in CATEGORIES}
+
+
+class SiteScraper(XepelinPlaywrightScraper):
+    """Scraper que lee los listados del sitio de prueba y "visita" los posts sin navegador."""
+    
+    def __init__(self, site, failing=(), **kwargs):
+        super().__init__(**kwargs)
+        self.site = site
+        self.failing = set(failing)  # Categorías cuyo listado falla
+        self.visited = []
+        self._lock = threading.Lock()
+    
+    def _discover_listing(self, category_name, known_urls):
+        if category_name in self.failing:
+            raise RuntimeError("Timeout esperando el listado")
+        return self.site.expected_urls(category_name), {}
+    
+    def _extract_posts_details(self, urls, on_post=None):
+        with self._lock:
+            self.visited.extend(urls)
+        posts = [self.site.expected_post(url) for url in urls]
+        for url, post in zip(urls, posts):
+            if on_post:
+                on_post(url, post)
+        return posts
+
+
+def test_dedupe_keeps_the_first_appearance(site, discovered):
+    unique = XepelinPlaywrightScraper._dedupe_urls(discovered)
+    
+    assert sorted(unique) == sorted(site.expected_urls())
+    listed = [url for urls in discovered.values() for url in urls]
+    assert unique == sorted(set(listed), key=listed.index)
+
+
+def test_fan_out_gives_each_category_its_own_copy(site, discovered):
+    posts_by_url = {url: site.expected_post(url) for url in site.expected_urls()}
+    
+    results = XepelinPlaywrightScraper._fan_out(discovered, posts_by_url)
+    
+    for name, urls in discovered.items():
+        assert [post["URL"] for post in results[name]] == urls
+        assert {post["Categoría"] for post in results[name]} == {name}
+    assert all("Categoría" not in post for post in posts_by_url.values())  # Los únicos no cambian
+
+
+def test_categories_of_follows_the_category_order():
+    discovered = {"Pymes": ["a", "b", "a"], "Noticias": ["b", "c"], "Corporativos": []}
+    
+    assert XepelinPlaywrightScraper._categories_of(discovered) == {
+        "a": ["Pymes"], "b": ["Pymes", "Noticias"], "c": ["Noticias"]}
+
+
+def test_scrape_all_categories_visits_each_post_once(site, discovered):
+    scraper = SiteScraper(site, concurrency=2)
+    
+    results = scraper.scrape_all_categories()
+    
+    assert sorted(scraper.visited) == sorted(site.expected_urls())
+    for name, urls in discovered.items():
+        assert results[name] == [dict(site.expected_post(url), Categoría=name) for url in urls]
+
+
+def test_iter_all_posts_yields_one_copy_per_category(site, discovered):
+    scraper = SiteScraper(site)
+    
+    posts = list(scraper.iter_all_posts(batch_size=7))
+    
+    assert sorted(scraper.visited) == sorted(site.expected_urls())
+    for name, urls in discovered.items():
+        category_posts = [post for post in posts if post["Categoría"] == name]
+        assert sorted(post["URL"] for post in category_posts) == sorted(urls)
+        assert all(post == dict(site.expected_post(post["URL"]), Categoría=name) for post in category_posts)
+    first = next(iter(discovered))
+    assert [post["URL"] for post in posts if post["Categoría"] == first] == discovered[first]
+
+
+def test_failed_category_is_left_empty(site, discovered):
+    scraper = SiteScraper(site, failing={"Noticias"})
+    
+    results = scraper.scrape_all_categories()
+    
+    assert results["Noticias"] == []
+    assert sorted(scraper.visited) == sorted(set(discovered["Pymes"]) | set(discovered["Corporativos"]))
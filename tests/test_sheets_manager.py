@@ -0,0 +1,224 @@
+"""
+GoogleSheetsManager contra la API falsa de benchmarks.fake_sheets: reintentos de 429 y 5xx,
+diff por URL de sync_multiple_categories / SheetLayout y contenido final de la planilla.
+"""
+import gspread
+import pytest
+
+from benchmarks.fake_sheets import FakeSheetsClient
+from metrics import FAILURES
+from sheets_manager import GoogleSheetsManager, SheetLayout, SheetsSink
+
+
+def make_posts(category, count, prefix="post"):
+    return [{"Titular": f"{prefix} {i}", "Categoría": category, "Autor": "Ana", "Tiempo de lectura": "5 min",
+             "Fecha": "2024-01-01", "URL": f"https://example.test/blog/{category.lower()}/{prefix}-{i}"}
+            for i in range(count)]
+
+
+CATEGORIES = {"Pymes": make_posts("Pymes", 5), "Noticias": make_posts("Noticias", 3)}
+
+
+@pytest.fixture
+def client():
+    return FakeSheetsClient()
+
+
+@pytest.fixture
+def manager(client):
+    return GoogleSheetsManager(client=client, max_retries=3, retry_base_seconds=0)
+
+
+def sheet_rows(client, url, title):
+    return client.spreadsheet(url).sheet(title).values()
+
+
+def expected_rows(manager, posts):
+    return [manager.HEADERS] + [manager._post_to_row(post) for post in posts]
+
+
+def assert_sheets(client, manager, url, categories):
+    spreadsheet = client.spreadsheet(url)
+    assert {sheet.title for sheet in spreadsheet.sheets} == set(categories)
+    for name, posts in categories.items():
+        assert sheet_rows(client, url, name) == expected_rows(manager, posts)
+
+
+def test_write_retries_rate_limited_batch_update(client, manager):
+    retries_before = FAILURES.value(stage="sheets_retry")
+    client.inject_error("batch_update", 429, times=2)
+    
+    url = manager.write_multiple_categories(CATEGORIES)
+    
+    assert client.calls["batch_update"] == 3
+    assert client.rejected == 2
+    assert FAILURES.value(stage="sheets_retry") - retries_before == 2
+    assert_sheets(client, manager, url, CATEGORIES)
+
+
+def test_sync_retries_server_error_on_read(client, manager):
+    url = manager.write_multiple_categories(CATEGORIES)
+    changed = {"Pymes": make_posts("Pymes", 2, "nuevo") + CATEGORIES["Pymes"][1:], "Noticias": CATEGORIES["Noticias"]}
+    client.inject_error("values_batch_get", 503)
+    
+    manager.sync_multiple_categories(changed, url)
+    
+    assert client.calls["values_batch_get"] == 2
+    assert_sheets(client, manager, url, changed)
+
+
+def test_sync_does_not_retry_committed_batch_update(client, manager):
+    url = manager.write_multiple_categories(CATEGORIES)
+    changed = {"Pymes": make_posts("Pymes", 2, "nuevo") + CATEGORIES["Pymes"][2:], "Noticias": CATEGORIES["Noticias"]}
+    client.inject_error("batch_update", 500, applied=True)
+    calls_before = client.calls["batch_update"]
+    
+    with pytest.raises(gspread.exceptions.APIError):
+        manager.sync_multiple_categories(changed, url)
+    
+    # La escritura se aplicó una sola vez: las filas no quedaron desplazadas dos veces
+    assert client.calls["batch_update"] - calls_before == 1
+    assert_sheets(client, manager, url, changed)
+
+
+def test_create_is_not_retried_on_server_error(client, manager):
+    client.inject_error("create", 500, applied=True)
+    
+    with pytest.raises(gspread.exceptions.APIError):
+        manager.create_spreadsheet("prueba")
+    
+    assert len(client.spreadsheets) == 1
+
+
+def test_gives_up_after_max_retries(client, manager):
+    client.inject_error("batch_update", 429, times=manager.max_retries + 1)
+    
+    with pytest.raises(gspread.exceptions.APIError):
+        manager.write_multiple_categories(CATEGORIES)
+    
+    assert client.calls["batch_update"] == manager.max_retries + 1
+
+
+def test_sink_streams_batches_through_rate_limits(client, manager):
+    url = manager.write_multiple_categories({"Pymes": make_posts("Pymes", 4, "viejo"), "Otra": make_posts("Otra", 1)})
+    sink = SheetsSink(manager, url, categories=list(CATEGORIES))
+    client.inject_error("batch_update", 429)
+    client.inject_error("values_batch_get", 500)
+    
+    for name, posts in CATEGORIES.items():
+        sink.write_batch(name, posts[:2])
+        client.inject_error("batch_update", 429)
+        sink.write_batch(name, posts[2:])
+    sink.close()
+    
+    assert_sheets(client, manager, url, CATEGORIES)
+
+
+def test_sinks_sharing_a_spreadsheet_interleave_batches(client, manager):
+    url = manager.write_multiple_categories({"Pymes": make_posts("Pymes", 4, "viejo")})
+    first = SheetsSink(manager, url, categories=list(CATEGORIES))
+    second = SheetsSink(manager, url, categories=list(CATEGORIES))
+    
+    # Cada job toma el lock de la planilla por lote: sus lotes se intercalan
+    first.write_batch("Pymes", CATEGORIES["Pymes"][:2])
+    second.write_batch("Pymes", CATEGORIES["Pymes"][:3])
+    first.write_batch("Pymes", CATEGORIES["Pymes"][2:])
+    second.write_batch("Noticias", CATEGORIES["Noticias"])
+    first.write_batch("Noticias", CATEGORIES["Noticias"])
+    second.write_batch("Pymes", CATEGORIES["Pymes"][3:])
+    first.close()
+    second.close()
+    
+    assert_sheets(client, manager, url, CATEGORIES)
+
+
+def set_rows(client, url, title, rows):
+    """Reemplaza las filas de datos de una hoja, como si alguien la hubiera editado a mano."""
+    sheet = client.spreadsheet(url).sheet(title)
+    for index, row in enumerate(rows, start=1):
+        sheet.cells[index] = (list(row) + [""] * sheet.col_count)[:sheet.col_count]
+    for index in range(len(rows) + 1, sheet.row_count):
+        sheet.cells[index] = [""] * sheet.col_count
+
+
+def test_sync_of_an_unchanged_sheet_sends_no_writes(client, manager):
+    url = manager.write_multiple_categories(CATEGORIES)
+    writes, applied = client.calls["batch_update"], client.applied_requests
+    
+    assert manager.sync_multiple_categories(CATEGORIES, url) == url
+    
+    assert client.calls["batch_update"] == writes and client.applied_requests == applied
+    assert client.calls["values_batch_get"] == 1  # Todas las hojas en una lectura
+    assert_sheets(client, manager, url, CATEGORIES)
+
+
+def test_sync_inserts_new_posts_after_their_predecessor(client, manager):
+    url = manager.write_multiple_categories(CATEGORIES)
+    old = CATEGORIES["Pymes"]
+    first, middle = make_posts("Pymes", 2, "nuevo")
+    edited = dict(old[3], Titular="Título corregido")
+    changed = {"Pymes": [first] + old[:2] + [middle] + old[2:3] + [edited], "Noticias": CATEGORIES["Noticias"]}
+    applied = client.applied_requests
+    
+    manager.sync_multiple_categories(changed, url)
+    
+    assert_sheets(client, manager, url, changed)
+    # Dos inserciones (insertDimension + updateCells), una fila editada y una borrada
+    assert client.applied_requests - applied == 6
+
+
+def test_layout_insert_position_follows_the_predecessor(manager):
+    rows = [manager._post_to_row(post) for post in CATEGORIES["Pymes"]]
+    new = [manager._post_to_row(post) for post in make_posts("Pymes", 2, "nuevo")]
+    layout = SheetLayout(manager, 7, len(rows) + 1, [manager.HEADERS] + rows)  # Grilla justa
+    
+    requests = layout.upsert(rows[:2] + new + rows[2:])
+    
+    insert, cells = requests
+    assert insert["insertDimension"]["range"] == {"sheetId": 7, "dimension": "ROWS", "startIndex": 3, "endIndex": 5}
+    assert cells["updateCells"]["start"]["rowIndex"] == 3
+    assert layout.order == [row[-1] for row in rows[:2] + new + rows[2:]]
+    assert layout.stats == {"inserted": 2, "updated": 0, "deleted": 0, "unchanged": 5}
+    
+    # Las nuevas de un lote siguiente van detrás de `after`; al final de la grilla se agregan filas
+    tail = [manager._post_to_row(post) for post in make_posts("Pymes", 20, "cola")[10:]]
+    append = layout.upsert(tail, after=rows[-1][-1])[0]
+    assert append["appendDimension"] == {"sheetId": 7, "dimension": "ROWS", "length": 10}
+    assert layout.row_count == 18
+
+
+def test_sync_deletes_duplicated_and_url_less_rows(client, manager):
+    url = manager.write_multiple_categories(CATEGORIES)
+    rows = [manager._post_to_row(post) for post in CATEGORIES["Pymes"]]
+    no_url = manager._post_to_row(dict(CATEGORIES["Pymes"][0], URL=""))
+    set_rows(client, url, "Pymes", rows[:2] + [no_url, rows[1]] + rows[2:] + [rows[0]])
+    
+    manager.sync_multiple_categories(CATEGORIES, url)
+    
+    assert_sheets(client, manager, url, CATEGORIES)
+
+
+def test_layout_deletes_bottom_up_in_contiguous_ranges(manager):
+    rows = [manager._post_to_row(post) for post in CATEGORIES["Pymes"]]
+    no_url = rows[0][:-1] + [""]
+    layout = SheetLayout(manager, 7, 20, [manager.HEADERS] + [rows[0], no_url, rows[0], rows[1], rows[2], rows[3]])
+    
+    requests = layout.delete_rows({rows[0][-1], rows[1][-1], rows[3][-1]})
+    
+    assert [request["deleteDimension"]["range"]["startIndex"] for request in requests] == [5, 2]
+    assert [request["deleteDimension"]["range"]["endIndex"] for request in requests] == [6, 4]
+    assert layout.order == [rows[0][-1], rows[1][-1], rows[3][-1]]
+    assert layout.row_count == 17 and layout.stats["deleted"] == 3
+
+
+def test_sync_repairs_a_broken_header(client, manager):
+    url = manager.write_multiple_categories(CATEGORIES)
+    sheet = client.spreadsheet(url).sheet("Noticias")
+    sheet.cells[0] = ["Titulo", "Cat"] + [""] * (sheet.col_count - 2)
+    sheet.header_formatted = False
+    
+    manager.sync_multiple_categories(CATEGORIES, url)
+    
+    assert_sheets(client, manager, url, CATEGORIES)
+    assert client.spreadsheet(url).sheet("Noticias").header_formatted
+    assert SheetLayout(manager, 1, 10, [manager.HEADERS]).header_requests() == []
@@ -0,0 +1,156 @@
+"""
+Descubrimiento por sitemap contra el sitio de prueba de benchmarks.fixture_site: parseo de
+sitemaps, índices y feeds, reparto en categorías, corte incremental por lastmod y vuelta
+al listado para las categorías que no aparecen.
+"""
+import io
+import time
+
+import pytest
+
+from benchmarks import fixture_site
+from benchmarks.fixture_site import FixtureSite
+from post_cache import PostCache
+from scraper_playwright import XepelinPlaywrightScraper
+from sitemap_discovery import SitemapDiscovery, SitemapEntry, parse_date
+
+CATEGORIES = {"Pymes": "pymes", "Noticias": "noticias", "Casos de éxito": "empresarios-exitosos"}
+
+SITEMAP_NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def parse(xml):
+    return list(SitemapDiscovery._parse(io.BytesIO(xml.encode())))
+
+
+@pytest.fixture
+def site(monkeypatch):
+    # Pocos posts por sitemap hijo para que el índice tenga varios
+    monkeypatch.setattr(fixture_site, "SITEMAP_CHUNK", 10)
+    with FixtureSite(CATEGORIES, posts=45, overlap=0.2) as site:
+        yield site
+
+
+@pytest.fixture
+def discovery(site):
+    return SitemapDiscovery(site.base_url, CATEGORIES)
+
+
+def make_scraper(site, categories=CATEGORIES, **kwargs):
+    scraper_cls = type("S", (XepelinPlaywrightScraper,), {"BASE_URL": site.base_url, "CATEGORIES": categories})
+    return scraper_cls(discovery="sitemap", **kwargs)
+
+
+def test_parse_date_formats():
+    assert parse_date("2024-01-02T03:04:05Z") == 1704164645
+    assert parse_date("2024-01-02T03:04:05+00:00") == 1704164645
+    assert parse_date("2024-01-02") == 1704153600  # Sin zona horaria se asume UTC
+    assert parse_date("Tue, 02 Jan 2024 03:04:05 GMT") == 1704164645
+    assert parse_date("  2024-01-02T03:04:05Z\n") == 1704164645
+    assert parse_date("ayer") is None
+    assert parse_date("") is None
+    assert parse_date(None) is None
+
+
+def test_parse_sitemap_index_and_urlset():
+    index = (f'<?xml version="1.0"?><sitemapindex {SITEMAP_NS}>'
+             '<sitemap><loc>https://example.test/sitemap-1.xml</loc></sitemap>'
+             '<sitemap><loc> https://example.test/sitemap-2.xml.gz </loc></sitemap>'
+             '<sitemap><lastmod>2024-01-01</lastmod></sitemap>'
+             '</sitemapindex>')
+    assert parse(index) == [("sitemap", "https://example.test/sitemap-1.xml"),
+                            ("sitemap", "https://example.test/sitemap-2.xml.gz")]
+    
+    urlset = (f'<urlset {SITEMAP_NS}>'
+              '<url><loc>https://example.test/blog/pymes/a</loc><lastmod>2024-01-02T03:04:05Z</lastmod></url>'
+              '<url><loc>https://example.test/blog/pymes/b</loc></url>'
+              '</urlset>')
+    assert parse(urlset) == [
+        ("entry", SitemapEntry("https://example.test/blog/pymes/a", 1704164645, "", ())),
+        ("entry", SitemapEntry("https://example.test/blog/pymes/b", None, "", ())),
+    ]
+
+
+def test_parse_rss_and_atom_feeds():
+    rss = ('<rss version="2.0"><channel><title>Blog</title><link>https://example.test/blog</link>'
+           '<item><title>Post A</title><link>https://example.test/blog/a</link>'
+           '<pubDate>Tue, 02 Jan 2024 03:04:05 GMT</pubDate>'
+           '<category>Pymes</category><category>noticias</category></item>'
+           '</channel></rss>')
+    assert parse(rss) == [("entry", SitemapEntry("https://example.test/blog/a", 1704164645, "Post A",
+                                                 ("Pymes", "noticias")))]
+    
+    atom = ('<feed xmlns="http://www.w3.org/2005/Atom"><entry><title>Post B</title>'
+            '<link rel="self" href="https://example.test/feed/b"/>'
+            '<link href="https://example.test/blog/b"/>'
+            '<published>2024-01-02T03:04:05Z</published><category term="Pymes"/></entry></feed>')
+    assert parse(atom) == [("entry", SitemapEntry("https://example.test/blog/b", 1704164645, "Post B",
+                                                  ("Pymes",)))]
+
+
+def test_entries_follow_nested_sitemap_index(site, discovery):
+    entries = discovery.entries()
+    
+    assert set(entries) == set(site.expected_urls())
+    # Fecha del sitemap y título del feed combinados en la misma entrada
+    for url, entry in entries.items():
+        post = site.posts[url[len(site.url("")):]]
+        assert entry.lastmod == parse_date(post["date"])
+        assert entry.title == post["title"]
+
+
+def test_category_entries_match_listings(site, discovery):
+    for name, slug in CATEGORIES.items():
+        entries = discovery.category_entries(slug)
+        assert {entry.url for entry in entries} == set(site.expected_urls(name))
+        # Del más reciente al más antiguo, como el listado
+        assert [entry.lastmod for entry in entries] == sorted((entry.lastmod for entry in entries), reverse=True)
+
+
+def test_categories_of(discovery, site):
+    blog = site.base_url
+    
+    assert discovery.categories_of(SitemapEntry(f"{blog}/pymes/post-1", None, "", ())) == {"pymes"}
+    assert discovery.categories_of(SitemapEntry(f"{blog}/PYMES/post-1/", None, "", ())) == {"pymes"}
+    # Feed con nombre y slug de otras categorías, sin distinguir mayúsculas
+    assert discovery.categories_of(SitemapEntry(f"{blog}/pymes/post-1", None, "",
+                                                ("noticias", "Casos de Éxito"))) == {
+        "pymes", "noticias", "empresarios-exitosos"}
+    # La ruta de una categoría sin post, categorías desconocidas y rutas fuera del blog no cuentan
+    assert discovery.categories_of(SitemapEntry(f"{blog}/pymes", None, "", ("Otra",))) == set()
+    assert discovery.categories_of(SitemapEntry(site.url("/pymes/post-1"), None, "", ())) == set()
+
+
+def test_incremental_reuses_cached_posts_until_lastmod(site, tmp_path):
+    cache = PostCache(str(tmp_path / "cache.db"))
+    scraper = make_scraper(site, cache=cache)
+    urls = site.expected_urls("Pymes")
+    for url in urls:
+        cache.put(url, {"URL": url, "Titular": "guardado"})
+    # Un post modificado después de guardarse en la caché
+    changed = urls[1]
+    site.posts[changed[len(site.url("")):]]["date"] = time.strftime(
+        "%Y-%m-%dT%H:%M:%S.000Z", time.gmtime(time.time() + 3600))
+    
+    found, ready = scraper._discover_new("Pymes", incremental=True)
+    
+    assert found[0] == changed  # El más reciente primero
+    assert set(found) == set(urls)
+    assert set(ready) == set(urls) - {changed}
+    assert all(record["Titular"] == "guardado" for record in ready.values())
+    cache.close()
+
+
+def test_category_missing_from_sitemaps_falls_back_to_listing(site, monkeypatch):
+    scraper = make_scraper(site, categories=dict(CATEGORIES, Otra="otra"))
+    listed = []
+    
+    def discover_listing(category_name, known_urls):
+        listed.append(category_name)
+        return [f"{site.base_url}/otra/post-1"], {}
+    
+    monkeypatch.setattr(scraper, "_discover_listing", discover_listing)
+    
+    assert scraper._discover_new("Otra", incremental=False) == ([f"{site.base_url}/otra/post-1"], {})
+    assert scraper._discover_new("Pymes", incremental=False)[0]
+    assert listed == ["Otra"]
@@ -0,0 +1,191 @@
+"""
+Pool de workers sync de XepelinPlaywrightScraper con navegadores falsos: el resultado sigue
+el orden de las URLs, un navegador que muere devuelve su URL a la cola y los contextos se
+reciclan cada `recycle_every` posts.
+"""
+import random
+import threading
+import time
+
+import pytest
+
+import scraper_playwright
+from scraper_playwright import XepelinPlaywrightScraper
+
+URLS = [f"https://xepelin.com/blog/pymes/post-{i}" for i in range(24)]
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+    
+    def is_closed(self):
+        return False
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+    
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, name, dies_at=None):
+        self.name = name
+        self.dies_at = dies_at  # Cantidad de posts tras la que el navegador muere
+        self.connected = True
+        self.contexts = []
+        self.visited = []
+    
+    def new_context(self):
+        self.contexts.append(FakeContext(self))
+        return self.contexts[-1]
+    
+    def is_connected(self):
+        return self.connected
+    
+    def close(self):
+        self.connected = False
+
+
+class FakePlaywright:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+
+class PoolScraper(XepelinPlaywrightScraper):
+    """Scraper cuyos workers lanzan los navegadores de `launches` en orden."""
+    
+    def __init__(self, launches, **kwargs):
+        super().__init__(**kwargs)
+        self.launches = list(launches)
+        self.launched = []
+        self._launch_lock = threading.Lock()
+    
+    def _launch_browser(self, playwright):
+        with self._launch_lock:
+            browser = self.launches.pop(0) if self.launches else FakeBrowser(f"w{len(self.launched)}")
+            self.launched.append(browser)
+        return browser
+    
+    def _new_page(self, target):
+        return FakePage(target)
+    
+    def _extract_post_details(self, page, url):
+        browser = page.context.browser
+        if not browser.connected:
+            raise RuntimeError("Target closed")
+        if browser.dies_at is not None and len(browser.visited) >= browser.dies_at:
+            browser.connected = False
+            raise RuntimeError("Browser has been disconnected")
+        time.sleep(random.uniform(0, 0.003))
+        browser.visited.append(url)
+        return {"Titular": url.rsplit("/", 1)[-1], "URL": url, "Worker": browser.name}
+
+
+@pytest.fixture(autouse=True)
+def fake_playwright(monkeypatch):
+    monkeypatch.setattr(scraper_playwright, "sync_playwright", FakePlaywright)
+
+
+def test_results_follow_the_url_order():
+    scraper = PoolScraper([], concurrency=4)
+    
+    posts = scraper._extract_posts_details(URLS)
+    
+    assert [post["URL"] for post in posts] == URLS
+    assert len(scraper.launched) == 4
+    assert sum(len(browser.visited) for browser in scraper.launched) == len(URLS)
+    # Sin navegador principal: los workers lanzan el suyo
+    assert scraper.browser is None
+
+
+def test_on_post_receives_every_post_once():
+    scraper = PoolScraper([], concurrency=3)
+    seen = []
+    lock = threading.Lock()
+    
+    def on_post(url, post):
+        with lock:
+            seen.append(url)
+    
+    scraper._extract_posts_details(URLS, on_post=on_post)
+    
+    assert sorted(seen) == sorted(URLS)
+
+
+def test_disconnected_browser_requeues_its_url():
+    dying = FakeBrowser("dying", dies_at=0)
+    scraper = PoolScraper([dying, FakeBrowser("w1"), FakeBrowser("w2")], concurrency=3)
+    
+    posts = scraper._extract_posts_details(URLS)
+    
+    assert [post["URL"] for post in posts] == URLS
+    # La URL que tenía el navegador muerto la extrajo otro worker, sin registro de respaldo
+    assert {post.get("Worker") for post in posts} == {"w1", "w2"}
+    assert dying.visited == [] and not dying.connected
+    assert all(context.closed for browser in scraper.launched[1:] for context in browser.contexts)
+
+
+def test_main_browser_finishes_when_every_worker_dies():
+    scraper = PoolScraper([FakeBrowser("a", dies_at=1), FakeBrowser("b", dies_at=1)], concurrency=2)
+    scraper.browser = FakeBrowser("main")
+    
+    posts = scraper._extract_posts_details(URLS)
+    
+    assert [post["URL"] for post in posts] == URLS
+    assert len(scraper.browser.visited) == len(URLS) - 2
+
+
+def test_every_worker_dead_without_main_browser_raises():
+    scraper = PoolScraper([FakeBrowser("a", dies_at=1), FakeBrowser("b", dies_at=1)], concurrency=2)
+    
+    with pytest.raises(RuntimeError, match="Browser no inicializado"):
+        scraper._extract_posts_details(URLS)
+
+
+def test_contexts_are_recycled_every_n_posts():
+    scraper = PoolScraper([], concurrency=1, recycle_every=5)
+    scraper.browser = FakeBrowser("main")
+    
+    posts = scraper._extract_posts_details(URLS[:12])
+    
+    assert len(posts) == 12
+    assert len(scraper.browser.contexts) == 3
+    assert all(context.closed for context in scraper.browser.contexts)
+
+
+class FakeFetcher:
+    """HttpPostFetcher que solo resuelve las URLs de `complete`."""
+    
+    def __init__(self, complete):
+        self.complete = set(complete)
+        self.stored = []
+    
+    def fetch_post(self, url):
+        return {"Titular": "http", "URL": url} if url in self.complete else None
+    
+    def store(self, url, post):
+        self.stored.append(url)
+
+
+def test_browser_is_only_required_for_fallbacks():
+    scraper = PoolScraper([], concurrency=1)
+    scraper.http_fetcher = FakeFetcher(URLS)
+    
+    assert [post["Titular"] for post in scraper._extract_posts_details(URLS)] == ["http"] * len(URLS)
+    
+    scraper.http_fetcher = FakeFetcher(URLS[1:])
+    with pytest.raises(RuntimeError, match="Browser no inicializado"):
+        scraper._extract_posts_details(URLS)
+    
+    scraper.browser = FakeBrowser("main")
+    posts = scraper._extract_posts_details(URLS)
+    assert posts[0]["Worker"] == "main" and posts[1]["Titular"] == "http"
+    assert scraper.http_fetcher.stored == [URLS[0]]
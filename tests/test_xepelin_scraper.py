@@ -0,0 +1,118 @@
+"""
+Línea de comandos (xepelin_scraper.py) con `run_shards` reemplazado por una versión que
+escribe las partes sin lanzar procesos: validación de argumentos, formato deducido de la
+extensión y códigos de salida.
+"""
+import csv
+import json
+
+import pytest
+
+import xepelin_scraper
+from sharding import Shard, ShardOptions
+from xepelin_scraper import build_parser, main
+
+
+class FakeShards:
+    """`run_shards` que entrega dos posts por categoría, o un error para las de `failing`."""
+    
+    def __init__(self, failing=(), empty=False):
+        self.failing = set(failing)
+        self.empty = empty
+        self.calls = []
+    
+    def __call__(self, categories, parts_dir, options=None, workers=None, worker_memory_mb=700):
+        self.calls.append({"categories": categories, "options": options, "workers": workers})
+        for category in reversed(categories):  # El orden de la salida no depende de quién termina antes
+            path = f"{parts_dir}/{category}.jsonl"
+            posts = [] if self.empty else [
+                {"Titular": f"{category} {i}", "Categoría": category, "URL": f"https://x/{category}/{i}"}
+                for i in range(2)]
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(post) + "\n" for post in posts)
+            report = {"posts": len(posts), "wall_seconds": 0.1, "part_path": path, "stages": {"extract": [0.05]}}
+            if category in self.failing:
+                report["error"] = "navegador caído"
+            yield Shard(category, 1, None, {}), report
+
+
+@pytest.fixture
+def shards(monkeypatch):
+    shards = FakeShards()
+    monkeypatch.setattr(xepelin_scraper, "run_shards", shards)
+    return shards
+
+
+def test_parser_defaults():
+    args = build_parser().parse_args(["scrape", "--out", "posts.jsonl"])
+    
+    assert args.categories == list(xepelin_scraper.XepelinPlaywrightScraper.CATEGORIES)
+    assert (args.format, args.concurrency, args.shard_size, args.backend) == (None, None, 200, "browser")
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["scrape"])  # --out es obligatorio
+
+
+def test_writes_the_format_of_the_extension(tmp_path, shards, capsys):
+    out = tmp_path / "posts.csv"
+    
+    code = main(["scrape", "--categories", "Pymes", "Noticias", "Pymes", "--out", str(out),
+                 "--backend", "http", "--shard-size", "50", "--concurrency", "3"])
+    
+    assert code == 0
+    with open(out, encoding="utf-8-sig", newline="") as f:
+        assert [row["Titular"] for row in csv.DictReader(f)] == ["Pymes 0", "Pymes 1", "Noticias 0", "Noticias 1"]
+    call, = shards.calls
+    assert call["categories"] == ["Pymes", "Noticias"] and call["workers"] == 3
+    assert call["options"] == ShardOptions(backend="http", shard_size=50)
+    assert "Tiempo total" in capsys.readouterr().out
+
+
+def test_format_flag_overrides_an_unknown_extension(tmp_path, shards):
+    out = tmp_path / "posts.txt"
+    
+    assert main(["scrape", "--categories", "Pymes", "--out", str(out), "--format", "jsonl"]) == 0
+    
+    assert [json.loads(line)["Titular"] for line in out.read_text(encoding="utf-8").splitlines()] == ["Pymes 0", "Pymes 1"]
+
+
+@pytest.mark.parametrize("argv, message", [
+    (["--categories", "Pymes", "Inventada", "--out", "x.jsonl"], "categorías desconocidas: Inventada"),
+    (["--out", "x.txt"], "no se reconoce el formato"),
+    (["--out", "x.jsonl", "--concurrency", "0"], "--concurrency debe ser >= 1"),
+    (["--out", "x.jsonl", "--shard-size", "0"], "--shard-size debe ser >= 1"),
+])
+def test_invalid_arguments_exit_with_code_2(shards, capsys, argv, message):
+    with pytest.raises(SystemExit) as exc:
+        main(["scrape"] + argv)
+    
+    assert exc.value.code == 2
+    assert message in capsys.readouterr().err
+    assert shards.calls == []
+
+
+def test_unavailable_format_exits_with_code_2(monkeypatch, shards, capsys):
+    monkeypatch.setattr(xepelin_scraper, "available_formats", lambda: ["jsonl", "csv", "sqlite"])
+    
+    with pytest.raises(SystemExit) as exc:
+        main(["scrape", "--out", "x.parquet"])
+    
+    assert exc.value.code == 2
+    assert "requiere pyarrow" in capsys.readouterr().err
+
+
+def test_failed_category_is_left_out_and_exits_with_1(tmp_path, monkeypatch):
+    monkeypatch.setattr(xepelin_scraper, "run_shards", FakeShards(failing={"Noticias"}))
+    out = tmp_path / "posts.jsonl"
+    
+    assert main(["scrape", "--categories", "Pymes", "Noticias", "--out", str(out)]) == 1
+    
+    assert [json.loads(line)["Categoría"] for line in out.read_text(encoding="utf-8").splitlines()] == ["Pymes"] * 2
+
+
+def test_no_posts_exits_with_1(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(xepelin_scraper, "run_shards", FakeShards(empty=True))
+    out = tmp_path / "posts.jsonl"
+    
+    assert main(["scrape", "--categories", "Pymes", "--out", str(out)]) == 1
+    
+    assert "No se encontraron posts" in capsys.readouterr().out
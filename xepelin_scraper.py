@@ -0,0 +1,181 @@
+"""
+Línea de comandos del scraper: escribe los posts en un archivo local (JSONL, CSV, Parquet
+o SQLite) sin servidor web, webhook ni credenciales de Google Sheets.
+
+Cada categoría se descubre en un proceso propio (hasta `--concurrency` a la vez, cada uno con
+su navegador; ver sharding.py) y sus URLs se reparten en tramos de `--shard-size` posts entre
+varios procesos, sin extraer dos veces los posts que aparecen en varias categorías. Cada
+shard escribe un JSONL temporal; al terminar, las partes se unen en el archivo de salida en
+el orden de `--categories`, sin importar cuál terminó primero. Al final se imprimen los
+tiempos por etapa sumados de todos los procesos.
+
+Uso:
+    python -m xepelin_scraper scrape --out posts.parquet
+    python -m xepelin_scraper scrape --categories Pymes Noticias --concurrency 2 --backend http --out posts.sqlite
+    python -m xepelin_scraper scrape --categories Pymes --out pymes.txt --format jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from metrics import percentile, timed
+from post_sinks import FILE_SINKS, StreamingWriter, available_formats, open_file_sink, sink_format
+from scraper_playwright import XepelinPlaywrightScraper
+from sharding import ShardOptions, record_stages, run_shards
+
+
+def merge_parts(parts: List[str], out: str, output: str, batch_size: int = 50) -> Optional[str]:
+    """
+    Une las partes JSONL en el archivo de salida, en el orden de `parts`.
+    
+    Returns:
+        Ruta del archivo, o None si las partes no tenían posts
+    """
+    with StreamingWriter(open_file_sink(output, out), batch_size=batch_size) as writer:
+        for part in parts:
+            if not os.path.exists(part):
+                continue
+            with open(part, encoding="utf-8") as f:
+                for line in f:
+                    writer.put(json.loads(line))
+    return writer.result
+
+
+def scrape(categories: List[str], out: str, output: str, concurrency: Optional[int] = None,
+           worker_memory_mb: int = 700, options: Optional[ShardOptions] = None) -> Dict[str, Any]:
+    """
+    Extrae las categorías en procesos paralelos y une sus posts en `out`.
+    
+    Args:
+        categories: Nombres de categorías, en el orden en que quedan en la salida
+        out: Ruta del archivo de salida
+        output: Formato (clave de FILE_SINKS)
+        concurrency: Procesos worker simultáneos (por defecto, los núcleos de la máquina)
+        worker_memory_mb: Memoria estimada de un worker con su navegador
+        options: Backend, descubrimiento, nivel de detalle y tamaños de tramo y lote
+                 (por defecto, ShardOptions())
+    
+    Returns:
+        {"result": ruta o None, "categories": {categoría: {"posts", "shards", "wall_seconds", "error"?}},
+         "stages": {etapa: [duraciones]}, "wall_seconds"}
+    """
+    options = options or ShardOptions()
+    started = time.perf_counter()
+    stages = record_stages()
+    reports: Dict[str, Dict[str, Any]] = {category: {"posts": 0, "shards": 0, "wall_seconds": 0.0}
+                                          for category in categories}
+    parts: Dict[str, List[str]] = {category: [] for category in categories}
+    
+    with tempfile.TemporaryDirectory(prefix="xepelin-parts-") as parts_dir:
+        for shard, report in run_shards(categories, parts_dir, options, concurrency, worker_memory_mb):
+            summary = reports[shard.category]
+            summary["shards"] += 1
+            summary["posts"] += report["posts"]
+            summary["wall_seconds"] += report["wall_seconds"]
+            if "error" in report:
+                summary["error"] = report["error"]
+            else:
+                print(f"✅ {shard.category} (tramo {shard.part}): {report['posts']} posts "
+                      f"en {report['wall_seconds']:.1f}s")
+            parts[shard.category].append(report["part_path"])
+            for stage, values in report["stages"].items():
+                stages[stage] += values
+        
+        # Las partes de una categoría con un tramo fallido pueden estar incompletas: no se incluyen
+        with timed("merge"):
+            result = merge_parts([path for category in categories if "error" not in reports[category]
+                                  for path in parts[category]], out, output, options.batch_size)
+    
+    return {
+        "result": result,
+        "categories": reports,
+        "stages": dict(stages),
+        "wall_seconds": time.perf_counter() - started,
+    }
+
+
+def print_timings(summary: Dict[str, Any]) -> None:
+    """Tabla de posts por categoría y de tiempos por etapa (sumados entre procesos)."""
+    print(f"\n{'categoría':<24}{'posts':>8}{'tramos':>8}{'segundos':>10}")
+    for category, report in summary["categories"].items():
+        if "error" in report:
+            print(f"{category:<24}{'error':>8}  {report['error']}")
+        else:
+            print(f"{category:<24}{report['posts']:>8}{report['shards']:>8}{report['wall_seconds']:>10.1f}")
+    
+    print(f"\n{'etapa':<24}{'n':>8}{'total s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, values in sorted(summary["stages"].items()):
+        p50, p95, p99 = (percentile(values, pct) * 1000 for pct in (50, 95, 99))
+        print(f"{stage:<24}{len(values):>8}{sum(values):>10.1f}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}")
+    print(f"\n⏱️ Tiempo total: {summary['wall_seconds']:.1f}s")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="xepelin_scraper", description="Scraper del blog de Xepelin")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    scrape_parser = commands.add_parser("scrape", help="Extrae posts y los escribe en un archivo local")
+    scrape_parser.add_argument("--categories", nargs="+", metavar="CATEGORIA",
+                               default=list(XepelinPlaywrightScraper.CATEGORIES),
+                               help="Categorías a extraer (por defecto, todas)")
+    scrape_parser.add_argument("--out", required=True,
+                               help="Archivo de salida; el formato se deduce de la extensión "
+                                    "(.jsonl, .csv, .parquet, .sqlite)")
+    scrape_parser.add_argument("--format", choices=list(FILE_SINKS), default=None,
+                               help="Formato de salida, si la extensión no lo indica")
+    scrape_parser.add_argument("--concurrency", type=int, default=None,
+                               help="Procesos a la vez, cada uno con su navegador (por defecto, los núcleos; "
+                                    "se lanzan menos si no alcanza la memoria)")
+    scrape_parser.add_argument("--shard-size", type=int, default=200,
+                               help="Las categorías con más posts se reparten en tramos de este tamaño")
+    scrape_parser.add_argument("--worker-memory-mb", type=int, default=700,
+                               help="Memoria estimada de un worker con su navegador")
+    scrape_parser.add_argument("--backend", choices=XepelinPlaywrightScraper.BACKENDS, default="browser",
+                               help="browser visita cada post; http descarga el HTML y usa el navegador "
+                                    "solo si está incompleto")
+    scrape_parser.add_argument("--discovery", choices=XepelinPlaywrightScraper.DISCOVERY_BACKENDS,
+                               default="listing")
+    scrape_parser.add_argument("--detail-level", choices=XepelinPlaywrightScraper.DETAIL_LEVELS,
+                               default="full")
+    scrape_parser.add_argument("--batch-size", type=int, default=50, help="Registros por micro-lote")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    unknown = [name for name in args.categories if name not in XepelinPlaywrightScraper.CATEGORIES]
+    if unknown:
+        parser.error(f"categorías desconocidas: {', '.join(unknown)} "
+                     f"(disponibles: {', '.join(XepelinPlaywrightScraper.CATEGORIES)})")
+    output = args.format or sink_format(args.out)
+    if output is None:
+        parser.error(f"no se reconoce el formato de '{args.out}'; indícalo con --format")
+    if output not in available_formats():
+        parser.error(f"el formato {output} no está disponible (Parquet requiere pyarrow)")
+    if args.concurrency is not None and args.concurrency < 1:
+        parser.error("--concurrency debe ser >= 1")
+    if args.shard_size < 1:
+        parser.error("--shard-size debe ser >= 1")
+    
+    options = ShardOptions(backend=args.backend, discovery=args.discovery, detail_level=args.detail_level,
+                           shard_size=args.shard_size, batch_size=args.batch_size)
+    summary = scrape(list(dict.fromkeys(args.categories)), args.out, output, concurrency=args.concurrency,
+                     worker_memory_mb=args.worker_memory_mb, options=options)
+    print_timings(summary)
+    
+    failed = [category for category, report in summary["categories"].items() if "error" in report]
+    if summary["result"] is None:
+        print("❌ No se encontraron posts")
+        return 1
+    print(f"✅ Posts escritos en {summary['result']}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())